@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐页检查点开销基准
+
+模拟 2000 页、每页约 1500 字的书籍，比较不同 fsync 间隔下写入检查点的总耗时，
+以及从检查点恢复（读取全部已完成页面）的耗时。单页 PDF 提取通常需要数十毫秒，
+检查点的开销应远小于提取本身。
+
+用法:
+    python benchmarks/bench_checkpoint.py [页数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.checkpoint import DEFAULT_FSYNC_EVERY, PageCheckpoint
+from src.models import PDFDocument, PageText
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    page_list = [
+        PageText(page_number=i, text=f"第 {i + 1} 页\n" + "价值投资与安全边际。" * 150)
+        for i in range(pages)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "book.pdf")
+        with open(source, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+        document = PDFDocument(file_path=source, page_count=pages)
+        path = os.path.join(tmpdir, "book.checkpoint")
+
+        print(f"{pages} 页")
+        print(f"{'fsync 间隔':<12} {'写入 (ms)':>10} {'每页 (ms)':>10}")
+        for fsync_every in (1, DEFAULT_FSYNC_EVERY, 128):
+            if os.path.exists(path):
+                os.remove(path)
+            start = time.perf_counter()
+            with PageCheckpoint(path, document, fsync_every=fsync_every) as checkpoint:
+                checkpoint.load()
+                for page in page_list:
+                    checkpoint.append(page)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{fsync_every:<12} {elapsed:>10.0f} {elapsed / pages:>10.3f}")
+
+        start = time.perf_counter()
+        with PageCheckpoint(path, document) as checkpoint:
+            restored = checkpoint.load()
+        elapsed = (time.perf_counter() - start) * 1000
+        assert len(restored) == pages
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"恢复 {len(restored)} 页（{size:.1f} MB）: {elapsed:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩输出基准
+
+模拟边提取边写出 ndjson：每页先执行一段纯 Python 计算（代替 pdfplumber 的
+页面解析），再交给写出器。对比不压缩、在写出线程中直接 gzip 压缩，以及
+后台线程 gzip / zstd 压缩的总耗时（三次中的最短值）和输出大小。
+
+用法:
+    python benchmarks/bench_compression.py [页数]
+"""
+
+import gzip
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.compression import GZIP_LEVEL, open_output
+from src.models import ExtractedContent, PageText
+from src.output_formatter import NDJSONWriter
+
+
+# 随机抽取常用汉字和单词生成文本，避免高度重复的文本让压缩耗时可以忽略
+_random = random.Random(0)
+_WORDS = [chr(_random.randint(0x4E00, 0x62FF)) for _ in range(3000)] + [
+    "value", "margin", "safety", "Graham", "1934", "，", "。\n"
+]
+CORPUS = "".join(_random.choice(_WORDS) for _ in range(200000))
+
+
+def simulate_extraction(page_number: int) -> PageText:
+    """模拟单页提取：约 2 ms 的纯 Python 计算，返回约 1500 字的页面"""
+    checksum = 0
+    for i in range(40000):
+        checksum = (checksum * 31 + i) & 0xFFFF
+    start = (page_number * 1500) % (len(CORPUS) - 1500)
+    text = f"第 {page_number + 1} 页 {checksum}\n" + CORPUS[start:start + 1500]
+    return PageText(page_number=page_number, text=text)
+
+
+def run(stream, pages: int) -> None:
+    writer = NDJSONWriter(stream)
+    writer.write_header("模拟书籍.pdf", pages)
+    page_list = []
+    for page_number in range(pages):
+        page = simulate_extraction(page_number)
+        writer.write_page(page)
+        page_list.append(page)
+    writer.write_footer(ExtractedContent("模拟书籍.pdf", pages, page_list))
+
+
+def inline_gzip(path: str):
+    """在写出线程中同步压缩（对照组）"""
+    return io.TextIOWrapper(
+        gzip.GzipFile(path, mode='wb', compresslevel=GZIP_LEVEL), encoding='utf-8'
+    )
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    cases = [
+        ("不压缩", "out.ndjson", lambda path: open_output(path)),
+        ("gzip（同步）", "out.ndjson.gz", inline_gzip),
+        ("gzip（后台线程）", "out.ndjson.gz", lambda path: open_output(path)),
+    ]
+    try:
+        import zstandard  # noqa: F401
+        cases.append(("zstd（后台线程）", "out.ndjson.zst", lambda path: open_output(path)))
+    except ImportError:
+        print("未安装 zstandard，跳过 zstd（pip install zstandard）")
+
+    print(f"{pages} 页")
+    print(f"{'方式':<16} {'耗时 (ms)':>10} {'大小 (KB)':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, filename, opener in cases:
+            path = os.path.join(tmpdir, filename)
+            elapsed = float('inf')
+            for _ in range(3):
+                start = time.perf_counter()
+                with opener(path) as stream:
+                    run(stream, pages)
+                elapsed = min(elapsed, (time.perf_counter() - start) * 1000)
+            size = os.path.getsize(path) / 1024
+            print(f"{name:<16} {elapsed:>10.0f} {size:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+守护进程模式基准
+
+生成一个单页小 PDF，依次通过入口脚本调用 N 次命令行提取（开启关键信息提取），
+比较直接执行与转发给守护进程执行的总耗时。
+
+用法:
+    python benchmarks/bench_daemon.py [调用次数]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reportlab.pdfgen import canvas
+
+from src.daemon import ENV_NO_DAEMON, ENV_SOCKET, stop_daemon
+
+ENTRY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pdf_extractor.py')
+
+
+def build_pdf(path: str) -> None:
+    """生成单页小 PDF"""
+    c = canvas.Canvas(path)
+    c.drawString(100, 750, "Value investing and the margin of safety.")
+    c.showPage()
+    c.save()
+
+
+def run_batch(pdf_path: str, count: int, env: dict) -> float:
+    """依次执行 count 次提取，返回平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run([sys.executable, ENTRY_SCRIPT, pdf_path, '-q'],
+                       env=env, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = os.path.join(tmpdir, "small.pdf")
+        socket_path = os.path.join(tmpdir, "daemon.sock")
+        build_pdf(pdf_path)
+
+        env = {k: v for k, v in os.environ.items() if k not in (ENV_SOCKET, ENV_NO_DAEMON)}
+        direct_env = dict(env, **{ENV_NO_DAEMON: "1"})
+        daemon_env = dict(env, **{ENV_SOCKET: socket_path})
+
+        daemon = subprocess.Popen([sys.executable, ENTRY_SCRIPT, '--daemon', '--socket', socket_path],
+                                  stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket_path):
+                if daemon.poll() is not None:
+                    sys.exit("守护进程启动失败")
+                time.sleep(0.05)
+
+            print(f"单页 PDF，调用 {count} 次")
+            print(f"{'方式':<10} {'平均耗时 (ms)':>14}")
+            for name, run_env in (("直接执行", direct_env), ("守护进程", daemon_env)):
+                print(f"{name:<10} {run_batch(pdf_path, count, run_env):>14.0f}")
+        finally:
+            stop_daemon(socket_path)
+            daemon.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 布局对比基准
+
+对比完整布局（-f json）与紧凑布局（-f json-compact）的体积、序列化和反序列化耗时。
+可以传入已有的 -f json 输出文件；不传时使用约 1.5 MB 文本的模拟书籍。
+
+用法:
+    python benchmarks/bench_json_layout.py [result.json ...]
+"""
+
+import sys
+import os
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import ExtractedContent, KeyInformation, PageText
+from src.output_formatter import OutputFormatter
+from src.result_loader import load_content, loads_content
+
+
+def build_content(pages: int = 500, chars_per_page: int = 3000) -> ExtractedContent:
+    """构造模拟提取结果"""
+    page_list = [
+        PageText(page_number=i, text=("价值投资与安全边际，\n" * (chars_per_page // 11)))
+        for i in range(pages)
+    ]
+    return ExtractedContent(
+        file_path="模拟书籍.pdf",
+        page_count=pages,
+        pages=page_list,
+        key_info=KeyInformation(keywords=["价值", "投资"], summary="价值投资与安全边际。")
+    )
+
+
+def timed(func, repeat: int = 3) -> float:
+    """返回多次执行中的最短耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def compare(name: str, content: ExtractedContent) -> None:
+    formatter = OutputFormatter()
+    print(f"\n{name}（{len(content.total_text):,} 字符，{content.page_count} 页）")
+    print(f"{'布局':>14} {'大小 (KB)':>12} {'序列化 (ms)':>12} {'反序列化 (ms)':>14}")
+    for output_format in ("json", "json-compact"):
+        serialized = formatter.format_as(content, output_format)
+        size = len(serialized.encode('utf-8'))
+        dump_ms = timed(lambda: formatter.format_as(content, output_format))
+        load_ms = timed(lambda: loads_content(serialized))
+        print(f"{output_format:>14} {size / 1024:>12,.0f} {dump_ms:>12.1f} {load_ms:>14.1f}")
+
+
+def main():
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            compare(path, load_content(path))
+    else:
+        compare("模拟书籍", build_content())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化后端基准
+
+对比标准库 json 与 orjson 后端在各 JSON 输出格式上的序列化耗时，并检查
+两种后端的输出逐字节一致。可以传入已有的 -f json 输出文件；不传时使用两本
+约 2.9 MB 的模拟书籍（中文文本和英文文本各一本）。
+
+用法:
+    python benchmarks/bench_json_serializer.py [result.json ...]
+"""
+
+import sys
+import os
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import json_serializer
+from src.models import ExtractedContent, KeyInformation, PageText
+from src.output_formatter import OutputFormatter
+from src.result_loader import load_content
+
+
+CJK_PARAGRAPH = "价值投资的核心是安全边际，格雷厄姆在一九三四年提出这一概念。\n"
+LATIN_PARAGRAPH = "Value investing relies on a margin of safety, as Graham wrote in 1934.\n"
+
+
+def build_content(paragraph: str, pages: int, chars_per_page: int) -> ExtractedContent:
+    """构造模拟提取结果"""
+    text = paragraph * (chars_per_page // len(paragraph))
+    page_list = [PageText(page_number=i, text=text) for i in range(pages)]
+    return ExtractedContent(
+        file_path="模拟书籍.pdf",
+        page_count=pages,
+        pages=page_list,
+        total_text="".join(page.text for page in page_list),
+        extraction_time=12.5,
+        key_info=KeyInformation(
+            keywords=["价值", "投资"],
+            summary="价值投资的核心是安全边际。",
+            stage_timings={"keywords": 0.8, "summary": 5e-06}
+        )
+    )
+
+
+def timed(func, repeat: int = 5) -> float:
+    """返回多次执行中的最短耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def compare(name: str, content: ExtractedContent) -> None:
+    formatter = OutputFormatter()
+    backends = [json_serializer.BACKEND_JSON]
+    if json_serializer.orjson is not None:
+        backends.append(json_serializer.BACKEND_ORJSON)
+
+    size = len(formatter.format_as_json(content).encode('utf-8'))
+    print(f"\n{name}（{size / 1024 / 1024:.1f} MB，{content.page_count} 页）")
+    print(f"{'格式':>14} {'后端':>8} {'序列化 (ms)':>12}")
+
+    default_backend = json_serializer.DEFAULT_BACKEND
+    try:
+        for output_format in ("json", "json-compact", "ndjson"):
+            outputs = {}
+            for backend in backends:
+                json_serializer.DEFAULT_BACKEND = backend
+                outputs[backend] = formatter.format_as(content, output_format)
+                dump_ms = timed(lambda: formatter.format_as(content, output_format))
+                print(f"{output_format:>14} {backend:>8} {dump_ms:>12.1f}")
+
+            if len(set(outputs.values())) != 1:
+                print(f"  警告: {output_format} 两种后端的输出不一致")
+    finally:
+        json_serializer.DEFAULT_BACKEND = default_backend
+
+    if json_serializer.orjson is None:
+        print("\n未安装 orjson，只测试了标准库后端（pip install orjson）")
+
+
+def main():
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            compare(path, load_content(path))
+    else:
+        compare("模拟中文书籍", build_content(CJK_PARAGRAPH, pages=400, chars_per_page=1200))
+        compare("模拟英文书籍", build_content(LATIN_PARAGRAPH, pages=1000, chars_per_page=1400))
+
+
+if __name__ == '__main__':
+    main()
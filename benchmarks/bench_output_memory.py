@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出写出内存基准
+
+对比“格式化为完整字符串再保存”与“逐页写出到文件”两种方式的峰值内存（tracemalloc）。
+模拟 500 页、每页约 3000 字的书籍。
+
+写出器对比的是已在内存中的内容；第二部分通过 PDFExtractionService.extract 逐页生成
+并写出同样的页面（模拟的提取器不读取 PDF），测量整个提取流程的峰值内存，
+已写出的页面未被释放时会在这里体现出来。
+
+用法:
+    python benchmarks/bench_output_memory.py
+"""
+
+import sys
+import os
+import tempfile
+import tracemalloc
+from unittest.mock import Mock, patch
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import ExtractedContent, PDFDocument, PageText
+from src.output_formatter import OutputFormatter
+from src.pdf_extraction_service import PDFExtractionService
+
+
+PAGES = 500
+CHARS_PER_PAGE = 3000
+
+
+def build_page(number: int, chars_per_page: int = CHARS_PER_PAGE) -> PageText:
+    return PageText(page_number=number, text=("价值投资与安全边际。" * (chars_per_page // 10)))
+
+
+def build_content(pages: int = PAGES) -> ExtractedContent:
+    """构造模拟提取结果"""
+    return ExtractedContent(file_path="book.pdf", page_count=pages, pages=[build_page(i) for i in range(pages)])
+
+
+def extract_streaming(output_format: str, path: str, pages: int = PAGES) -> None:
+    """通过提取服务逐页生成并写出页面（每页在提取时才创建）"""
+    service = PDFExtractionService()
+
+    def iter_pages(document, start_page=0):
+        for number in range(start_page, pages):
+            yield build_page(number), None
+
+    with patch.object(service, "path_handler") as path_handler, \
+         patch.object(service, "reader") as reader, \
+         patch.object(service.extractor, "iter_pages", side_effect=iter_pages):
+        path_handler.normalize_path.return_value = "book.pdf"
+        path_handler.validate_path.return_value = True
+        path_handler.is_pdf_file.return_value = True
+        reader.open.return_value = PDFDocument("book.pdf", pages, {}, Mock())
+        service.extract("book.pdf", output_format, extract_key_info=False, output_file=path)
+
+
+def measure(func) -> int:
+    """返回函数执行期间的峰值内存增量（字节）"""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    content = build_content()
+    formatter = OutputFormatter()
+    page_size = len(content.pages[0].text.encode('utf-8'))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "out")
+        print(f"总文本: {len(content.total_text):,} 字符，单页约 {page_size:,} 字节")
+        print(f"{'格式':>10} {'整体格式化 (KB)':>16} {'逐页写出 (KB)':>16}")
+        for output_format in ("text", "json", "markdown"):
+            method = getattr(formatter, f"format_as_{output_format}")
+            buffered = measure(lambda: formatter.save_to_file(method(content), path))
+            streamed = measure(lambda: formatter.write_to_file(content, output_format, path))
+            print(f"{output_format:>10} {buffered / 1024:>16,.0f} {streamed / 1024:>16,.0f}")
+
+        print("\n提取并逐页写出（不提取关键信息）")
+        print(f"{'格式':>10} {'峰值 (KB)':>16}")
+        for output_format in ("text", "json", "ndjson"):
+            peak = measure(lambda: extract_streaming(output_format, path))
+            print(f"{output_format:>10} {peak / 1024:>16,.0f}")
+
+
+if __name__ == '__main__':
+    main()
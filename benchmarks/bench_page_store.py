@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+随机访问单页基准
+
+模拟 2000 页、每页约 1500 字的书籍，比较读取第 1800 页的三种方式：
+- 加载完整 JSON 输出（-f json）后取出该页
+- 在纯文本输出（-f text）中查找 "=== 第 1800 页 ===" 分隔行
+- 用 PageStoreReader 打开页面存储（-f pages）并按偏移读取该页
+
+用法:
+    python benchmarks/bench_page_store.py [页数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import ExtractedContent, PageText
+from src.output_formatter import OutputFormatter
+from src.result_loader import PageStoreReader, load_content
+
+
+def build_content(pages: int) -> ExtractedContent:
+    """构造模拟提取结果"""
+    page_list = [
+        PageText(page_number=i, text=f"第 {i + 1} 页\n" + "价值投资与安全边际。" * 150)
+        for i in range(pages)
+    ]
+    return ExtractedContent(file_path="book.pdf", page_count=pages, pages=page_list)
+
+
+def read_from_json(path: str, index: int) -> str:
+    return load_content(path).pages[index].text
+
+
+def read_from_text(path: str, index: int) -> str:
+    start_marker = f"=== 第 {index + 1} 页 ===\n"
+    end_marker = f"\n=== 第 {index + 2} 页 ==="
+    with open(path, encoding='utf-8') as f:
+        data = f.read()
+    start = data.index(start_marker) + len(start_marker)
+    return data[start:data.index(end_marker, start)]
+
+
+def read_from_store(path: str, index: int) -> str:
+    with PageStoreReader(path) as store:
+        return store.get_page(index).text
+
+
+def best_of(func, *args, repeat: int = 5) -> float:
+    """多次执行取最短耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    index = pages * 9 // 10 - 1
+    content = build_content(pages)
+    formatter = OutputFormatter()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {}
+        for output_format, suffix in (("json", ".json"), ("text", ".txt"), ("pages", ".pages")):
+            paths[output_format] = os.path.join(tmpdir, "book" + suffix)
+            formatter.write_to_file(content, output_format, paths[output_format])
+
+        expected = content.pages[index].text
+        print(f"{pages} 页，读取第 {index + 1} 页")
+        print(f"{'方式':<10} {'文件 (MB)':>10} {'耗时 (ms)':>10}")
+        for name, output_format, reader in (
+            ("完整 JSON", "json", read_from_json),
+            ("文本查找", "text", read_from_text),
+            ("页面存储", "pages", read_from_store),
+        ):
+            path = paths[output_format]
+            assert reader(path, index).rstrip("\n") == expected
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{name:<10} {size:>10.1f} {best_of(reader, path, index):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
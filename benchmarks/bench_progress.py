@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度显示开销基准
+
+模拟较慢的终端（每次写入并刷新耗时固定），比较每页重绘一次进度与
+TerminalProgress 限频重绘的总开销。页面提取很快（如纯文本的小页面）时，
+逐页刷新终端的耗时会占到提取时间的可观比例。
+
+用法:
+    python benchmarks/bench_progress.py [页数] [每次刷新耗时（毫秒）]
+"""
+
+import io
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.progress import DocumentProgress, TerminalProgress
+
+
+class SlowTerminal(io.StringIO):
+    """每次刷新耗时 delay 秒的输出流"""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        time.sleep(self.delay)
+
+
+def every_page(pages: int, stream: SlowTerminal) -> float:
+    """每页重绘一次（旧实现的方式）"""
+    start = time.perf_counter()
+    for index in range(1, pages + 1):
+        stream.write(f"\r处理进度: {index}/{pages} ({index / pages * 100:.1f}%)")
+        stream.flush()
+    return time.perf_counter() - start
+
+
+def rate_limited(pages: int, stream: SlowTerminal) -> float:
+    """TerminalProgress，默认每秒最多重绘 10 次"""
+    start = time.perf_counter()
+    tracker = DocumentProgress(TerminalProgress(stream), "bench.pdf")
+    tracker.start(pages)
+    for _ in tracker.track(range(pages)):
+        pass
+    tracker.finish()
+    return time.perf_counter() - start
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.5 / 1000
+
+    print(f"{pages} 页，每次刷新 {delay * 1000:.2f} 毫秒")
+    for name, run in (("每页重绘", every_page), ("限频重绘", rate_limited)):
+        stream = SlowTerminal(delay)
+        elapsed = run(pages, stream)
+        print(f"  {name}: {elapsed:.3f} 秒，刷新 {stream.flushes} 次，{elapsed / pages * 1e6:.1f} 微秒/页")
+
+
+if __name__ == "__main__":
+    main()
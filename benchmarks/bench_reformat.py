@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重新格式化基准
+
+模拟 2000 页、每页约 1500 字的 JSON 输出，对比两种方式转换为 Markdown 的
+耗时和峰值内存（tracemalloc）：
+- 整体加载：load_content 解析完整 JSON 后格式化
+- 逐页读取：PDFExtractionService.reformat 增量解析，逐页写出
+
+用法:
+    python benchmarks/bench_reformat.py [页数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import ExtractedContent, PageText
+from src.output_formatter import OutputFormatter
+from src.pdf_extraction_service import PDFExtractionService
+from src.result_loader import load_content
+
+
+def build_content(pages: int) -> ExtractedContent:
+    """构造模拟提取结果"""
+    page_list = [
+        PageText(page_number=i, text=f"第 {i + 1} 页\n" + "价值投资与安全边际。" * 150)
+        for i in range(pages)
+    ]
+    return ExtractedContent(file_path="book.pdf", page_count=pages, pages=page_list)
+
+
+def measure(func):
+    """返回函数的耗时（毫秒）和峰值内存增量（MB）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    formatter = OutputFormatter()
+    service = PDFExtractionService()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_path = os.path.join(tmpdir, "book.json")
+        output_path = os.path.join(tmpdir, "book.md")
+        formatter.write_to_file(build_content(pages), "json", input_path)
+
+        def buffered():
+            formatter.write_to_file(load_content(input_path), "markdown", output_path)
+
+        def streamed():
+            service.reformat(input_path, "markdown", output_file=output_path)
+
+        size = os.path.getsize(input_path) / 1024 / 1024
+        print(f"{pages} 页，JSON 输入 {size:.1f} MB -> Markdown")
+        print(f"{'方式':<10} {'耗时 (ms)':>10} {'峰值内存 (MB)':>14}")
+        for name, func in (("整体加载", buffered), ("逐页读取", streamed)):
+            elapsed, peak = measure(func)
+            print(f"{name:<10} {elapsed:>10.0f} {peak:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
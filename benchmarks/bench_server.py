@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 提取服务压测
+
+在本机启动 serve 子命令（或使用 --url 指定已运行的服务），用多个线程并发上传
+同一份生成的 PDF，统计各状态码的数量、成功请求的延迟分位数、首字节时间和吞吐量。
+请求数超过 工作进程数 + 排队上限 时，超出的部分应快速返回 429，而不是堆积在服务端。
+
+用法:
+    python benchmarks/bench_server.py [-n 请求数] [-c 并发数] [--pages 页数]
+                                      [-j 工作进程数] [--queue 排队上限] [--url URL]
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reportlab.pdfgen import canvas
+
+ENTRY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pdf_extractor.py')
+
+
+def build_pdf(path: str, pages: int) -> None:
+    """生成每页若干行英文文本的 PDF"""
+    c = canvas.Canvas(path)
+    for page in range(pages):
+        for line in range(40):
+            c.drawString(50, 800 - line * 18, f"Page {page + 1} line {line + 1}: the margin of safety.")
+        c.showPage()
+    c.save()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(host: str, port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/health")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit("服务启动超时")
+
+
+def send(host: str, port: int, body: bytes, results: list) -> None:
+    """上传一次，记录 (状态码, 首字节耗时, 总耗时)"""
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(host, port, timeout=300)
+    try:
+        conn.request("POST", "/extract?format=ndjson&key_info=1", body=body,
+                     headers={"Expect": "100-continue"})
+        response = conn.getresponse()
+        first_byte = time.perf_counter() - start
+        response.read()
+        results.append((response.status, first_byte, time.perf_counter() - start))
+    except OSError:
+        results.append((0, 0.0, time.perf_counter() - start))
+    finally:
+        conn.close()
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 提取服务压测")
+    parser.add_argument("-n", "--requests", type=int, default=40)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("-j", "--workers", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=4)
+    parser.add_argument("--url", type=str, default=None, help="已运行的服务地址（不自动启动）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = os.path.join(tmpdir, "load.pdf")
+        build_pdf(pdf_path, args.pages)
+        with open(pdf_path, "rb") as f:
+            body = f.read()
+
+        process = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port
+        else:
+            host, port = "127.0.0.1", free_port()
+            process = subprocess.Popen(
+                [sys.executable, ENTRY_SCRIPT, "serve", "--port", str(port),
+                 "-j", str(args.workers), "--queue", str(args.queue)],
+                stderr=subprocess.DEVNULL
+            )
+        try:
+            wait_for_server(host, port)
+
+            results = []
+            semaphore = threading.Semaphore(args.concurrency)
+
+            def worker():
+                with semaphore:
+                    send(host, port, body, results)
+
+            start = time.perf_counter()
+            threads = [threading.Thread(target=worker) for _ in range(args.requests)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    statuses = Counter(status for status, _, _ in results)
+    ok = [r for r in results if r[0] == 200]
+    rejected = [r for r in results if r[0] == 429]
+    print(f"{args.requests} 个请求，并发 {args.concurrency}，每个 PDF {args.pages} 页，"
+          f"{len(body) / 1024:.0f} KB")
+    print("状态码: " + ", ".join(f"{status}×{count}" for status, count in sorted(statuses.items())))
+    if ok:
+        print(f"成功请求延迟 (ms): p50 {percentile([r[2] for r in ok], 0.5):.0f}  "
+              f"p95 {percentile([r[2] for r in ok], 0.95):.0f}  "
+              f"首字节 p50 {percentile([r[1] for r in ok], 0.5):.0f}")
+    if rejected:
+        print(f"429 响应延迟 (ms): p50 {percentile([r[2] for r in rejected], 0.5):.1f}")
+    print(f"总耗时 {elapsed:.1f} 秒，吞吐量 {len(ok) / elapsed:.1f} 个/秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 语料库基准
+
+向临时语料库批量写入模拟书籍（含 FTS5 分词索引），统计写入耗时，再测量
+几个典型检索词的页面级检索延迟。
+
+用法:
+    python benchmarks/bench_sqlite_search.py [书籍数] [每本页数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models import ExtractedContent, PageText
+from src.sqlite_store import SQLiteStore
+
+
+SENTENCES = [
+    "渴望是一切成就的起点。",
+    "安全边际是价值投资的核心。",
+    "坚持不懈的人最终会获得回报。",
+    "市场先生每天都会报出一个价格。",
+    "复利是世界第八大奇迹。",
+    "The margin of safety is the central concept of investment.",
+    "Mr. Market offers you a price every day.",
+]
+
+QUERIES = ["价值投资", "渴望", "市场 价格", "margin safety", "不存在的词语"]
+
+
+def build_books(books: int, pages: int):
+    """生成模拟书籍"""
+    rng = random.Random(0)
+    for book in range(books):
+        page_list = [
+            PageText(page_number=i, text="".join(rng.choice(SENTENCES) for _ in range(30)))
+            for i in range(pages)
+        ]
+        yield ExtractedContent(file_path=f"书籍{book:04d}.pdf", page_count=pages, pages=page_list)
+
+
+def main():
+    books = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "library.db")
+        with SQLiteStore(path) as store:
+            start = time.perf_counter()
+            store.write_many(build_books(books, pages))
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"写入 {books} 本书、{books * pages} 页: {elapsed:.2f} 秒，数据库 {size:.1f} MB")
+
+            print(f"\n{'检索词':<14} {'结果数':>6} {'耗时 (ms)':>10}")
+            for query in QUERIES:
+                best = float('inf')
+                for _ in range(5):
+                    start = time.perf_counter()
+                    hits = store.search(query, limit=20)
+                    best = min(best, time.perf_counter() - start)
+                print(f"{query:<14} {len(hits):>6} {best * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
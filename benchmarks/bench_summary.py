@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+摘要生成性能基准
+
+验证 KeyInfoAnalyzer.generate_summary 的开销与文档大小无关：
+惰性扫描句子，达到 max_length 后立即停止。
+
+用法:
+    python benchmarks/bench_summary.py
+"""
+
+import sys
+import os
+import timeit
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.key_info_analyzer import KeyInfoAnalyzer
+
+
+SENTENCE = "投资者应当关注企业的内在价值，而不是市场的短期波动。"
+
+
+def build_text(size: int) -> str:
+    """构造约 size 个字符的测试文本"""
+    repeat = size // len(SENTENCE) + 1
+    return (SENTENCE * repeat)[:size]
+
+
+def main():
+    analyzer = KeyInfoAnalyzer()
+    sizes = [10_000, 100_000, 500_000, 1_500_000]
+    number = 200
+
+    print(f"{'文本大小':>12} {'单次耗时 (µs)':>16}")
+    print("-" * 30)
+    for size in sizes:
+        text = build_text(size)
+        elapsed = timeit.timeit(
+            lambda: analyzer.generate_summary(text, max_length=200),
+            number=number
+        )
+        print(f"{size:>12,} {elapsed / number * 1e6:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TextRank 摘要性能基准
+
+模拟 250 页书籍（每页约 1500 字），对比 lead 与 textrank 两种摘要算法的耗时。
+需要安装 numpy 和 scipy。
+
+用法:
+    python benchmarks/bench_textrank.py
+"""
+
+import sys
+import os
+import random
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.key_info_analyzer import KeyInfoAnalyzer
+
+
+WORDS = [
+    "投资", "价值", "企业", "市场", "风险", "收益", "股票", "债券", "安全边际",
+    "分析", "长期", "短期", "波动", "价格", "财务", "报表", "利润", "资产",
+]
+
+
+def build_book(pages: int = 250, chars_per_page: int = 1500, seed: int = 42) -> str:
+    """构造模拟书籍文本"""
+    rng = random.Random(seed)
+    parts = []
+    total = pages * chars_per_page
+    length = 0
+    while length < total:
+        sentence = "".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20))) + "。"
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)
+
+
+def main():
+    analyzer = KeyInfoAnalyzer()
+    text = build_book()
+    print(f"文本长度: {len(text):,} 字符")
+
+    for method in ("lead", "textrank"):
+        start = time.perf_counter()
+        summary = analyzer.generate_summary(text, max_length=200, method=method)
+        elapsed = time.perf_counter() - start
+        print(f"{method:>10}: {elapsed * 1000:8.1f} ms  摘要长度 {len(summary)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+首页输出延迟基准
+
+用 reportlab 生成多页 PDF，对比两种输出到标准输出的方式中下游读到第一页的延迟
+（time-to-first-page）和总耗时：
+- 整体输出：提取、分析、格式化全部完成后一次性返回结果字符串
+- 逐页输出：每页提取完成后立即写出并刷新（命令行不指定 -o 时的方式）
+
+用法:
+    python benchmarks/bench_time_to_first_page.py [页数]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from src.pdf_extraction_service import PDFExtractionService
+
+
+LINE = "The margin of safety is always dependent on the price paid for a security."
+
+
+class TimedStream(io.StringIO):
+    """记录第一页正文写出时间的内存流（模拟管道下游）"""
+
+    def __init__(self):
+        super().__init__()
+        self.first_page = None
+
+    def write(self, s):
+        if self.first_page is None and "CHAPTER" in s:
+            self.first_page = time.perf_counter()
+        return super().write(s)
+
+
+def create_pdf(path: str, pages: int) -> None:
+    """生成每页约 40 行英文文本的 PDF"""
+    c = canvas.Canvas(path, pagesize=A4)
+    for page in range(pages):
+        c.setFont('Helvetica', 10)
+        c.drawString(72, 800, f"CHAPTER {page + 1}")
+        for line in range(40):
+            c.drawString(72, 780 - line * 18, LINE)
+        c.showPage()
+    c.save()
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    service = PDFExtractionService()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "book.pdf")
+        create_pdf(path, pages)
+
+        print(f"{pages} 页，text 格式，提取关键信息")
+        print(f"{'方式':<10} {'首页延迟 (ms)':>14} {'总耗时 (ms)':>12}")
+
+        start = time.perf_counter()
+        result = service.extract(path, output_format="text")
+        elapsed = time.perf_counter() - start
+        # 整体输出时，下游在结果返回后才能读到第一页
+        print(f"{'整体输出':<10} {elapsed * 1000:>14.0f} {elapsed * 1000:>12.0f}")
+        assert result
+
+        stream = TimedStream()
+        start = time.perf_counter()
+        service.extract(path, output_format="text", output_stream=stream)
+        elapsed = time.perf_counter() - start
+        first = stream.first_page - start
+        print(f"{'逐页输出':<10} {first * 1000:>14.0f} {elapsed * 1000:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
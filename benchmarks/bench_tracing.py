@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跟踪记录开销基准
+
+比较未启用跟踪和启用跟踪时每个 span 的开销。提取流程每页只有几个 span，
+而单页提取通常需要数十毫秒，未启用跟踪时的开销应可以忽略。
+
+用法:
+    python benchmarks/bench_tracing.py [span 数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tracing import span, start_tracing, stop_tracing
+
+
+def run_spans(count: int) -> float:
+    """执行 count 个 span，返回每个 span 的平均耗时（纳秒）"""
+    start = time.perf_counter()
+    for page in range(count):
+        with span("extract_text", page=page):
+            pass
+    return (time.perf_counter() - start) / count * 1e9
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    start = time.perf_counter()
+    for page in range(count):
+        pass
+    baseline = (time.perf_counter() - start) / count * 1e9
+
+    print(f"{count} 个 span")
+    print(f"  空循环:       {baseline:8.1f} ns/次")
+    print(f"  未启用跟踪:   {run_spans(count):8.1f} ns/次")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "trace.json")
+        start_tracing(path)
+        enabled = run_spans(count)
+        start = time.perf_counter()
+        events = stop_tracing()
+        merge = time.perf_counter() - start
+        print(f"  启用跟踪:     {enabled:8.1f} ns/次")
+        print(f"  合并 {events} 个事件: {merge:.3f} 秒，{os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,12 @@
 """PDF 文本提取工具 - 主入口脚本"""
 
 import sys
-from src.cli import main
+from src.daemon import run_in_daemon
 
 if __name__ == '__main__':
-    sys.exit(main())
+    # 守护进程（pdf_extractor.py --daemon）运行时转发给它执行，省去导入和加载词典的开销
+    exit_code = run_in_daemon(sys.argv[1:])
+    if exit_code is None:
+        from src.cli import main
+        exit_code = main()
+    sys.exit(exit_code)
@@ -2,7 +2,6 @@
 
 __version__ = "0.1.0"
 
-from .pdf_extraction_service import PDFExtractionService
 from .models import PDFDocument, PageText, ExtractedContent, KeyInformation
 from .exceptions import (
     PDFExtractionError,
@@ -30,3 +29,15 @@ __all__ = [
     'EncodingError',
     'PathError',
 ]
+
+
+def __getattr__(name):
+    """延迟导入 PDFExtractionService
+
+    导入服务会同时导入 pdfplumber 和 jieba；延迟导入后，只用到轻量模块
+    （如守护进程客户端 src.daemon）时不需要承担这部分启动开销。
+    """
+    if name == 'PDFExtractionService':
+        from .pdf_extraction_service import PDFExtractionService
+        return PDFExtractionService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
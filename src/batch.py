@@ -0,0 +1,296 @@
+"""批量提取模块
+
+把输入文件（或目录下的所有 PDF）加入持久化任务队列（参见 job_queue），
+由一个或多个工作进程领取并逐个提取到输出目录：
+- 输出文件先写入同目录下的临时文件，提取成功后再重命名，中断时不会留下不完整的结果
+- 重新运行同一批任务时跳过已完成的文件，失败的文件在次数上限内重试
+- 多次运行的批处理命令可以共享同一个队列，同时处理
+- 提供 on_progress 时，各工作进程的逐页进度经进程间队列汇总到调用 run 的进程
+
+命令行用法：
+    pdf-extractor batch books/ -d out/ -f json -j 4
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .compression import detect_compression
+from .config import ExtractionConfig
+from .exceptions import PDFExtractionError
+from .job_queue import DEFAULT_MAX_ATTEMPTS, Job, JobQueue
+from .progress import ProgressCallback
+from .tracing import span
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# 输出目录中默认的队列数据库文件名
+DEFAULT_QUEUE_NAME = ".pdf-extractor-jobs.db"
+
+# 输出格式 -> 输出文件后缀
+OUTPUT_SUFFIXES = {
+    'text': '.txt',
+    'json': '.json',
+    'json-compact': '.json',
+    'markdown': '.md',
+    'ndjson': '.ndjson',
+    'pages': '.pages',
+}
+
+# 单个任务完成后的回调：(任务, 错误信息)，成功时错误信息为 None
+ResultCallback = Callable[[Job, Optional[str]], None]
+
+
+def collect_inputs(inputs: Sequence[str]) -> List[Tuple[str, str]]:
+    """展开输入文件和目录
+
+    参数:
+        inputs: PDF 文件或目录路径（目录递归查找 .pdf 文件）
+
+    返回:
+        (PDF 绝对路径, 输出文件的相对路径，不含后缀) 列表；
+        目录中的文件保留相对于该目录的子目录结构
+    """
+    collected = []
+    for item in inputs:
+        path = Path(item).resolve()
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+            collected.extend((str(p), str(p.relative_to(path).with_suffix(""))) for p in files)
+        else:
+            collected.append((str(path), path.stem))
+    return collected
+
+
+def output_path_for(relative_stem: str, output_dir: str, output_format: str) -> str:
+    """输出文件路径：输出目录 / 相对路径 + 格式对应的后缀"""
+    return os.path.join(os.path.abspath(output_dir), relative_stem + OUTPUT_SUFFIXES[output_format])
+
+
+class BatchRunner:
+    """批量提取
+
+    使用方式：
+        runner = BatchRunner("out/.pdf-extractor-jobs.db", output_format="json")
+        runner.add(["books/"], "out/")
+        counts = runner.run(workers=4)
+    """
+
+    def __init__(
+        self,
+        queue_path: str,
+        output_format: str = "json",
+        extract_key_info: bool = True,
+        key_info_stages: Optional[Sequence[str]] = None,
+        config: Optional[ExtractionConfig] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        on_result: Optional[ResultCallback] = None,
+        checkpoint: bool = False,
+        on_progress: Optional[ProgressCallback] = None
+    ):
+        """初始化批处理
+
+        参数:
+            queue_path: 任务队列数据库路径
+            output_format: 输出格式（参见 OUTPUT_SUFFIXES）
+            extract_key_info: 是否提取关键信息
+            key_info_stages: 要执行的关键信息分析阶段（可选），默认执行所有阶段
+            config: 提取配置（可选）
+            max_attempts: 每个文件的最大尝试次数
+            on_result: 每个任务结束后的回调（在执行该任务的工作进程中调用）
+            checkpoint: 是否为每个文件保存逐页检查点（与输出文件同目录），
+                        重试时从最后完成的一页之后继续
+            on_progress: 逐页进度回调（在调用 run 的进程中调用），参见 progress.ProgressEvent
+        """
+        if output_format not in OUTPUT_SUFFIXES:
+            raise ValueError(
+                f"不支持的输出格式: {output_format}，支持的格式: {', '.join(OUTPUT_SUFFIXES)}"
+            )
+        self.queue_path = queue_path
+        self.output_format = output_format
+        self.extract_key_info = extract_key_info
+        self.key_info_stages = key_info_stages
+        self.config = config or ExtractionConfig()
+        self.max_attempts = max_attempts
+        self.on_result = on_result
+        self.checkpoint = checkpoint
+        self.on_progress = on_progress
+
+    def add(self, inputs: Sequence[str], output_dir: str) -> int:
+        """把输入文件加入队列（已在队列中的文件保持原状态）
+
+        返回:
+            新添加的任务数
+        """
+        jobs = [
+            (input_path, output_path_for(stem, output_dir, self.output_format))
+            for input_path, stem in collect_inputs(inputs)
+        ]
+        with JobQueue(self.queue_path, self.max_attempts) as queue:
+            return queue.enqueue(jobs)
+
+    def run(self, workers: int = 1) -> Dict[str, int]:
+        """处理队列中的任务，直到没有可领取的任务
+
+        参数:
+            workers: 工作进程数；为 1 时在当前进程中处理
+
+        返回:
+            处理结束后各状态的任务数
+        """
+        with JobQueue(self.queue_path, self.max_attempts) as queue:
+            queue.recover_stale()
+
+        if workers <= 1:
+            self.work(progress=self.on_progress)
+        else:
+            events = None
+            if self.on_progress is not None:
+                events = multiprocessing.Queue()
+                forwarder = threading.Thread(
+                    target=self._forward_progress, args=(events,), name="batch-progress", daemon=True
+                )
+                forwarder.start()
+            self._preload()
+            processes = [
+                multiprocessing.Process(target=self._child_work, args=(None, events))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            try:
+                for process in processes:
+                    process.join()
+            except KeyboardInterrupt:
+                # 工作进程同样收到 Ctrl-C，放回各自的任务后退出
+                for process in processes:
+                    process.join()
+                raise
+            finally:
+                if events is not None:
+                    # 工作进程退出前已写完各自的事件，结束标记排在最后
+                    events.put(None)
+                    forwarder.join()
+
+        with JobQueue(self.queue_path, self.max_attempts) as queue:
+            return queue.counts()
+
+    def work(
+        self,
+        stop_event=None,
+        idle_interval: float = 1.0,
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """工作进程：逐个领取并处理任务
+
+        参数:
+            stop_event: 停止信号（可选，如 multiprocessing.Event）。提供时作为常驻工作进程，
+                        队列为空时等待新任务，直到收到停止信号；不提供时队列为空即返回
+            idle_interval: 常驻工作进程队列为空时的检查间隔（秒）
+            progress: 逐页进度回调（可选），在当前进程中调用
+
+        返回:
+            处理的任务数
+        """
+        from .pdf_extraction_service import PDFExtractionService
+
+        service = PDFExtractionService(config=self.config)
+        processed = 0
+        with JobQueue(self.queue_path, self.max_attempts) as queue:
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    return processed
+                job = queue.claim()
+                if job is None:
+                    if stop_event is None or stop_event.wait(idle_interval):
+                        return processed
+                    continue
+                try:
+                    error = self._process(service, job, progress)
+                except KeyboardInterrupt:
+                    queue.release(job.id)
+                    raise
+                if error is None:
+                    queue.complete(job.id)
+                else:
+                    queue.fail(job.id, error)
+                processed += 1
+                if self.on_result is not None:
+                    self.on_result(job, error)
+
+    def start_workers(self, workers: int, stop_event) -> List[multiprocessing.Process]:
+        """启动常驻工作进程，收到 stop_event 后处理完当前任务即退出"""
+        self._preload()
+        processes = [
+            multiprocessing.Process(target=self._child_work, args=(stop_event,))
+            for _ in range(max(1, workers))
+        ]
+        for process in processes:
+            process.start()
+        return processes
+
+    def _preload(self) -> None:
+        """提取关键信息时在创建工作进程前预加载词表和 jieba 词典（fork 后由工作进程共享）"""
+        if self.extract_key_info:
+            from .lexicon import preload_lexicon
+
+            preload_lexicon(self.config)
+
+    def _child_work(self, stop_event=None, events=None) -> None:
+        try:
+            self.work(stop_event, progress=events.put if events is not None else None)
+        except KeyboardInterrupt:
+            pass
+
+    def _forward_progress(self, events) -> None:
+        """把工作进程的进度事件交给 on_progress，直到收到结束标记"""
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            try:
+                self.on_progress(event)
+            except Exception:
+                logger.exception("进度回调发生错误")
+
+    def _process(self, service, job: Job, progress: Optional[ProgressCallback] = None) -> Optional[str]:
+        """提取单个文件
+
+        返回:
+            错误信息，成功时为 None
+        """
+        # 同一任务同时只由一个工作进程处理；异常退出留下的临时文件在重试时被覆盖
+        output_dir = os.path.dirname(job.output_path)
+        partial_path = os.path.join(output_dir, f".{os.path.basename(job.output_path)}.part")
+        checkpoint_path = None
+        if self.checkpoint:
+            checkpoint_path = os.path.join(output_dir, f".{os.path.basename(job.output_path)}.checkpoint")
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            with span("job", file=job.input_path, attempt=job.attempts):
+                service.extract(
+                    job.input_path,
+                    output_format=self.output_format,
+                    extract_key_info=self.extract_key_info,
+                    output_file=partial_path,
+                    key_info_stages=self.key_info_stages,
+                    compression=detect_compression(job.output_path),
+                    checkpoint=checkpoint_path,
+                    progress=progress
+                )
+            os.replace(partial_path, job.output_path)
+            return None
+        except (PDFExtractionError, IOError, ValueError) as e:
+            logger.info(f"处理失败: {job.input_path}: {str(e)}")
+            return str(e)
+        except Exception as e:
+            logger.exception(f"处理失败: {job.input_path}")
+            return f"发生未知错误: {str(e)}"
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
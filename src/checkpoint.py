@@ -0,0 +1,175 @@
+"""逐页检查点模块
+
+提取很长的文档时，把每页的提取结果追加写入检查点文件，中途失败（进程被终止、
+机器重启）后用相同的检查点重新提取同一文件，会从最后完成的一页之后继续：
+- 文件为 NDJSON：第一行记录源文件标识（路径、大小、修改时间、页数），之后每页一行
+- 每写入 fsync_every 页调用一次 fsync，异常退出最多丢失最后一批尚未落盘的页面
+- 源文件被修改或不是同一文件时丢弃旧检查点，从头开始
+- 写了一半的最后一行在恢复时被截掉
+
+提取流程成功完成后由调用方删除检查点（参见 PDFExtractionService.extract 的 checkpoint 参数）。
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .models import PDFDocument, PageText
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+CHECKPOINT_FORMAT = "pdf-extractor-checkpoint"
+CHECKPOINT_VERSION = 1
+
+# 默认每写入多少页调用一次 fsync
+DEFAULT_FSYNC_EVERY = 16
+
+
+def source_identity(document: PDFDocument) -> Dict:
+    """源文件标识：文件被替换或修改后标识随之改变"""
+    stat = os.stat(document.file_path)
+    return {
+        "file_path": os.path.abspath(document.file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "page_count": document.page_count,
+    }
+
+
+def remove_checkpoint(path: str) -> None:
+    """删除检查点文件（提取流程完成后调用）"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class PageCheckpoint:
+    """逐页检查点文件
+
+    使用方式：
+        with PageCheckpoint("book.checkpoint", document) as checkpoint:
+            completed = checkpoint.load()
+            for page, error in extractor.iter_pages(document, start_page=len(completed)):
+                checkpoint.append(page, error)
+    """
+
+    def __init__(self, path: str, document: PDFDocument, fsync_every: int = DEFAULT_FSYNC_EVERY):
+        """初始化检查点
+
+        参数:
+            path: 检查点文件路径
+            document: 正在提取的 PDF 文档
+            fsync_every: 每写入多少页调用一次 fsync
+        """
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._header = {
+            "format": CHECKPOINT_FORMAT,
+            "version": CHECKPOINT_VERSION,
+            "source": source_identity(document),
+        }
+        self._file = None
+        self._unsynced = 0
+
+    def __enter__(self) -> "PageCheckpoint":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def load(self) -> List[Tuple[PageText, Optional[str]]]:
+        """读取已完成的页面，并打开文件以继续追加
+
+        返回:
+            (页面文本, 错误信息) 列表，按页码顺序排列；没有可用的检查点时为空列表
+
+        异常:
+            IOError: 检查点文件无法读写
+        """
+        completed, valid_size = self._read()
+        try:
+            if valid_size:
+                self._file = open(self.path, "r+b")
+                # 截掉写了一半的最后一行
+                self._file.truncate(valid_size)
+                self._file.seek(valid_size)
+            else:
+                self._file = open(self.path, "wb")
+                self._write_line(self._header)
+                self._sync()
+        except OSError as e:
+            raise IOError(f"检查点文件无法写入: {self.path}，错误: {str(e)}")
+
+        if completed:
+            logger.info(f"从检查点恢复 {len(completed)} 页: {self.path}")
+        return completed
+
+    def append(self, page: PageText, error: Optional[str] = None) -> None:
+        """追加一页，每 fsync_every 页落盘一次"""
+        record = {"page_number": page.page_number, "text": page.text}
+        if error:
+            record["error"] = error
+        self._write_line(record)
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self._sync()
+
+    def close(self) -> None:
+        """落盘并关闭文件"""
+        if self._file is None:
+            return
+        try:
+            self._sync()
+        finally:
+            self._file.close()
+            self._file = None
+
+    def _read(self) -> Tuple[List[Tuple[PageText, Optional[str]]], int]:
+        """读取检查点
+
+        返回:
+            (已完成的页面, 有效内容的字节数)；文件不存在或与源文件不匹配时为 ([], 0)
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        except OSError as e:
+            raise IOError(f"检查点文件无法读取: {self.path}，错误: {str(e)}")
+
+        completed = []
+        valid_size = 0
+        for index, line in enumerate(data.splitlines(keepends=True)):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if index == 0:
+                if record != self._header:
+                    logger.info(f"检查点与源文件不匹配，重新开始: {self.path}")
+                    return [], 0
+            else:
+                if not isinstance(record, dict) or record.get("page_number") != len(completed):
+                    break
+                completed.append((
+                    PageText(page_number=record["page_number"], text=record["text"]),
+                    record.get("error")
+                ))
+            valid_size += len(line)
+        return completed, valid_size
+
+    def _write_line(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line.encode("utf-8"))
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
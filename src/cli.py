@@ -5,16 +5,61 @@
 """
 
 import argparse
+import json
+import os
+import shutil
 import sys
 import logging
+import signal
+import tempfile
+import time
+from dataclasses import asdict
 from pathlib import Path
+from typing import List, Optional
 
 from .pdf_extraction_service import PDFExtractionService
 from .exceptions import PDFExtractionError
 from .config import get_config_manager
+from .key_info_analyzer import parse_stages
+from .models import StageTimings
+from .profiling import PROFILE_MODES, StageProfiler, report_prefix
+from .tracing import start_tracing, stop_tracing
+from .progress import TerminalProgress
+from .metrics import DEFAULT_METRICS_INTERVAL, MetricsExporter, PeriodicWriter, disable_shared as disable_metrics, enable_shared as enable_metrics
+from .output_formatter import WRITERS
+from .compression import COMPRESSIONS, detect_compression
+from .daemon import daemon_main, discard_stdout
+from .job_queue import DEFAULT_MAX_ATTEMPTS, STATUS_FAILED, STATUS_PENDING, STATUS_RUNNING, JobQueue
 from .logger import setup_logging as setup_logger_system
 
 
+def _parse_key_info_stages(value: str):
+    """解析 --key-info 参数"""
+    try:
+        return parse_stages(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _parse_sink_spec(value: str) -> str:
+    """解析 --sink 参数（只检查格式，不打开数据库）"""
+    from .sqlite_store import parse_sink
+
+    try:
+        parse_sink(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def _load_config_manager(parser: argparse.ArgumentParser, config_path: Optional[str]):
+    """加载配置，配置项取值不受支持时按参数错误退出"""
+    try:
+        return get_config_manager(config_path)
+    except ValueError as e:
+        parser.error(f"配置错误: {e}")
+
+
 def create_parser() -> argparse.ArgumentParser:
     """创建命令行参数解析器
     
@@ -57,9 +102,49 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         '-f', '--format',
         type=str,
-        choices=['text', 'json', 'markdown'],
+        choices=list(WRITERS),
         default='text',
-        help='输出格式（默认: text）。可选值: text（纯文本）, json（JSON格式）, markdown（Markdown格式）'
+        help='输出格式（默认: text）。可选值: text（纯文本）, json（JSON格式）, '
+             'json-compact（不含 total_text 的紧凑 JSON）, markdown（Markdown格式）, '
+             'ndjson（每页一行 JSON 记录）, pages（带页面偏移索引、可随机访问任意一页，需要 -o）'
+    )
+    
+    # 可选参数：追加到输出文件
+    parser.add_argument(
+        '--append',
+        action='store_true',
+        default=False,
+        help='追加到输出文件末尾而不是覆盖（仅支持 ndjson 格式，需要同时指定 -o）'
+    )
+    
+    # 可选参数：压缩输出
+    parser.add_argument(
+        '--compress',
+        type=str,
+        choices=list(COMPRESSIONS),
+        default=None,
+        help='压缩输出文件（需要同时指定 -o）。不指定时根据输出文件后缀（.gz / .zst）自动识别，'
+             'zstd 需要安装 zstandard'
+    )
+    
+    # 可选参数：结果存储
+    parser.add_argument(
+        '--sink',
+        type=_parse_sink_spec,
+        default=None,
+        metavar='SPEC',
+        help='同时将结果写入语料库，如 sqlite:library.db（支持全文检索，参见 search 子命令）。'
+             '未指定 -o 时不输出到标准输出'
+    )
+    
+    # 可选参数：逐页检查点
+    parser.add_argument(
+        '--checkpoint',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='逐页检查点文件。每页提取完成后追加写入；提取中途失败后使用相同的检查点重新运行，'
+             '从最后完成的一页之后继续。提取完成后自动删除'
     )
     
     # 可选参数：是否提取关键信息
@@ -70,6 +155,16 @@ def create_parser() -> argparse.ArgumentParser:
         help='提取关键信息（标题、关键词、摘要、列表）'
     )
     
+    # 可选参数：只执行选定的关键信息分析阶段
+    parser.add_argument(
+        '--key-info',
+        type=_parse_key_info_stages,
+        default=None,
+        metavar='STAGES',
+        help='只提取指定的关键信息，逗号分隔（如 keywords,summary）。'
+             '可选值: headings, keywords, summary, lists, all'
+    )
+    
     # 可选参数：不提取关键信息（与上面互斥）
     parser.add_argument(
         '--no-key-info',
@@ -86,6 +181,33 @@ def create_parser() -> argparse.ArgumentParser:
         help='显示提取进度（对于大文件很有用）'
     )
     
+    # 可选参数：显示耗时统计
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        default=False,
+        help='提取完成后在标准错误显示各阶段耗时和提取吞吐量（页/秒、字符/秒）'
+    )
+    
+    # 可选参数：按阶段性能分析
+    parser.add_argument(
+        '--profile',
+        type=str,
+        choices=list(PROFILE_MODES),
+        default=None,
+        help='按阶段分析性能，结果写在输出文件旁边（未指定 -o 时写在当前目录）：'
+             'cpu 为每个阶段写出 .pstats 文件，memory 写出各阶段分配最多的代码行'
+    )
+    
+    # 可选参数：跟踪记录
+    parser.add_argument(
+        '--trace',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='把打开文件、逐页提取、分析和写出的时间线保存为 Chrome trace-event JSON（可在 Perfetto 中查看）'
+    )
+    
     # 可选参数：详细输出
     parser.add_argument(
         '-v', '--verbose',
@@ -105,6 +227,828 @@ def create_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def create_search_parser() -> argparse.ArgumentParser:
+    """创建 search 子命令的参数解析器
+    
+    返回:
+        配置好的 ArgumentParser 对象
+    """
+    parser = argparse.ArgumentParser(
+        prog='pdf-extractor search',
+        description='在 SQLite 语料库中全文检索页面',
+        epilog='示例: pdf-extractor search library.db "安全边际 价值"',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        'database',
+        type=str,
+        help='语料库文件路径（由 --sink sqlite:路径 生成）'
+    )
+    
+    parser.add_argument(
+        'query',
+        type=str,
+        help='检索词，多个词以空格分隔（需同时出现）'
+    )
+    
+    parser.add_argument(
+        '-n', '--limit',
+        type=int,
+        default=20,
+        metavar='N',
+        help='最多返回的结果数（默认: 20）'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        type=str,
+        choices=['text', 'json'],
+        default='text',
+        help='输出格式（默认: text）'
+    )
+    
+    return parser
+
+
+def create_reformat_parser() -> argparse.ArgumentParser:
+    """创建 reformat 子命令的参数解析器
+    
+    返回:
+        配置好的 ArgumentParser 对象
+    """
+    parser = argparse.ArgumentParser(
+        prog='pdf-extractor reformat',
+        description='从已有的提取结果（JSON 输出或页面存储）重新格式化，不需要原始 PDF',
+        epilog='示例: pdf-extractor reformat 思考致富.json -f markdown --extract-key-info',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        'input',
+        type=str,
+        help='提取结果文件路径（-f json / json-compact / pages 的输出，可以是 .gz / .zst 压缩文件）'
+    )
+    
+    parser.add_argument(
+        '-c', '--config',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='配置文件路径（可选）'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='输出文件路径（可选）。如果不指定，结果将输出到标准输出'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        type=str,
+        choices=list(WRITERS),
+        default='text',
+        help='输出格式（默认: text）'
+    )
+    
+    parser.add_argument(
+        '--compress',
+        type=str,
+        choices=list(COMPRESSIONS),
+        default=None,
+        help='压缩输出文件（需要同时指定 -o）'
+    )
+    
+    parser.add_argument(
+        '--extract-key-info',
+        action='store_true',
+        help='重新分析关键信息。不指定时保留输入中已有的关键信息'
+    )
+    
+    parser.add_argument(
+        '--key-info',
+        type=_parse_key_info_stages,
+        default=None,
+        metavar='STAGES',
+        help='只重新分析指定的关键信息，逗号分隔（如 keywords,summary）'
+    )
+    
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='静默模式，只输出结果或错误信息'
+    )
+    
+    return parser
+
+
+def reformat_main(args: List[str]) -> int:
+    """reformat 子命令
+    
+    参数:
+        args: 子命令之后的参数列表
+    
+    返回:
+        退出代码（0 表示成功，1 表示失败）
+    """
+    parser = create_reformat_parser()
+    parsed_args = parser.parse_args(args)
+    if parsed_args.compress and not parsed_args.output:
+        parser.error('--compress 需要同时指定 -o')
+    if parsed_args.format == 'pages' and (
+        not parsed_args.output or parsed_args.compress or detect_compression(parsed_args.output)
+    ):
+        parser.error('pages 格式需要同时指定 -o，且不支持压缩')
+    
+    config_manager = _load_config_manager(parser, parsed_args.config)
+    setup_logging(quiet=parsed_args.quiet, config_manager=config_manager)
+    
+    try:
+        service = PDFExtractionService(config=config_manager.get_config())
+        result = service.reformat(
+            input_path=parsed_args.input,
+            output_format=parsed_args.format,
+            extract_key_info=parsed_args.extract_key_info or parsed_args.key_info is not None,
+            output_file=parsed_args.output,
+            key_info_stages=parsed_args.key_info,
+            output_stream=None if parsed_args.output else sys.stdout,
+            compression=parsed_args.compress
+        )
+        print_result(
+            result,
+            parsed_args.output,
+            parsed_args.quiet,
+            trailing_newline=parsed_args.format != 'ndjson'
+        )
+        return 0
+        
+    except BrokenPipeError:
+        # 下游已关闭管道（如 | head）
+        discard_stdout()
+        return 1
+        
+    except (IOError, ValueError) as e:
+        print(f"\n✗ {str(e)}", file=sys.stderr)
+        return 1
+
+
+def create_serve_parser() -> argparse.ArgumentParser:
+    """创建 serve 子命令的参数解析器
+    
+    返回:
+        配置好的 ArgumentParser 对象
+    """
+    from .server import DEFAULT_PORT, DEFAULT_QUEUE_SIZE
+
+    parser = argparse.ArgumentParser(
+        prog='pdf-extractor serve',
+        description='启动 HTTP 提取服务，接收 PDF 上传或本机文件路径，逐页返回提取结果',
+        epilog='示例: pdf-extractor serve --port 8000 -j 4\n'
+               '      curl -T book.pdf "http://127.0.0.1:8000/extract?format=json"',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help='监听地址（默认: 127.0.0.1，只接受本机请求；监听其他地址时不接受 path 参数）'
+    )
+    
+    parser.add_argument(
+        '-p', '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f'监听端口（默认: {DEFAULT_PORT}）'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        metavar='N',
+        help='工作进程数，即同时提取的请求数（默认: CPU 核数）'
+    )
+    
+    parser.add_argument(
+        '--queue',
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        metavar='N',
+        help=f'排队请求数上限，超出后返回 429（默认: {DEFAULT_QUEUE_SIZE}）'
+    )
+    
+    parser.add_argument(
+        '--max-upload',
+        type=int,
+        default=200,
+        metavar='MB',
+        help='上传文件大小上限，单位 MB（默认: 200）'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='把各工作进程处理请求的时间线保存为 Chrome trace-event JSON，服务停止时写出（可在 Perfetto 中查看）'
+    )
+    
+    parser.add_argument(
+        '-c', '--config',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='配置文件路径（可选）'
+    )
+    
+    return parser
+
+
+def serve_main(args: List[str]) -> int:
+    """serve 子命令
+    
+    参数:
+        args: 子命令之后的参数列表
+    
+    返回:
+        退出代码（0 表示成功，1 表示失败）
+    """
+    import asyncio
+    from .server import ExtractionServer
+
+    parser = create_serve_parser()
+    parsed_args = parser.parse_args(args)
+    config_manager = _load_config_manager(parser, parsed_args.config)
+    setup_logging(config_manager=config_manager)
+    
+    server = ExtractionServer(
+        config=config_manager.get_config(),
+        host=parsed_args.host,
+        port=parsed_args.port,
+        workers=parsed_args.workers,
+        queue_size=parsed_args.queue,
+        max_upload_size=parsed_args.max_upload * 1024 * 1024
+    )
+    if parsed_args.trace:
+        start_tracing(parsed_args.trace)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n✓ 服务已停止", file=sys.stderr)
+    except OSError as e:
+        print(f"✗ 服务启动失败: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        # 关闭服务时已等待工作进程退出，各进程的跟踪记录都已写出
+        if parsed_args.trace:
+            save_trace(parsed_args.trace)
+    return 0
+
+
+def create_batch_parser() -> argparse.ArgumentParser:
+    """创建 batch 子命令的参数解析器
+    
+    返回:
+        配置好的 ArgumentParser 对象
+    """
+    from .batch import DEFAULT_QUEUE_NAME, OUTPUT_SUFFIXES
+
+    parser = argparse.ArgumentParser(
+        prog='pdf-extractor batch',
+        description='批量提取多个 PDF 文件到输出目录。任务状态保存在 SQLite 队列中，'
+                    '中断后重新运行同一命令时跳过已完成的文件，并重试失败的文件',
+        epilog='示例: pdf-extractor batch books/ -d out/ -f json -j 4',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        'inputs',
+        type=str,
+        nargs='*',
+        metavar='INPUT',
+        help='PDF 文件或目录（递归查找 .pdf 文件）。不指定时只处理队列中已有的任务'
+    )
+    
+    parser.add_argument(
+        '-d', '--output-dir',
+        type=str,
+        required=True,
+        metavar='DIR',
+        help='输出目录，目录输入的子目录结构保留在输出目录中'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        type=str,
+        choices=list(OUTPUT_SUFFIXES),
+        default='json',
+        help='输出格式（默认: json）'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        metavar='N',
+        help='工作进程数（默认: CPU 核数）'
+    )
+    
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        metavar='N',
+        help=f'每个文件的最大尝试次数（默认: {DEFAULT_MAX_ATTEMPTS}）'
+    )
+    
+    parser.add_argument(
+        '--queue-db',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help=f'任务队列数据库路径（默认: 输出目录下的 {DEFAULT_QUEUE_NAME}）'
+    )
+    
+    parser.add_argument(
+        '--checkpoint',
+        action='store_true',
+        help='为每个文件保存逐页检查点，重试中断或失败的文件时从最后完成的一页之后继续'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='定期把 Prometheus 格式的运行指标写到该文件（如 node_exporter textfile 目录下的 .prom 文件）'
+    )
+    
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=DEFAULT_METRICS_INTERVAL,
+        metavar='SECONDS',
+        help=f'运行指标的写出间隔，单位秒（默认: {DEFAULT_METRICS_INTERVAL:g}）'
+    )
+    
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help='在同一行显示所有工作进程汇总的进度（文件数、页/秒和预计剩余时间）'
+    )
+    
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help='只显示队列中各状态的任务数和失败原因，不执行提取'
+    )
+    
+    parser.add_argument(
+        '-c', '--config',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='配置文件路径（可选）'
+    )
+    
+    parser.add_argument(
+        '--extract-key-info',
+        action='store_true',
+        help='提取关键信息'
+    )
+    
+    parser.add_argument(
+        '--key-info',
+        type=_parse_key_info_stages,
+        default=None,
+        metavar='STAGES',
+        help='只提取指定的关键信息，逗号分隔（如 keywords,summary）'
+    )
+    
+    parser.add_argument(
+        '--no-key-info',
+        action='store_true',
+        help='不提取关键信息'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='把各工作进程的时间线保存为 Chrome trace-event JSON（可在 Perfetto 中查看）'
+    )
+    
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='静默模式，不显示每个文件的处理结果'
+    )
+    
+    return parser
+
+
+def start_metrics(path: str, interval: float, queue_path: str) -> PeriodicWriter:
+    """启用多进程运行指标，并在后台定期写出到 path（排队深度从任务队列读取）"""
+    exporter = MetricsExporter(tempfile.mkdtemp(prefix="pdf-extractor-metrics-"))
+    enable_metrics(exporter.directory)
+    
+    def gauges():
+        with JobQueue(queue_path) as queue:
+            counts = queue.counts()
+        return {"queue_depth": counts[STATUS_PENDING], "jobs_running": counts[STATUS_RUNNING]}
+    
+    writer = PeriodicWriter(exporter, path, interval, gauges)
+    writer.start()
+    return writer
+
+
+def stop_metrics(writer: PeriodicWriter) -> None:
+    """写出最终的运行指标并删除各进程的临时数据"""
+    try:
+        writer.stop()
+    except IOError as e:
+        print(f"✗ {str(e)}", file=sys.stderr)
+    finally:
+        disable_metrics()
+        shutil.rmtree(writer.exporter.directory, ignore_errors=True)
+
+
+def print_batch_status(queue: JobQueue) -> None:
+    """显示队列中各状态的任务数和失败原因"""
+    counts = queue.counts()
+    print(
+        f"待处理 {counts['pending']}，处理中 {counts['running']}，"
+        f"已完成 {counts['done']}，失败 {counts['failed']}"
+        f"（其中 {queue.exhausted_count()} 个已达到 {queue.max_attempts} 次的尝试上限）",
+        file=sys.stderr
+    )
+    for job in queue.jobs(STATUS_FAILED):
+        print(f"  ✗ {job.input_path}（已尝试 {job.attempts} 次）: {job.error}", file=sys.stderr)
+
+
+def batch_main(args: List[str]) -> int:
+    """batch 子命令
+    
+    参数:
+        args: 子命令之后的参数列表
+    
+    返回:
+        退出代码（0 表示全部完成，1 表示有失败的文件）
+    """
+    from .batch import DEFAULT_QUEUE_NAME, BatchRunner
+
+    parser = create_batch_parser()
+    parsed_args = parser.parse_args(args)
+    queue_path = parsed_args.queue_db or os.path.join(parsed_args.output_dir, DEFAULT_QUEUE_NAME)
+    
+    if parsed_args.status:
+        if not os.path.exists(queue_path):
+            print(f"✗ 任务队列不存在: {queue_path}", file=sys.stderr)
+            return 1
+        with JobQueue(queue_path, parsed_args.max_attempts) as queue:
+            print_batch_status(queue)
+        return 0
+    
+    config_manager = _load_config_manager(parser, parsed_args.config)
+    config = config_manager.get_config()
+    setup_logging(quiet=parsed_args.quiet, config_manager=config_manager)
+    
+    extract_key_info = parsed_args.extract_key_info or parsed_args.key_info is not None
+    if parsed_args.no_key_info:
+        extract_key_info = False
+    elif not extract_key_info:
+        extract_key_info = config.extract_key_info
+    
+    def report(job, error):
+        if error is None:
+            print(f"✓ {job.input_path}（{time.time() - job.started_at:.1f} 秒）", file=sys.stderr)
+        else:
+            print(f"✗ {job.input_path}: {error}", file=sys.stderr)
+    
+    # 显示进度时每个文件的结果由进度显示输出在进度行上方
+    progress = TerminalProgress(show_documents=not parsed_args.quiet) if parsed_args.progress else None
+    metrics_writer = None
+    try:
+        os.makedirs(parsed_args.output_dir, exist_ok=True)
+        runner = BatchRunner(
+            queue_path,
+            output_format=parsed_args.format,
+            extract_key_info=extract_key_info,
+            key_info_stages=parsed_args.key_info,
+            config=config,
+            max_attempts=parsed_args.max_attempts,
+            on_result=None if parsed_args.quiet or progress is not None else report,
+            checkpoint=parsed_args.checkpoint,
+            on_progress=progress
+        )
+        added = runner.add(parsed_args.inputs, parsed_args.output_dir)
+        if not parsed_args.quiet:
+            print(f"新增 {added} 个任务，任务队列: {queue_path}", file=sys.stderr)
+        if progress is not None:
+            with JobQueue(queue_path, parsed_args.max_attempts) as queue:
+                counts = queue.counts()
+                progress.total_documents = (
+                    counts[STATUS_PENDING] + counts[STATUS_FAILED] - queue.exhausted_count()
+                )
+        if parsed_args.trace:
+            start_tracing(parsed_args.trace)
+        if parsed_args.metrics:
+            metrics_writer = start_metrics(parsed_args.metrics, parsed_args.metrics_interval, queue_path)
+        runner.run(workers=parsed_args.workers or os.cpu_count() or 1)
+        
+    except (IOError, ValueError) as e:
+        print(f"\n✗ {str(e)}", file=sys.stderr)
+        return 1
+        
+    except KeyboardInterrupt:
+        print("\n\n✗ 操作已取消，重新运行同一命令可继续处理", file=sys.stderr)
+        return 1
+    
+    finally:
+        if progress is not None:
+            progress.close()
+        if parsed_args.trace:
+            save_trace(parsed_args.trace)
+        if metrics_writer is not None:
+            stop_metrics(metrics_writer)
+    
+    with JobQueue(queue_path, parsed_args.max_attempts) as queue:
+        print_batch_status(queue)
+        return 1 if queue.counts()[STATUS_FAILED] else 0
+
+
+def create_watch_parser() -> argparse.ArgumentParser:
+    """创建 watch 子命令的参数解析器
+    
+    返回:
+        配置好的 ArgumentParser 对象
+    """
+    from .batch import DEFAULT_QUEUE_NAME, OUTPUT_SUFFIXES
+    from .watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_TIME
+
+    parser = argparse.ArgumentParser(
+        prog='pdf-extractor watch',
+        description='监视目录，把新放入或被修改的 PDF 交给常驻工作进程提取到输出目录。'
+                    '启动时跳过输出文件比输入文件新的 PDF，按 Ctrl-C 停止',
+        epilog='示例: pdf-extractor watch inbox/ -d out/ -j 2',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    parser.add_argument(
+        'directory',
+        type=str,
+        metavar='DIR',
+        help='监视的目录（包括子目录）'
+    )
+    
+    parser.add_argument(
+        '-d', '--output-dir',
+        type=str,
+        required=True,
+        metavar='DIR',
+        help='输出目录，子目录结构保留在输出目录中'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        type=str,
+        choices=list(OUTPUT_SUFFIXES),
+        default='json',
+        help='输出格式（默认: json）'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=1,
+        metavar='N',
+        help='常驻工作进程数（默认: 1）'
+    )
+    
+    parser.add_argument(
+        '--settle',
+        type=float,
+        default=DEFAULT_SETTLE_TIME,
+        metavar='SECONDS',
+        help='文件大小和修改时间多少秒内不再变化后才提交，避免处理仍在写入的文件'
+             f'（默认: {DEFAULT_SETTLE_TIME:g}）'
+    )
+    
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help=f'不使用 inotify，每 {DEFAULT_POLL_INTERVAL:g} 秒扫描一次目录（适用于网络文件系统）'
+    )
+    
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        metavar='N',
+        help=f'每个文件的最大尝试次数（默认: {DEFAULT_MAX_ATTEMPTS}）'
+    )
+    
+    parser.add_argument(
+        '--queue-db',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help=f'任务队列数据库路径（默认: 输出目录下的 {DEFAULT_QUEUE_NAME}）'
+    )
+    
+    parser.add_argument(
+        '--checkpoint',
+        action='store_true',
+        help='为每个文件保存逐页检查点，重试中断或失败的文件时从最后完成的一页之后继续'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='定期把 Prometheus 格式的运行指标写到该文件（如 node_exporter textfile 目录下的 .prom 文件）'
+    )
+    
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=DEFAULT_METRICS_INTERVAL,
+        metavar='SECONDS',
+        help=f'运行指标的写出间隔，单位秒（默认: {DEFAULT_METRICS_INTERVAL:g}）'
+    )
+    
+    parser.add_argument(
+        '-c', '--config',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='配置文件路径（可选）'
+    )
+    
+    parser.add_argument(
+        '--extract-key-info',
+        action='store_true',
+        help='提取关键信息'
+    )
+    
+    parser.add_argument(
+        '--key-info',
+        type=_parse_key_info_stages,
+        default=None,
+        metavar='STAGES',
+        help='只提取指定的关键信息，逗号分隔（如 keywords,summary）'
+    )
+    
+    parser.add_argument(
+        '--no-key-info',
+        action='store_true',
+        help='不提取关键信息'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='把各工作进程的时间线保存为 Chrome trace-event JSON，停止监视时写出（可在 Perfetto 中查看）'
+    )
+    
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='静默模式，不显示每个文件的处理结果'
+    )
+    
+    return parser
+
+
+def watch_main(args: List[str]) -> int:
+    """watch 子命令
+    
+    参数:
+        args: 子命令之后的参数列表
+    
+    返回:
+        退出代码（0 表示正常停止，1 表示失败）
+    """
+    from .batch import DEFAULT_QUEUE_NAME, BatchRunner
+    from .watch import FolderWatcher
+
+    parser = create_watch_parser()
+    parsed_args = parser.parse_args(args)
+    if not os.path.isdir(parsed_args.directory):
+        print(f"✗ 目录不存在: {parsed_args.directory}", file=sys.stderr)
+        return 1
+    queue_path = parsed_args.queue_db or os.path.join(parsed_args.output_dir, DEFAULT_QUEUE_NAME)
+    
+    config_manager = _load_config_manager(parser, parsed_args.config)
+    config = config_manager.get_config()
+    setup_logging(quiet=parsed_args.quiet, config_manager=config_manager)
+    
+    extract_key_info = parsed_args.extract_key_info or parsed_args.key_info is not None
+    if parsed_args.no_key_info:
+        extract_key_info = False
+    elif not extract_key_info:
+        extract_key_info = config.extract_key_info
+    
+    def report(job, error):
+        if error is None:
+            print(f"✓ {job.input_path}（{time.time() - job.started_at:.1f} 秒）", file=sys.stderr)
+        else:
+            print(f"✗ {job.input_path}: {error}", file=sys.stderr)
+    
+    metrics_writer = None
+    try:
+        os.makedirs(parsed_args.output_dir, exist_ok=True)
+        runner = BatchRunner(
+            queue_path,
+            output_format=parsed_args.format,
+            extract_key_info=extract_key_info,
+            key_info_stages=parsed_args.key_info,
+            config=config,
+            max_attempts=parsed_args.max_attempts,
+            on_result=None if parsed_args.quiet else report,
+            checkpoint=parsed_args.checkpoint
+        )
+        watcher = FolderWatcher(
+            parsed_args.directory,
+            parsed_args.output_dir,
+            runner,
+            workers=parsed_args.workers,
+            settle_time=parsed_args.settle,
+            force_polling=parsed_args.poll
+        )
+        # SIGTERM（如 systemd 停止服务）时处理完当前文件再退出
+        signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+        if not parsed_args.quiet:
+            print(f"✓ 正在监视 {watcher.directory}，输出到 {watcher.output_dir}（按 Ctrl-C 停止）",
+                  file=sys.stderr)
+        if parsed_args.trace:
+            start_tracing(parsed_args.trace)
+        if parsed_args.metrics:
+            metrics_writer = start_metrics(parsed_args.metrics, parsed_args.metrics_interval, queue_path)
+        watcher.run()
+        
+    except (IOError, ValueError) as e:
+        print(f"\n✗ {str(e)}", file=sys.stderr)
+        return 1
+        
+    except KeyboardInterrupt:
+        pass
+    
+    finally:
+        if parsed_args.trace:
+            save_trace(parsed_args.trace)
+        if metrics_writer is not None:
+            stop_metrics(metrics_writer)
+    
+    print("\n✓ 已停止监视，未完成的文件在下次启动时继续处理", file=sys.stderr)
+    return 0
+
+
+def search_main(args: List[str]) -> int:
+    """search 子命令
+    
+    参数:
+        args: 子命令之后的参数列表
+    
+    返回:
+        退出代码（0 表示成功，1 表示失败）
+    """
+    from .sqlite_store import SQLiteStore
+
+    parsed_args = create_search_parser().parse_args(args)
+    
+    if not os.path.exists(parsed_args.database):
+        print(f"✗ 语料库不存在: {parsed_args.database}", file=sys.stderr)
+        return 1
+    
+    try:
+        start_time = time.perf_counter()
+        with SQLiteStore(parsed_args.database) as store:
+            hits = store.search(parsed_args.query, limit=parsed_args.limit)
+        elapsed = (time.perf_counter() - start_time) * 1000
+    except Exception as e:
+        print(f"✗ 检索失败: {str(e)}", file=sys.stderr)
+        return 1
+    
+    if parsed_args.format == 'json':
+        print(json.dumps([asdict(hit) for hit in hits], ensure_ascii=False, indent=2))
+    else:
+        for hit in hits:
+            snippet = " ".join(hit.snippet.split())
+            print(f"{hit.file_path} 第 {hit.page_number} 页: {snippet}")
+        print(f"共 {len(hits)} 条结果，耗时 {elapsed:.1f} 毫秒", file=sys.stderr)
+    
+    return 0
+
+
 def setup_logging(verbose: bool = False, quiet: bool = False, config_manager=None):
     """配置日志系统
     
@@ -145,23 +1089,104 @@ def setup_logging(verbose: bool = False, quiet: bool = False, config_manager=Non
     )
 
 
-def print_result(result: str, output_file: str = None, quiet: bool = False):
+def print_result(
+    result: Optional[str],
+    output_file: str = None,
+    quiet: bool = False,
+    trailing_newline: bool = True
+):
     """打印或保存结果
     
     参数:
-        result: 提取的结果字符串
+        result: 提取的结果字符串；已逐页写出到标准输出时为 None
         output_file: 输出文件路径（如果已保存）
         quiet: 是否静默模式
+        trailing_newline: 逐页写出到标准输出后是否补上结尾换行
+                          （ndjson 每条记录已以换行结尾，不需要补）
     """
     if output_file:
         # 如果已保存到文件，显示成功消息
         if not quiet:
             print(f"\n✓ 提取完成！结果已保存到: {output_file}")
+    elif result is None:
+        # 结果已逐页写出到标准输出，补上结尾换行
+        if trailing_newline:
+            print()
     else:
         # 否则输出到标准输出
         print(result)
 
 
+# --stats 显示的最慢页面数
+SLOW_PAGES_TOP = 5
+
+# 页面复杂度各项计数的显示名称
+_COMPLEXITY_LABELS = {
+    "chars": "字符",
+    "lines": "直线",
+    "rects": "矩形",
+    "curves": "曲线",
+    "images": "图片",
+    "content_bytes": "内容流大小",
+}
+
+
+def print_stats(timings: StageTimings) -> None:
+    """在标准错误显示各阶段耗时和提取吞吐量"""
+    print("\n各阶段耗时:", file=sys.stderr)
+    print(f"  打开文件: {timings.open:.3f} 秒", file=sys.stderr)
+    restored = f"，另有 {timings.restored_pages} 页从检查点恢复" if timings.restored_pages else ""
+    print(
+        f"  提取文本: {timings.extract:.3f} 秒（{timings.extracted_pages} 页，"
+        f"{timings.pages_per_second:.1f} 页/秒，{timings.chars_per_second:.0f} 字符/秒{restored}）",
+        file=sys.stderr
+    )
+    for stage, elapsed in timings.analysis.items():
+        print(f"  关键信息 {stage}: {elapsed:.3f} 秒", file=sys.stderr)
+    if timings.format:
+        print(f"  格式化: {timings.format:.3f} 秒", file=sys.stderr)
+    print(f"  写出: {timings.write:.3f} 秒", file=sys.stderr)
+    print(f"  总计: {timings.total:.3f} 秒", file=sys.stderr)
+    if timings.time_to_first_page:
+        print(f"  第一页写出: {timings.time_to_first_page:.3f} 秒", file=sys.stderr)
+    print_slow_pages(timings)
+
+
+def print_slow_pages(timings: StageTimings, top: int = SLOW_PAGES_TOP) -> None:
+    """在标准错误显示提取最慢的页面及其对象数，以及每页耗时与对象数的相关系数"""
+    slowest = timings.slowest_pages(top)
+    if not slowest:
+        return
+    print(f"\n最慢的 {len(slowest)} 页:", file=sys.stderr)
+    for page_number, elapsed, complexity in slowest:
+        line = f"  第 {page_number + 1} 页: {elapsed:.3f} 秒"
+        if complexity is not None:
+            counts = "，".join(
+                f"{label} {getattr(complexity, name)}" for name, label in _COMPLEXITY_LABELS.items()
+                if name != "content_bytes"
+            )
+            line += f"（{counts}，内容流 {complexity.content_bytes / 1024:.1f} KiB）"
+        print(line, file=sys.stderr)
+    
+    correlation = timings.complexity_correlation()
+    if any(value is not None for value in correlation.values()):
+        values = "，".join(
+            f"{_COMPLEXITY_LABELS[name]} {value:+.2f}" for name, value in correlation.items()
+            if value is not None
+        )
+        print(f"每页耗时与对象数的相关系数: {values}", file=sys.stderr)
+
+
+def save_trace(path: str) -> None:
+    """停止跟踪，合并各进程的跟踪记录并显示保存位置"""
+    try:
+        count = stop_tracing()
+    except IOError as e:
+        print(f"✗ {str(e)}", file=sys.stderr)
+        return
+    print(f"✓ 跟踪记录已保存: {path}（{count} 个事件，可在 https://ui.perfetto.dev 打开）", file=sys.stderr)
+
+
 def main(args=None):
     """主函数
     
@@ -171,22 +1196,47 @@ def main(args=None):
     返回:
         退出代码（0 表示成功，1 表示失败）
     """
+    if args is None:
+        args = sys.argv[1:]
+    
+    # 子命令
+    if args and args[0] == 'search':
+        return search_main(args[1:])
+    if args and args[0] == 'reformat':
+        return reformat_main(args[1:])
+    if args and args[0] == 'serve':
+        return serve_main(args[1:])
+    if args and args[0] == 'batch':
+        return batch_main(args[1:])
+    if args and args[0] == 'watch':
+        return watch_main(args[1:])
+    if args and args[0] == '--daemon':
+        return daemon_main(args[1:])
+    
     # 解析命令行参数
     parser = create_parser()
     parsed_args = parser.parse_args(args)
+    if parsed_args.append and (parsed_args.format != 'ndjson' or not parsed_args.output):
+        parser.error('--append 仅支持 ndjson 格式，且需要同时指定 -o')
+    if parsed_args.compress and not parsed_args.output:
+        parser.error('--compress 需要同时指定 -o')
+    if parsed_args.format == 'pages' and (
+        not parsed_args.output or parsed_args.compress or detect_compression(parsed_args.output)
+    ):
+        parser.error('pages 格式需要同时指定 -o，且不支持压缩')
     
     # 加载配置
-    config_manager = get_config_manager(parsed_args.config)
+    config_manager = _load_config_manager(parser, parsed_args.config)
     config = config_manager.get_config()
     
     # 配置日志
     setup_logging(parsed_args.verbose, parsed_args.quiet, config_manager)
     
     # 确定是否提取关键信息
-    extract_key_info = parsed_args.extract_key_info
+    extract_key_info = parsed_args.extract_key_info or parsed_args.key_info is not None
     if parsed_args.no_key_info:
         extract_key_info = False
-    elif not parsed_args.extract_key_info and not parsed_args.no_key_info:
+    elif not extract_key_info:
         # 如果用户没有指定，使用配置文件中的默认值
         extract_key_info = config.extract_key_info
     
@@ -198,26 +1248,67 @@ def main(args=None):
         output_format = config.default_output_format
     
     try:
-        # 显示开始消息
+        # 显示开始消息（写到标准错误，结果逐页写出到标准输出时不会混入结果）
         if not parsed_args.quiet:
-            print(f"正在处理文件: {parsed_args.input}")
+            print(f"正在处理文件: {parsed_args.input}", file=sys.stderr)
             if extract_key_info:
-                print("将提取关键信息...")
+                print("将提取关键信息...", file=sys.stderr)
         
         # 创建服务实例
-        service = PDFExtractionService()
+        service = PDFExtractionService(config=config)
+        sink = None
+        if parsed_args.sink:
+            # 语料库的分词依赖 jieba，只在写入语料库时导入
+            from .sqlite_store import open_sink
+            sink = open_sink(parsed_args.sink)
         
         # 执行提取
-        result = service.extract(
-            file_path=parsed_args.input,
-            output_format=output_format,
-            extract_key_info=extract_key_info,
-            output_file=parsed_args.output,
-            show_progress=parsed_args.progress
-        )
+        timings = StageTimings()
+        profiler = StageProfiler(parsed_args.profile) if parsed_args.profile else None
+        if parsed_args.trace:
+            start_tracing(parsed_args.trace)
+        try:
+            result = service.extract(
+                file_path=parsed_args.input,
+                output_format=output_format,
+                extract_key_info=extract_key_info,
+                output_file=parsed_args.output,
+                show_progress=parsed_args.progress,
+                key_info_stages=parsed_args.key_info,
+                output_stream=None if parsed_args.output or sink else sys.stdout,
+                append=parsed_args.append,
+                compression=parsed_args.compress,
+                sink=sink,
+                checkpoint=parsed_args.checkpoint,
+                timings=timings,
+                profiler=profiler
+            )
+            if profiler is not None:
+                reports = profiler.write_reports(report_prefix(parsed_args.input, parsed_args.output))
+        finally:
+            if sink is not None:
+                sink.close()
+            if profiler is not None:
+                profiler.close()
+            if parsed_args.trace:
+                save_trace(parsed_args.trace)
         
         # 打印结果
-        print_result(result, parsed_args.output, parsed_args.quiet)
+        if sink is not None and not parsed_args.output:
+            if not parsed_args.quiet:
+                print(f"\n✓ 提取完成！结果已写入语料库: {parsed_args.sink}")
+        else:
+            print_result(
+                result,
+                parsed_args.output,
+                parsed_args.quiet,
+                trailing_newline=output_format != 'ndjson'
+            )
+        
+        if parsed_args.stats:
+            print_stats(timings)
+        if profiler is not None:
+            print(f"✓ 性能分析结果已保存: {', '.join(reports)}", file=sys.stderr)
         
         return 0
         
@@ -226,6 +1317,11 @@ def main(args=None):
         print(f"\n✗ {str(e)}", file=sys.stderr)
         return 1
         
+    except BrokenPipeError:
+        # 下游已关闭管道（如 | head）：已停止提取
+        discard_stdout()
+        return 1
+        
     except KeyboardInterrupt:
         # 处理用户中断
         print("\n\n✗ 操作已取消", file=sys.stderr)
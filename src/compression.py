@@ -0,0 +1,224 @@
+"""压缩输出模块
+
+提供 gzip / zstd 流式压缩写出和透明解压读取：
+- 写出时文本先编码为字节，按块交给后台线程压缩并写入文件，压缩与提取并行进行
+- 压缩格式可以显式指定，也可以由输出文件后缀（.gz / .zst）自动识别
+- 读取时按文件头识别压缩格式，未压缩的文件按普通文本读取
+- 追加写出时每次写出一个新的 gzip member / zstd frame，读取时自动连续解压
+
+zstd 需要安装 zstandard：pip install pdf-text-extractor[zstd]
+"""
+
+import gzip
+import io
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional, TextIO
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+COMPRESSIONS = (COMPRESSION_GZIP, COMPRESSION_ZSTD)
+
+# 输出文件后缀 -> 压缩格式
+COMPRESSION_SUFFIXES = {
+    '.gz': COMPRESSION_GZIP,
+    '.zst': COMPRESSION_ZSTD,
+}
+
+# 文件头魔数
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# 交给后台线程的块大小，以及最多排队的块数（压缩跟不上时阻塞写出方）
+_CHUNK_SIZE = 64 * 1024
+_QUEUE_SIZE = 16
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """根据文件后缀识别压缩格式
+
+    返回:
+        'gzip'、'zstd'，未压缩时返回 None
+    """
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def _import_zstandard():
+    """延迟导入 zstandard"""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd 压缩需要安装 zstandard：pip install zstandard")
+    return zstandard
+
+
+class BackgroundCompressor(io.RawIOBase):
+    """在后台线程中压缩并写出的二进制流
+
+    write() 只把数据放入队列，压缩和写文件在后台线程中完成（zlib 和 zstd
+    压缩时会释放 GIL），因此与提取并行进行。关闭时等待队列中的数据全部写出。
+    """
+
+    def __init__(self, raw: BinaryIO, compression: str):
+        """初始化压缩流
+
+        参数:
+            raw: 已打开的二进制文件
+            compression: 'gzip' 或 'zstd'
+        """
+        super().__init__()
+        if compression == COMPRESSION_GZIP:
+            self._compressor = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=GZIP_LEVEL)
+        elif compression == COMPRESSION_ZSTD:
+            zstandard = _import_zstandard()
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+                raw, closefd=False
+            )
+        else:
+            raise ValueError(
+                f"不支持的压缩格式: {compression}，支持的格式: {', '.join(COMPRESSIONS)}"
+            )
+
+        self._raw = raw
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=_QUEUE_SIZE)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"{compression}-compressor",
+            daemon=True
+        )
+        self._thread.start()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """将数据交给后台线程压缩"""
+        self._check_error()
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def close(self) -> None:
+        """等待后台线程写完并关闭文件
+
+        异常:
+            IOError: 后台压缩或写文件失败
+        """
+        if self.closed:
+            return
+        try:
+            self._queue.put(None)
+            self._thread.join()
+        finally:
+            super().close()
+        self._check_error()
+
+    def _run(self) -> None:
+        """后台线程：依次压缩队列中的块"""
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self._error is not None:
+                # 出错后继续取出数据，避免写出方阻塞在满队列上
+                continue
+            try:
+                self._compressor.write(chunk)
+            except Exception as e:
+                self._error = e
+
+        try:
+            self._compressor.close()
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+        finally:
+            self._raw.close()
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise IOError(f"压缩写出失败: {str(self._error)}")
+
+
+def open_output(
+    path: str,
+    compression: Optional[str] = None,
+    encoding: str = 'utf-8',
+    append: bool = False
+) -> TextIO:
+    """打开输出文件（可选压缩）
+
+    参数:
+        path: 输出文件路径
+        compression: 'gzip' 或 'zstd'，默认根据文件后缀识别，不压缩时为 None
+        encoding: 文本编码，默认 UTF-8
+        append: 是否追加到文件末尾（压缩时追加一个新的 gzip member / zstd frame）
+
+    返回:
+        可写的文本流，关闭时完成压缩
+
+    异常:
+        ValueError: 不支持的压缩格式
+        ImportError: 使用 zstd 但未安装 zstandard
+        OSError: 文件打开失败
+    """
+    if compression is None:
+        compression = detect_compression(path)
+    if compression is None:
+        return open(path, 'a' if append else 'w', encoding=encoding)
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"不支持的压缩格式: {compression}，支持的格式: {', '.join(COMPRESSIONS)}"
+        )
+    if compression == COMPRESSION_ZSTD:
+        # 先检查依赖，避免创建空文件
+        _import_zstandard()
+
+    raw = open(path, 'ab' if append else 'wb')
+    try:
+        compressor = BackgroundCompressor(raw, compression)
+    except Exception:
+        raw.close()
+        raise
+    logger.debug(f"以 {compression} 格式压缩写出: {path}")
+    return io.TextIOWrapper(io.BufferedWriter(compressor, _CHUNK_SIZE), encoding=encoding)
+
+
+def open_input(path: str, encoding: str = 'utf-8') -> TextIO:
+    """打开输入文件，按文件头自动解压
+
+    参数:
+        path: 文件路径（未压缩、gzip 或 zstd）
+        encoding: 文本编码，默认 UTF-8
+
+    返回:
+        可读的文本流
+
+    异常:
+        ImportError: 文件为 zstd 格式但未安装 zstandard
+        OSError: 文件打开失败
+    """
+    with open(path, 'rb') as f:
+        header = f.read(len(_ZSTD_MAGIC))
+
+    if header.startswith(_GZIP_MAGIC):
+        return gzip.open(path, 'rt', encoding=encoding)
+
+    if header.startswith(_ZSTD_MAGIC):
+        zstandard = _import_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, 'rb'), read_across_frames=True
+        )
+        return io.TextIOWrapper(io.BufferedReader(reader, _CHUNK_SIZE), encoding=encoding)
+
+    return open(path, 'r', encoding=encoding)
@@ -6,8 +6,12 @@
 import os
 import json
 from pathlib import Path
-from typing import Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, asdict, field
+
+
+# 支持的摘要算法
+SUMMARY_METHODS = ('lead', 'textrank')
 
 
 @dataclass
@@ -18,6 +22,14 @@ class ExtractionConfig:
     extract_key_info: bool = True
     max_keywords: int = 10
     summary_max_length: int = 200
+    summary_method: str = "lead"  # lead（前几句）或 textrank
+    summary_max_sentences: int = 2000  # textrank 参与排序的候选句上限
+    
+    # 词表配置（文件中的词会合并到内置词表）
+    stopwords_file: Optional[str] = None
+    english_stopwords_file: Optional[str] = None
+    punctuation_file: Optional[str] = None
+    user_dict_files: List[str] = field(default_factory=list)  # jieba 自定义词典
     
     # 输出配置
     default_output_format: str = "text"
@@ -30,6 +42,20 @@ class ExtractionConfig:
     log_level: str = "WARNING"
     log_to_file: bool = False
     log_file_path: str = "pdf_extractor.log"
+    
+    def __post_init__(self):
+        self.validate()
+    
+    def validate(self):
+        """校验取值受限的配置项
+        
+        异常:
+            ValueError: 配置项取值不受支持
+        """
+        if self.summary_method not in SUMMARY_METHODS:
+            raise ValueError(
+                f"不支持的摘要算法: {self.summary_method}，支持的算法: {', '.join(SUMMARY_METHODS)}"
+            )
 
 
 class ConfigManager:
@@ -67,6 +93,9 @@ class ConfigManager:
         按优先级顺序加载配置：
         1. 从配置文件加载
         2. 从环境变量覆盖
+        
+        异常:
+            ValueError: 配置项取值不受支持（如 summary_method）
         """
         # 1. 从配置文件加载
         config_file = self._find_config_file()
@@ -75,6 +104,9 @@ class ConfigManager:
         
         # 2. 从环境变量覆盖
         self._load_from_env()
+        
+        # 在加载时校验，而不是等到使用配置项时才报错
+        self.config.validate()
     
     def _find_config_file(self) -> Optional[Path]:
         """查找配置文件
@@ -138,6 +170,7 @@ class ConfigManager:
             'max_keywords': 'MAX_KEYWORDS',
             'summary_max_length': 'SUMMARY_MAX_LENGTH',
             'show_progress_threshold': 'SHOW_PROGRESS_THRESHOLD',
+            'summary_max_sentences': 'SUMMARY_MAX_SENTENCES',
         }
         
         for attr, env_name in int_configs.items():
@@ -152,14 +185,28 @@ class ConfigManager:
         str_configs = {
             'default_output_format': 'DEFAULT_OUTPUT_FORMAT',
             'output_encoding': 'OUTPUT_ENCODING',
+            'summary_method': 'SUMMARY_METHOD',
             'log_level': 'LOG_LEVEL',
             'log_file_path': 'LOG_FILE_PATH',
+            'stopwords_file': 'STOPWORDS_FILE',
+            'english_stopwords_file': 'ENGLISH_STOPWORDS_FILE',
+            'punctuation_file': 'PUNCTUATION_FILE',
         }
         
         for attr, env_name in str_configs.items():
             env_value = os.environ.get(prefix + env_name)
             if env_value is not None:
                 setattr(self.config, attr, env_value)
+        
+        # 路径列表类型配置（使用系统路径分隔符分隔，如 Linux 下的 ':'）
+        list_configs = {
+            'user_dict_files': 'USER_DICT_FILES',
+        }
+        
+        for attr, env_name in list_configs.items():
+            env_value = os.environ.get(prefix + env_name)
+            if env_value is not None:
+                setattr(self.config, attr, [p for p in env_value.split(os.pathsep) if p])
     
     def save_config(self, config_path: Optional[str] = None):
         """保存配置到文件
@@ -198,10 +245,14 @@ class ConfigManager:
         
         参数:
             **kwargs: 要更新的配置项
+            
+        异常:
+            ValueError: 配置项取值不受支持
         """
         for key, value in kwargs.items():
             if hasattr(self.config, key):
                 setattr(self.config, key, value)
+        self.config.validate()
     
     def reset_to_defaults(self):
         """重置为默认配置"""
@@ -0,0 +1,554 @@
+"""守护进程模块
+
+pdf-extractor --daemon 启动常驻进程，省去每次调用时导入 pdfplumber、jieba
+和加载词典的启动开销：
+- 主进程预先导入所有模块并加载词表，再 fork 出若干工作进程共同监听 Unix socket，
+  工作进程以写时复制方式共享已加载的状态
+- 命令行客户端（pdf_extractor.py）检测到守护进程时，把参数、工作目录和
+  PDF_EXTRACTOR_* 环境变量发给守护进程；工作进程执行与进程内相同的 cli.main，
+  标准输出和标准错误按帧转发回客户端，退出码与进程内执行一致
+- 某次请求加载了新的 jieba 自定义词典时（jieba 词典为进程级全局状态），
+  处理完该请求的工作进程退出，由主进程重新 fork，避免影响之后的请求
+- 指定 --metrics FILE 时，各工作进程的运行指标（参见 metrics 模块）合并后，
+  在每次请求结束时写到该文件
+
+本模块在顶层只导入标准库，客户端连接守护进程时不会导入 pdfplumber 和 jieba。
+
+命令行用法：
+    pdf-extractor --daemon [--socket PATH] [--workers N] [--metrics FILE]
+    pdf-extractor --daemon --stop
+    PDF_EXTRACTOR_NO_DAEMON=1 pdf-extractor book.pdf    # 强制在当前进程中执行
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# 环境变量：守护进程的 socket 路径，以及禁止转发到守护进程
+ENV_SOCKET = "PDF_EXTRACTOR_SOCKET"
+ENV_NO_DAEMON = "PDF_EXTRACTOR_NO_DAEMON"
+
+# 随请求转发给守护进程的环境变量前缀（配置项，参见 ConfigManager._load_from_env）
+_FORWARDED_ENV_PREFIX = "PDF_EXTRACTOR_"
+
+# 帧格式：1 字节通道 + 4 字节长度（网络字节序）+ 数据
+_FRAME_HEADER = struct.Struct("!cI")
+CHANNEL_REQUEST = b"q"
+CHANNEL_STDOUT = b"1"
+CHANNEL_STDERR = b"2"
+CHANNEL_EXIT = b"x"
+
+_LISTEN_BACKLOG = 64
+
+# 长期运行、自带工作进程的命令总是在当前进程中执行，不占用守护进程的工作进程
+_LOCAL_COMMANDS = ("--daemon", "serve", "batch", "watch")
+
+
+def is_supported() -> bool:
+    """当前平台是否支持守护进程模式（需要 Unix socket 和用户 ID，Windows 上不支持）"""
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+
+def default_socket_path() -> str:
+    """守护进程的默认 socket 路径（每个用户一个，可由 PDF_EXTRACTOR_SOCKET 指定）
+
+    异常:
+        RuntimeError: 当前平台不支持守护进程模式，且未指定 PDF_EXTRACTOR_SOCKET
+    """
+    path = os.environ.get(ENV_SOCKET)
+    if path:
+        return path
+    if not hasattr(os, "getuid"):
+        raise RuntimeError("当前平台不支持守护进程模式")
+    return os.path.join(tempfile.gettempdir(), f"pdf-extractor-{os.getuid()}.sock")
+
+
+def discard_stdout() -> None:
+    """下游关闭管道后丢弃标准输出中剩余的内容，避免退出时再次报错"""
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+    except (OSError, ValueError):
+        # 标准输出不是真实文件（如被替换为内存流或守护进程的转发流）
+        pass
+
+
+def _send_frame(sock: socket.socket, channel: bytes, data: bytes) -> None:
+    sock.sendall(_FRAME_HEADER.pack(channel, len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """读取 size 字节，连接在此之前关闭时返回 None"""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[Tuple[bytes, bytes]]:
+    """读取一帧，连接关闭时返回 None"""
+    header = _recv_exact(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    channel, size = _FRAME_HEADER.unpack(header)
+    data = _recv_exact(sock, size)
+    if data is None:
+        return None
+    return channel, data
+
+
+# ---------------------------------------------------------------------------
+# 客户端
+# ---------------------------------------------------------------------------
+
+def _connect(socket_path: str) -> Optional[socket.socket]:
+    """连接守护进程，未运行时返回 None"""
+    if not is_supported():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def run_in_daemon(args: List[str], socket_path: Optional[str] = None) -> Optional[int]:
+    """把一次命令行调用转发给正在运行的守护进程
+
+    参数:
+        args: 命令行参数（不含程序名）
+        socket_path: socket 路径，默认为 default_socket_path()
+
+    返回:
+        退出码；当前平台不支持守护进程、守护进程未运行、已禁用转发或参数为
+        --daemon / serve / batch / watch 时返回 None，此时调用方应在当前进程中执行
+    """
+    if not is_supported() or os.environ.get(ENV_NO_DAEMON) or (args and args[0] in _LOCAL_COMMANDS):
+        return None
+    sock = _connect(socket_path or default_socket_path())
+    if sock is None:
+        return None
+
+    request = {
+        "args": list(args),
+        "cwd": os.getcwd(),
+        "env": {
+            name: value for name, value in os.environ.items()
+            if name.startswith(_FORWARDED_ENV_PREFIX) and name not in (ENV_SOCKET, ENV_NO_DAEMON)
+        },
+        "encoding": sys.stdout.encoding or "utf-8",
+        "errors": sys.stdout.errors or "strict",
+    }
+
+    with sock:
+        try:
+            _send_frame(sock, CHANNEL_REQUEST, json.dumps(request).encode("utf-8"))
+            while True:
+                frame = _recv_frame(sock)
+                if frame is None:
+                    print("\n✗ 与守护进程的连接已断开", file=sys.stderr)
+                    return 1
+                channel, data = frame
+                if channel == CHANNEL_STDOUT:
+                    sys.stdout.buffer.write(data)
+                    sys.stdout.buffer.flush()
+                elif channel == CHANNEL_STDERR:
+                    sys.stderr.buffer.write(data)
+                    sys.stderr.buffer.flush()
+                elif channel == CHANNEL_EXIT:
+                    return int(data)
+        except BrokenPipeError:
+            # 下游已关闭管道（如 | head），断开连接后守护进程随即停止处理
+            discard_stdout()
+            return 1
+        except KeyboardInterrupt:
+            print("\n\n✗ 操作已取消", file=sys.stderr)
+            return 1
+
+
+def stop_daemon(socket_path: Optional[str] = None) -> bool:
+    """请求守护进程退出
+
+    返回:
+        守护进程是否在运行
+    """
+    if not is_supported():
+        return False
+    sock = _connect(socket_path or default_socket_path())
+    if sock is None:
+        return False
+    with sock:
+        _send_frame(sock, CHANNEL_REQUEST, json.dumps({"command": "stop"}).encode("utf-8"))
+        _recv_frame(sock)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 服务端
+# ---------------------------------------------------------------------------
+
+class _ChannelWriter(io.RawIOBase):
+    """把写入的数据作为一帧发送到指定通道"""
+
+    def __init__(self, sock: socket.socket, channel: bytes):
+        super().__init__()
+        self._sock = sock
+        self._channel = channel
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        _send_frame(self._sock, self._channel, bytes(data))
+        return len(data)
+
+
+def _channel_stream(sock: socket.socket, channel: bytes, encoding: str, errors: str,
+                    line_buffering: bool) -> io.TextIOWrapper:
+    return io.TextIOWrapper(
+        io.BufferedWriter(_ChannelWriter(sock, channel)),
+        encoding=encoding,
+        errors=errors,
+        line_buffering=line_buffering
+    )
+
+
+class ExtractionDaemon:
+    """预先加载、预先 fork 的守护进程
+
+    使用方式：
+        ExtractionDaemon("/tmp/pdf-extractor.sock", workers=4).serve_forever()
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, workers: Optional[int] = None,
+                 metrics_path: Optional[str] = None):
+        """初始化守护进程
+
+        参数:
+            socket_path: socket 路径，默认为 default_socket_path()
+            workers: 工作进程数，默认为 CPU 核数
+            metrics_path: 运行指标文件路径（可选），每次请求结束时更新
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.metrics_path = metrics_path
+        self._metrics_exporter = None
+        self._listener: Optional[socket.socket] = None
+        self._worker_pids: set = set()
+        self._stopping = False
+
+    def serve_forever(self) -> None:
+        """预先加载模块并启动工作进程，直到收到 SIGTERM / SIGINT 或 stop 请求
+
+        异常:
+            RuntimeError: 已有守护进程在该 socket 上运行
+            OSError: socket 创建失败
+        """
+        self._warm_up()
+        self._bind()
+        if self.metrics_path:
+            self._start_metrics()
+        print(
+            f"✓ 守护进程已启动: {self.socket_path}（{self.workers} 个工作进程），按 Ctrl-C 停止",
+            file=sys.stderr
+        )
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        try:
+            for _ in range(self.workers):
+                self._spawn_worker()
+            while self._worker_pids:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                self._worker_pids.discard(pid)
+                if not self._stopping:
+                    # 工作进程退出（回收或异常），重新 fork 一个
+                    self._spawn_worker()
+        finally:
+            self._shutdown()
+
+    def _warm_up(self) -> None:
+        """导入所有模块并加载词表和 jieba 词典（fork 后由工作进程共享）"""
+        from . import cli  # noqa: F401  导入 pdfplumber、jieba 等全部依赖
+        from .config import get_config
+        from .lexicon import preload_lexicon
+
+        preload_lexicon(get_config())
+
+    def _start_metrics(self) -> None:
+        """启用多进程运行指标（在 fork 工作进程之前，预加载的缓存查询不计入）"""
+        from . import metrics
+
+        # 预加载的缓存查询只在内存中计数，清空后不会在导出时写出
+        metrics.REGISTRY.clear()
+        self._metrics_exporter = metrics.MetricsExporter(tempfile.mkdtemp(prefix="pdf-extractor-metrics-"))
+        metrics.enable_shared(self._metrics_exporter.directory)
+
+    def _write_metrics(self) -> None:
+        from . import metrics
+
+        # 请求本身（如 batch --metrics）可能切换过共享目录
+        metrics.enable_shared(self._metrics_exporter.directory)
+        try:
+            self._metrics_exporter.write(self.metrics_path)
+        except IOError as e:
+            logger.warning(str(e))
+
+    def _bind(self) -> None:
+        """创建只有当前用户可以访问的 Unix socket"""
+        if os.path.exists(self.socket_path):
+            probe = _connect(self.socket_path)
+            if probe is not None:
+                probe.close()
+                raise RuntimeError(f"守护进程已在运行: {self.socket_path}")
+            # 上次异常退出留下的 socket 文件
+            os.unlink(self.socket_path)
+
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self._listener.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self._listener.listen(_LISTEN_BACKLOG)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self._worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _spawn_worker(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                # 终端的 Ctrl-C 由主进程处理
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                self._worker_loop()
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self._worker_pids.add(pid)
+
+    def _shutdown(self) -> None:
+        self._handle_stop(signal.SIGTERM, None)
+        for pid in list(self._worker_pids):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._worker_pids.clear()
+        if self._metrics_exporter is not None:
+            from . import metrics
+
+            self._write_metrics()
+            metrics.disable_shared()
+            shutil.rmtree(self._metrics_exporter.directory, ignore_errors=True)
+        if self._listener is not None:
+            self._listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        logger.info("守护进程已退出")
+
+    def _worker_loop(self) -> None:
+        """工作进程：逐个处理连接，需要回收时退出"""
+        from .lexicon import loaded_user_dict_count
+
+        while True:
+            conn, _ = self._listener.accept()
+            loaded_before = loaded_user_dict_count()
+            with conn:
+                self._handle_connection(conn)
+            if loaded_user_dict_count() != loaded_before:
+                return
+
+    def _handle_connection(self, conn: socket.socket) -> None:
+        """执行一次请求"""
+        frame = _recv_frame(conn)
+        if frame is None or frame[0] != CHANNEL_REQUEST:
+            return
+        request = json.loads(frame[1].decode("utf-8"))
+
+        if request.get("command") == "stop":
+            os.kill(os.getppid(), signal.SIGTERM)
+            _send_frame(conn, CHANNEL_EXIT, b"0")
+            return
+
+        exit_code = self._run_cli(conn, request)
+        if self._metrics_exporter is not None:
+            # 在返回退出码之前写出，客户端结束时指标已经更新
+            self._write_metrics()
+        try:
+            _send_frame(conn, CHANNEL_EXIT, str(exit_code).encode("ascii"))
+        except OSError:
+            # 客户端已断开
+            pass
+
+    def _run_cli(self, conn: socket.socket, request: Dict) -> int:
+        """在客户端的工作目录和环境变量下执行 cli.main，输出转发给客户端"""
+        from . import cli, config
+
+        encoding = request.get("encoding", "utf-8")
+        stdout = _channel_stream(conn, CHANNEL_STDOUT, encoding, request.get("errors", "strict"),
+                                 line_buffering=False)
+        stderr = _channel_stream(conn, CHANNEL_STDERR, encoding, "backslashreplace",
+                                 line_buffering=True)
+        saved_streams = (sys.stdout, sys.stderr)
+        saved_cwd = os.getcwd()
+        saved_env = {
+            name: value for name, value in os.environ.items()
+            if name.startswith(_FORWARDED_ENV_PREFIX)
+        }
+
+        try:
+            os.chdir(request["cwd"])
+        except OSError as e:
+            stderr.write(f"\n✗ 无法切换到工作目录: {str(e)}\n")
+            stderr.flush()
+            return 1
+
+        try:
+            self._replace_env(saved_env, request.get("env", {}))
+            # 配置管理器为进程级单例，每次请求按客户端的参数和环境变量重新加载
+            config._config_manager = None
+            sys.stdout, sys.stderr = stdout, stderr
+            try:
+                exit_code = cli.main(request["args"])
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    exit_code = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+        finally:
+            for stream in (stdout, stderr):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+            sys.stdout, sys.stderr = saved_streams
+            os.chdir(saved_cwd)
+            self._replace_env(request.get("env", {}), saved_env)
+            config._config_manager = None
+            # 日志处理器绑定了本次请求的标准错误
+            logging.getLogger("pdf_extractor").handlers.clear()
+        return exit_code
+
+    @staticmethod
+    def _replace_env(current: Dict[str, str], new: Dict[str, str]) -> None:
+        """将 PDF_EXTRACTOR_* 环境变量从 current 替换为 new"""
+        for name in current:
+            if name not in new:
+                os.environ.pop(name, None)
+        os.environ.update(new)
+
+
+def create_daemon_parser() -> argparse.ArgumentParser:
+    """创建 --daemon 的参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog='pdf-extractor --daemon',
+        description='启动常驻守护进程，之后的命令行调用自动转发给守护进程执行',
+        epilog='示例: pdf-extractor --daemon --workers 4',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help=f'Unix socket 路径（默认: 环境变量 {ENV_SOCKET}，或临时目录下的 pdf-extractor-<uid>.sock）'
+    )
+
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        metavar='N',
+        help='工作进程数（默认: CPU 核数）'
+    )
+
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='每次请求结束时把 Prometheus 格式的运行指标写到该文件'
+    )
+
+    parser.add_argument(
+        '--stop',
+        action='store_true',
+        help='停止正在运行的守护进程'
+    )
+
+    return parser
+
+
+def daemon_main(args: List[str]) -> int:
+    """--daemon 入口
+
+    参数:
+        args: --daemon 之后的参数列表
+
+    返回:
+        退出代码（0 表示成功，1 表示失败）
+    """
+    parsed_args = create_daemon_parser().parse_args(args)
+
+    if not is_supported():
+        print("✗ 当前平台不支持 Unix socket，无法启动守护进程", file=sys.stderr)
+        return 1
+    socket_path = parsed_args.socket or default_socket_path()
+
+    if parsed_args.stop:
+        if not stop_daemon(socket_path):
+            print(f"✗ 守护进程未运行: {socket_path}", file=sys.stderr)
+            return 1
+        print(f"✓ 守护进程已停止: {socket_path}", file=sys.stderr)
+        return 0
+
+    daemon = ExtractionDaemon(socket_path, parsed_args.workers, parsed_args.metrics)
+    try:
+        daemon.serve_forever()
+    except (RuntimeError, OSError) as e:
+        print(f"✗ {str(e)}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,316 @@
+"""持久化任务队列模块
+
+批量处理的任务状态保存在本地 SQLite 数据库中，进程崩溃或机器重启后重新运行
+同一批任务时跳过已完成的文件，并在次数上限内重试失败的文件：
+- 任务状态：pending（待处理）、running（处理中）、done（已完成）、failed（失败）
+- 每个任务记录尝试次数、错误信息、入队 / 开始 / 结束时间和耗时
+- 领取任务在 BEGIN IMMEDIATE 事务中完成，多个本机工作进程（或多次运行的批处理命令）
+  可以同时使用同一个队列，每个任务只会被一个工作进程领取
+- 工作进程异常退出（如被 OOM 终止）后留下的 running 任务记为一次失败的尝试，
+  反复导致崩溃的文件在达到次数上限后不再重试
+
+使用方式：
+    with JobQueue("jobs.db", max_attempts=3) as queue:
+        queue.enqueue([("a.pdf", "out/a.json")])
+        job = queue.claim()
+        ...
+        queue.complete(job.id)
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# 数据库结构版本（记录在 PRAGMA user_version 中）
+SCHEMA_VERSION = 1
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUSES = (STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED)
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# 其他进程持有写锁时的最长等待时间（秒）
+_BUSY_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    input_path TEXT NOT NULL UNIQUE,
+    output_path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+@dataclass
+class Job:
+    """队列中的一个任务"""
+    id: int
+    input_path: str
+    output_path: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    enqueued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration: Optional[float] = None
+
+
+_JOB_COLUMNS = (
+    "id, input_path, output_path, status, attempts, error, "
+    "enqueued_at, started_at, finished_at, duration"
+)
+
+
+def worker_id() -> str:
+    """当前进程的工作进程标识（主机名:进程号）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _is_alive(worker: Optional[str]) -> bool:
+    """判断领取任务的工作进程是否仍在运行（只能判断本机进程，其他主机视为运行中）"""
+    if not worker:
+        return False
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class JobQueue:
+    """SQLite 持久化任务队列"""
+
+    def __init__(self, path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """打开（必要时创建）队列数据库
+
+        参数:
+            path: 数据库文件路径
+            max_attempts: 每个任务的最大尝试次数，失败次数达到上限后不再领取
+
+        异常:
+            IOError: 数据库打开失败
+        """
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        try:
+            # 自动提交模式，事务由 BEGIN IMMEDIATE 显式开启
+            self._conn = sqlite3.connect(path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        except sqlite3.Error as e:
+            raise IOError(f"打开任务队列失败: {path}，错误: {str(e)}")
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
+
+    def enqueue(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        """添加任务，已在队列中的输入文件保持原状态
+
+        参数:
+            jobs: (输入文件路径, 输出文件路径) 序列
+
+        返回:
+            新添加的任务数
+        """
+        now = time.time()
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (input_path, output_path, enqueued_at) VALUES (?, ?, ?)",
+                ((input_path, output_path, now) for input_path, output_path in jobs)
+            )
+            added = self._conn.total_changes - before
+        logger.info(f"任务队列新增 {added} 个任务: {self.path}")
+        return added
+
+    def resubmit(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        """添加任务；已在队列中且未在处理中的输入文件重新置为待处理，尝试次数清零
+
+        用于输入文件被修改后重新提取（如监视目录模式）。
+
+        参数:
+            jobs: (输入文件路径, 输出文件路径) 序列
+
+        返回:
+            添加或重新置为待处理的任务数
+        """
+        now = time.time()
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO jobs (input_path, output_path, enqueued_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (input_path) DO UPDATE SET "
+                "output_path = excluded.output_path, status = ?, attempts = 0, error = NULL, "
+                "worker = NULL, enqueued_at = excluded.enqueued_at, "
+                "started_at = NULL, finished_at = NULL, duration = NULL "
+                "WHERE status != ?",
+                (
+                    (input_path, output_path, now, STATUS_PENDING, STATUS_RUNNING)
+                    for input_path, output_path in jobs
+                )
+            )
+            return self._conn.total_changes - before
+
+    def claim(self, worker: Optional[str] = None) -> Optional[Job]:
+        """领取下一个待处理任务（包括未达到次数上限的失败任务）
+
+        参数:
+            worker: 工作进程标识，默认为 worker_id()
+
+        返回:
+            已标记为 running 的任务；没有可领取的任务时返回 None
+        """
+        worker = worker or worker_id()
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs "
+                "WHERE status = ? OR (status = ? AND attempts < ?) "
+                "ORDER BY status = ? DESC, id LIMIT 1",
+                (STATUS_PENDING, STATUS_FAILED, self.max_attempts, STATUS_PENDING)
+            ).fetchone()
+            if row is None:
+                return None
+            job = Job(*row)
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, "
+                "started_at = ?, finished_at = NULL, duration = NULL WHERE id = ?",
+                (STATUS_RUNNING, worker, now, job.id)
+            )
+        job.status = STATUS_RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.finished_at = job.duration = None
+        return job
+
+    def complete(self, job_id: int) -> None:
+        """标记任务已完成"""
+        self._finish(job_id, STATUS_DONE, None)
+
+    def fail(self, job_id: int, error: str) -> None:
+        """标记任务失败（未达到次数上限时之后会被重新领取）"""
+        self._finish(job_id, STATUS_FAILED, error)
+
+    def release(self, job_id: int) -> None:
+        """放回未完成的任务（如用户中断），不计入尝试次数"""
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, worker = NULL, "
+                "started_at = NULL WHERE id = ? AND status = ?",
+                (STATUS_PENDING, job_id, STATUS_RUNNING)
+            )
+
+    def recover_stale(self) -> int:
+        """把工作进程已退出的 running 任务记为一次失败的尝试
+
+        返回:
+            恢复的任务数
+        """
+        now = time.time()
+        recovered = 0
+        with self._transaction():
+            rows = self._conn.execute(
+                "SELECT id, worker, started_at FROM jobs WHERE status = ?", (STATUS_RUNNING,)
+            ).fetchall()
+            for job_id, worker, started_at in rows:
+                if _is_alive(worker):
+                    continue
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, duration = ? WHERE id = ?",
+                    (STATUS_FAILED, f"工作进程 {worker} 异常退出", now,
+                     now - started_at if started_at else None, job_id)
+                )
+                recovered += 1
+        if recovered:
+            logger.warning(f"{recovered} 个任务的工作进程已退出，记为失败")
+        return recovered
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        result = {status: 0 for status in STATUSES}
+        for status, count in self._conn.execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        ):
+            result[status] = count
+        return result
+
+    def exhausted_count(self) -> int:
+        """失败且已达到次数上限的任务数"""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND attempts >= ?",
+            (STATUS_FAILED, self.max_attempts)
+        ).fetchone()[0]
+
+    def jobs(self, status: Optional[str] = None) -> List[Job]:
+        """按添加顺序列出任务
+
+        参数:
+            status: 只列出该状态的任务（可选）
+        """
+        if status is None:
+            rows = self._conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs ORDER BY id")
+        else:
+            rows = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status = ? ORDER BY id", (status,)
+            )
+        return [Job(*row) for row in rows]
+
+    def _finish(self, job_id: int, status: str, error: Optional[str]) -> None:
+        now = time.time()
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, "
+                "duration = ? - started_at WHERE id = ?",
+                (status, error, now, now, job_id)
+            )
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE 事务：开始时即获取写锁，避免两个进程读到同一个待处理任务"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
@@ -0,0 +1,105 @@
+"""JSON 序列化模块
+
+安装 orjson 时使用 orjson 编码 JSON，否则回退到标准库 json。
+两种后端的输出逐字节一致（等价于 json.dumps(..., ensure_ascii=False)）：
+- orjson 不支持的值（科学计数法浮点数、NaN/Infinity、超出 64 位的整数、
+  含代理字符的字符串等）自动交给标准库编码
+- 缩进只支持 None（紧凑格式）和 2，其他缩进使用标准库
+
+安装方式：pip install pdf-text-extractor[fastjson]
+"""
+
+import json
+import math
+from typing import Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+
+BACKEND_ORJSON = 'orjson'
+BACKEND_JSON = 'json'
+
+# 默认后端：安装了 orjson 时使用 orjson
+DEFAULT_BACKEND = BACKEND_ORJSON if orjson is not None else BACKEND_JSON
+
+# orjson 支持的整数范围
+_ORJSON_INT_MIN = -2 ** 63
+_ORJSON_INT_MAX = 2 ** 64 - 1
+
+
+def _orjson_compatible(value: Any) -> bool:
+    """检查 orjson 的编码结果是否与标准库完全一致"""
+    value_type = type(value)
+    if value_type is str or value_type is bool or value is None:
+        return True
+    if value_type is int:
+        return _ORJSON_INT_MIN <= value <= _ORJSON_INT_MAX
+    if value_type is float:
+        # 标准库和 orjson 的科学计数法写法不同（1e-05 与 1e-5）
+        return math.isfinite(value) and 'e' not in repr(value)
+    if value_type is list or value_type is tuple:
+        return all(_orjson_compatible(item) for item in value)
+    if value_type is dict:
+        return all(
+            type(key) is str and _orjson_compatible(item)
+            for key, item in value.items()
+        )
+    return False
+
+
+class JSONSerializer:
+    """JSON 编码器
+
+    用法与 json.JSONEncoder 相同：serializer.encode(value) 返回字符串。
+    """
+
+    def __init__(
+        self,
+        indent: Optional[int] = None,
+        separators: Optional[Tuple[str, str]] = None,
+        backend: Optional[str] = None
+    ):
+        """初始化编码器
+
+        参数:
+            indent: 缩进空格数，None 表示不缩进
+            separators: (项分隔符, 键分隔符)，不缩进时默认为紧凑格式 (',', ':')
+            backend: 'orjson' 或 'json'，默认使用 DEFAULT_BACKEND
+        """
+        if separators is None:
+            separators = (',', ': ') if indent is not None else (',', ':')
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, indent=indent, separators=separators
+        )
+
+        backend = backend or DEFAULT_BACKEND
+        if backend not in (BACKEND_ORJSON, BACKEND_JSON):
+            raise ValueError(f"不支持的 JSON 后端: {backend}")
+
+        # orjson 只有紧凑格式和 2 空格缩进两种布局
+        if indent is None:
+            orjson_layout = separators == (',', ':')
+            self._orjson_option = 0
+        else:
+            orjson_layout = indent == 2 and separators == (',', ': ')
+            self._orjson_option = orjson.OPT_INDENT_2 if orjson is not None else 0
+
+        self.backend = (
+            BACKEND_ORJSON
+            if backend == BACKEND_ORJSON and orjson is not None and orjson_layout
+            else BACKEND_JSON
+        )
+
+    def encode(self, value: Any) -> str:
+        """将值编码为 JSON 字符串"""
+        if self.backend == BACKEND_ORJSON and _orjson_compatible(value):
+            try:
+                return orjson.dumps(value, option=self._orjson_option).decode('utf-8')
+            except orjson.JSONEncodeError:
+                # 含代理字符等 orjson 不支持的字符串
+                pass
+        return self._encoder.encode(value)
+
@@ -1,9 +1,86 @@
-"""关键信息分析器"""
+"""关键信息分析器
 
+分析过程由若干阶段组成（标题、关键词、摘要、列表），通过阶段注册表按需执行。
+各阶段依赖的重型模块（jieba、NumPy/SciPy）在阶段首次执行时才导入，
+未选择的阶段既不执行也不加载其依赖。
+"""
+
+import logging
 import re
-from typing import List
-import jieba
+import time
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Iterable, List, Optional, Sequence, Union
 from collections import Counter
+from contextlib import nullcontext
+
+from .config import SUMMARY_METHODS, ExtractionConfig
+from .logger import log_warning
+from .models import KeyInformation
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .lexicon import Lexicon
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 分析阶段注册表：阶段名（与 KeyInformation 字段同名）-> 执行函数
+StageFunc = Callable[['KeyInfoAnalyzer', str, Optional[Sequence[str]]], Any]
+_STAGE_REGISTRY: Dict[str, StageFunc] = {}
+
+
+def register_stage(name: str) -> Callable[[StageFunc], StageFunc]:
+    """注册分析阶段（装饰器）
+    
+    阶段函数接收 (analyzer, text, pages)，返回值写入 KeyInformation 的同名字段。
+    
+    参数:
+        name: 阶段名，必须是 KeyInformation 的字段名
+    """
+    def decorator(func: StageFunc) -> StageFunc:
+        _STAGE_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def available_stages() -> List[str]:
+    """返回所有已注册的分析阶段（按注册顺序）"""
+    return list(_STAGE_REGISTRY)
+
+
+def parse_stages(stages: Union[str, Iterable[str], None]) -> List[str]:
+    """解析分析阶段列表
+    
+    参数:
+        stages: 逗号分隔的阶段名字符串（如 'keywords,summary'）或阶段名列表；
+                None 或 'all' 表示所有阶段
+        
+    返回:
+        去重后按注册顺序排列的阶段名列表
+        
+    异常:
+        ValueError: 包含未注册的阶段名
+    """
+    if stages is None:
+        return available_stages()
+    if isinstance(stages, str):
+        stages = stages.split(',')
+    
+    requested = {name.strip() for name in stages if name.strip()}
+    if 'all' in requested:
+        return available_stages()
+    
+    unknown = requested - set(_STAGE_REGISTRY)
+    if unknown or not requested:
+        raise ValueError(
+            f"不支持的分析阶段: {', '.join(sorted(unknown)) or '(空)'}，"
+            f"支持的阶段: {', '.join(available_stages())}"
+        )
+    return [name for name in _STAGE_REGISTRY if name in requested]
+
+
+# 句子模式：正文 + 句末标点（中英文句号、问号、感叹号）
+SENTENCE_PATTERN = re.compile(r'([^。！？.!?]+)([。！？.!?]*)')
+_NON_SPACE_PATTERN = re.compile(r'\S')
 
 
 class KeyInfoAnalyzer:
@@ -12,10 +89,36 @@ class KeyInfoAnalyzer:
     用于从文本中提取标题、关键词、摘要和列表等关键信息
     """
     
-    def __init__(self):
-        """初始化分析器"""
-        # 初始化 jieba 分词器
-        jieba.setLogLevel(jieba.logging.INFO)
+    def __init__(
+        self,
+        lexicon: Optional['Lexicon'] = None,
+        config: Optional[ExtractionConfig] = None
+    ):
+        """初始化分析器
+        
+        参数:
+            lexicon: 词表（可选），不提供时按 config 在首次使用时加载
+            config: 提取配置（可选），提供关键词数量、摘要长度和词表文件等设置
+        """
+        self.config = config or ExtractionConfig()
+        self._lexicon = lexicon
+    
+    @property
+    def lexicon(self) -> 'Lexicon':
+        """词表（首次访问时加载）"""
+        if self._lexicon is None:
+            from .lexicon import get_lexicon_from_config
+            self._lexicon = get_lexicon_from_config(self.config)
+        return self._lexicon
+    
+    def analyze(
+        self,
+        text: str,
+        stages: Union[str, Iterable[str], None] = None,
+        pages: Optional[Sequence[str]] = None
+    ) -> KeyInformation:
+        """执行选定的分析阶段（参见 run_stages）"""
+        return run_stages(self, text, stages=stages, pages=pages)
     
     def extract_headings(self, text: str) -> List[str]:
         """提取标题和章节
@@ -76,14 +179,22 @@ class KeyInfoAnalyzer:
         
         return headings
 
-    def extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
+    def extract_keywords(
+        self,
+        text: str,
+        top_n: int = 10,
+        pages: Optional[Sequence[str]] = None
+    ) -> List[str]:
         """提取关键词
         
-        使用 jieba 分词和词频统计识别重要词汇
+        按页检测文字体系后分词并统计词频：中文页面使用 jieba，
+        拉丁文字页面使用正则分词器，混排页面按片段分别处理
         
         参数:
             text: 要分析的文本内容
             top_n: 返回的关键词数量，默认 10
+            pages: 按页拆分的文本（可选），提供时逐页检测文字体系；
+                   不提供时把 text 视为一页
             
         返回:
             关键词列表，按重要性排序
@@ -91,20 +202,14 @@ class KeyInfoAnalyzer:
         if not text or not text.strip():
             return []
         
-        # 使用 jieba 分词
-        words = jieba.cut(text)
-        
-        # 过滤停用词和无意义词
-        # 停用词包括：标点符号、单字符、纯数字、常见虚词
-        stopwords = {
-            '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一',
-            '一个', '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有',
-            '看', '好', '自己', '这', '那', '里', '为', '以', '个', '用', '来', '他',
-            '她', '它', '们', '这个', '那个', '什么', '怎么', '可以', '但是', '如果',
-            '因为', '所以', '虽然', '然而', '而且', '或者', '并且', '但', '与', '及',
-            '等', '等等', '之', '于', '对', '从', '把', '被', '让', '给', '向', '往',
-            '由', '将', '得', '地', '得到', '进行', '通过', '根据', '按照', '关于',
-        }
+        from .tokenizer import tokenize_pages
+        
+        # 按文字体系分词
+        lexicon = self.lexicon
+        words = tokenize_pages(
+            pages if pages is not None else [text],
+            english_stopwords=lexicon.english_stopwords
+        )
         
         # 统计词频
         word_counts = Counter()
@@ -116,66 +221,103 @@ class KeyInfoAnalyzer:
             # 3. 不是纯数字
             # 4. 不是纯标点符号
             if (len(word) >= 2 and 
-                word not in stopwords and 
+                word not in lexicon.stopwords and 
                 not word.isdigit() and
-                not all(c in '，。！？、；：""''（）【】《》\n\t ,.!?;:\'"()[]<>' for c in word)):
+                not lexicon.is_punctuation(word)):
                 word_counts[word] += 1
         
         # 返回出现频率最高的 top_n 个词
         top_keywords = [word for word, count in word_counts.most_common(top_n)]
         return top_keywords
 
-    def generate_summary(self, text: str, max_length: int = 200) -> str:
+    def generate_summary(
+        self,
+        text: str,
+        max_length: int = 200,
+        method: str = 'lead',
+        max_sentences: int = 2000
+    ) -> str:
         """生成文本摘要
         
-        提取前几句作为摘要
+        支持两种算法：
+        - lead: 提取前几句作为摘要。使用 finditer 惰性扫描句子，
+          达到 max_length 后立即停止，开销与文档总长度无关
+        - textrank: 基于句子相似度图的抽取式摘要（需要 NumPy 和 SciPy），
+          依赖缺失时回退到 lead
         
         参数:
             text: 要分析的文本内容
             max_length: 摘要的最大长度（字符数），默认 200
+            method: 摘要算法，'lead' 或 'textrank'，默认 'lead'
+            max_sentences: textrank 参与排序的候选句上限，默认 2000
             
         返回:
             生成的摘要文本
+            
+        异常:
+            ValueError: 不支持的摘要算法
         """
-        if not text or not text.strip():
-            return ""
+        if method not in SUMMARY_METHODS:
+            raise ValueError(
+                f"不支持的摘要算法: {method}，支持的算法: {', '.join(SUMMARY_METHODS)}"
+            )
         
-        # 清理文本
-        text = text.strip()
+        # 只查找第一个非空白字符，避免对整篇文档做 strip 拷贝
+        first = _NON_SPACE_PATTERN.search(text) if text else None
+        if first is None:
+            return ""
         
         # 如果文本本身就很短，直接返回
         if len(text) <= max_length:
-            return text
-        
-        # 按句子分割（中英文句号、问号、感叹号）
-        sentence_endings = r'[。！？\.!?]+'
-        sentences = re.split(sentence_endings, text)
-        
-        # 过滤空句子
-        sentences = [s.strip() for s in sentences if s.strip()]
+            return text.strip()
         
-        if not sentences:
-            # 如果没有明显的句子分隔符，直接截取前 max_length 个字符
-            return text[:max_length] + ('...' if len(text) > max_length else '')
+        if method == 'textrank':
+            summary = self._textrank_summary(text, max_length, max_sentences)
+            if summary is not None:
+                return summary
         
         # 逐句添加，直到达到最大长度
-        summary = ""
-        for sentence in sentences:
+        parts: List[str] = []
+        length = 0
+        for match in SENTENCE_PATTERN.finditer(text):
+            sentence = match.group(1).strip()
+            if not sentence:
+                continue
+            # 保留句末标点（只取第一个字符）
+            ending = match.group(2)[:1]
+            
             # 如果添加这句话会超过最大长度
-            if len(summary) + len(sentence) > max_length:
-                # 如果 summary 已经有内容，就停止
-                if summary:
-                    break
-                # 如果 summary 还是空的，至少要包含第一句的一部分
-                summary = sentence[:max_length] + '...'
+            if length + len(sentence) + len(ending) > max_length:
+                # 如果摘要还是空的，至少要包含第一句的一部分
+                if not parts:
+                    return sentence[:max_length] + '...'
                 break
             
-            summary += sentence
-            # 添加句号（如果原文有的话）
-            if len(summary) < len(text) and text[len(summary)] in '。！？.!?':
-                summary += text[len(summary)]
+            parts.append(sentence)
+            parts.append(ending)
+            length += len(sentence) + len(ending)
+        
+        if not parts:
+            # 如果没有明显的句子，直接截取前 max_length 个字符
+            start = first.start()
+            return text[start:start + max_length] + '...'
         
-        return summary.strip()
+        return "".join(parts).strip()
+
+    def _textrank_summary(self, text: str, max_length: int, max_sentences: int):
+        """使用 TextRank 生成摘要
+        
+        返回:
+            摘要文本；依赖缺失或没有可用候选句时返回 None
+        """
+        try:
+            from .textrank import TextRankSummarizer
+        except ImportError:
+            logger.warning("未安装 NumPy/SciPy，TextRank 摘要不可用，改用 lead 摘要")
+            return None
+        
+        summary = TextRankSummarizer(max_sentences=max_sentences).summarize(text, max_length)
+        return summary or None
 
     def extract_lists(self, text: str) -> List[str]:
         """提取列表和要点
@@ -229,3 +371,70 @@ class KeyInfoAnalyzer:
                     break
         
         return lists
+
+
+def run_stages(
+    analyzer: KeyInfoAnalyzer,
+    text: str,
+    stages: Union[str, Iterable[str], None] = None,
+    pages: Optional[Sequence[str]] = None,
+    stage_context: Optional[Callable[[str], ContextManager]] = None
+) -> KeyInformation:
+    """执行选定的分析阶段
+    
+    每个阶段单独计时并记录到 KeyInformation.stage_timings。
+    某个阶段失败时记录警告并继续执行其他阶段。
+    
+    参数:
+        analyzer: 关键信息分析器
+        text: 要分析的文本内容
+        stages: 要执行的阶段（参见 parse_stages），默认执行所有阶段
+        pages: 按页拆分的文本（可选）
+        stage_context: 以阶段名调用，返回执行该阶段的上下文管理器（可选，如 StageProfiler.stage）
+        
+    返回:
+        关键信息对象，未执行的阶段保持默认值
+        
+    异常:
+        ValueError: 包含未注册的阶段名
+    """
+    key_info = KeyInformation()
+    
+    for name in parse_stages(stages):
+        start = time.perf_counter()
+        try:
+            context = stage_context(name) if stage_context is not None else nullcontext()
+            with span(f"analysis.{name}"), context:
+                setattr(key_info, name, _STAGE_REGISTRY[name](analyzer, text, pages))
+        except Exception as e:
+            logger.warning(f"分析阶段 {name} 发生错误: {str(e)}")
+            log_warning(logger, "analysis_failed", reason=str(e))
+        key_info.stage_timings[name] = time.perf_counter() - start
+    
+    return key_info
+
+
+@register_stage('headings')
+def _headings_stage(analyzer: KeyInfoAnalyzer, text: str, pages: Optional[Sequence[str]]):
+    return analyzer.extract_headings(text)
+
+
+@register_stage('keywords')
+def _keywords_stage(analyzer: KeyInfoAnalyzer, text: str, pages: Optional[Sequence[str]]):
+    return analyzer.extract_keywords(text, top_n=analyzer.config.max_keywords, pages=pages)
+
+
+@register_stage('summary')
+def _summary_stage(analyzer: KeyInfoAnalyzer, text: str, pages: Optional[Sequence[str]]):
+    config = analyzer.config
+    return analyzer.generate_summary(
+        text,
+        max_length=config.summary_max_length,
+        method=config.summary_method,
+        max_sentences=config.summary_max_sentences
+    )
+
+
+@register_stage('lists')
+def _lists_stage(analyzer: KeyInfoAnalyzer, text: str, pages: Optional[Sequence[str]]):
+    return analyzer.extract_lists(text)
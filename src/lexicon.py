@@ -0,0 +1,208 @@
+"""词表管理模块
+
+负责加载停用词、标点符号和 jieba 自定义词典：
+- 词表只在首次使用时加载一次，编译为 frozenset 和 str.translate 转换表
+- 加载结果按配置缓存在模块级别，同一进程内的分析器共享同一份词表
+- 在创建工作进程前调用 preload_lexicon()，fork 出的子进程以写时复制方式共享词表
+
+词表文件格式：UTF-8 编码，每行一个词，# 开头的行为注释。
+文件中的词会合并到内置词表中。
+"""
+
+import gc
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import jieba
+
+from . import metrics
+from .tokenizer import ENGLISH_STOPWORDS
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# 内置中文停用词：常见虚词、代词和连词
+DEFAULT_STOPWORDS = frozenset({
+    '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一',
+    '一个', '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没有',
+    '看', '好', '自己', '这', '那', '里', '为', '以', '个', '用', '来', '他',
+    '她', '它', '们', '这个', '那个', '什么', '怎么', '可以', '但是', '如果',
+    '因为', '所以', '虽然', '然而', '而且', '或者', '并且', '但', '与', '及',
+    '等', '等等', '之', '于', '对', '从', '把', '被', '让', '给', '向', '往',
+    '由', '将', '得', '地', '得到', '进行', '通过', '根据', '按照', '关于',
+})
+
+# 内置标点符号（含空白字符）
+DEFAULT_PUNCTUATION = '，。！？、；：\u201c\u201d\u2018\u2019（）【】《》\n\t ,.!?;:\'"()[]<>'
+
+# 已加载到 jieba 的自定义词典（jieba 词典为进程级全局状态，每个文件只加载一次）
+_loaded_user_dicts: Set[str] = set()
+
+
+@dataclass(frozen=True)
+class Lexicon:
+    """编译后的词表
+
+    属性:
+        stopwords: 中文停用词
+        english_stopwords: 英文停用词
+        punctuation: 标点符号字符集
+        punctuation_table: 删除标点符号的 str.translate 转换表
+    """
+    stopwords: FrozenSet[str]
+    english_stopwords: FrozenSet[str]
+    punctuation: FrozenSet[str]
+    punctuation_table: Dict[int, None]
+
+    def is_punctuation(self, word: str) -> bool:
+        """判断词语是否完全由标点符号组成"""
+        return not word.translate(self.punctuation_table)
+
+
+def read_word_file(path: str) -> List[str]:
+    """读取词表文件
+
+    参数:
+        path: 词表文件路径
+
+    返回:
+        词语列表（已去除空行和注释）
+
+    异常:
+        IOError: 文件读取失败
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError as e:
+        raise IOError(f"读取词表文件失败: {path}，错误: {str(e)}")
+
+    words = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            words.append(line)
+    return words
+
+
+def loaded_user_dict_count() -> int:
+    """已加载到 jieba 的自定义词典数（用于判断进程的全局词典是否被修改）"""
+    return len(_loaded_user_dicts)
+
+
+def load_user_dicts(paths: Iterable[str]) -> None:
+    """加载 jieba 自定义词典（每个文件只加载一次）
+
+    参数:
+        paths: 词典文件路径列表，格式参见 jieba.load_userdict
+    """
+    for path in paths:
+        resolved = str(Path(path).expanduser().resolve())
+        if resolved in _loaded_user_dicts:
+            continue
+        jieba.load_userdict(resolved)
+        _loaded_user_dicts.add(resolved)
+        logger.info(f"已加载自定义词典: {resolved}")
+
+
+@lru_cache(maxsize=None)
+def _compile_lexicon(
+    stopwords_file: Optional[str],
+    english_stopwords_file: Optional[str],
+    punctuation_file: Optional[str],
+    user_dict_files: Tuple[str, ...]
+) -> Lexicon:
+    """加载并编译词表（按参数缓存）"""
+    stopwords = set(DEFAULT_STOPWORDS)
+    if stopwords_file:
+        stopwords.update(read_word_file(stopwords_file))
+
+    english_stopwords = set(ENGLISH_STOPWORDS)
+    if english_stopwords_file:
+        english_stopwords.update(word.lower() for word in read_word_file(english_stopwords_file))
+
+    punctuation = set(DEFAULT_PUNCTUATION)
+    if punctuation_file:
+        for word in read_word_file(punctuation_file):
+            punctuation.update(word)
+
+    load_user_dicts(user_dict_files)
+
+    return Lexicon(
+        stopwords=frozenset(stopwords),
+        english_stopwords=frozenset(english_stopwords),
+        punctuation=frozenset(punctuation),
+        punctuation_table=str.maketrans('', '', ''.join(punctuation))
+    )
+
+
+def get_lexicon(
+    stopwords_file: Optional[str] = None,
+    english_stopwords_file: Optional[str] = None,
+    punctuation_file: Optional[str] = None,
+    user_dict_files: Iterable[str] = ()
+) -> Lexicon:
+    """获取编译后的词表
+
+    相同参数只会加载一次，之后直接返回模块级缓存。
+
+    参数:
+        stopwords_file: 中文停用词文件（可选）
+        english_stopwords_file: 英文停用词文件（可选）
+        punctuation_file: 标点符号文件（可选）
+        user_dict_files: jieba 自定义词典文件列表（可选）
+
+    返回:
+        Lexicon 对象
+
+    异常:
+        IOError: 词表文件读取失败
+    """
+    misses = _compile_lexicon.cache_info().misses
+    lexicon = _compile_lexicon(
+        stopwords_file or None,
+        english_stopwords_file or None,
+        punctuation_file or None,
+        tuple(user_dict_files or ())
+    )
+    metrics.record_cache("lexicon", hit=_compile_lexicon.cache_info().misses == misses)
+    return lexicon
+
+
+def get_lexicon_from_config(config) -> Lexicon:
+    """根据 ExtractionConfig 获取词表
+
+    参数:
+        config: ExtractionConfig 对象
+
+    返回:
+        Lexicon 对象
+    """
+    return get_lexicon(
+        stopwords_file=config.stopwords_file,
+        english_stopwords_file=config.english_stopwords_file,
+        punctuation_file=config.punctuation_file,
+        user_dict_files=config.user_dict_files
+    )
+
+
+def preload_lexicon(config=None) -> Lexicon:
+    """在创建工作进程前预加载词表和 jieba 词典
+
+    预加载后冻结垃圾回收器跟踪的对象，避免子进程中的 GC
+    修改对象头导致共享内存页被复制。
+
+    参数:
+        config: ExtractionConfig 对象（可选），不提供时加载内置词表
+
+    返回:
+        Lexicon 对象
+    """
+    lexicon = get_lexicon_from_config(config) if config is not None else get_lexicon()
+    jieba.initialize()
+    gc.freeze()
+    return lexicon
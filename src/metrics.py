@@ -0,0 +1,449 @@
+"""运行指标模块
+
+以服务或批处理方式运行时，用 Prometheus 文本格式导出运行指标：
+- pdf_extractor_documents_total / pages_total：提取完成的文档数和页数（不包括从检查点恢复的页面）
+- pdf_extractor_errors_total{type}：按异常类型（src.exceptions 中的类名）统计的错误数，
+  逐页提取时跳过的页面记为 PageExtractionError
+- pdf_extractor_cache_requests_total{cache, result}：缓存查询次数（如 lexicon 词表缓存的 hit / miss），
+  导出时附带命中率 pdf_extractor_cache_hit_ratio
+- pdf_extractor_stage_duration_seconds{stage}、page_duration_seconds、document_duration_seconds：
+  各阶段、每页和每个文档耗时的直方图
+- pdf_extractor_first_page_seconds：逐页写出时，从开始处理到第一页写出的耗时的直方图
+- pdf_extractor_queue_depth、jobs_running、documents_per_second：由导出方（服务、批处理）提供的当前状态
+
+提取服务（PDFExtractionService.extract）在每个文档结束时更新当前进程的 REGISTRY，
+不需要调用方额外处理。
+
+多进程：批处理、服务和守护进程的提取在工作进程中进行。调用 enable_shared(目录) 后，
+每个进程在每个文档结束时把自己的累计值写到 <目录>/<进程号>-<启动时间>.json（fork 出的子进程从零开始计数，
+spawn 出的子进程通过环境变量 PDF_EXTRACTOR_METRICS_DIR 得知目录），
+MetricsExporter 合并目录中所有进程的数据后导出。文件名带有进程的启动时间，进程号被复用时不会覆盖
+已退出进程的文件，已退出进程的累计值保留在目录中，计数不会回退。
+缓存查询在热路径上，只在内存中计数，随下一个文档结束时或导出时一起写出。
+
+使用方式：
+    enable_shared("/tmp/metrics")
+    exporter = MetricsExporter()
+    ...
+    exporter.write("/var/lib/node_exporter/pdf_extractor.prom", {"queue_depth": 3})
+"""
+
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# spawn 出的子进程通过该环境变量得知共享目录
+METRICS_DIR_ENV_VAR = "PDF_EXTRACTOR_METRICS_DIR"
+
+# 指标名前缀
+PREFIX = "pdf_extractor_"
+
+# 批处理和监视目录模式写出 .prom 文件的默认间隔（秒）
+DEFAULT_METRICS_INTERVAL = 15.0
+
+# 耗时直方图的桶上限（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# 指标名 -> (类型, 说明)，按导出顺序排列
+METRICS = {
+    "documents_total": ("counter", "提取完成的文档数"),
+    "pages_total": ("counter", "提取的页数"),
+    "errors_total": ("counter", "按异常类型统计的错误数"),
+    "cache_requests_total": ("counter", "缓存查询次数"),
+    "cache_hit_ratio": ("gauge", "缓存命中率"),
+    "documents_per_second": ("gauge", "导出方启动以来平均每秒完成的文档数"),
+    "queue_depth": ("gauge", "排队等待处理的文档数"),
+    "jobs_running": ("gauge", "正在处理的文档数"),
+    "stage_duration_seconds": ("histogram", "每个文档各阶段的耗时"),
+    "page_duration_seconds": ("histogram", "每页的提取耗时"),
+    "document_duration_seconds": ("histogram", "每个文档的总耗时"),
+    "first_page_seconds": ("histogram", "逐页写出时从开始处理到第一页写出的耗时"),
+}
+
+# 记录到直方图的阶段（StageTimings 的字段）
+_STAGES = ("open", "extract", "analysis", "format", "write")
+
+# (指标名, ((标签名, 标签值), ...))
+SampleKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, str]) -> SampleKey:
+    if name not in METRICS:
+        raise ValueError(f"未定义的指标: {name}")
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class MetricsRegistry:
+    """计数器、仪表和直方图（线程安全）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[SampleKey, float] = {}
+        self._gauges: Dict[SampleKey, float] = {}
+        # 每个桶的计数（不累加），最后两项为总和与总数
+        self._histograms: Dict[SampleKey, List[float]] = {}
+
+    def clear(self) -> None:
+        """清空所有指标（fork 后在子进程中调用）"""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """增加计数器"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """设置仪表的当前值"""
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = float(value)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """在直方图中记录一个观测值"""
+        key = _key(name, labels)
+        with self._lock:
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0.0] * (len(self.buckets) + 3)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        """计数器的值；不指定标签时为该指标所有标签组合之和"""
+        with self._lock:
+            if labels:
+                return self._counters.get(_key(name, labels), 0.0)
+            return sum(value for (metric, _), value in self._counters.items() if metric == name)
+
+    def to_dict(self) -> Dict:
+        """可以编码为 JSON 的快照"""
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "counters": [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                "gauges": [[name, dict(labels), value] for (name, labels), value in self._gauges.items()],
+                "histograms": [[name, dict(labels), counts] for (name, labels), counts in self._histograms.items()],
+            }
+
+    def merge(self, data: Dict) -> None:
+        """合并另一个进程的快照：计数器和直方图相加，仪表取快照中的值
+
+        异常:
+            ValueError: 快照的直方图桶与本对象不同
+        """
+        if tuple(data.get("buckets", self.buckets)) != self.buckets:
+            raise ValueError("直方图的桶不一致，无法合并")
+        with self._lock:
+            for name, labels, value in data.get("counters", []):
+                key = _key(name, labels)
+                self._counters[key] = self._counters.get(key, 0.0) + value
+            for name, labels, value in data.get("gauges", []):
+                self._gauges[_key(name, labels)] = value
+            for name, labels, counts in data.get("histograms", []):
+                key = _key(name, labels)
+                current = self._histograms.get(key)
+                if current is None:
+                    self._histograms[key] = list(counts)
+                else:
+                    self._histograms[key] = [a + b for a, b in zip(current, counts)]
+
+    def render(self) -> str:
+        """Prometheus 文本格式（text/plain; version=0.0.4）"""
+        samples: Dict[str, List[str]] = {name: [] for name in METRICS}
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                samples[name].append(_sample(name, labels, value))
+            for (name, labels), value in sorted(self._gauges.items()):
+                samples[name].append(_sample(name, labels, value))
+            for (name, labels), counts in sorted(self._histograms.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    samples[name].append(
+                        _sample(f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative)
+                    )
+                samples[name].append(_sample(f"{name}_sum", labels, counts[-2]))
+                samples[name].append(_sample(f"{name}_count", labels, counts[-1]))
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            if not samples[name]:
+                continue
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {metric_type}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isfinite(value) and value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name: str, labels: Tuple[Tuple[str, str], ...], value: float) -> str:
+    label_text = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+    if label_text:
+        return f"{PREFIX}{name}{{{label_text}}} {_format_value(value)}"
+    return f"{PREFIX}{name} {_format_value(value)}"
+
+
+# 当前进程的指标
+REGISTRY = MetricsRegistry()
+
+# 多进程共享目录，未启用时为 None
+_shared_dir: Optional[str] = os.environ.get(METRICS_DIR_ENV_VAR) or None
+
+# 当前进程在共享目录中的文件名（<进程号>-<启动时间>.json），首次写出时确定
+_snapshot_name: Optional[str] = None
+
+# 是否有尚未写到共享目录的更新（缓存查询只在内存中计数）
+_unsaved = False
+
+
+def enable_shared(directory: str) -> None:
+    """启用多进程共享：之后当前进程和新建的子进程每个文档结束时把累计值写到 directory"""
+    global _shared_dir
+    directory = os.path.abspath(directory)
+    os.makedirs(directory, exist_ok=True)
+    _shared_dir = directory
+    os.environ[METRICS_DIR_ENV_VAR] = directory
+
+
+def disable_shared() -> None:
+    """停止多进程共享（不删除目录）"""
+    global _shared_dir
+    _shared_dir = None
+    os.environ.pop(METRICS_DIR_ENV_VAR, None)
+
+
+def record_extraction(timings, page_errors: int = 0) -> None:
+    """记录一个提取完成的文档
+
+    参数:
+        timings: 该文档的 StageTimings
+        page_errors: 提取失败而跳过的页数
+    """
+    # 从检查点恢复的页面位于 pages 开头，本次没有提取，不计入页数和每页耗时
+    extracted = timings.pages[timings.restored_pages:]
+    REGISTRY.inc("documents_total")
+    REGISTRY.inc("pages_total", len(extracted))
+    for stage in _STAGES:
+        elapsed = getattr(timings, stage)
+        # 未执行的阶段（如未提取关键信息时的 analysis、逐页写出时的 format）不记录 0
+        if not elapsed:
+            continue
+        if isinstance(elapsed, dict):
+            elapsed = sum(elapsed.values())
+        REGISTRY.observe("stage_duration_seconds", elapsed, stage=stage)
+    for elapsed in extracted:
+        REGISTRY.observe("page_duration_seconds", elapsed)
+    REGISTRY.observe("document_duration_seconds", timings.total)
+    # 不逐页写出时没有第一页的耗时，不计入
+    if timings.time_to_first_page:
+        REGISTRY.observe("first_page_seconds", timings.time_to_first_page)
+    if page_errors:
+        REGISTRY.inc("errors_total", page_errors, type="PageExtractionError")
+    _save()
+
+
+def record_error(error: BaseException) -> None:
+    """记录一个提取失败的文档（按异常类名统计）"""
+    REGISTRY.inc("errors_total", type=type(error).__name__)
+    _save()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """记录一次缓存查询（只在内存中计数，随下一次 _save 写出）"""
+    global _unsaved
+    REGISTRY.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+    _unsaved = True
+
+
+def _save() -> None:
+    """启用共享时把当前进程的累计值写到共享目录"""
+    global _snapshot_name, _unsaved
+    directory = _shared_dir
+    if directory is None:
+        return
+    if _snapshot_name is None:
+        _snapshot_name = f"{os.getpid()}-{time.time_ns()}.json"
+    _unsaved = False
+    try:
+        _write_atomic(os.path.join(directory, _snapshot_name), json.dumps(REGISTRY.to_dict()))
+    except OSError as e:
+        logger.warning(f"运行指标写入失败: {str(e)}")
+
+
+def _after_fork_in_child() -> None:
+    """fork 出的子进程从零开始计数，并使用自己的文件名"""
+    global _snapshot_name, _unsaved
+    REGISTRY.clear()
+    _snapshot_name = None
+    _unsaved = False
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """写入同目录下的临时文件后重命名，读取方不会读到不完整的内容"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def collect(directory: Optional[str] = None) -> MetricsRegistry:
+    """合并各进程的指标
+
+    参数:
+        directory: 共享目录，默认为当前启用的目录；未启用共享时只包含当前进程的指标
+
+    返回:
+        合并后的新 MetricsRegistry
+    """
+    directory = directory or _shared_dir
+    merged = MetricsRegistry(REGISTRY.buckets)
+    if directory is None:
+        merged.merge(REGISTRY.to_dict())
+        return merged
+    # 先写出当前进程在内存中尚未写出的缓存查询
+    if _unsaved and directory == _shared_dir:
+        _save()
+    for path in sorted(glob.glob(os.path.join(glob.escape(directory), "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"跳过无法读取的运行指标: {path}: {str(e)}")
+    return merged
+
+
+class MetricsExporter:
+    """合并各进程的指标，附加导出方的当前状态后导出"""
+
+    def __init__(self, directory: Optional[str] = None, clock: Callable[[], float] = time.monotonic):
+        """初始化
+
+        参数:
+            directory: 共享目录，默认为导出时启用的目录
+            clock: 时钟（用于计算平均吞吐量），默认为 time.monotonic
+        """
+        self.directory = directory
+        self._clock = clock
+        self._started = clock()
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus 文本格式
+
+        参数:
+            gauges: 导出方的当前状态，如 {"queue_depth": 3, "jobs_running": 2}
+        """
+        registry = collect(self.directory)
+        for name, value in (gauges or {}).items():
+            registry.set_gauge(name, value)
+
+        elapsed = self._clock() - self._started
+        if elapsed > 0:
+            registry.set_gauge("documents_per_second", registry.counter_value("documents_total") / elapsed)
+        for cache in sorted({
+            labels["cache"] for name, labels, _ in registry.to_dict()["counters"]
+            if name == "cache_requests_total"
+        }):
+            hits = registry.counter_value("cache_requests_total", cache=cache, result="hit")
+            misses = registry.counter_value("cache_requests_total", cache=cache, result="miss")
+            if hits + misses:
+                registry.set_gauge("cache_hit_ratio", hits / (hits + misses), cache=cache)
+        return registry.render()
+
+    def write(self, path: str, gauges: Optional[Dict[str, float]] = None) -> None:
+        """写出 .prom 文件（供 node_exporter 的 textfile 收集器读取）
+
+        异常:
+            IOError: 文件写入失败
+        """
+        try:
+            _write_atomic(path, self.render(gauges))
+        except OSError as e:
+            raise IOError(f"运行指标写入失败: {str(e)}")
+
+
+class PeriodicWriter:
+    """后台线程定期写出 .prom 文件，停止时再写出一次"""
+
+    def __init__(
+        self,
+        exporter: MetricsExporter,
+        path: str,
+        interval: float,
+        gauges: Optional[Callable[[], Dict[str, float]]] = None
+    ):
+        """初始化
+
+        参数:
+            exporter: 指标导出
+            path: .prom 文件路径
+            interval: 写出间隔（秒）
+            gauges: 每次写出时调用，返回导出方的当前状态（可选）
+        """
+        self.exporter = exporter
+        self.path = path
+        self.interval = interval
+        self.gauges = gauges
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并写出最终结果
+
+        异常:
+            IOError: 文件写入失败
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+    def write(self) -> None:
+        self.exporter.write(self.path, self.gauges() if self.gauges is not None else None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except Exception as e:
+                logger.warning(f"运行指标写入失败: {str(e)}")
+
+
+# 没有 fork 的平台（Windows）只有 spawn 出的子进程，不需要清空
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
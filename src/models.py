@@ -1,7 +1,8 @@
 """核心数据模型类"""
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
 @dataclass
@@ -13,6 +14,22 @@ class PDFDocument:
     _internal_handle: Any = None
 
 
+# 页面复杂度中的各项计数，与每页耗时计算相关系数
+COMPLEXITY_FIELDS = ("chars", "lines", "rects", "curves", "images", "content_bytes")
+
+
+@dataclass
+class PageComplexity:
+    """页面复杂度：页面上的对象数和内容流大小，用于分析哪些页面为什么慢"""
+    page_number: int  # 页码（从 0 开始）
+    chars: int = 0  # 字符
+    lines: int = 0  # 直线
+    rects: int = 0  # 矩形
+    curves: int = 0  # 曲线
+    images: int = 0  # 图片
+    content_bytes: int = 0  # 内容流大小（解码后的字节数）
+
+
 @dataclass
 class PageText:
     """页面文本"""
@@ -20,6 +37,8 @@ class PageText:
     text: str
     char_count: int = 0
     is_empty: bool = False
+    # 提取时统计的页面复杂度（从检查点或已有结果读取的页面没有），不参与比较
+    complexity: Optional[PageComplexity] = field(default=None, compare=False, repr=False)
     
     def __post_init__(self):
         """初始化后自动计算字符数和是否为空"""
@@ -36,6 +55,77 @@ class KeyInformation:
     keywords: List[str] = field(default_factory=list)
     summary: str = ""
     lists: List[str] = field(default_factory=list)
+    stage_timings: Dict[str, float] = field(default_factory=dict)  # 各分析阶段耗时（秒）
+
+
+@dataclass
+class StageTimings:
+    """提取流程各阶段耗时（秒）"""
+    open: float = 0.0  # 打开 PDF 文件
+    extract: float = 0.0  # 逐页提取文本（各页耗时之和）
+    pages: List[float] = field(default_factory=list)  # 每页提取耗时，按页码顺序（从检查点恢复的页面为 0）
+    analysis: Dict[str, float] = field(default_factory=dict)  # 关键信息各分析阶段耗时
+    format: float = 0.0  # 格式化为字符串（逐页写出时格式化与写出同时进行，计入 write）
+    write: float = 0.0  # 写出到文件、输出流和结果存储
+    total: float = 0.0  # 整个提取流程
+    time_to_first_page: float = 0.0  # 逐页写出时，从开始处理到第一页写出的耗时（不逐页写出时为 0）
+    char_count: int = 0  # 提取的字符数（用于计算吞吐量）
+    restored_pages: int = 0  # 从检查点恢复的页数（位于 pages 开头，不计入吞吐量）
+    restored_chars: int = 0  # 从检查点恢复的字符数（包含在 char_count 中，不计入吞吐量）
+    page_complexity: List[PageComplexity] = field(default_factory=list)  # 每页的对象数（从检查点恢复的页面没有）
+    
+    @property
+    def extracted_pages(self) -> int:
+        """本次实际提取的页数（不包括从检查点恢复的页面）"""
+        return len(self.pages) - self.restored_pages
+    
+    @property
+    def pages_per_second(self) -> float:
+        """文本提取吞吐量（页/秒，不包括从检查点恢复的页面）"""
+        return self.extracted_pages / self.extract if self.extract > 0 else 0.0
+    
+    @property
+    def chars_per_second(self) -> float:
+        """文本提取吞吐量（字符/秒，不包括从检查点恢复的字符）"""
+        return (self.char_count - self.restored_chars) / self.extract if self.extract > 0 else 0.0
+    
+    def slowest_pages(self, top: int = 5) -> List[Tuple[int, float, Optional[PageComplexity]]]:
+        """提取耗时最长的 top 页
+        
+        返回:
+            (页码（从 0 开始）, 耗时（秒）, 页面复杂度) 列表，按耗时从长到短排列；
+            没有复杂度记录的页面（如从检查点恢复）为 None
+        """
+        complexity = {item.page_number: item for item in self.page_complexity}
+        ranked = sorted(range(len(self.pages)), key=lambda index: self.pages[index], reverse=True)
+        return [(index, self.pages[index], complexity.get(index)) for index in ranked[:top]]
+    
+    def complexity_correlation(self) -> Dict[str, Optional[float]]:
+        """每页提取耗时与各项页面复杂度的皮尔逊相关系数
+        
+        返回:
+            {计数名: 相关系数}，参见 COMPLEXITY_FIELDS；少于 3 页或某项在各页都相同时为 None
+        """
+        samples = [item for item in self.page_complexity if item.page_number < len(self.pages)]
+        durations = [self.pages[item.page_number] for item in samples]
+        return {
+            name: _correlation(durations, [getattr(item, name) for item in samples])
+            for name in COMPLEXITY_FIELDS
+        }
+
+
+def _correlation(xs: Sequence[float], ys: Sequence[float]) -> Optional[float]:
+    """皮尔逊相关系数（样本少于 3 个或任一序列没有变化时为 None）"""
+    if len(xs) < 3:
+        return None
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    spread_x = math.sqrt(sum((x - mean_x) ** 2 for x in xs))
+    spread_y = math.sqrt(sum((y - mean_y) ** 2 for y in ys))
+    if spread_x == 0 or spread_y == 0:
+        return None
+    return covariance / (spread_x * spread_y)
 
 
 @dataclass
@@ -47,7 +137,9 @@ class ExtractedContent:
     total_text: str = ""
     key_info: Optional[KeyInformation] = None
     extraction_time: float = 0.0
+    time_to_first_page: float = 0.0  # 逐页写出时，从开始处理到第一页写出的耗时（秒）
     errors: List[str] = field(default_factory=list)
+    timings: Optional[StageTimings] = None  # 各阶段耗时，由 PDFExtractionService.extract 记录
     
     def __post_init__(self):
         """初始化后自动生成总文本"""
@@ -1,214 +1,725 @@
-"""输出格式化器模块"""
+"""输出格式化器模块
 
-import json
-from typing import Optional
-from src.models import ExtractedContent
+格式化由分页写出器（PageWriter）完成：先写文件头，再逐页写出，最后写出
+关键信息和错误信息。写出器直接写入文件句柄或标准输出，内存中最多只保留
+一页的格式化结果；format_as_* 方法在写出器之上生成完整字符串。
+
+JSON 编码使用 JSONSerializer，安装 orjson 时自动启用快速路径，输出不变。
+
+JSON 类格式（json、json-compact、ndjson、pages）在尾部写出各阶段耗时（timings），
+format 和 write 为写出尾部之前的耗时。
+
+pages 格式（PageStoreWriter）额外记录每页的字节偏移，可以用
+result_loader.PageStoreReader 直接读取任意一页。
+"""
+
+import io
+import shutil
+import tempfile
+from dataclasses import asdict
+from typing import Dict, Optional, TextIO, Type
+from src.models import ExtractedContent, KeyInformation, PageText, StageTimings
+from src.compression import COMPRESSIONS, detect_compression, open_output
+from src.json_serializer import JSONSerializer
+
+
+# 紧凑 JSON 布局的版本号（完整布局没有版本字段，视为版本 1）
+COMPACT_JSON_SCHEMA_VERSION = 2
+
+# 耗时写出到 JSON 时保留的小数位数（微秒）
+_TIMING_DIGITS = 6
+
+# 逐块转义长字符串时每块的字符数
+_JSON_STRING_CHUNK = 8 * 1024
+
+# 完整 JSON 布局中 total_text 暂存在内存中的上限（字符），超出后转存到临时文件，
+# 使峰值内存与文档大小无关
+_TOTAL_TEXT_SPOOL_SIZE = 64 * 1024
+
+# 页面存储格式（-f pages）的标识和版本号
+PAGE_STORE_FORMAT = "pdf-extractor-pages"
+PAGE_STORE_VERSION = 1
+
+# 页面存储文件末尾固定长度的一行，记录索引行的字节偏移
+PAGE_STORE_TRAILER = '{{"index_offset":{:<20d}}}\n'
+PAGE_STORE_TRAILER_SIZE = len(PAGE_STORE_TRAILER.format(0))
+
+
+class PageWriter:
+    """分页写出器基类
+
+    使用方式：
+        writer.write_header(file_path, page_count)
+        for page in pages:
+            writer.write_page(page)
+        writer.write_footer(content)
+
+    也可以直接调用 writer.write(content) 写出完整内容。
+    """
+
+    # 是否只能写出到未压缩、可定位的文件（不支持标准输出、压缩和追加）
+    requires_file = False
+
+    def __init__(self, stream: TextIO):
+        """初始化写出器
+
+        参数:
+            stream: 目标文本流（文件句柄、sys.stdout 或 io.StringIO）
+        """
+        self.stream = stream
+        self._has_output = False
+
+    def write(self, content: ExtractedContent) -> None:
+        """写出完整的提取内容"""
+        self.write_header(content.file_path, content.page_count)
+        for page in content.pages:
+            self.write_page(page)
+        self.write_footer(content)
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        """写出文件头"""
+        raise NotImplementedError
+
+    def write_page(self, page: PageText) -> None:
+        """写出单页内容"""
+        raise NotImplementedError
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        """写出关键信息、错误信息等尾部内容"""
+        raise NotImplementedError
+
+    def _write_line(self, line: str) -> None:
+        """写出一行（行与行之间以换行符分隔，末尾不追加换行）"""
+        if self._has_output:
+            self.stream.write("\n")
+        self.stream.write(line)
+        self._has_output = True
+
+
+class TextWriter(PageWriter):
+    """纯文本写出器"""
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        self._write_line(f"文件路径: {file_path}")
+        self._write_line(f"总页数: {page_count}")
+        self._write_line("-" * 50)
+        self._write_line("")
+
+    def write_page(self, page: PageText) -> None:
+        self._write_line(f"=== 第 {page.page_number + 1} 页 ===")
+        if page.is_empty:
+            self._write_line("(空页面)")
+        else:
+            self._write_line(page.text)
+        self._write_line("")
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        key_info = content.key_info
+
+        # 添加关键信息（如果有）
+        if key_info:
+            self._write_line("=" * 50)
+            self._write_line("关键信息")
+            self._write_line("=" * 50)
+            self._write_line("")
+
+            if key_info.headings:
+                self._write_line("标题:")
+                for heading in key_info.headings:
+                    self._write_line(f"  - {heading}")
+                self._write_line("")
+
+            if key_info.keywords:
+                self._write_line("关键词:")
+                self._write_line(f"  {', '.join(key_info.keywords)}")
+                self._write_line("")
+
+            if key_info.summary:
+                self._write_line("摘要:")
+                self._write_line(f"  {key_info.summary}")
+                self._write_line("")
+
+            if key_info.lists:
+                self._write_line("列表项:")
+                for list_item in key_info.lists:
+                    self._write_line(f"  {list_item}")
+                self._write_line("")
+
+            if key_info.stage_timings:
+                self._write_line("分析耗时:")
+                for stage, elapsed in key_info.stage_timings.items():
+                    self._write_line(f"  {stage}: {elapsed:.3f} 秒")
+                self._write_line("")
+
+        # 添加错误信息（如果有）
+        if content.errors:
+            self._write_line("=" * 50)
+            self._write_line("错误信息")
+            self._write_line("=" * 50)
+            for error in content.errors:
+                self._write_line(f"  - {error}")
+            self._write_line("")
+
+
+class MarkdownWriter(PageWriter):
+    """Markdown 写出器"""
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        self._write_line("# PDF 文本提取结果")
+        self._write_line("")
+        self._write_line(f"**文件路径:** {file_path}")
+        self._write_line(f"**总页数:** {page_count}")
+        self._write_line("")
+        self._write_line("---")
+        self._write_line("")
+
+    def write_page(self, page: PageText) -> None:
+        self._write_line(f"## 第 {page.page_number + 1} 页")
+        self._write_line("")
+        if page.is_empty:
+            self._write_line("*(空页面)*")
+        else:
+            self._write_line(page.text)
+        self._write_line("")
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        key_info = content.key_info
+
+        # 添加关键信息（如果有）
+        if key_info:
+            self._write_line("---")
+            self._write_line("")
+            self._write_line("## 关键信息")
+            self._write_line("")
+
+            if key_info.headings:
+                self._write_line("### 标题")
+                self._write_line("")
+                for heading in key_info.headings:
+                    self._write_line(f"- {heading}")
+                self._write_line("")
+
+            if key_info.keywords:
+                self._write_line("### 关键词")
+                self._write_line("")
+                self._write_line(", ".join(key_info.keywords))
+                self._write_line("")
+
+            if key_info.summary:
+                self._write_line("### 摘要")
+                self._write_line("")
+                self._write_line(key_info.summary)
+                self._write_line("")
+
+            if key_info.lists:
+                self._write_line("### 列表项")
+                self._write_line("")
+                for list_item in key_info.lists:
+                    self._write_line(f"- {list_item}")
+                self._write_line("")
+
+            if key_info.stage_timings:
+                self._write_line("### 分析耗时")
+                self._write_line("")
+                for stage, elapsed in key_info.stage_timings.items():
+                    self._write_line(f"- {stage}: {elapsed:.3f} 秒")
+                self._write_line("")
+
+        # 添加错误信息（如果有）
+        if content.errors:
+            self._write_line("---")
+            self._write_line("")
+            self._write_line("## 错误信息")
+            self._write_line("")
+            for error in content.errors:
+                self._write_line(f"- {error}")
+            self._write_line("")
+
+
+class JSONWriter(PageWriter):
+    """JSON 写出器
+
+    增量写出与 json.dumps(data, ensure_ascii=False, indent=2) 完全相同的结果：
+    每页单独编码后写出，不在内存中构建完整文档。尾部的 total_text 由写出时
+    各页转义后的文本拼接而成，较大时暂存在临时文件中，调用方不需要保留所有页面。
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._encoder = JSONSerializer(indent=2)
+        self._page_written = False
+        self._total_text = None
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        self.stream.write("{\n")
+        self._write_key("file_path", file_path, first=True)
+        self._write_key("page_count", page_count)
+        self.stream.write(',\n  "pages": [')
+
+    def write_page(self, page: PageText) -> None:
+        data = {
+            "page_number": page.page_number + 1,  # 转换为 1-based
+            "text": page.text,
+            "char_count": page.char_count,
+            "is_empty": page.is_empty
+        }
+        self.stream.write(",\n    " if self._page_written else "\n    ")
+        self.stream.write(self._encode_nested(data, level=2))
+        self._page_written = True
+
+        if self._total_text is None:
+            self._total_text = tempfile.SpooledTemporaryFile(
+                max_size=_TOTAL_TEXT_SPOOL_SIZE, mode="w+", encoding="utf-8", newline=""
+            )
+        self._total_text.write(self._encoder.encode(page.text)[1:-1])
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        self.stream.write("\n  ]" if self._page_written else "]")
+
+        self.stream.write(',\n  "total_text": ')
+        if self._total_text is not None:
+            # 各页转义后的文本按顺序拼接，即为 total_text 转义后的结果
+            self.stream.write('"')
+            self._total_text.seek(0)
+            shutil.copyfileobj(self._total_text, self.stream, _JSON_STRING_CHUNK)
+            self.stream.write('"')
+            self._total_text.close()
+            self._total_text = None
+        else:
+            self._write_string(content.total_text)
+
+        self._write_key("extraction_time", content.extraction_time)
+
+        # 添加各阶段耗时（如果有）
+        if content.timings is not None:
+            self._write_key("timings", self._timings_data(content.timings))
+
+        # 添加关键信息（如果有）
+        if content.key_info:
+            self._write_key("key_info", self._key_info_data(content.key_info))
+
+        # 添加错误信息（如果有）
+        if content.errors:
+            self._write_key("errors", content.errors)
+
+        self.stream.write("\n}")
+
+    @staticmethod
+    def _key_info_data(key_info: KeyInformation) -> Dict:
+        """关键信息的 JSON 结构"""
+        return {
+            "headings": key_info.headings,
+            "keywords": key_info.keywords,
+            "summary": key_info.summary,
+            "lists": key_info.lists,
+            "stage_timings": key_info.stage_timings
+        }
+
+    @staticmethod
+    def _timings_data(timings: StageTimings) -> Dict:
+        """各阶段耗时和每页复杂度的 JSON 结构（耗时保留到微秒）"""
+        return {
+            "open": round(timings.open, _TIMING_DIGITS),
+            "extract": round(timings.extract, _TIMING_DIGITS),
+            "analysis": {
+                stage: round(elapsed, _TIMING_DIGITS)
+                for stage, elapsed in timings.analysis.items()
+            },
+            "format": round(timings.format, _TIMING_DIGITS),
+            "write": round(timings.write, _TIMING_DIGITS),
+            "time_to_first_page": round(timings.time_to_first_page, _TIMING_DIGITS),
+            "pages": [round(elapsed, _TIMING_DIGITS) for elapsed in timings.pages],
+            "restored_pages": timings.restored_pages,
+            "page_complexity": [
+                dict(asdict(item), page_number=item.page_number + 1)  # 转换为 1-based
+                for item in timings.page_complexity
+            ]
+        }
+
+    def _write_key(self, key: str, value, first: bool = False) -> None:
+        """写出顶层键值对"""
+        if not first:
+            self.stream.write(",\n")
+        self.stream.write(f'  {self._encoder.encode(key)}: ')
+        self.stream.write(self._encode_nested(value, level=1))
+
+    def _encode_nested(self, value, level: int) -> str:
+        """按嵌套层级缩进编码（字符串中的换行已被转义，不受影响）"""
+        encoded = self._encoder.encode(value)
+        return encoded.replace("\n", "\n" + "  " * level)
+
+    def _write_string(self, value: str) -> None:
+        """分块转义并写出长字符串"""
+        self.stream.write('"')
+        for start in range(0, len(value), _JSON_STRING_CHUNK):
+            chunk = value[start:start + _JSON_STRING_CHUNK]
+            self.stream.write(self._encoder.encode(chunk)[1:-1])
+        self.stream.write('"')
+
+
+class CompactJSONWriter(PageWriter):
+    """紧凑 JSON 写出器（带版本号的精简布局）
+
+    与 JSONWriter 的布局相比：
+    - 不写出 total_text（可由各页文本拼接得到）
+    - 每页只保留 page_number 和 text（char_count、is_empty 可由文本推导）
+    - 关键信息只写出非空的部分
+    - 不缩进，每页单独一行
+    """
+
+    SCHEMA_VERSION = COMPACT_JSON_SCHEMA_VERSION
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._encoder = JSONSerializer()
+        self._page_written = False
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        encode = self._encoder.encode
+        self.stream.write(
+            f'{{"schema_version":{self.SCHEMA_VERSION},'
+            f'"file_path":{encode(file_path)},'
+            f'"page_count":{page_count},"pages":['
+        )
+
+    def write_page(self, page: PageText) -> None:
+        self.stream.write(",\n" if self._page_written else "\n")
+        self.stream.write(self._encoder.encode({
+            "page_number": page.page_number + 1,  # 转换为 1-based
+            "text": page.text
+        }))
+        self._page_written = True
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        encode = self._encoder.encode
+        self.stream.write("\n]" if self._page_written else "]")
+        self.stream.write(f',"extraction_time":{encode(content.extraction_time)}')
+        if content.timings is not None:
+            self.stream.write(f',"timings":{encode(JSONWriter._timings_data(content.timings))}')
+
+        # 只写出非空的关键信息部分
+        if content.key_info:
+            sections = {
+                name: value
+                for name, value in JSONWriter._key_info_data(content.key_info).items()
+                if value
+            }
+            self.stream.write(f',"key_info":{encode(sections)}')
+
+        if content.errors:
+            self.stream.write(f',"errors":{encode(content.errors)}')
+
+        self.stream.write("}")
+
+
+class NDJSONWriter(PageWriter):
+    """NDJSON 写出器（每行一条 JSON 记录）
+
+    每条记录都带有 type 和 file_path 字段，按顺序写出：
+    - document: 文档开始（page_count）
+    - page: 单页（page_number 为 1-based，text、char_count、is_empty）
+    - key_info: 关键信息（可选，只包含非空部分）
+    - errors: 错误信息（可选）
+    - end: 文档结束（extraction_time，以及各阶段耗时 timings）
+
+    每条记录写出后立即刷新，下游可以边提取边读取。多个文档可以追加到
+    同一文件，缺少 end 记录的文档说明写出被中断。
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._encoder = JSONSerializer()
+        self._file_path = ""
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        self._file_path = file_path
+        self._write_record("document", {"page_count": page_count})
+
+    def write_page(self, page: PageText) -> None:
+        self._write_record("page", {
+            "page_number": page.page_number + 1,  # 转换为 1-based
+            "text": page.text,
+            "char_count": page.char_count,
+            "is_empty": page.is_empty
+        })
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        # 只写出非空的关键信息部分
+        if content.key_info:
+            sections = {
+                name: value
+                for name, value in JSONWriter._key_info_data(content.key_info).items()
+                if value
+            }
+            self._write_record("key_info", sections)
+
+        if content.errors:
+            self._write_record("errors", {"errors": content.errors})
+
+        end = {"extraction_time": content.extraction_time}
+        if content.timings is not None:
+            end["timings"] = JSONWriter._timings_data(content.timings)
+        self._write_record("end", end)
+
+    def _write_record(self, record_type: str, fields: Dict) -> None:
+        """写出一条记录并刷新"""
+        record = {"type": record_type, "file_path": self._file_path}
+        record.update(fields)
+        self.stream.write(self._encoder.encode(record))
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class PageStoreWriter(PageWriter):
+    """页面存储写出器（可随机访问的逐行 JSON）
+
+    文件中每行一条 JSON 记录，按顺序为：
+    - 文件头：format、version、file_path、page_count
+    - 每页一行：page_number（1-based）、text、char_count、is_empty
+    - 尾部：extraction_time、timings，以及非空的 key_info、errors
+    - 索引：pages（每页记录的字节偏移）、footer（尾部记录的字节偏移）
+    - 结尾：固定长度的一行，记录索引行的字节偏移
+
+    读取时从文件末尾定位索引，再按偏移直接读取任意一页，参见
+    result_loader.PageStoreReader。偏移取自文件位置（tell），因此只能写出到
+    未压缩的文件，且不支持追加。
+    """
+
+    requires_file = True
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._encoder = JSONSerializer()
+        self._page_offsets = []
+
+    def write_header(self, file_path: str, page_count: int) -> None:
+        if not hasattr(self.stream, "buffer") or not self.stream.seekable():
+            raise ValueError("pages 格式只能写出到未压缩的文件")
+        if self.stream.tell() != 0:
+            raise ValueError("pages 格式不支持追加写出")
+        self._write_record({
+            "format": PAGE_STORE_FORMAT,
+            "version": PAGE_STORE_VERSION,
+            "file_path": file_path,
+            "page_count": page_count
+        })
+
+    def write_page(self, page: PageText) -> None:
+        self._page_offsets.append(self.stream.tell())
+        self._write_record({
+            "page_number": page.page_number + 1,  # 转换为 1-based
+            "text": page.text,
+            "char_count": page.char_count,
+            "is_empty": page.is_empty
+        })
+
+    def write_footer(self, content: ExtractedContent) -> None:
+        footer_offset = self.stream.tell()
+        footer = {"extraction_time": content.extraction_time}
+        if content.timings is not None:
+            footer["timings"] = JSONWriter._timings_data(content.timings)
+        # 只写出非空的关键信息部分
+        if content.key_info:
+            footer["key_info"] = {
+                name: value
+                for name, value in JSONWriter._key_info_data(content.key_info).items()
+                if value
+            }
+        if content.errors:
+            footer["errors"] = content.errors
+        self._write_record(footer)
+
+        index_offset = self.stream.tell()
+        self._write_record({"pages": self._page_offsets, "footer": footer_offset})
+        self.stream.write(PAGE_STORE_TRAILER.format(index_offset))
+
+    def _write_record(self, record: Dict) -> None:
+        """写出一条记录（JSON 字符串中的换行已被转义，每条记录恰好一行）"""
+        self.stream.write(self._encoder.encode(record))
+        self.stream.write("\n")
+
+
+# 输出格式 -> 写出器类
+WRITERS: Dict[str, Type[PageWriter]] = {
+    'text': TextWriter,
+    'json': JSONWriter,
+    'json-compact': CompactJSONWriter,
+    'markdown': MarkdownWriter,
+    'ndjson': NDJSONWriter,
+    'pages': PageStoreWriter,
+}
 
 
 class OutputFormatter:
     """输出格式化器
-    
+
     负责将提取的内容格式化为不同的输出格式（文本、JSON、Markdown）
     并支持保存到文件。
     """
-    
+
+    def get_writer(self, output_format: str, stream: TextIO) -> PageWriter:
+        """创建指定格式的分页写出器
+
+        参数:
+            output_format: 输出格式（'text', 'json', 'markdown'）
+            stream: 目标文本流
+
+        返回:
+            PageWriter 对象
+
+        异常:
+            ValueError: 不支持的输出格式
+        """
+        return self._writer_class(output_format)(stream)
+
+    def write(self, content: ExtractedContent, output_format: str, stream: TextIO) -> None:
+        """将提取的内容逐页写出到文本流
+
+        参数:
+            content: 提取的内容对象
+            output_format: 输出格式（'text', 'json', 'markdown'）
+            stream: 目标文本流
+
+        异常:
+            ValueError: 不支持的输出格式
+        """
+        self.get_writer(output_format, stream).write(content)
+
     def format_as_text(self, content: ExtractedContent) -> str:
         """格式化为纯文本
-        
+
         参数:
             content: 提取的内容对象
-            
+
         返回:
             纯文本格式的字符串
         """
-        lines = []
-        
-        # 添加文件信息
-        lines.append(f"文件路径: {content.file_path}")
-        lines.append(f"总页数: {content.page_count}")
-        lines.append("-" * 50)
-        lines.append("")
-        
-        # 添加每页内容
-        for page in content.pages:
-            lines.append(f"=== 第 {page.page_number + 1} 页 ===")
-            if page.is_empty:
-                lines.append("(空页面)")
-            else:
-                lines.append(page.text)
-            lines.append("")
-        
-        # 添加关键信息（如果有）
-        if content.key_info:
-            lines.append("=" * 50)
-            lines.append("关键信息")
-            lines.append("=" * 50)
-            lines.append("")
-            
-            if content.key_info.headings:
-                lines.append("标题:")
-                for heading in content.key_info.headings:
-                    lines.append(f"  - {heading}")
-                lines.append("")
-            
-            if content.key_info.keywords:
-                lines.append("关键词:")
-                lines.append(f"  {', '.join(content.key_info.keywords)}")
-                lines.append("")
-            
-            if content.key_info.summary:
-                lines.append("摘要:")
-                lines.append(f"  {content.key_info.summary}")
-                lines.append("")
-            
-            if content.key_info.lists:
-                lines.append("列表项:")
-                for list_item in content.key_info.lists:
-                    lines.append(f"  {list_item}")
-                lines.append("")
-        
-        # 添加错误信息（如果有）
-        if content.errors:
-            lines.append("=" * 50)
-            lines.append("错误信息")
-            lines.append("=" * 50)
-            for error in content.errors:
-                lines.append(f"  - {error}")
-            lines.append("")
-        
-        return "\n".join(lines)
-    
+        return self._format(TextWriter, content)
+
     def format_as_json(self, content: ExtractedContent) -> str:
         """格式化为 JSON
-        
+
         参数:
             content: 提取的内容对象
-            
+
         返回:
             JSON 格式的字符串，包含页码信息
         """
-        data = {
-            "file_path": content.file_path,
-            "page_count": content.page_count,
-            "pages": [
-                {
-                    "page_number": page.page_number + 1,  # 转换为 1-based
-                    "text": page.text,
-                    "char_count": page.char_count,
-                    "is_empty": page.is_empty
-                }
-                for page in content.pages
-            ],
-            "total_text": content.total_text,
-            "extraction_time": content.extraction_time
-        }
-        
-        # 添加关键信息（如果有）
-        if content.key_info:
-            data["key_info"] = {
-                "headings": content.key_info.headings,
-                "keywords": content.key_info.keywords,
-                "summary": content.key_info.summary,
-                "lists": content.key_info.lists
-            }
-        
-        # 添加错误信息（如果有）
-        if content.errors:
-            data["errors"] = content.errors
-        
-        return json.dumps(data, ensure_ascii=False, indent=2)
-    
+        return self._format(JSONWriter, content)
+
     def format_as_markdown(self, content: ExtractedContent) -> str:
         """格式化为 Markdown
-        
+
         参数:
             content: 提取的内容对象
-            
+
         返回:
             Markdown 格式的字符串
         """
-        lines = []
-        
-        # 添加文件信息
-        lines.append(f"# PDF 文本提取结果")
-        lines.append("")
-        lines.append(f"**文件路径:** {content.file_path}")
-        lines.append(f"**总页数:** {content.page_count}")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        
-        # 添加每页内容
-        for page in content.pages:
-            lines.append(f"## 第 {page.page_number + 1} 页")
-            lines.append("")
-            if page.is_empty:
-                lines.append("*(空页面)*")
-            else:
-                lines.append(page.text)
-            lines.append("")
-        
-        # 添加关键信息（如果有）
-        if content.key_info:
-            lines.append("---")
-            lines.append("")
-            lines.append("## 关键信息")
-            lines.append("")
-            
-            if content.key_info.headings:
-                lines.append("### 标题")
-                lines.append("")
-                for heading in content.key_info.headings:
-                    lines.append(f"- {heading}")
-                lines.append("")
-            
-            if content.key_info.keywords:
-                lines.append("### 关键词")
-                lines.append("")
-                lines.append(", ".join(content.key_info.keywords))
-                lines.append("")
-            
-            if content.key_info.summary:
-                lines.append("### 摘要")
-                lines.append("")
-                lines.append(content.key_info.summary)
-                lines.append("")
-            
-            if content.key_info.lists:
-                lines.append("### 列表项")
-                lines.append("")
-                for list_item in content.key_info.lists:
-                    lines.append(f"- {list_item}")
-                lines.append("")
-        
-        # 添加错误信息（如果有）
-        if content.errors:
-            lines.append("---")
-            lines.append("")
-            lines.append("## 错误信息")
-            lines.append("")
-            for error in content.errors:
-                lines.append(f"- {error}")
-            lines.append("")
-        
-        return "\n".join(lines)
-    
+        return self._format(MarkdownWriter, content)
+
+    def format_as_compact_json(self, content: ExtractedContent) -> str:
+        """格式化为紧凑 JSON（不包含 total_text，参见 CompactJSONWriter）
+
+        参数:
+            content: 提取的内容对象
+
+        返回:
+            紧凑 JSON 格式的字符串
+        """
+        return self._format(CompactJSONWriter, content)
+
+    def format_as(self, content: ExtractedContent, output_format: str) -> str:
+        """格式化为指定格式的字符串
+
+        参数:
+            content: 提取的内容对象
+            output_format: 输出格式（参见 WRITERS）
+
+        返回:
+            格式化后的字符串
+
+        异常:
+            ValueError: 不支持的输出格式
+        """
+        return self._format(self._writer_class(output_format), content)
+
     def save_to_file(self, content: str, output_path: str) -> str:
         """将内容保存到文件
-        
+
+        输出路径以 .gz / .zst 结尾时自动压缩。
+
         参数:
             content: 要保存的文本内容
             output_path: 输出文件路径
-            
+
         返回:
             成功消息，包含输出文件路径
-            
+
         异常:
             IOError: 文件写入失败
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with open_output(output_path) as f:
                 f.write(content)
             return f"文件保存成功: {output_path}"
         except Exception as e:
             raise IOError(f"文件保存失败: {str(e)}")
+
+    def write_to_file(
+        self,
+        content: ExtractedContent,
+        output_format: str,
+        output_path: str,
+        encoding: str = 'utf-8',
+        append: bool = False,
+        compression: Optional[str] = None
+    ) -> str:
+        """将提取的内容逐页写出到文件
+
+        参数:
+            content: 提取的内容对象
+            output_format: 输出格式（'text', 'json', 'markdown'）
+            output_path: 输出文件路径
+            encoding: 文件编码，默认 UTF-8
+            append: 是否追加到已有文件末尾（用于 ndjson 批量写出多个文档），默认覆盖
+            compression: 压缩格式（'gzip' 或 'zstd'），默认根据文件后缀（.gz / .zst）识别
+
+        返回:
+            成功消息，包含输出文件路径
+
+        异常:
+            ValueError: 不支持的输出格式
+            IOError: 文件写入失败
+        """
+        # 先检查格式，格式错误时不会创建空文件
+        writer_class = self._writer_class(output_format)
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f"不支持的压缩格式: {compression}，支持的格式: {', '.join(COMPRESSIONS)}"
+            )
+        if writer_class.requires_file and (append or compression or detect_compression(output_path)):
+            raise ValueError(f"{output_format} 格式不支持压缩和追加写出")
+        try:
+            with open_output(output_path, compression, encoding, append) as f:
+                writer_class(f).write(content)
+            return f"文件保存成功: {output_path}"
+        except Exception as e:
+            raise IOError(f"文件保存失败: {str(e)}")
+
+    @staticmethod
+    def _writer_class(output_format: str) -> Type[PageWriter]:
+        """查找输出格式对应的写出器类"""
+        writer_class = WRITERS.get(output_format.lower())
+        if writer_class is None:
+            raise ValueError(
+                f"不支持的输出格式: {output_format}，支持的格式: {', '.join(WRITERS)}"
+            )
+        return writer_class
+
+    @staticmethod
+    def _format(writer_class: Type[PageWriter], content: ExtractedContent) -> str:
+        """使用写出器生成完整字符串"""
+        buffer = io.StringIO()
+        writer_class(buffer).write(content)
+        return buffer.getvalue()
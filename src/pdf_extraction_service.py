@@ -1,14 +1,24 @@
 """PDF 提取服务 - 应用服务层"""
 
+import io
 import logging
 import time
-from typing import Optional
+from contextlib import nullcontext
+from typing import List, Optional, Sequence, TextIO
 
-from .models import ExtractedContent, KeyInformation
+from .config import ExtractionConfig
+from .models import ExtractedContent, KeyInformation, PageComplexity, StageTimings
 from .pdf_reader import PDFReader
 from .text_extractor import TextExtractor
-from .key_info_analyzer import KeyInfoAnalyzer
-from .output_formatter import OutputFormatter
+from .key_info_analyzer import KeyInfoAnalyzer, run_stages
+from .output_formatter import OutputFormatter, WRITERS
+from .compression import open_output
+from .checkpoint import PageCheckpoint, remove_checkpoint
+from .profiling import StageProfiler
+from .tracing import span
+from .progress import DocumentProgress, ProgressCallback, TerminalProgress
+from . import metrics
+from .result_loader import open_result
 from .path_handler import PathHandler
 from .exceptions import (
     PDFExtractionError,
@@ -35,11 +45,16 @@ class PDFExtractionService:
     提供统一的接口用于执行完整的提取工作流。
     """
     
-    def __init__(self):
-        """初始化所有组件"""
+    def __init__(self, config: Optional[ExtractionConfig] = None):
+        """初始化所有组件
+        
+        参数:
+            config: 提取配置（可选），不提供时使用默认配置
+        """
+        self.config = config or ExtractionConfig()
         self.reader = PDFReader()
         self.extractor = TextExtractor()
-        self.analyzer = KeyInfoAnalyzer()
+        self.analyzer = KeyInfoAnalyzer(config=self.config)
         self.formatter = OutputFormatter()
         self.path_handler = PathHandler()
         
@@ -51,8 +66,17 @@ class PDFExtractionService:
         output_format: str = "text",
         extract_key_info: bool = True,
         output_file: Optional[str] = None,
-        show_progress: bool = False
-    ) -> str:
+        show_progress: bool = False,
+        key_info_stages: Optional[Sequence[str]] = None,
+        output_stream: Optional[TextIO] = None,
+        append: bool = False,
+        compression: Optional[str] = None,
+        sink=None,
+        checkpoint: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+        profiler: Optional[StageProfiler] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Optional[str]:
         """执行完整的提取流程
         
         工作流程：
@@ -61,17 +85,42 @@ class PDFExtractionService:
         3. 提取所有页面的文本内容
         4. （可选）分析关键信息
         5. 格式化输出
-        6. （可选）保存到文件
+        
+        提供 output_file 或 output_stream 时，每页提取完成后立即写出，
+        关键信息在所有页面提取完成后写在末尾。
+        提供 sink 时，提取结果同时写入该目标（如 SQLiteStore）。
+        提供 checkpoint 时，每页提取结果追加写入该检查点文件；同一文件之前的提取中途失败时，
+        从检查点中最后完成的一页之后继续，提取流程完成后删除检查点。
+        各阶段耗时记录在 ExtractedContent.timings 中（JSON 类输出包含写出尾部之前的耗时），
+        提供 timings 时同时记录到该对象。
+        提供 profiler 时，打开文件（open）、逐页提取（extract）、关键信息各分析阶段
+        （analysis.<阶段>）、格式化（format）和写出（write）分别在其中分析。
+        提供 progress 时，文件打开后、每提取一页以及提取流程结束（包括失败）时
+        调用 progress(ProgressEvent)，参见 progress 模块。
         
         参数:
             file_path: PDF 文件路径（支持相对路径、绝对路径、中文路径）
-            output_format: 输出格式，可选值：'text', 'json', 'markdown'，默认 'text'
+            output_format: 输出格式，可选值：'text', 'json', 'json-compact', 'markdown', 'ndjson',
+                           'pages'（只能写出到未压缩的 output_file），默认 'text'
             extract_key_info: 是否提取关键信息（标题、关键词、摘要等），默认 True
-            output_file: 输出文件路径（可选），如果提供则保存到文件
-            show_progress: 是否显示进度指示（对于大文件），默认 False
+            output_file: 输出文件路径（可选），如果提供则逐页写出到文件
+            show_progress: 是否在标准错误显示进度（页数超过配置的 show_progress_threshold 时），
+                           默认 False；提供 progress 时忽略
+            key_info_stages: 要执行的关键信息分析阶段（如 ['keywords', 'summary']），
+                             默认执行所有阶段
+            output_stream: 输出文本流（可选，如 sys.stdout），如果提供则逐页写出到该流
+            append: 是否追加到 output_file 末尾（用于 ndjson 批量写出多个文档），默认覆盖
+            compression: output_file 的压缩格式（'gzip' 或 'zstd'），
+                         默认根据文件后缀（.gz / .zst）识别
+            sink: 结果存储目标（可选），需提供 write(content) 方法，参见 sqlite_store.open_sink
+            checkpoint: 逐页检查点文件路径（可选），参见 checkpoint.PageCheckpoint
+            timings: 各阶段耗时的记录对象（可选），用于调用方在提取完成后读取耗时和吞吐量
+            profiler: 按阶段性能分析（可选），由调用方写出分析结果，参见 profiling.StageProfiler
+            progress: 进度回调（可选），参见 progress.ProgressEvent
             
         返回:
-            格式化的提取结果字符串
+            格式化的提取结果字符串；写出到文件或 output_stream 时，
+            以及只写入 sink 时返回 None
             
         异常:
             PathError: 路径格式错误
@@ -80,7 +129,13 @@ class PDFExtractionService:
             PDFExtractionError: 提取过程中的其他错误
         """
         document = None
+        content = None
+        error = None
         start_time = time.time()
+        started = time.perf_counter()
+        if timings is None:
+            timings = StageTimings()
+        tracker = DocumentProgress(progress, file_path) if progress is not None else None
         
         try:
             # 步骤 1: 验证和规范化路径
@@ -104,51 +159,99 @@ class PDFExtractionService:
             
             # 步骤 2: 打开 PDF 文件
             logger.info(f"打开 PDF 文件: {normalized_path}")
-            document = self.reader.open(normalized_path)
+            with self._profile_stage(profiler, "open"):
+                document = self.reader.open(normalized_path)
+            timings.open = time.perf_counter() - started
             logger.info(f"PDF 文件已打开，共 {document.page_count} 页")
+            if tracker is None and show_progress and document.page_count > self.config.show_progress_threshold:
+                tracker = DocumentProgress(TerminalProgress(), file_path)
+            if tracker is not None:
+                tracker.start(document.page_count)
+            
+            # 提供 output_file 或 output_stream 时边提取边逐页写出
+            if output_stream is not None or output_file:
+                self._validate_format(output_format)
+                if output_stream is not None:
+                    logger.info(f"以 {output_format} 格式逐页写出结果...")
+                    # 输出流通常是管道或终端，每页写出后立即刷新
+                    content = self._extract_to_stream(
+                        document, output_format, output_stream,
+                        extract_key_info, key_info_stages, tracker, start_time,
+                        flush_pages=True, checkpoint=checkpoint, timings=timings,
+                        profiler=profiler, keep_pages=sink is not None
+                    )
+                else:
+                    logger.info(f"以 {output_format} 格式保存结果到文件: {output_file}")
+                    content = self._extract_to_file(
+                        document, output_format, output_file, append,
+                        extract_key_info, key_info_stages, tracker, start_time,
+                        compression=compression, checkpoint=checkpoint, timings=timings,
+                        profiler=profiler, keep_pages=sink is not None
+                    )
+                self._write_sink(content, sink, profiler)
+                self._finish_checkpoint(checkpoint)
+                logger.info("提取流程完成")
+                return None
             
             # 步骤 3: 提取文本内容
             logger.info("开始提取文本内容...")
             
-            if show_progress and document.page_count > 5:
-                # 对于大文件，显示进度
-                content = self._extract_with_progress(document)
+            if checkpoint is not None or tracker is not None:
+                page_iter = self._iter_pages(document, checkpoint, timings, profiler)
+                if tracker is not None:
+                    page_iter = tracker.track(page_iter)
+                content = self._collect_pages(document, page_iter)
             else:
-                content = self.extractor.extract_all_text(document)
+                with self._profile_stage(profiler, "extract"):
+                    content = self.extractor.extract_all_text(document, page_timings=timings.pages)
             
             logger.info(f"文本提取完成，共提取 {len(content.total_text)} 个字符")
             
             # 记录提取时间
             content.extraction_time = time.time() - start_time
+            self._record_extraction(content, timings)
             
             # 步骤 4: 提取关键信息（可选）
             if extract_key_info:
-                logger.info("开始分析关键信息...")
-                key_info = self._analyze_key_information(content.total_text)
-                content.key_info = key_info
-                logger.info("关键信息分析完成")
+                self._add_key_information(content, key_info_stages, profiler)
+            
+            # 只写入 sink 时不需要格式化输出
+            if sink is not None:
+                self._write_sink(content, sink, profiler)
+                self._finish_checkpoint(checkpoint)
+                logger.info("提取流程完成")
+                return None
             
             # 步骤 5: 格式化输出
             logger.info(f"格式化输出为 {output_format} 格式...")
-            formatted_output = self._format_output(content, output_format)
-            
-            # 步骤 6: 保存到文件（可选）
-            if output_file:
-                logger.info(f"保存结果到文件: {output_file}")
-                save_message = self.formatter.save_to_file(formatted_output, output_file)
-                logger.info(save_message)
+            format_start = time.perf_counter()
+            with self._profile_stage(profiler, "format"), span("format", format=output_format):
+                formatted_output = self._format_output(content, output_format)
+            timings.format = time.perf_counter() - format_start
             
+            self._finish_checkpoint(checkpoint)
             logger.info("提取流程完成")
             return formatted_output
             
-        except PDFExtractionError:
+        except PDFExtractionError as e:
             # 重新抛出已知的 PDF 提取错误
+            error = e
+            raise
+        except BrokenPipeError as e:
+            # 输出管道已被下游关闭（如 | head），停止提取，由调用方处理
+            logger.info("输出管道已关闭，停止提取")
+            error = e
             raise
         except Exception as e:
             # 捕获未预期的错误
             error_msg = f"提取过程中发生未知错误: {str(e)}"
             logger.exception(error_msg)
-            raise PDFExtractionError(error_msg) from e
+            error = PDFExtractionError(error_msg)
+            raise error from e
+        except BaseException as e:
+            # 被中断（KeyboardInterrupt、SystemExit 等）的文档不算提取完成
+            error = e
+            raise
         finally:
             # 确保关闭 PDF 文件
             if document is not None:
@@ -157,108 +260,163 @@ class PDFExtractionService:
                     logger.info("PDF 文件已关闭")
                 except Exception as e:
                     logger.warning(f"关闭 PDF 文件时发生错误: {str(e)}")
+            timings.total = time.perf_counter() - started
+            # 更新运行指标（只统计正常完成的文档；管道被下游关闭和中断不算错误）
+            if error is None:
+                metrics.record_extraction(timings, page_errors=len(content.errors) if content else 0)
+            elif isinstance(error, PDFExtractionError):
+                metrics.record_error(error)
+            if tracker is not None:
+                tracker.finish(error)
     
-    def _extract_with_progress(self, document) -> ExtractedContent:
-        """带进度指示的文本提取
+    def reformat(
+        self,
+        input_path: str,
+        output_format: str = "text",
+        extract_key_info: bool = False,
+        output_file: Optional[str] = None,
+        key_info_stages: Optional[Sequence[str]] = None,
+        output_stream: Optional[TextIO] = None,
+        compression: Optional[str] = None
+    ) -> Optional[str]:
+        """从已有的提取结果重新格式化（不需要原始 PDF）
         
-        对于大文件，显示提取进度
+        输入可以是 JSON 输出（完整或紧凑布局，可压缩）或页面存储（-f pages），
+        逐页读取后直接交给写出器，参见 result_loader.open_result。
         
         参数:
-            document: PDF 文档对象
+            input_path: 提取结果文件路径
+            output_format: 输出格式（参见 WRITERS），默认 'text'
+            extract_key_info: 是否重新分析关键信息，默认 False（保留输入中已有的关键信息）
+            output_file: 输出文件路径（可选）
+            key_info_stages: 要执行的关键信息分析阶段（可选），默认执行所有阶段
+            output_stream: 输出文本流（可选，如 sys.stdout）
+            compression: output_file 的压缩格式，默认根据文件后缀识别
             
         返回:
-            提取的内容对象
+            格式化的结果字符串；写出到文件或 output_stream 时返回 None
+            
+        异常:
+            ValueError: 不支持的输出格式，或输入文件格式错误
+            IOError: 文件读取或写出失败
         """
-        from .models import PageText
+        self._validate_format(output_format)
+        logger.info(f"重新格式化提取结果: {input_path}")
         
-        pages = []
-        errors = []
-        total_pages = document.page_count
+        with open_result(input_path, encoding=self.config.output_encoding) as source:
+            if output_stream is not None:
+                self._reformat_to_stream(
+                    source, output_format, output_stream, extract_key_info, key_info_stages
+                )
+                return None
+            
+            if output_file:
+                try:
+                    stream = open_output(
+                        output_file, compression, encoding=self.config.output_encoding
+                    )
+                except OSError as e:
+                    raise IOError(f"文件保存失败: {str(e)}")
+                with stream:
+                    self._reformat_to_stream(
+                        source, output_format, stream, extract_key_info, key_info_stages
+                    )
+                logger.info(f"文件保存成功: {output_file}")
+                return None
+            
+            buffer = io.StringIO()
+            self._reformat_to_stream(
+                source, output_format, buffer, extract_key_info, key_info_stages
+            )
+            return buffer.getvalue()
+    
+    def _reformat_to_stream(
+        self,
+        source,
+        output_format: str,
+        stream: TextIO,
+        extract_key_info: bool = False,
+        key_info_stages: Optional[Sequence[str]] = None
+    ) -> ExtractedContent:
+        """逐页读取提取结果并写出到文本流
         
-        print(f"\n开始提取 {total_pages} 页内容...")
+        参数:
+            source: open_result 返回的读取器
+            其余参数参见 reformat
+            
+        返回:
+            重建的内容对象；不重新分析关键信息时不保留页面（pages 为空）
+        """
+        writer = self.formatter.get_writer(output_format, stream)
+        writer.write_header(source.file_path, source.page_count)
         
-        for page_num in range(total_pages):
-            try:
-                # 显示进度
-                progress = (page_num + 1) / total_pages * 100
-                print(f"\r处理进度: {page_num + 1}/{total_pages} ({progress:.1f}%)", end='', flush=True)
-                
-                # 提取单页文本
-                text = self.extractor.extract_text(document, page_num)
-                
-                # 创建 PageText 对象
-                page_text = PageText(
-                    page_number=page_num,
-                    text=text,
-                    char_count=len(text),
-                    is_empty=(not text or text.strip() == "")
-                )
-                pages.append(page_text)
-                
-            except Exception as e:
-                # 记录错误但继续处理
-                error_msg = f"第 {page_num + 1} 页提取失败：{str(e)}"
-                errors.append(error_msg)
-                log_error(logger, "extraction_failed", page=page_num + 1, reason=str(e))
-                
-                # 添加空页面占位
-                pages.append(PageText(
-                    page_number=page_num,
-                    text="",
-                    char_count=0,
-                    is_empty=True
-                ))
-        
-        print("\n提取完成！\n")
-        
-        # 合并所有页面的文本
-        total_text = "".join(page.text for page in pages)
-        
-        # 创建 ExtractedContent 对象
-        content = ExtractedContent(
-            file_path=document.file_path,
-            page_count=document.page_count,
-            pages=pages,
-            total_text=total_text,
-            errors=errors
-        )
+        # 只有重新分析关键信息需要全文，其余情况写出后即丢弃每一页
+        pages = []
+        for page in source.iter_pages():
+            writer.write_page(page)
+            if extract_key_info:
+                pages.append(page)
+        
+        content = source.content_from_pages(pages)
+        if extract_key_info:
+            self._add_key_information(content, key_info_stages)
         
+        writer.write_footer(content)
+        stream.flush()
         return content
     
-    def _analyze_key_information(self, text: str) -> KeyInformation:
+    def _add_key_information(
+        self,
+        content: ExtractedContent,
+        stages: Optional[Sequence[str]] = None,
+        profiler: Optional[StageProfiler] = None
+    ) -> None:
+        """分析关键信息并保存到 content.key_info"""
+        logger.info("开始分析关键信息...")
+        content.key_info = self._analyze_key_information(
+            content.total_text,
+            pages=[page.text for page in content.pages],
+            stages=stages,
+            profiler=profiler
+        )
+        if content.timings is not None:
+            content.timings.analysis = dict(content.key_info.stage_timings)
+        logger.info("关键信息分析完成")
+    
+    def _analyze_key_information(
+        self,
+        text: str,
+        pages: Optional[List[str]] = None,
+        stages: Optional[Sequence[str]] = None,
+        profiler: Optional[StageProfiler] = None
+    ) -> KeyInformation:
         """分析关键信息
         
-        从文本中提取标题、关键词、摘要和列表
+        从文本中提取标题、关键词、摘要和列表，只执行选定的分析阶段
         
         参数:
             text: 要分析的文本内容
+            pages: 按页拆分的文本（可选），用于逐页检测文字体系
+            stages: 要执行的分析阶段（可选），默认执行所有阶段
+            profiler: 按阶段性能分析（可选），各分析阶段记为 analysis.<阶段>
             
         返回:
             关键信息对象
         """
-        key_info = KeyInformation()
-        
+        stage_context = None
+        if profiler is not None:
+            stage_context = lambda name: profiler.stage(f"analysis.{name}")
         try:
-            # 提取标题
-            key_info.headings = self.analyzer.extract_headings(text)
-            logger.debug(f"提取到 {len(key_info.headings)} 个标题")
-            
-            # 提取关键词
-            key_info.keywords = self.analyzer.extract_keywords(text, top_n=10)
-            logger.debug(f"提取到 {len(key_info.keywords)} 个关键词")
-            
-            # 生成摘要
-            key_info.summary = self.analyzer.generate_summary(text, max_length=200)
-            logger.debug(f"生成摘要，长度: {len(key_info.summary)} 字符")
-            
-            # 提取列表
-            key_info.lists = self.analyzer.extract_lists(text)
-            logger.debug(f"提取到 {len(key_info.lists)} 个列表项")
-            
+            key_info = run_stages(
+                self.analyzer, text, stages=stages, pages=pages, stage_context=stage_context
+            )
         except Exception as e:
             logger.warning(f"关键信息分析过程中发生错误: {str(e)}")
             log_warning(logger, "analysis_failed", reason=str(e))
-            # 即使分析失败，也返回部分结果
+            return KeyInformation()
+        
+        for name, elapsed in key_info.stage_timings.items():
+            logger.debug(f"分析阶段 {name} 耗时 {elapsed:.3f} 秒")
         
         return key_info
     
@@ -269,7 +427,7 @@ class PDFExtractionService:
         
         参数:
             content: 提取的内容对象
-            output_format: 输出格式（'text', 'json', 'markdown'）
+            output_format: 输出格式（'text', 'json', 'json-compact', 'markdown'）
             
         返回:
             格式化后的字符串
@@ -277,6 +435,7 @@ class PDFExtractionService:
         异常:
             ValueError: 不支持的输出格式
         """
+        self._validate_format(output_format)
         format_lower = output_format.lower()
         
         if format_lower == 'text':
@@ -286,6 +445,300 @@ class PDFExtractionService:
         elif format_lower == 'markdown':
             return self.formatter.format_as_markdown(content)
         else:
-            error_msg = f"不支持的输出格式: {output_format}，支持的格式: text, json, markdown"
+            return self.formatter.format_as(content, format_lower)
+    
+    def _extract_to_file(
+        self,
+        document,
+        output_format: str,
+        output_file: str,
+        append: bool = False,
+        extract_key_info: bool = True,
+        key_info_stages: Optional[Sequence[str]] = None,
+        tracker: Optional[DocumentProgress] = None,
+        start_time: Optional[float] = None,
+        compression: Optional[str] = None,
+        checkpoint: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+        profiler: Optional[StageProfiler] = None,
+        keep_pages: bool = False
+    ) -> ExtractedContent:
+        """边提取边逐页写出到文件
+        
+        压缩在后台线程中进行，与提取并行。
+        
+        参数:
+            document: PDF 文档对象
+            output_format: 输出格式（参见 WRITERS）
+            output_file: 输出文件路径
+            append: 是否追加到文件末尾
+            compression: 压缩格式（'gzip' 或 'zstd'），默认根据文件后缀识别
+            其余参数参见 _extract_to_stream
+            
+        返回:
+            提取的内容对象
+            
+        异常:
+            IOError: 文件打开失败
+        """
+        try:
+            stream = open_output(
+                output_file,
+                compression,
+                encoding=self.config.output_encoding,
+                append=append
+            )
+        except OSError as e:
+            raise IOError(f"文件保存失败: {str(e)}")
+        
+        try:
+            content = self._extract_to_stream(
+                document, output_format, stream,
+                extract_key_info, key_info_stages, tracker, start_time,
+                checkpoint=checkpoint, timings=timings, profiler=profiler, keep_pages=keep_pages
+            )
+        finally:
+            # 关闭时等待后台压缩线程写完剩余数据，计入写出耗时
+            close_start = time.perf_counter()
+            with self._profile_stage(profiler, "write"), span("write"):
+                stream.close()
+        content.timings.write += time.perf_counter() - close_start
+        logger.info(f"文件保存成功: {output_file}")
+        return content
+    
+    def _extract_to_stream(
+        self,
+        document,
+        output_format: str,
+        stream: TextIO,
+        extract_key_info: bool = True,
+        key_info_stages: Optional[Sequence[str]] = None,
+        tracker: Optional[DocumentProgress] = None,
+        start_time: Optional[float] = None,
+        flush_pages: bool = False,
+        checkpoint: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+        profiler: Optional[StageProfiler] = None,
+        keep_pages: bool = False
+    ) -> ExtractedContent:
+        """边提取边逐页写出到文本流
+        
+        每页提取完成后立即交给写出器；所有页面提取完成后再分析关键信息，
+        并与错误信息一起写在末尾。字符数和页面复杂度逐页累计，不提取关键信息且
+        keep_pages 为 False 时写出后不保留页面，内存中只有正在处理的一页。第一页写出的耗时记录在 timings.time_to_first_page
+        （以及 ExtractedContent.time_to_first_page）中。
+        
+        参数:
+            document: PDF 文档对象
+            output_format: 输出格式（参见 WRITERS）
+            stream: 目标文本流
+            extract_key_info: 是否提取关键信息
+            key_info_stages: 要执行的关键信息分析阶段（可选）
+            tracker: 进度报告（可选），每提取一页报告一次
+            start_time: 提取开始时间（用于计算提取耗时），默认为调用时间
+            flush_pages: 是否每页写出后刷新流（管道下游可以立即读到），默认 False
+            checkpoint: 逐页检查点文件路径（可选），已完成的页面从检查点读取后直接写出
+            timings: 各阶段耗时的记录对象（可选），写出器的耗时计入 write
+            profiler: 按阶段性能分析（可选）
+            keep_pages: 是否在返回的内容对象中保留各页文本（如之后写入 sink），
+                        提取关键信息时总是保留
+            
+        返回:
+            提取的内容对象；未保留页面时 pages 为空、total_text 为空字符串
+        """
+        if start_time is None:
+            start_time = time.time()
+        if timings is None:
+            timings = StageTimings()
+        
+        write_start = time.perf_counter()
+        writer = self.formatter.get_writer(output_format, stream)
+        with self._profile_stage(profiler, "write"), span("write"):
+            writer.write_header(document.file_path, document.page_count)
+        timings.write += time.perf_counter() - write_start
+        
+        keep_pages = keep_pages or extract_key_info
+        pages = []
+        errors = []
+        page_count = 0
+        char_count = 0
+        page_complexity = []
+        page_iter = self._iter_pages(document, checkpoint, timings, profiler)
+        if tracker is not None:
+            page_iter = tracker.track(page_iter)
+        
+        for page_text, error_msg in page_iter:
+            write_start = time.perf_counter()
+            with self._profile_stage(profiler, "write"), span("write"):
+                writer.write_page(page_text)
+                if flush_pages:
+                    stream.flush()
+            timings.write += time.perf_counter() - write_start
+            if not page_count:
+                timings.time_to_first_page = time.time() - start_time
+                logger.info(f"第一页已写出，耗时 {timings.time_to_first_page:.3f} 秒")
+            page_count += 1
+            char_count += len(page_text.text)
+            if page_text.complexity is not None:
+                page_complexity.append(page_text.complexity)
+            if keep_pages:
+                pages.append(page_text)
+            if error_msg:
+                errors.append(error_msg)
+        
+        content = ExtractedContent(
+            file_path=document.file_path,
+            page_count=document.page_count,
+            pages=pages,
+            time_to_first_page=timings.time_to_first_page,
+            errors=errors
+        )
+        logger.info(f"文本提取完成，共提取 {char_count} 个字符")
+        content.extraction_time = time.time() - start_time
+        self._record_extraction(content, timings, char_count, page_complexity)
+        
+        if extract_key_info:
+            self._add_key_information(content, key_info_stages, profiler)
+        
+        write_start = time.perf_counter()
+        with self._profile_stage(profiler, "write"), span("write"):
+            writer.write_footer(content)
+            stream.flush()
+        timings.write += time.perf_counter() - write_start
+        return content
+    
+    def _iter_pages(
+        self,
+        document,
+        checkpoint: Optional[str] = None,
+        timings: Optional[StageTimings] = None,
+        profiler: Optional[StageProfiler] = None
+    ):
+        """逐页提取文本，提供 checkpoint 时先返回检查点中已完成的页面
+        
+        参数:
+            document: PDF 文档对象
+            checkpoint: 逐页检查点文件路径（可选）
+            timings: 各阶段耗时的记录对象（可选），每页提取耗时（秒）追加到 timings.pages；
+                     从检查点恢复的页面记为 0，并计入 restored_pages 和 restored_chars
+            profiler: 按阶段性能分析（可选），每页的提取计入 extract 阶段
+            
+        返回:
+            (页面文本, 错误信息) 迭代器，参见 TextExtractor.iter_pages
+        """
+        page_timings = timings.pages if timings is not None else None
+        if checkpoint is None:
+            yield from self._time_pages(self.extractor.iter_pages(document), page_timings, profiler)
+            return
+        
+        with PageCheckpoint(checkpoint, document) as store:
+            completed = store.load()
+            if timings is not None:
+                timings.pages.extend(0.0 for _ in completed)
+                timings.restored_pages += len(completed)
+                timings.restored_chars += sum(len(page_text.text) for page_text, _ in completed)
+            yield from completed
+            pages = self.extractor.iter_pages(document, start_page=len(completed))
+            for page_text, error_msg in self._time_pages(pages, page_timings, profiler):
+                store.append(page_text, error_msg)
+                yield page_text, error_msg
+    
+    @staticmethod
+    def _collect_pages(document, page_iter) -> ExtractedContent:
+        """把逐页提取结果汇总为内容对象"""
+        pages = []
+        errors = []
+        for page_text, error_msg in page_iter:
+            pages.append(page_text)
+            if error_msg:
+                errors.append(error_msg)
+        return ExtractedContent(
+            file_path=document.file_path,
+            page_count=document.page_count,
+            pages=pages,
+            total_text="".join(page.text for page in pages),
+            errors=errors
+        )
+    
+    @classmethod
+    def _time_pages(
+        cls,
+        pages,
+        page_timings: Optional[List[float]] = None,
+        profiler: Optional[StageProfiler] = None
+    ):
+        """记录迭代器产生每一页的耗时（不包括调用方处理每页的时间）"""
+        if page_timings is None and profiler is None:
+            yield from pages
+            return
+        pages = iter(pages)
+        while True:
+            start = time.perf_counter()
+            try:
+                with cls._profile_stage(profiler, "extract"):
+                    item = next(pages)
+            except StopIteration:
+                return
+            if page_timings is not None:
+                page_timings.append(time.perf_counter() - start)
+            yield item
+    
+    @staticmethod
+    def _profile_stage(profiler: Optional[StageProfiler], name: str):
+        """在性能分析中执行一个阶段（未提供 profiler 时不做任何事）"""
+        return profiler.stage(name) if profiler is not None else nullcontext()
+    
+    @staticmethod
+    def _record_extraction(
+        content: ExtractedContent,
+        timings: StageTimings,
+        char_count: Optional[int] = None,
+        page_complexity: Optional[List[PageComplexity]] = None
+    ) -> None:
+        """文本提取完成后汇总提取耗时和各页复杂度，并把耗时记录保存到内容对象
+        
+        逐页写出时页面不一定保留在内容对象中，由调用方提供逐页累计的字符数和复杂度
+        """
+        timings.extract = float(sum(timings.pages))
+        if char_count is None:
+            char_count = len(content.total_text)
+        if page_complexity is None:
+            page_complexity = [page.complexity for page in content.pages if page.complexity is not None]
+        timings.char_count = char_count
+        timings.page_complexity = page_complexity
+        content.timings = timings
+    
+    @staticmethod
+    def _finish_checkpoint(checkpoint: Optional[str]) -> None:
+        """提取流程完成后删除检查点（未提供时跳过）"""
+        if checkpoint is not None:
+            remove_checkpoint(checkpoint)
+            logger.info(f"提取完成，已删除检查点: {checkpoint}")
+    
+    @classmethod
+    def _write_sink(
+        cls,
+        content: ExtractedContent,
+        sink,
+        profiler: Optional[StageProfiler] = None
+    ) -> None:
+        """将提取结果写入存储目标（未提供时跳过）"""
+        if sink is None:
+            return
+        logger.info("写入结果存储...")
+        start = time.perf_counter()
+        with cls._profile_stage(profiler, "write"), span("write"):
+            sink.write(content)
+        if content.timings is not None:
+            content.timings.write += time.perf_counter() - start
+    
+    def _validate_format(self, output_format: str) -> None:
+        """检查输出格式是否受支持
+        
+        异常:
+            ValueError: 不支持的输出格式
+        """
+        if output_format.lower() not in WRITERS:
+            error_msg = f"不支持的输出格式: {output_format}，支持的格式: {', '.join(WRITERS)}"
             log_error(logger, "invalid_format", format=output_format)
             raise ValueError(error_msg)
@@ -5,6 +5,7 @@ import pdfplumber
 from typing import Optional
 
 from .models import PDFDocument
+from .tracing import span
 from .exceptions import (
     FileNotFoundError as PDFFileNotFoundError,
     InvalidPDFError,
@@ -33,41 +34,42 @@ class PDFReader:
             InvalidPDFError: 文件不是有效的 PDF
             PDFPermissionError: 没有读取权限
         """
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            raise PDFFileNotFoundError(file_path)
-        
-        # 检查是否有读取权限
-        if not os.access(file_path, os.R_OK):
-            raise PDFPermissionError(file_path)
-        
-        try:
-            # 使用 pdfplumber 打开 PDF 文件
-            pdf_handle = pdfplumber.open(file_path)
-            
-            # 获取页数
-            page_count = len(pdf_handle.pages)
-            
-            # 提取元数据
-            metadata = pdf_handle.metadata or {}
-            
-            # 创建 PDFDocument 对象
-            document = PDFDocument(
-                file_path=file_path,
-                page_count=page_count,
-                metadata=metadata,
-                _internal_handle=pdf_handle
-            )
+        with span("PDFReader.open", file=file_path):
+            # 检查文件是否存在
+            if not os.path.exists(file_path):
+                raise PDFFileNotFoundError(file_path)
             
-            return document
+            # 检查是否有读取权限
+            if not os.access(file_path, os.R_OK):
+                raise PDFPermissionError(file_path)
             
-        except Exception as e:
-            # 如果打开失败，可能是无效的 PDF 文件
-            error_msg = str(e).lower()
-            if 'pdf' in error_msg or 'format' in error_msg or 'invalid' in error_msg:
-                raise InvalidPDFError(file_path)
-            # 其他未知错误也视为无效 PDF
-            raise InvalidPDFError(file_path)
+            try:
+                # 使用 pdfplumber 打开 PDF 文件
+                pdf_handle = pdfplumber.open(file_path)
+                
+                # 获取页数
+                page_count = len(pdf_handle.pages)
+                
+                # 提取元数据
+                metadata = pdf_handle.metadata or {}
+                
+                # 创建 PDFDocument 对象
+                document = PDFDocument(
+                    file_path=file_path,
+                    page_count=page_count,
+                    metadata=metadata,
+                    _internal_handle=pdf_handle
+                )
+                
+                return document
+                
+            except Exception as e:
+                # 如果打开失败，可能是无效的 PDF 文件
+                error_msg = str(e).lower()
+                if 'pdf' in error_msg or 'format' in error_msg or 'invalid' in error_msg:
+                    raise InvalidPDFError(file_path) from e
+                # 其他未知错误也视为无效 PDF
+                raise InvalidPDFError(file_path) from e
     
     def get_page_count(self, document: PDFDocument) -> int:
         """
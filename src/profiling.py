@@ -0,0 +1,202 @@
+"""按阶段性能分析模块
+
+分析某个文档为什么慢时，不需要修改代码：提取流程的各阶段（打开文件、逐页提取、
+关键信息各分析阶段、格式化、写出）分别在 StageProfiler.stage 中执行，
+同名阶段多次进入时（如逐页写出时交替进行的提取和写出）结果累加：
+- cpu：每个阶段一个 cProfile，写出为 <前缀>.<阶段>.pstats，可用 python -m pstats 或 snakeviz 查看
+- memory：每次进入和离开阶段时拍摄 tracemalloc 快照，按代码行累计各阶段的净分配量和峰值，
+  写出为 <前缀>.memory.txt，每个阶段列出分配最多的 top 行
+
+内存分析每页拍摄两次快照，开销较大，只适合用于排查单个文档。
+
+使用方式：
+    with StageProfiler("cpu") as profiler:
+        service.extract("book.pdf", "json", output_file="book.json", profiler=profiler)
+        paths = profiler.write_reports("book.json")
+"""
+
+import cProfile
+import linecache
+import logging
+import os
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+PROFILE_CPU = "cpu"
+PROFILE_MEMORY = "memory"
+PROFILE_MODES = (PROFILE_CPU, PROFILE_MEMORY)
+
+DEFAULT_TOP = 20
+
+# 快照中排除的分析工具自身的分配
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def report_prefix(input_path: str, output_file: str = None) -> str:
+    """分析报告的文件名前缀：输出文件旁边；输出到标准输出时为当前目录下的输入文件名"""
+    return output_file or os.path.basename(input_path)
+
+
+class StageProfiler:
+    """按阶段分析 CPU 或内存"""
+
+    def __init__(self, mode: str = PROFILE_CPU, top: int = DEFAULT_TOP):
+        """初始化
+
+        参数:
+            mode: 'cpu'（cProfile）或 'memory'（tracemalloc）
+            top: 内存报告中每个阶段列出的代码行数
+
+        异常:
+            ValueError: 不支持的分析模式
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的分析模式: {mode}，支持的模式: {', '.join(PROFILE_MODES)}")
+        self.mode = mode
+        self.top = top
+        self._active = False
+        self._started_tracing = False
+        # 阶段 -> cProfile（cpu 模式）
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        # 阶段 -> {代码行: [净分配字节数, 净分配块数]}（memory 模式）
+        self._allocations: Dict[str, Dict[Tuple[str, int], List[int]]] = {}
+        # 阶段 -> 峰值（相对进入阶段时的已分配量，字节）
+        self._peaks: Dict[str, int] = {}
+
+        if mode == PROFILE_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def __enter__(self) -> "StageProfiler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """停止由本对象启动的 tracemalloc"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def stages(self) -> List[str]:
+        """已分析的阶段（按首次进入的顺序）"""
+        return list(self._profiles if self.mode == PROFILE_CPU else self._allocations)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """在该上下文中执行一个阶段；嵌套的阶段计入外层阶段"""
+        if self._active:
+            yield
+            return
+        self._active = True
+        try:
+            if self.mode == PROFILE_CPU:
+                with self._profile_cpu(name):
+                    yield
+            else:
+                with self._profile_memory(name):
+                    yield
+        finally:
+            self._active = False
+
+    def write_reports(self, prefix: str) -> List[str]:
+        """写出分析结果
+
+        参数:
+            prefix: 文件名前缀（如输出文件路径），参见 report_prefix
+
+        返回:
+            写出的文件路径列表
+
+        异常:
+            IOError: 文件写入失败
+        """
+        try:
+            if self.mode == PROFILE_CPU:
+                paths = []
+                for name, profile in self._profiles.items():
+                    path = f"{prefix}.{name}.pstats"
+                    profile.dump_stats(path)
+                    paths.append(path)
+                return paths
+
+            path = f"{prefix}.memory.txt"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.format_memory_report())
+            return [path]
+        except OSError as e:
+            raise IOError(f"分析结果写入失败: {str(e)}")
+
+    def format_memory_report(self) -> str:
+        """各阶段分配最多的代码行（memory 模式）"""
+        lines = []
+        for name, allocations in self._allocations.items():
+            total = sum(size for size, _ in allocations.values())
+            lines.append(
+                f"== {name}: 净分配 {_format_size(total)}，"
+                f"峰值 {_format_size(self._peaks.get(name, 0))} =="
+            )
+            top = sorted(allocations.items(), key=lambda item: abs(item[1][0]), reverse=True)
+            for (filename, lineno), (size, count) in top[:self.top]:
+                if not size:
+                    continue
+                lines.append(f"  {_format_size(size, sign=True):>12}  {count:+8d} 块  {filename}:{lineno}")
+                source = linecache.getline(filename, lineno).strip()
+                if source:
+                    lines.append(f"      {source}")
+            lines.append("")
+        return "\n".join(lines)
+
+    @contextmanager
+    def _profile_cpu(self, name: str) -> Iterator[None]:
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    @contextmanager
+    def _profile_memory(self, name: str) -> Iterator[None]:
+        allocations = self._allocations.setdefault(name, {})
+        before = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            self._peaks[name] = max(self._peaks.get(name, 0), peak - current)
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            for diff in after.compare_to(before, "lineno"):
+                if not diff.size_diff and not diff.count_diff:
+                    continue
+                frame = diff.traceback[0]
+                totals = allocations.setdefault((frame.filename, frame.lineno), [0, 0])
+                totals[0] += diff.size_diff
+                totals[1] += diff.count_diff
+
+
+def _format_size(size: int, sign: bool = False) -> str:
+    """字节数的可读形式"""
+    prefix = ("+" if size >= 0 else "-") if sign else ("-" if size < 0 else "")
+    size = abs(size)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024 or unit == "MiB":
+            return f"{prefix}{size:.1f} {unit}" if unit != "B" else f"{prefix}{size} B"
+        size /= 1024
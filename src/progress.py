@@ -0,0 +1,233 @@
+"""进度报告模块
+
+提取流程通过回调报告进度，调用方决定如何显示：
+- ProgressEvent：一个文档的进度（已提取页数、总页数、是否结束），可以跨进程传递
+- DocumentProgress：提取服务内部使用，为一个文档生成开始、每页和结束事件
+- TerminalProgress：命令行的进度显示，在标准错误的同一行重绘，限制每秒重绘次数，
+  显示页/秒和预计剩余时间；批量提取时汇总多个工作进程的进度
+
+回调在提取所在的线程中同步调用，应尽快返回；每页的开销只有创建一个事件对象，
+限频由 TerminalProgress 负责。
+
+使用方式：
+    service.extract("book.pdf", progress=lambda event: print(event.pages_done, event.total_pages))
+    service.extract("book.pdf", progress=TerminalProgress())
+"""
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, TextIO
+
+
+# 默认每秒最多重绘的次数
+DEFAULT_REFRESH_RATE = 10.0
+
+
+@dataclass
+class ProgressEvent:
+    """一个文档的提取进度
+
+    属性:
+        file_path: 文件路径（调用 extract 时传入的路径）
+        pages_done: 已提取的页数（从检查点恢复的页面也计入）
+        total_pages: 总页数，文件打开前失败时为 0
+        elapsed: 该文档开始提取以来的秒数
+        finished: 是否为结束事件（成功或失败）
+        error: 失败或被中断时的错误信息（没有错误信息的异常，如 KeyboardInterrupt，为异常类名）
+    """
+    file_path: str
+    pages_done: int
+    total_pages: int
+    elapsed: float
+    finished: bool = False
+    error: Optional[str] = None
+
+
+# 进度回调
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class DocumentProgress:
+    """为一个文档生成进度事件"""
+
+    def __init__(self, callback: ProgressCallback, file_path: str, clock: Callable[[], float] = time.perf_counter):
+        """初始化
+
+        参数:
+            callback: 进度回调
+            file_path: 文件路径
+            clock: 时钟，默认为 time.perf_counter
+        """
+        self.callback = callback
+        self.file_path = file_path
+        self.pages_done = 0
+        self.total_pages = 0
+        self._clock = clock
+        self._started = clock()
+
+    def start(self, total_pages: int) -> None:
+        """文件已打开"""
+        self.total_pages = total_pages
+        self._emit()
+
+    def track(self, pages):
+        """逐页转发迭代器的元素，每取得一页报告一次"""
+        for item in pages:
+            self.pages_done += 1
+            self._emit()
+            yield item
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """提取流程结束（包括失败和被中断）"""
+        self._emit(finished=True, error=(str(error) or type(error).__name__) if error is not None else None)
+
+    def _emit(self, finished: bool = False, error: Optional[str] = None) -> None:
+        self.callback(ProgressEvent(
+            file_path=self.file_path,
+            pages_done=self.pages_done,
+            total_pages=self.total_pages,
+            elapsed=self._clock() - self._started,
+            finished=finished,
+            error=error
+        ))
+
+
+def format_duration(seconds: float) -> str:
+    """预计剩余时间的显示（如 "42 秒"、"3 分 05 秒"、"1 小时 02 分"）"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} 秒"
+    if seconds < 3600:
+        return f"{seconds // 60} 分 {seconds % 60:02d} 秒"
+    return f"{seconds // 3600} 小时 {seconds % 3600 // 60:02d} 分"
+
+
+class TerminalProgress:
+    """在终端的同一行显示进度（线程安全）
+
+    单个文档：已提取页数、百分比、页/秒和预计剩余时间，文档结束时换行。
+    批量提取（提供 total_documents）：已完成和进行中的文件数、累计页数、页/秒，
+    以及按已完成文件的平均耗时估算的剩余时间；show_documents 为 True 时，
+    每个文件结束时在进度行上方显示一行结果。
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        refresh_rate: float = DEFAULT_REFRESH_RATE,
+        total_documents: Optional[int] = None,
+        show_documents: bool = False,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """初始化
+
+        参数:
+            stream: 输出流，默认为写出时的 sys.stderr
+            refresh_rate: 每秒最多重绘的次数（开始和结束事件总是立即显示）
+            total_documents: 批量提取的文件总数（可选）
+            show_documents: 每个文件结束时是否显示一行结果（批量提取时使用）
+            clock: 时钟，默认为 time.monotonic
+        """
+        self._stream = stream
+        self._interval = 1.0 / refresh_rate if refresh_rate > 0 else 0.0
+        self.total_documents = total_documents
+        self.show_documents = show_documents
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._last_draw: Optional[float] = None
+        self._line_length = 0
+        self._pages: Dict[str, int] = {}
+        self._totals: Dict[str, int] = {}
+        self._pages_done = 0
+        self._documents_done = 0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        with self._lock:
+            now = self._clock()
+            if self._started is None:
+                self._started = now
+            self._pages_done += max(0, event.pages_done - self._pages.get(event.file_path, 0))
+
+            if not event.finished:
+                is_new = event.file_path not in self._pages
+                self._pages[event.file_path] = event.pages_done
+                self._totals[event.file_path] = event.total_pages
+                if is_new or self._last_draw is None or now - self._last_draw >= self._interval:
+                    self._draw(now)
+                return
+
+            self._pages.pop(event.file_path, None)
+            self._totals.pop(event.file_path, None)
+            self._documents_done += 1
+            if self.show_documents:
+                if event.error is None:
+                    self._print_above(f"✓ {event.file_path}（{event.elapsed:.1f} 秒）")
+                else:
+                    self._print_above(f"✗ {event.file_path}: {event.error}")
+            if self.total_documents is None:
+                # 单个文档：显示最终结果后换行
+                if event.total_pages:
+                    self._draw(now, event.pages_done, event.total_pages)
+                self._end_line()
+                self._started = None
+                self._pages_done = 0
+            else:
+                self._draw(now)
+
+    def close(self) -> None:
+        """结束进度行（批量提取完成后调用）"""
+        with self._lock:
+            self._end_line()
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream if self._stream is not None else sys.stderr
+
+    def _draw(self, now: float, pages_done: Optional[int] = None, total_pages: Optional[int] = None) -> None:
+        elapsed = now - self._started
+        rate = self._pages_done / elapsed if elapsed > 0 else 0.0
+
+        if self.total_documents is None:
+            if pages_done is None:
+                pages_done = sum(self._pages.values())
+                total_pages = sum(self._totals.values())
+            percent = pages_done / total_pages * 100 if total_pages else 100.0
+            line = f"处理进度: {pages_done}/{total_pages} 页 ({percent:.1f}%)"
+            remaining = (total_pages - pages_done) / rate if rate > 0 else None
+        else:
+            total = max(self.total_documents, self._documents_done + len(self._pages))
+            line = (
+                f"处理进度: {self._documents_done}/{total} 个文件，{len(self._pages)} 个进行中，"
+                f"已提取 {self._pages_done} 页"
+            )
+            remaining = None
+            if self._documents_done:
+                remaining = (total - self._documents_done) * elapsed / self._documents_done
+        if elapsed > 0:
+            line += f"，{rate:.1f} 页/秒"
+        if remaining is not None:
+            line += f"，剩余约 {format_duration(remaining)}"
+
+        self._write("\r" + line.ljust(self._line_length))
+        self._line_length = len(line)
+        self._last_draw = now
+
+    def _print_above(self, message: str) -> None:
+        """在进度行的位置显示一行消息，之后的重绘在下一行"""
+        self._write("\r" + message.ljust(self._line_length) + "\n")
+        self._line_length = 0
+        self._last_draw = None
+
+    def _end_line(self) -> None:
+        if self._line_length:
+            self._write("\n")
+            self._line_length = 0
+        self._last_draw = None
+
+    def _write(self, text: str) -> None:
+        stream = self.stream
+        stream.write(text)
+        stream.flush()
@@ -0,0 +1,620 @@
+"""提取结果加载模块
+
+从 JSON 输出重建 ExtractedContent，支持两种布局：
+- 完整布局（-f json，版本 1）：包含 total_text，每页带 char_count 和 is_empty
+- 紧凑布局（-f json-compact，版本 2）：不含 total_text，关键信息只保留非空部分
+
+也可以从 NDJSON 输出（-f ndjson）中逐个重建文档，参见 iter_ndjson_contents。
+gzip / zstd 压缩的输出文件会被自动解压。
+
+页面存储（-f pages）通过 PageStoreReader 按偏移索引直接读取任意一页，
+不需要解析整个文件。
+
+重新格式化时使用 open_result 逐页读取 JSON 输出或页面存储：JSON 由增量
+解析器按块读取，一次只解码一页，不在内存中保留完整文档。
+"""
+
+import json
+import mmap
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from .compression import open_input
+from .models import ExtractedContent, KeyInformation, PageComplexity, PageText, StageTimings
+from .output_formatter import (
+    COMPACT_JSON_SCHEMA_VERSION,
+    PAGE_STORE_FORMAT,
+    PAGE_STORE_TRAILER_SIZE,
+    PAGE_STORE_VERSION,
+)
+
+
+# 完整布局没有 schema_version 字段，视为版本 1
+LEGACY_JSON_SCHEMA_VERSION = 1
+SUPPORTED_SCHEMA_VERSIONS = (LEGACY_JSON_SCHEMA_VERSION, COMPACT_JSON_SCHEMA_VERSION)
+
+# 页面存储文件的开头（用于识别文件格式）
+_PAGE_STORE_MAGIC = ('{"format":' + json.dumps(PAGE_STORE_FORMAT)).encode('utf-8')
+
+# 增量解析时每次读取的字符数
+_PARSER_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# JSON 字符串中不含结束引号的最长前缀（遇到结束引号或末尾孤立的反斜杠时停止）
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+
+def _check_schema_version(data: Dict[str, Any]) -> None:
+    """检查 JSON 布局版本
+
+    异常:
+        ValueError: 不支持的布局版本
+    """
+    version = data.get("schema_version", LEGACY_JSON_SCHEMA_VERSION)
+    if version not in SUPPORTED_SCHEMA_VERSIONS:
+        raise ValueError(
+            f"不支持的 JSON 布局版本: {version}，"
+            f"支持的版本: {', '.join(str(v) for v in SUPPORTED_SCHEMA_VERSIONS)}"
+        )
+
+
+def content_from_dict(data: Dict[str, Any]) -> ExtractedContent:
+    """从 JSON 数据重建提取内容
+
+    参数:
+        data: json.load 得到的字典（任一布局）
+
+    返回:
+        ExtractedContent 对象
+
+    异常:
+        ValueError: 不支持的布局版本或缺少必需字段
+    """
+    _check_schema_version(data)
+
+    try:
+        pages = [page_from_dict(page) for page in data["pages"]]
+        content = ExtractedContent(
+            file_path=data["file_path"],
+            page_count=data.get("page_count", len(pages)),
+            pages=pages,
+            total_text=data.get("total_text", ""),
+            extraction_time=data.get("extraction_time", 0.0),
+            errors=list(data.get("errors", []))
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"JSON 数据缺少必需字段: {str(e)}") from e
+
+    if "key_info" in data:
+        content.key_info = key_info_from_dict(data["key_info"])
+    if "timings" in data:
+        content.timings = timings_from_dict(data["timings"])
+
+    return content
+
+
+def page_from_dict(data: Dict[str, Any]) -> PageText:
+    """从 JSON 数据重建单页文本（page_number 为 1-based）"""
+    text = data["text"]
+    return PageText(
+        page_number=data["page_number"] - 1,
+        text=text,
+        char_count=data.get("char_count", len(text)),
+        is_empty=data.get("is_empty", not text.strip())
+    )
+
+
+def key_info_from_dict(data: Dict[str, Any]) -> KeyInformation:
+    """从 JSON 数据重建关键信息（缺失的部分使用默认值）"""
+    return KeyInformation(
+        headings=list(data.get("headings", [])),
+        keywords=list(data.get("keywords", [])),
+        summary=data.get("summary", ""),
+        lists=list(data.get("lists", [])),
+        stage_timings=dict(data.get("stage_timings", {}))
+    )
+
+
+def timings_from_dict(data: Dict[str, Any]) -> StageTimings:
+    """从 JSON 数据重建各阶段耗时和每页复杂度（缺失的部分使用默认值）"""
+    return StageTimings(
+        open=data.get("open", 0.0),
+        extract=data.get("extract", 0.0),
+        pages=list(data.get("pages", [])),
+        restored_pages=data.get("restored_pages", 0),
+        analysis=dict(data.get("analysis", {})),
+        format=data.get("format", 0.0),
+        write=data.get("write", 0.0),
+        time_to_first_page=data.get("time_to_first_page", 0.0),
+        page_complexity=[
+            PageComplexity(**dict(item, page_number=item["page_number"] - 1))  # 转换为 0-based
+            for item in data.get("page_complexity", [])
+        ]
+    )
+
+
+def loads_content(text: Union[str, bytes]) -> ExtractedContent:
+    """从 JSON 字符串重建提取内容
+
+    异常:
+        ValueError: JSON 格式错误或布局不受支持
+    """
+    return content_from_dict(json.loads(text))
+
+
+def load_content(source: Union[str, TextIO]) -> ExtractedContent:
+    """从 JSON 文件重建提取内容
+
+    参数:
+        source: JSON 文件路径（可以是 gzip / zstd 压缩文件）或已打开的文本流
+
+    返回:
+        ExtractedContent 对象
+
+    异常:
+        IOError: 文件读取失败
+        ValueError: JSON 格式错误或布局不受支持
+    """
+    if not isinstance(source, str):
+        return content_from_dict(json.load(source))
+
+    try:
+        with open_input(source) as f:
+            data = json.load(f)
+    except OSError as e:
+        raise IOError(f"读取提取结果失败: {source}，错误: {str(e)}")
+    return content_from_dict(data)
+
+
+def iter_ndjson_contents(lines: Iterable[str]) -> Iterator[ExtractedContent]:
+    """从 NDJSON 记录中逐个重建文档
+
+    一次只在内存中保留一个文档，适合读取追加了多个文档的大文件。
+
+    参数:
+        lines: NDJSON 文本行（如已打开的文件），空行会被忽略
+
+    返回:
+        ExtractedContent 迭代器，按写出顺序排列
+
+    异常:
+        ValueError: JSON 格式错误、记录顺序错误或文档缺少 end 记录（写出被中断）
+    """
+    content: Optional[ExtractedContent] = None
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            record_type = record["type"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"第 {line_number} 行不是有效的 NDJSON 记录: {str(e)}") from e
+
+        if record_type == "document":
+            if content is not None:
+                raise ValueError(f"文档记录不完整: {content.file_path}")
+            content = ExtractedContent(
+                file_path=record.get("file_path", ""),
+                page_count=record.get("page_count", 0),
+                pages=[]
+            )
+            continue
+
+        if content is None:
+            raise ValueError(f"第 {line_number} 行的 {record_type} 记录之前缺少 document 记录")
+
+        try:
+            if record_type == "page":
+                content.pages.append(page_from_dict(record))
+            elif record_type == "key_info":
+                content.key_info = key_info_from_dict(record)
+            elif record_type == "errors":
+                content.errors.extend(record["errors"])
+            elif record_type == "end":
+                content.total_text = "".join(page.text for page in content.pages)
+                content.extraction_time = record.get("extraction_time", 0.0)
+                if "timings" in record:
+                    content.timings = timings_from_dict(record["timings"])
+                yield content
+                content = None
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"第 {line_number} 行缺少必需字段: {str(e)}") from e
+
+    if content is not None:
+        raise ValueError(f"文档记录不完整: {content.file_path}")
+
+
+def load_ndjson(source: Union[str, TextIO]) -> List[ExtractedContent]:
+    """从 NDJSON 文件重建所有文档
+
+    参数:
+        source: NDJSON 文件路径（可以是 gzip / zstd 压缩文件）或已打开的文本流
+
+    返回:
+        ExtractedContent 列表
+
+    异常:
+        IOError: 文件读取失败
+        ValueError: 记录格式错误或文档不完整
+    """
+    if not isinstance(source, str):
+        return list(iter_ndjson_contents(source))
+
+    try:
+        with open_input(source) as f:
+            return list(iter_ndjson_contents(f))
+    except OSError as e:
+        raise IOError(f"读取提取结果失败: {source}，错误: {str(e)}")
+
+
+class PageStoreReader:
+    """页面存储读取器
+
+    以内存映射方式打开 -f pages 输出，打开时只解析文件头和偏移索引，
+    get_page 按偏移直接解码单页记录，读取任意一页的开销与文件大小无关。
+    可以作为重新格式化的数据源：iter_pages 逐页读取，load_content 重建完整内容。
+
+    使用方式：
+        with PageStoreReader("book.pages") as store:
+            page = store.get_page(179)  # 第 180 页
+    """
+
+    def __init__(self, path: str, encoding: str = 'utf-8'):
+        """打开页面存储文件
+
+        参数:
+            path: 页面存储文件路径
+            encoding: 文件编码，默认 UTF-8
+
+        异常:
+            IOError: 文件打开失败
+            ValueError: 文件不是有效的页面存储（或写出被中断）
+        """
+        self.path = path
+        self.encoding = encoding
+        try:
+            self._file = open(path, 'rb')
+        except OSError as e:
+            raise IOError(f"读取提取结果失败: {path}，错误: {str(e)}")
+
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise ValueError(f"不是有效的页面存储文件: {path}")
+        except OSError as e:
+            self._file.close()
+            raise IOError(f"读取提取结果失败: {path}，错误: {str(e)}")
+
+        try:
+            self._load_index()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> "PageStoreReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._page_offsets)
+
+    def close(self) -> None:
+        """关闭内存映射和文件"""
+        self._mmap.close()
+        self._file.close()
+
+    def get_page(self, index: int) -> PageText:
+        """读取单页
+
+        参数:
+            index: 页面序号（0-based，与 PageText.page_number 一致）
+
+        返回:
+            PageText 对象
+
+        异常:
+            IndexError: 页面序号超出范围
+        """
+        if not 0 <= index < len(self._page_offsets):
+            raise IndexError(f"页面序号超出范围: {index}，共 {len(self._page_offsets)} 页")
+        start = self._page_offsets[index]
+        end = self._page_offsets[index + 1] if index + 1 < len(self._page_offsets) else self._footer_offset
+        return page_from_dict(self._decode(start, end))
+
+    def iter_pages(self) -> Iterator[PageText]:
+        """按顺序逐页读取"""
+        for index in range(len(self._page_offsets)):
+            yield self.get_page(index)
+
+    def load_content(self) -> ExtractedContent:
+        """重建完整的提取内容"""
+        return self.content_from_pages(list(self.iter_pages()))
+
+    def content_from_pages(self, pages: List[PageText]) -> ExtractedContent:
+        """用已读取的页面和尾部记录（关键信息、错误信息、提取耗时）重建提取内容"""
+        footer = self._decode(self._footer_offset, self._index_offset)
+        content = ExtractedContent(
+            file_path=self.file_path,
+            page_count=self.page_count,
+            pages=pages,
+            extraction_time=footer.get("extraction_time", 0.0),
+            errors=list(footer.get("errors", []))
+        )
+        if "key_info" in footer:
+            content.key_info = key_info_from_dict(footer["key_info"])
+        if "timings" in footer:
+            content.timings = timings_from_dict(footer["timings"])
+        return content
+
+    def _decode(self, start: int, end: int) -> Dict[str, Any]:
+        """解码 [start, end) 字节范围内的一条记录"""
+        return json.loads(self._mmap[start:end].decode(self.encoding))
+
+    def _load_index(self) -> None:
+        """从文件末尾定位并解析偏移索引和文件头"""
+        size = len(self._mmap)
+        try:
+            trailer_offset = size - PAGE_STORE_TRAILER_SIZE
+            self._index_offset = self._decode(trailer_offset, size)["index_offset"]
+            index = self._decode(self._index_offset, trailer_offset)
+            self._page_offsets = list(index["pages"])
+            self._footer_offset = index["footer"]
+            header = self._decode(0, self._mmap.find(b"\n") + 1)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"不是有效的页面存储文件: {self.path}") from e
+
+        if header.get("format") != PAGE_STORE_FORMAT:
+            raise ValueError(f"不是有效的页面存储文件: {self.path}")
+        if header.get("version") != PAGE_STORE_VERSION:
+            raise ValueError(
+                f"不支持的页面存储版本: {header.get('version')}，支持的版本: {PAGE_STORE_VERSION}"
+            )
+        self.file_path = header.get("file_path", "")
+        self.page_count = header.get("page_count", len(self._page_offsets))
+
+
+class _JSONPullParser:
+    """按块读取文本流的增量 JSON 解析器
+
+    调用方按语法结构逐个读取标点和值：value() 用 JSONDecoder.raw_decode 解码
+    一个完整的值，数据不足时继续读取；skip_value() 跳过字符串时不解码，
+    已跳过的部分随即从缓冲区丢弃。
+    """
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符（已到末尾时返回空字符串）"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """读取指定的标点
+
+        异常:
+            ValueError: 下一个字符不是 char
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON 格式错误: 期望 '{char}'，实际为 '{found or '文件末尾'}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """解码下一个完整的值
+
+        异常:
+            ValueError: JSON 格式错误
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # 值不完整，读取更多数据后重试（每次读取量翻倍，避免大值反复解析）
+                if not self._read_more(len(self._buffer) - self._pos):
+                    raise
+                continue
+            if end == len(self._buffer) and self._read_more():
+                # 缓冲区恰好在值末尾结束，数字可能被截断
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """跳过下一个值（字符串不解码，适合跳过很长的 total_text）
+
+        异常:
+            ValueError: JSON 格式错误
+        """
+        if self.peek() != '"':
+            self.value()
+            return
+        self._pos += 1
+        while True:
+            self._pos = _STRING_BODY.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) and self._buffer[self._pos] == '"':
+                self._pos += 1
+                return
+            if not self._read_more():
+                raise ValueError("JSON 格式错误: 字符串不完整")
+
+    def _read_more(self, size: int = 0) -> bool:
+        """读取更多数据并丢弃已解析的部分
+
+        返回:
+            是否读到了新数据
+        """
+        if self._eof:
+            return False
+        chunk = self._stream.read(max(size, _PARSER_CHUNK_SIZE))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+
+class JSONPageReader:
+    """逐页读取 JSON 输出（完整布局或紧凑布局）
+
+    按块增量解析，一次只解码一页；total_text 被跳过（可由各页文本拼接得到）。
+    pages 之前的字段（file_path、page_count）在打开时读取，之后的字段
+    （关键信息、错误信息、提取耗时）在 iter_pages 读完后可用。
+
+    使用方式：
+        with JSONPageReader(open_input("book.json")) as reader:
+            pages = list(reader.iter_pages())
+            content = reader.content_from_pages(pages)
+    """
+
+    def __init__(self, stream: TextIO):
+        """开始读取 JSON 输出
+
+        参数:
+            stream: 已打开的文本流，关闭读取器时一并关闭
+
+        异常:
+            ValueError: JSON 格式错误、布局不受支持或 pages 之前缺少必需字段
+        """
+        self._stream = stream
+        self._parser = _JSONPullParser(stream)
+        self._fields: Dict[str, Any] = {}
+
+        self._parser.expect("{")
+        self._pages_pending = self._read_fields()
+        if not self._pages_pending:
+            raise ValueError("JSON 数据缺少必需字段: 'pages'")
+        _check_schema_version(self._fields)
+        if "file_path" not in self._fields:
+            raise ValueError("JSON 数据缺少必需字段: 'file_path'（需位于 pages 之前）")
+        self.file_path = self._fields["file_path"]
+        self.page_count = self._fields.get("page_count", 0)
+
+    def __enter__(self) -> "JSONPageReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭文本流"""
+        self._stream.close()
+
+    def iter_pages(self) -> Iterator[PageText]:
+        """按顺序逐页读取（只能读取一次）
+
+        异常:
+            ValueError: JSON 格式错误或页面缺少必需字段
+        """
+        if not self._pages_pending:
+            return
+        self._pages_pending = False
+
+        self._parser.expect("[")
+        if self._parser.peek() == "]":
+            self._parser.expect("]")
+        else:
+            while True:
+                try:
+                    yield page_from_dict(self._parser.value())
+                except (KeyError, TypeError) as e:
+                    raise ValueError(f"JSON 数据缺少必需字段: {str(e)}") from e
+                if self._parser.peek() != ",":
+                    break
+                self._parser.expect(",")
+            self._parser.expect("]")
+
+        if self._read_fields():
+            raise ValueError("JSON 格式错误: 重复的 pages 字段")
+
+    def content_from_pages(self, pages: List[PageText]) -> ExtractedContent:
+        """用已读取的页面和其余字段重建提取内容（需在 iter_pages 读完后调用）"""
+        content = ExtractedContent(
+            file_path=self.file_path,
+            page_count=self.page_count or len(pages),
+            pages=pages,
+            extraction_time=self._fields.get("extraction_time", 0.0),
+            errors=list(self._fields.get("errors", []))
+        )
+        if "key_info" in self._fields:
+            content.key_info = key_info_from_dict(self._fields["key_info"])
+        if "timings" in self._fields:
+            content.timings = timings_from_dict(self._fields["timings"])
+        return content
+
+    def _read_fields(self) -> bool:
+        """读取顶层键值对，直到 pages 数组开始或对象结束
+
+        返回:
+            是否停在 pages 数组之前
+        """
+        while True:
+            char = self._parser.peek()
+            if char == "}":
+                self._parser.expect("}")
+                return False
+            if char == ",":
+                self._parser.expect(",")
+            key = self._parser.value()
+            if not isinstance(key, str):
+                raise ValueError(f"JSON 格式错误: 无效的键 {key!r}")
+            self._parser.expect(":")
+            if key == "pages":
+                return True
+            if key == "total_text":
+                self._parser.skip_value()
+            else:
+                self._fields[key] = self._parser.value()
+
+
+def open_result(path: str, encoding: str = 'utf-8') -> Union[JSONPageReader, PageStoreReader]:
+    """打开提取结果，用于逐页读取（如重新格式化）
+
+    按文件内容识别格式：页面存储（-f pages）使用 PageStoreReader，
+    其余按 JSON 输出（完整或紧凑布局，可以是 gzip / zstd 压缩文件）增量读取。
+    两种读取器都提供 file_path、page_count、iter_pages() 和 content_from_pages()。
+
+    参数:
+        path: 提取结果文件路径
+        encoding: 文件编码，默认 UTF-8
+
+    返回:
+        JSONPageReader 或 PageStoreReader（均可用作上下文管理器）
+
+    异常:
+        IOError: 文件读取失败
+        ValueError: 文件格式错误或布局不受支持
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(len(_PAGE_STORE_MAGIC))
+    except OSError as e:
+        raise IOError(f"读取提取结果失败: {path}，错误: {str(e)}")
+
+    if head == _PAGE_STORE_MAGIC:
+        return PageStoreReader(path, encoding)
+
+    try:
+        stream = open_input(path, encoding)
+    except OSError as e:
+        raise IOError(f"读取提取结果失败: {path}，错误: {str(e)}")
+    try:
+        return JSONPageReader(stream)
+    except Exception:
+        stream.close()
+        raise
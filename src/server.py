@@ -0,0 +1,548 @@
+"""HTTP 提取服务
+
+基于 asyncio 的本地 HTTP 服务（只使用标准库），接收 PDF 上传或本机文件路径，
+在共享的进程池中提取，并以分块传输（chunked）逐页返回结果。
+
+接口：
+    POST /extract       请求体为 PDF 文件内容（也接受 PUT，如 curl -T），或通过 path 参数指定本机文件
+        参数: format（默认为配置中的 default_output_format）、key_info（0/1）、
+              stages（逗号分隔的分析阶段）、path、name（上传文件名，用于结果中的文件路径）
+    GET /health         返回工作进程数、正在处理和排队中的请求数
+    GET /metrics        Prometheus 文本格式的运行指标（参见 metrics 模块），包括排队深度
+
+并发控制：
+- 最多 workers 个请求同时提取，其余进入排队
+- 正在处理和排队的请求总数达到 workers + queue_size 时，新请求直接返回 429，
+  不读取请求体（客户端发送 Expect: 100-continue 时不会上传文件）
+- 工作进程异常退出（如内存不足）时，当时在进程池中的请求返回 500，进程池随即重建，
+  之后的请求不受影响
+
+path 参数读取服务所在机器上的文件，只在监听本机地址（loopback）时接受，
+监听其他地址时返回 403。
+
+工作进程把结果逐页写入临时文件，服务进程读取新写入的内容并立即发送给客户端。
+"""
+
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .config import ExtractionConfig
+from .exceptions import FileNotFoundError, InvalidPDFError, PathError
+from .key_info_analyzer import parse_stages
+from . import metrics
+from .pdf_extraction_service import PDFExtractionService
+from .tracing import span
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 各输出格式的 Content-Type
+CONTENT_TYPES = {
+    "text": "text/plain",
+    "json": "application/json",
+    "json-compact": "application/json",
+    "markdown": "text/markdown",
+    "ndjson": "application/x-ndjson",
+}
+
+DEFAULT_PORT = 8000
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_UPLOAD_SIZE = 200 * 1024 * 1024
+
+_CHUNK_SIZE = 64 * 1024
+_POLL_INTERVAL = 0.01      # 等待工作进程写出新内容的轮询间隔（秒）
+_HEADER_TIMEOUT = 30       # 读取请求头的超时（秒）
+_LINGER_TIMEOUT = 5        # 返回错误后丢弃未读请求体的最长时间（秒）
+
+_REASONS = {
+    100: "Continue",
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class _HTTPError(Exception):
+    """以指定状态码返回错误信息"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+        super().__init__(message)
+
+
+def is_loopback(host: str) -> bool:
+    """监听地址是否只接受本机连接"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 工作进程
+# ---------------------------------------------------------------------------
+_worker_service: Optional[PDFExtractionService] = None
+
+
+def _init_worker(config: ExtractionConfig) -> None:
+    """进程池初始化：每个工作进程创建一个服务实例"""
+    global _worker_service
+    # Ctrl-C 由服务进程处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_service = PDFExtractionService(config=config)
+
+
+def _run_job(
+    input_path: str,
+    output_path: str,
+    output_format: str,
+    extract_key_info: bool,
+    key_info_stages: Optional[Sequence[str]]
+) -> Tuple[int, str]:
+    """在工作进程中提取 PDF，结果逐页写入 output_path
+
+    返回:
+        (HTTP 状态码, 错误信息)，成功时为 (200, "")
+    """
+    try:
+        encoding = _worker_service.config.output_encoding
+        with span("job", file=input_path), open(output_path, "w", encoding=encoding) as stream:
+            _worker_service.extract(
+                input_path,
+                output_format=output_format,
+                extract_key_info=extract_key_info,
+                key_info_stages=key_info_stages,
+                output_stream=stream
+            )
+    except FileNotFoundError as e:
+        return 404, str(e)
+    except (PathError, InvalidPDFError, ValueError) as e:
+        return 400, str(e)
+    except Exception as e:
+        return 500, str(e)
+    return 200, ""
+
+
+# ---------------------------------------------------------------------------
+# HTTP 服务
+# ---------------------------------------------------------------------------
+class ExtractionServer:
+    """asyncio HTTP 提取服务
+
+    使用方式：
+        asyncio.run(ExtractionServer(config, port=8000, workers=4).serve_forever())
+    """
+
+    def __init__(
+        self,
+        config: Optional[ExtractionConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_upload_size: int = DEFAULT_MAX_UPLOAD_SIZE
+    ):
+        """初始化服务
+
+        参数:
+            config: 提取配置（可选），不提供时使用默认配置
+            host: 监听地址，默认只监听本机
+            port: 监听端口，0 表示自动分配（启动后见 self.port）
+            workers: 工作进程数，默认为 CPU 核数
+            queue_size: 排队请求数上限，超出后返回 429
+            max_upload_size: 上传文件大小上限（字节），超出后返回 413
+        """
+        self.config = config or ExtractionConfig()
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.queue_size = max(0, queue_size)
+        self.max_upload_size = max_upload_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tmpdir: Optional[str] = None
+        self._pending = 0   # 已接受、尚未完成的请求数（正在处理 + 排队）
+        self._running = 0
+        self._next_job_id = 0
+        self._metrics: Optional[metrics.MetricsExporter] = None
+
+    @property
+    def capacity(self) -> int:
+        """同时接受的请求数上限"""
+        return self.workers + self.queue_size
+
+    async def start(self) -> asyncio.AbstractServer:
+        """创建进程池并开始监听
+
+        返回:
+            asyncio 服务对象
+        """
+        self._tmpdir = tempfile.mkdtemp(prefix="pdf-extractor-server-")
+        # 工作进程把运行指标写到临时目录，/metrics 合并后返回
+        metrics.enable_shared(os.path.join(self._tmpdir, "metrics"))
+        self._metrics = metrics.MetricsExporter()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._pool = self._create_pool()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP 服务已启动: {self.host}:{self.port}")
+        return self._server
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.config,)
+        )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """重建已损坏的进程池（有工作进程异常退出后，进程池不再接受任务）"""
+        if self._pool is not broken:
+            # 其他请求已重建
+            return
+        logger.warning("工作进程异常退出，重建进程池")
+        broken.shutdown(wait=False)
+        self._pool = self._create_pool()
+
+    def _submit(self, *args) -> asyncio.Future:
+        """把提取任务提交到进程池，进程池已损坏时先重建"""
+        loop = asyncio.get_running_loop()
+        try:
+            return loop.run_in_executor(self._pool, _run_job, *args)
+        except BrokenProcessPool:
+            self._restart_pool(self._pool)
+            return loop.run_in_executor(self._pool, _run_job, *args)
+
+    async def serve_forever(self) -> None:
+        """预加载词典后启动服务，直到被取消或收到 Ctrl-C"""
+        from .lexicon import preload_lexicon
+
+        # 进程池以 fork 方式创建工作进程时共享已加载的词典
+        preload_lexicon(self.config)
+        server = await self.start()
+        print(
+            f"✓ 服务已启动: http://{self.host}:{self.port}"
+            f"（{self.workers} 个工作进程，排队上限 {self.queue_size}），按 Ctrl-C 停止",
+            file=sys.stderr
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """停止监听，关闭进程池并删除临时文件"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._pool is not None:
+            if sys.version_info >= (3, 9):
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            else:
+                # Python 3.8 不支持 cancel_futures，等待排队中的任务完成
+                self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._tmpdir is not None:
+            metrics.disable_shared()
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    # -- 请求处理 ---------------------------------------------------------
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理一个连接（每个连接一个请求）"""
+        try:
+            method, target, headers = await self._read_request_head(reader)
+            url = urlsplit(target)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+            if url.path == "/health":
+                if method != "GET":
+                    raise _HTTPError(405, "只支持 GET", {"Allow": "GET"})
+                await self._send_json(writer, 200, {
+                    "status": "ok",
+                    "workers": self.workers,
+                    "running": self._running,
+                    "queued": self._pending - self._running,
+                    "capacity": self.capacity,
+                })
+            elif url.path == "/metrics":
+                if method != "GET":
+                    raise _HTTPError(405, "只支持 GET", {"Allow": "GET"})
+                await self._send_metrics(writer)
+            elif url.path == "/extract":
+                if method not in ("POST", "PUT"):
+                    raise _HTTPError(405, "只支持 POST / PUT", {"Allow": "POST, PUT"})
+                await self._handle_extract(reader, writer, params, headers)
+            else:
+                raise _HTTPError(404, f"未知路径: {url.path}")
+
+        except _HTTPError as e:
+            try:
+                await self._send_json(writer, e.status, {"error": e.message}, e.headers)
+                await self._linger(reader, writer)
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # 客户端已断开
+            pass
+        except Exception:
+            logger.exception("处理请求时发生未知错误")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request_head(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        """读取请求行和请求头
+
+        返回:
+            (方法, 请求目标, 小写名称的请求头字典)
+        """
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _HEADER_TIMEOUT)
+        except asyncio.LimitOverrunError:
+            raise _HTTPError(431, "请求头过长")
+        except asyncio.TimeoutError:
+            raise _HTTPError(408, "读取请求头超时")
+
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise _HTTPError(400, "请求行格式错误")
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise _HTTPError(400, "请求头格式错误")
+            headers[name.strip().lower()] = value.strip()
+        return parts[0].upper(), parts[1], headers
+
+    async def _handle_extract(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        params: Dict[str, str],
+        headers: Dict[str, str]
+    ) -> None:
+        """POST /extract"""
+        output_format = params.get("format", self.config.default_output_format).lower()
+        if output_format not in CONTENT_TYPES:
+            raise _HTTPError(400, f"不支持的输出格式: {output_format}，支持的格式: {', '.join(CONTENT_TYPES)}")
+
+        extract_key_info = self.config.extract_key_info
+        if "key_info" in params:
+            extract_key_info = params["key_info"].lower() in ("1", "true", "yes")
+        key_info_stages = None
+        if "stages" in params:
+            try:
+                key_info_stages = parse_stages(params["stages"])
+            except ValueError as e:
+                raise _HTTPError(400, str(e))
+            extract_key_info = True
+
+        # 准入控制：已满时不读取请求体，直接拒绝
+        if self._pending >= self.capacity:
+            raise _HTTPError(429, "服务繁忙，请稍后重试", {"Retry-After": "1"})
+
+        self._pending += 1
+        self._next_job_id += 1
+        job_dir = os.path.join(self._tmpdir, str(self._next_job_id))
+        os.mkdir(job_dir)
+        try:
+            if "path" in params:
+                if not is_loopback(self.host):
+                    raise _HTTPError(403, "服务监听非本机地址时不接受 path 参数，请上传文件")
+                input_path = params["path"]
+            else:
+                name = os.path.basename(params.get("name", "")) or "upload.pdf"
+                input_path = os.path.join(job_dir, name)
+                await self._receive_upload(reader, writer, headers, input_path)
+
+            output_path = os.path.join(job_dir, "result.out")
+            async with self._slots:
+                self._running += 1
+                job = self._submit(input_path, output_path, output_format, extract_key_info, key_info_stages)
+                pool = self._pool
+                try:
+                    await self._stream_result(writer, job, output_path, output_format)
+                finally:
+                    # 客户端断开后工作进程仍在提取，等待其完成后再释放位置
+                    await asyncio.wait([job])
+                    self._running -= 1
+                    if not job.cancelled() and isinstance(job.exception(), BrokenProcessPool):
+                        self._restart_pool(pool)
+        finally:
+            self._pending -= 1
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    async def _receive_upload(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        headers: Dict[str, str],
+        path: str
+    ) -> None:
+        """把请求体写入 path"""
+        if "content-length" not in headers:
+            raise _HTTPError(411, "上传文件需要 Content-Length 请求头，或使用 path 参数指定本机文件")
+        try:
+            remaining = int(headers["content-length"])
+        except ValueError:
+            raise _HTTPError(400, "Content-Length 格式错误")
+        if remaining <= 0:
+            raise _HTTPError(400, "请求体为空，请上传 PDF 文件或使用 path 参数")
+        if remaining > self.max_upload_size:
+            raise _HTTPError(413, f"上传文件超过大小上限 {self.max_upload_size} 字节")
+
+        if headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+
+        with open(path, "wb") as f:
+            while remaining:
+                data = await reader.read(min(_CHUNK_SIZE, remaining))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                f.write(data)
+                remaining -= len(data)
+
+    async def _stream_result(
+        self,
+        writer: asyncio.StreamWriter,
+        job: asyncio.Future,
+        output_path: str,
+        output_format: str
+    ) -> None:
+        """边提取边把工作进程写出的内容分块发送给客户端
+
+        在第一块内容写出前出错时返回 JSON 错误信息；开始发送后出错时直接断开连接，
+        客户端收不到结束块，可据此判断结果不完整。
+        """
+        content_type = f"{CONTENT_TYPES[output_format]}; charset={self.config.output_encoding}"
+        started = False
+        # 工作进程尚未打开文件时先等待
+        while not os.path.exists(output_path) and not job.done():
+            await asyncio.sleep(_POLL_INTERVAL)
+
+        if os.path.exists(output_path):
+            with open(output_path, "rb") as f:
+                while True:
+                    done = job.done()
+                    data = f.read(_CHUNK_SIZE)
+                    if data:
+                        if not started:
+                            self._write_head(writer, 200, {
+                                "Content-Type": content_type,
+                                "Transfer-Encoding": "chunked",
+                            })
+                            started = True
+                        writer.write(b"%X\r\n%s\r\n" % (len(data), data))
+                        await writer.drain()
+                    elif done:
+                        break
+                    else:
+                        await asyncio.sleep(_POLL_INTERVAL)
+
+        try:
+            status, message = job.result()
+        except Exception as e:
+            status, message = 500, f"工作进程异常退出: {str(e)}"
+
+        if status != 200:
+            if started:
+                logger.error(f"提取中途失败: {message}")
+                writer.transport.abort()
+                return
+            raise _HTTPError(status, message)
+
+        if not started:
+            self._write_head(writer, 200, {"Content-Type": content_type, "Transfer-Encoding": "chunked"})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _linger(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """发送错误响应后读完并丢弃未读取的请求体
+
+        客户端可能仍在上传（如未使用 Expect: 100-continue 时被拒绝），
+        直接关闭连接会导致客户端收到连接重置而读不到响应。
+        """
+        if writer.can_write_eof():
+            writer.write_eof()
+
+        async def discard():
+            while await reader.read(_CHUNK_SIZE):
+                pass
+
+        try:
+            await asyncio.wait_for(discard(), _LINGER_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    # -- 响应 -------------------------------------------------------------
+
+    @staticmethod
+    def _write_head(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str]) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_metrics(self, writer: asyncio.StreamWriter) -> None:
+        body = self._metrics.render({
+            "queue_depth": self._pending - self._running,
+            "jobs_running": self._running,
+        }).encode("utf-8")
+        self._write_head(writer, 200, {
+            "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+            "Content-Length": str(len(body)),
+        })
+        writer.write(body)
+        await writer.drain()
+
+    async def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._write_head(writer, status, {
+            "Content-Type": "application/json; charset=utf-8",
+            "Content-Length": str(len(body)),
+            **(headers or {}),
+        })
+        writer.write(body)
+        await writer.drain()
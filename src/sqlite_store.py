@@ -0,0 +1,297 @@
+"""SQLite 语料库存储模块
+
+将提取结果（文档、页面、关键信息）批量写入 SQLite 数据库，并维护 FTS5 全文索引：
+- 使用 WAL 日志模式，每批文档在一个事务中用 executemany 写入
+- 全文索引中的页面文本预先按文字体系分词（汉字使用 jieba），词语之间以
+  控制字符分隔，FTS5 的 unicode61 分词器按该分隔符切分，中文词语可以直接检索
+- 同一文件重复写入时替换旧记录
+
+命令行用法：
+    pdf-extractor book.pdf --sink sqlite:library.db
+    pdf-extractor search library.db "安全边际"
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from .models import ExtractedContent
+from .tokenizer import INDEX_SEPARATOR, segment_for_index
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# 数据库结构版本（记录在 PRAGMA user_version 中）
+SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL UNIQUE,
+    page_count INTEGER NOT NULL,
+    extraction_time REAL NOT NULL,
+    errors TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page_number INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    char_count INTEGER NOT NULL,
+    is_empty INTEGER NOT NULL,
+    UNIQUE (document_id, page_number)
+);
+CREATE TABLE IF NOT EXISTS key_info (
+    document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+    headings TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    lists TEXT NOT NULL,
+    stage_timings TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    text,
+    tokenize = "unicode61 separators '{INDEX_SEPARATOR}'"
+);
+"""
+
+# 检索词中用于分隔多个词的空白
+_QUERY_TERM_SPLIT = re.compile(r'\s+')
+_TOKEN_SPLIT = re.compile(f'[{INDEX_SEPARATOR}\\s]+')
+
+
+@dataclass
+class SearchHit:
+    """页面级检索结果"""
+    file_path: str
+    page_number: int  # 1-based
+    snippet: str
+    score: float
+
+
+def build_match_query(query: str) -> str:
+    """将用户输入转换为 FTS5 MATCH 表达式
+
+    以空白分隔的每个词切分后作为一个短语（词语需相邻出现），多个词之间为 AND 关系。
+
+    返回:
+        MATCH 表达式；没有可检索的词时返回空字符串
+    """
+    phrases = []
+    for term in _QUERY_TERM_SPLIT.split(query.strip()):
+        tokens = [token for token in _TOKEN_SPLIT.split(segment_for_index(term)) if token]
+        if tokens:
+            phrase = " ".join(tokens).replace('"', '""')
+            phrases.append(f'"{phrase}"')
+    return " ".join(phrases)
+
+
+class SQLiteStore:
+    """SQLite 语料库
+
+    使用方式：
+        with SQLiteStore("library.db") as store:
+            store.write(content)
+            hits = store.search("安全边际")
+    """
+
+    def __init__(self, path: str):
+        """打开（必要时创建）数据库
+
+        参数:
+            path: 数据库文件路径
+
+        异常:
+            IOError: 数据库打开失败
+        """
+        self.path = path
+        try:
+            self._conn = sqlite3.connect(path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+                self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        except sqlite3.Error as e:
+            raise IOError(f"打开数据库失败: {path}，错误: {str(e)}")
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
+
+    def write(self, content: ExtractedContent) -> None:
+        """写入一个文档（参见 write_many）"""
+        self.write_many([content])
+
+    def write_many(self, contents: Iterable[ExtractedContent]) -> int:
+        """在一个事务中写入多个文档
+
+        参数:
+            contents: 提取的内容对象
+
+        返回:
+            写入的文档数
+        """
+        count = 0
+        start_time = time.time()
+        with self._conn:
+            for content in contents:
+                self._insert(content)
+                count += 1
+        logger.info(f"已写入 {count} 个文档到 {self.path}，耗时 {time.time() - start_time:.3f} 秒")
+        return count
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """全文检索页面
+
+        参数:
+            query: 检索词，多个词以空格分隔（AND 关系）
+            limit: 最多返回的结果数
+
+        返回:
+            按相关度排序的页面级结果，片段中的命中词以【】标出
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        rows = self._conn.execute(
+            """
+            SELECT documents.file_path, pages.page_number,
+                   snippet(pages_fts, 0, '【', '】', '…', 16), pages_fts.rank
+            FROM pages_fts
+            JOIN pages ON pages.id = pages_fts.rowid
+            JOIN documents ON documents.id = pages.document_id
+            WHERE pages_fts MATCH ?
+            ORDER BY pages_fts.rank
+            LIMIT ?
+            """,
+            (match, limit)
+        ).fetchall()
+
+        return [
+            SearchHit(
+                file_path=file_path,
+                page_number=page_number + 1,
+                snippet=snippet.replace(INDEX_SEPARATOR, ""),
+                score=-rank
+            )
+            for file_path, page_number, snippet, rank in rows
+        ]
+
+    def document_count(self) -> int:
+        """已存储的文档数"""
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def _insert(self, content: ExtractedContent) -> None:
+        """写入单个文档（调用方负责事务）"""
+        self._delete(content.file_path)
+
+        cursor = self._conn.execute(
+            "INSERT INTO documents (file_path, page_count, extraction_time, errors, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                content.file_path,
+                content.page_count,
+                content.extraction_time,
+                json.dumps(content.errors, ensure_ascii=False),
+                time.time()
+            )
+        )
+        document_id = cursor.lastrowid
+
+        # pages.id 与 pages_fts.rowid 一一对应，按文档连续分配
+        first_id = self._conn.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM pages"
+        ).fetchone()[0]
+        self._conn.executemany(
+            "INSERT INTO pages (id, document_id, page_number, text, char_count, is_empty) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (first_id + index, document_id, page.page_number, page.text,
+                 page.char_count, int(page.is_empty))
+                for index, page in enumerate(content.pages)
+            )
+        )
+        self._conn.executemany(
+            "INSERT INTO pages_fts (rowid, text) VALUES (?, ?)",
+            (
+                (first_id + index, segment_for_index(page.text))
+                for index, page in enumerate(content.pages)
+            )
+        )
+
+        key_info = content.key_info
+        if key_info is not None:
+            self._conn.execute(
+                "INSERT INTO key_info (document_id, headings, keywords, summary, lists, stage_timings) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    document_id,
+                    json.dumps(key_info.headings, ensure_ascii=False),
+                    json.dumps(key_info.keywords, ensure_ascii=False),
+                    key_info.summary,
+                    json.dumps(key_info.lists, ensure_ascii=False),
+                    json.dumps(key_info.stage_timings)
+                )
+            )
+
+    def _delete(self, file_path: str) -> None:
+        """删除已存储的同名文档"""
+        row = self._conn.execute(
+            "SELECT id FROM documents WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        if row is None:
+            return
+        self._conn.execute(
+            "DELETE FROM pages_fts WHERE rowid IN (SELECT id FROM pages WHERE document_id = ?)",
+            row
+        )
+        self._conn.execute("DELETE FROM documents WHERE id = ?", row)
+
+
+def parse_sink(spec: str) -> str:
+    """解析 --sink 参数
+
+    参数:
+        spec: 形如 'sqlite:path.db'
+
+    返回:
+        数据库文件路径
+
+    异常:
+        ValueError: 不支持的输出目标
+    """
+    scheme, _, path = spec.partition(':')
+    if scheme != 'sqlite' or not path:
+        raise ValueError(f"不支持的输出目标: {spec}，格式应为 sqlite:路径")
+    return path
+
+
+def open_sink(spec: str) -> SQLiteStore:
+    """根据 --sink 参数打开输出目标
+
+    参数:
+        spec: 形如 'sqlite:path.db'
+
+    返回:
+        SQLiteStore 对象
+
+    异常:
+        ValueError: 不支持的输出目标
+        IOError: 数据库打开失败
+    """
+    return SQLiteStore(parse_sink(spec))
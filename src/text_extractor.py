@@ -1,10 +1,14 @@
 """文本内容提取器"""
 
 import logging
-from typing import List
+import time
+from typing import Iterator, List, Optional, Tuple
 
-from .models import PDFDocument, PageText, ExtractedContent
+from pdfminer.pdftypes import resolve1
+
+from .models import PDFDocument, PageComplexity, PageText, ExtractedContent
 from .exceptions import PageExtractionError
+from .tracing import span
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -31,107 +35,162 @@ class TextExtractor:
         异常:
             PageExtractionError: 提取失败
         """
-        try:
-            # 验证页码范围
-            if page_number < 0 or page_number >= document.page_count:
-                raise PageExtractionError(
-                    page_number + 1,
-                    f"页码超出范围（总页数：{document.page_count}）"
-                )
-            
-            # 获取页面对象
-            pdf_handle = document._internal_handle
-            if pdf_handle is None:
-                raise PageExtractionError(
-                    page_number + 1,
-                    "PDF 文档未正确打开"
-                )
-            
-            page = pdf_handle.pages[page_number]
-            
-            # 提取文本
-            text = page.extract_text()
-            
-            # 处理空页面
-            if text is None:
-                return ""
-            
-            # 确保 UTF-8 编码处理正确
-            # pdfplumber 返回的是 Unicode 字符串，确保可以正确编码为 UTF-8
+        with span("extract_text", page=page_number + 1):
             try:
-                # 验证可以编码为 UTF-8
-                text.encode('utf-8')
-                return text
-            except UnicodeEncodeError as e:
-                # 如果编码失败，尝试替换无法编码的字符
-                logger.warning(f"第 {page_number + 1} 页包含无法编码为 UTF-8 的字符，将进行替换")
-                return text.encode('utf-8', errors='replace').decode('utf-8')
+                # 验证页码范围
+                if page_number < 0 or page_number >= document.page_count:
+                    raise PageExtractionError(
+                        page_number + 1,
+                        f"页码超出范围（总页数：{document.page_count}）"
+                    )
                 
-        except PageExtractionError:
-            # 重新抛出已知的提取错误
-            raise
-        except Exception as e:
-            # 捕获其他未预期的错误
-            logger.error(f"提取第 {page_number + 1} 页时发生错误: {str(e)}")
-            raise PageExtractionError(page_number + 1, str(e))
+                # 获取页面对象
+                pdf_handle = document._internal_handle
+                if pdf_handle is None:
+                    raise PageExtractionError(
+                        page_number + 1,
+                        "PDF 文档未正确打开"
+                    )
+                
+                page = pdf_handle.pages[page_number]
+                
+                # 提取文本
+                text = page.extract_text()
+                
+                # 处理空页面
+                if text is None:
+                    return ""
+                
+                # 确保 UTF-8 编码处理正确
+                # pdfplumber 返回的是 Unicode 字符串，确保可以正确编码为 UTF-8
+                try:
+                    # 验证可以编码为 UTF-8
+                    text.encode('utf-8')
+                    return text
+                except UnicodeEncodeError as e:
+                    # 如果编码失败，尝试替换无法编码的字符
+                    logger.warning(f"第 {page_number + 1} 页包含无法编码为 UTF-8 的字符，将进行替换")
+                    return text.encode('utf-8', errors='replace').decode('utf-8')
+                    
+            except PageExtractionError:
+                # 重新抛出已知的提取错误
+                raise
+            except Exception as e:
+                # 捕获其他未预期的错误
+                logger.error(f"提取第 {page_number + 1} 页时发生错误: {str(e)}")
+                raise PageExtractionError(page_number + 1, str(e))
     
-    def extract_all_text(self, document: PDFDocument) -> ExtractedContent:
+    def page_complexity(self, document: PDFDocument, page_number: int) -> Optional[PageComplexity]:
         """
-        提取所有页面的文本
+        统计页面上的对象数和内容流大小
         
-        使用错误恢复机制：如果某页提取失败，记录错误并继续处理其他页面。
+        在 extract_text 之后调用时复用 pdfplumber 已解析的页面对象和已解码的内容流，
+        只需计数。
         
         参数:
             document: PDF 文档对象
+            page_number: 页码（从 0 开始）
             
         返回:
-            包含所有页面文本的 ExtractedContent 对象
+            页面复杂度，无法统计时为 None
         """
-        pages: List[PageText] = []
-        errors: List[str] = []
+        try:
+            page = document._internal_handle.pages[page_number]
+            objects = page.objects
+            content_bytes = sum(
+                len(resolve1(stream).get_data()) for stream in page.page_obj.contents or []
+            )
+        except Exception as e:
+            logger.debug(f"无法统计第 {page_number + 1} 页的对象: {str(e)}")
+            return None
+        return PageComplexity(
+            page_number=page_number,
+            chars=len(objects.get("char", [])),
+            lines=len(objects.get("line", [])),
+            rects=len(objects.get("rect", [])),
+            curves=len(objects.get("curve", [])),
+            images=len(objects.get("image", [])),
+            content_bytes=content_bytes
+        )
+    
+    def iter_pages(
+        self,
+        document: PDFDocument,
+        start_page: int = 0
+    ) -> Iterator[Tuple[PageText, Optional[str]]]:
+        """
+        逐页提取文本
         
-        # 遍历所有页面
-        for page_num in range(document.page_count):
+        每提取完一页立即返回，调用方可以边提取边写出。提取成功的页面附带页面复杂度
+        （参见 page_complexity）。
+        使用错误恢复机制：如果某页提取失败，返回空页面占位和错误信息，并继续处理其他页面。
+        
+        参数:
+            document: PDF 文档对象
+            start_page: 从该页开始提取（从 0 开始，用于从检查点恢复），默认从第一页开始
+            
+        返回:
+            (页面文本, 错误信息) 迭代器，按页码顺序排列；提取成功时错误信息为 None
+        """
+        for page_num in range(start_page, document.page_count):
+            error_msg = None
+            complexity = None
             try:
                 # 提取单页文本
                 text = self.extract_text(document, page_num)
-                
-                # 创建 PageText 对象
-                page_text = PageText(
-                    page_number=page_num,
-                    text=text,
-                    char_count=len(text),
-                    is_empty=(not text or text.strip() == "")
-                )
-                pages.append(page_text)
+                complexity = self.page_complexity(document, page_num)
                 
             except PageExtractionError as e:
-                # 记录错误但继续处理
+                # 记录错误但继续处理，使用空页面占位
+                text = ""
                 error_msg = f"第 {page_num + 1} 页提取失败：{e.reason}"
-                errors.append(error_msg)
                 logger.error(error_msg)
                 
-                # 添加空页面占位
-                pages.append(PageText(
-                    page_number=page_num,
-                    text="",
-                    char_count=0,
-                    is_empty=True
-                ))
-                
             except Exception as e:
                 # 捕获未预期的错误
+                text = ""
                 error_msg = f"第 {page_num + 1} 页发生未知错误：{str(e)}"
-                errors.append(error_msg)
                 logger.exception(error_msg)
-                
-                # 添加空页面占位
-                pages.append(PageText(
-                    page_number=page_num,
-                    text="",
-                    char_count=0,
-                    is_empty=True
-                ))
+            
+            # 创建 PageText 对象
+            page_text = PageText(
+                page_number=page_num,
+                text=text,
+                char_count=len(text),
+                is_empty=(not text or text.strip() == ""),
+                complexity=complexity
+            )
+            yield page_text, error_msg
+    
+    def extract_all_text(
+        self,
+        document: PDFDocument,
+        page_timings: Optional[List[float]] = None
+    ) -> ExtractedContent:
+        """
+        提取所有页面的文本
+        
+        使用错误恢复机制：如果某页提取失败，记录错误并继续处理其他页面。
+        
+        参数:
+            document: PDF 文档对象
+            page_timings: 每页提取耗时（秒）追加到该列表（可选）
+            
+        返回:
+            包含所有页面文本的 ExtractedContent 对象
+        """
+        pages: List[PageText] = []
+        errors: List[str] = []
+        
+        # 遍历所有页面
+        start = time.perf_counter()
+        for page_text, error_msg in self.iter_pages(document):
+            if page_timings is not None:
+                page_timings.append(time.perf_counter() - start)
+            pages.append(page_text)
+            if error_msg:
+                errors.append(error_msg)
+            start = time.perf_counter()
         
         # 合并所有页面的文本
         total_text = "".join(page.text for page in pages)
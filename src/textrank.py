@@ -0,0 +1,174 @@
+"""TextRank 抽取式摘要
+
+基于句子相似度图的抽取式摘要算法：
+1. 将文本切分为句子，最多保留 max_sentences 个候选句
+2. 构建句子-词项稀疏矩阵（拉丁词 + 汉字二元组），按行做 L2 归一化
+3. 通过一次稀疏矩阵乘法批量计算余弦相似度
+4. 使用幂迭代计算每个句子的 PageRank 得分
+
+依赖 NumPy 和 SciPy（可选依赖，安装方式: pip install pdf-text-extractor[textrank]）。
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .key_info_analyzer import SENTENCE_PATTERN
+
+
+# 词项模式：拉丁单词、数字串、连续汉字
+_TERM_PATTERN = re.compile(r'[A-Za-z]+|\d+|[\u4e00-\u9fff]+')
+
+
+class TextRankSummarizer:
+    """TextRank 摘要生成器
+
+    参数:
+        max_sentences: 参与排序的候选句上限，超过时在全文中均匀抽样
+        damping: 阻尼系数，默认 0.85
+        max_iter: 幂迭代最大次数
+        tol: 收敛阈值（L1 范数）
+        min_sentence_length: 候选句的最小长度（字符数）
+    """
+
+    def __init__(
+        self,
+        max_sentences: int = 2000,
+        damping: float = 0.85,
+        max_iter: int = 100,
+        tol: float = 1e-6,
+        min_sentence_length: int = 8
+    ):
+        self.max_sentences = max_sentences
+        self.damping = damping
+        self.max_iter = max_iter
+        self.tol = tol
+        self.min_sentence_length = min_sentence_length
+
+    def summarize(self, text: str, max_length: int = 200) -> str:
+        """生成摘要
+
+        选出得分最高的句子，按原文顺序拼接，总长度不超过 max_length。
+
+        参数:
+            text: 要分析的文本内容
+            max_length: 摘要的最大长度（字符数）
+
+        返回:
+            摘要文本；没有可用候选句时返回空字符串
+        """
+        sentences = self._split_sentences(text)
+        if not sentences:
+            return ""
+
+        scores = self.rank([sentence for sentence, _ in sentences])
+
+        # 按得分从高到低挑选（跳过重复句），直到达到最大长度
+        chosen: List[int] = []
+        seen = set()
+        length = 0
+        for index in np.argsort(-scores, kind='stable'):
+            sentence, ending = sentences[index]
+            if sentence in seen:
+                continue
+            if length + len(sentence) + len(ending) > max_length:
+                break
+            seen.add(sentence)
+            chosen.append(int(index))
+            length += len(sentence) + len(ending)
+
+        if not chosen:
+            best = sentences[int(np.argmax(scores))][0]
+            return best[:max_length] + '...'
+
+        chosen.sort()
+        return "".join(sentences[i][0] + sentences[i][1] for i in chosen)
+
+    def rank(self, sentences: List[str]) -> np.ndarray:
+        """计算每个句子的 TextRank 得分
+
+        参数:
+            sentences: 句子列表
+
+        返回:
+            与 sentences 等长的得分数组（和为 1）
+        """
+        n = len(sentences)
+        if n == 1:
+            return np.ones(1)
+
+        matrix = self._build_term_matrix(sentences)
+
+        # 行已归一化，X·Xᵀ 即为余弦相似度
+        similarity = (matrix @ matrix.T).tocsr()
+        similarity.setdiag(0)
+        similarity.eliminate_zeros()
+
+        # 行归一化得到转移矩阵；孤立句子均匀跳转
+        out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        out_weight[dangling] = 1.0
+        transition = sparse.diags(1.0 / out_weight) @ similarity
+        transition_t = transition.T.tocsr()
+
+        scores = np.full(n, 1.0 / n)
+        teleport = (1.0 - self.damping) / n
+        for _ in range(self.max_iter):
+            dangling_mass = scores[dangling].sum() / n
+            updated = teleport + self.damping * (transition_t @ scores + dangling_mass)
+            if np.abs(updated - scores).sum() < self.tol:
+                scores = updated
+                break
+            scores = updated
+
+        return scores
+
+    def _split_sentences(self, text: str) -> List[Tuple[str, str]]:
+        """切分候选句
+
+        返回:
+            (句子正文, 句末标点) 列表，按原文顺序排列
+        """
+        sentences = []
+        for match in SENTENCE_PATTERN.finditer(text):
+            sentence = match.group(1).strip()
+            if len(sentence) >= self.min_sentence_length:
+                sentences.append((sentence, match.group(2)[:1]))
+
+        # 候选句过多时均匀抽样，避免只覆盖开头部分
+        if len(sentences) > self.max_sentences:
+            step = len(sentences) / self.max_sentences
+            sentences = [sentences[int(i * step)] for i in range(self.max_sentences)]
+
+        return sentences
+
+    def _build_term_matrix(self, sentences: List[str]) -> sparse.csr_matrix:
+        """构建按行 L2 归一化的句子-词项稀疏矩阵"""
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+
+        for row, sentence in enumerate(sentences):
+            for term in _TERM_PATTERN.findall(sentence):
+                if term[0] >= '\u4e00':
+                    # 汉字串拆分为二元组（单字时保留原字）
+                    grams = [term[i:i + 2] for i in range(max(len(term) - 1, 1))]
+                else:
+                    grams = [term.lower()]
+                for gram in grams:
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault(gram, len(vocabulary)))
+
+        data = np.ones(len(rows))
+        matrix = sparse.csr_matrix(
+            (data, (rows, cols)),
+            shape=(len(sentences), max(len(vocabulary), 1))
+        )
+        # 重复的 (row, col) 会被累加为词频；使用对数词频减弱高频词影响
+        matrix.data = 1.0 + np.log(matrix.data)
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix
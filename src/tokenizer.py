@@ -0,0 +1,216 @@
+"""分词与文字体系检测
+
+按页统计 Unicode 区段字符直方图判断文字体系：
+- 中文（CJK）页面交给 jieba 分词
+- 拉丁文字页面使用预编译的正则分词器，并过滤英文停用词
+- 中英混排页面按连续的汉字 / 非汉字片段切分后分别处理
+
+安装 NumPy 时直方图使用向量化计算，否则使用正则计数。
+"""
+
+import logging
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Tuple
+
+import jieba
+
+jieba.setLogLevel(logging.INFO)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 取决于运行环境
+    np = None
+
+
+# 文字体系
+SCRIPT_CJK = 'cjk'
+SCRIPT_LATIN = 'latin'
+SCRIPT_MIXED = 'mixed'
+SCRIPT_NONE = 'none'
+
+# 占比达到此阈值时视为单一文字体系，否则视为混排
+SCRIPT_DOMINANCE_RATIO = 0.9
+
+# Unicode 区段边界（左闭右开）及其对应的文字体系
+_RANGE_BOUNDS = [
+    0x41, 0x5B,        # A-Z
+    0x61, 0x7B,        # a-z
+    0xC0, 0x250,       # 拉丁字母扩展（带变音符号）
+    0x3400, 0x4DC0,    # CJK 统一汉字扩展 A
+    0x4E00, 0xA000,    # CJK 统一汉字
+    0xF900, 0xFB00,    # CJK 兼容汉字
+]
+_RANGE_SCRIPTS = [
+    None, SCRIPT_LATIN, None, SCRIPT_LATIN, None, SCRIPT_LATIN, None,
+    SCRIPT_CJK, None, SCRIPT_CJK, None, SCRIPT_CJK, None,
+]
+_CJK_BUCKETS = [i for i, script in enumerate(_RANGE_SCRIPTS) if script == SCRIPT_CJK]
+_LATIN_BUCKETS = [i for i, script in enumerate(_RANGE_SCRIPTS) if script == SCRIPT_LATIN]
+if np is not None:
+    _BOUNDS_ARRAY = np.array(_RANGE_BOUNDS, dtype=np.uint32)
+
+_CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_LATIN_CHARS = 'A-Za-z\u00c0-\u024f'
+
+_CJK_CHAR_PATTERN = re.compile(f'[{_CJK_CHARS}]')
+_LATIN_CHAR_PATTERN = re.compile(f'[{_LATIN_CHARS}]')
+_CJK_RUN_PATTERN = re.compile(f'([{_CJK_CHARS}]+)')
+
+# 拉丁文字分词：字母开头，允许内部的撇号和连字符（如 don't, well-known）
+LATIN_TOKEN_PATTERN = re.compile(f"[{_LATIN_CHARS}]+(?:['\u2019-][{_LATIN_CHARS}]+)*")
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because
+been before being below between both but by can could did do does doing down
+during each either else even ever every few for from further had has have having
+he her here hers herself him himself his how however i if in into is it its
+itself just let like made make many may me might more most much must my myself
+neither never no nor not now of off often on once one only or other others our
+ours ourselves out over own per rather same shall she should since so some such
+than that the their theirs them themselves then there these they this those
+though through thus to too under until up upon us very was we were what when
+where whether which while who whom whose why will with within without would yet
+you your yours yourself yourselves
+""".split())
+
+
+def script_histogram(text: str) -> Dict[str, int]:
+    """统计文本中各文字体系的字符数
+
+    参数:
+        text: 要统计的文本
+
+    返回:
+        {'cjk': 汉字数, 'latin': 拉丁字母数}
+    """
+    if not text:
+        return {SCRIPT_CJK: 0, SCRIPT_LATIN: 0}
+
+    if np is None:
+        return {
+            SCRIPT_CJK: sum(1 for _ in _CJK_CHAR_PATTERN.finditer(text)),
+            SCRIPT_LATIN: sum(1 for _ in _LATIN_CHAR_PATTERN.finditer(text)),
+        }
+
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+    buckets = np.searchsorted(_BOUNDS_ARRAY, codes, side='right')
+    counts = np.bincount(buckets, minlength=len(_RANGE_SCRIPTS))
+    return {
+        SCRIPT_CJK: int(counts[_CJK_BUCKETS].sum()),
+        SCRIPT_LATIN: int(counts[_LATIN_BUCKETS].sum()),
+    }
+
+
+def detect_script(text: str) -> str:
+    """检测文本的主要文字体系
+
+    参数:
+        text: 要检测的文本（通常为一页）
+
+    返回:
+        'cjk'、'latin'、'mixed' 或 'none'（不含任何字母或汉字）
+    """
+    histogram = script_histogram(text)
+    cjk = histogram[SCRIPT_CJK]
+    latin = histogram[SCRIPT_LATIN]
+    total = cjk + latin
+
+    if total == 0:
+        return SCRIPT_NONE
+    if cjk >= total * SCRIPT_DOMINANCE_RATIO:
+        return SCRIPT_CJK
+    if latin >= total * SCRIPT_DOMINANCE_RATIO:
+        return SCRIPT_LATIN
+    return SCRIPT_MIXED
+
+
+def split_script_runs(text: str) -> List[Tuple[str, str]]:
+    """将混排文本切分为连续的汉字 / 非汉字片段
+
+    返回:
+        (文字体系, 片段) 列表，按原文顺序排列，空片段被忽略
+    """
+    runs = []
+    for index, piece in enumerate(_CJK_RUN_PATTERN.split(text)):
+        if piece:
+            # split 的结果中奇数位置是捕获到的汉字片段
+            runs.append((SCRIPT_CJK if index % 2 else SCRIPT_LATIN, piece))
+    return runs
+
+
+def tokenize_latin(
+    text: str,
+    stopwords: FrozenSet[str] = ENGLISH_STOPWORDS
+) -> Iterator[str]:
+    """拉丁文字分词：转为小写并过滤英文停用词"""
+    for match in LATIN_TOKEN_PATTERN.finditer(text):
+        token = match.group().lower()
+        if token not in stopwords:
+            yield token
+
+
+def tokenize(
+    text: str,
+    english_stopwords: FrozenSet[str] = ENGLISH_STOPWORDS
+) -> Iterator[str]:
+    """按文字体系分词
+
+    参数:
+        text: 要分词的文本（通常为一页）
+        english_stopwords: 英文停用词
+
+    返回:
+        词语迭代器；中文词语原样返回（未过滤），拉丁词语已小写并去除停用词
+    """
+    script = detect_script(text)
+
+    if script == SCRIPT_CJK:
+        yield from jieba.cut(text)
+    elif script == SCRIPT_LATIN:
+        yield from tokenize_latin(text, english_stopwords)
+    elif script == SCRIPT_MIXED:
+        for run_script, piece in split_script_runs(text):
+            if run_script == SCRIPT_CJK:
+                yield from jieba.cut(piece)
+            else:
+                yield from tokenize_latin(piece, english_stopwords)
+
+
+def tokenize_pages(
+    pages: Iterable[str],
+    english_stopwords: FrozenSet[str] = ENGLISH_STOPWORDS
+) -> Iterator[str]:
+    """逐页检测文字体系并分词"""
+    for page in pages:
+        yield from tokenize(page, english_stopwords)
+
+
+# 全文索引中词语之间的分隔符（FTS5 unicode61 将控制字符视为分隔符）
+INDEX_SEPARATOR = '\x1f'
+
+
+def segment_for_index(text: str) -> str:
+    """将文本切分为全文索引使用的词语序列
+
+    汉字片段使用 jieba 精确模式分词，词语之间插入 INDEX_SEPARATOR；
+    拉丁文字保持原样，由 FTS5 自行按空白和标点分词。
+    去掉 INDEX_SEPARATOR 即可还原原文。
+    与页面的文字体系分类无关：以拉丁文字为主的页面中的汉字片段同样分词。
+
+    参数:
+        text: 要切分的文本（通常为一页）
+
+    返回:
+        插入了分隔符的文本
+    """
+    text = text.replace(INDEX_SEPARATOR, ' ')
+    if not _CJK_CHAR_PATTERN.search(text):
+        return text
+
+    parts = []
+    for run_script, piece in split_script_runs(text):
+        if run_script == SCRIPT_CJK:
+            parts.append(INDEX_SEPARATOR.join(jieba.cut(piece)))
+        else:
+            parts.append(piece)
+    return INDEX_SEPARATOR.join(parts)
@@ -0,0 +1,273 @@
+"""跟踪记录模块
+
+批量和并行提取时，某个文档慢的原因往往要看时间线才清楚：哪个工作进程在处理它、
+卡在打开文件、某一页还是写出。提取流程的关键位置（PDFReader.open、每页的
+extract_text、关键信息各分析阶段、格式化和写出、批量任务）用 span 标记，
+记录为 Chrome trace-event 格式的完整事件（ph 为 "X"），带进程号和线程号，
+合并后的 JSON 可以在 https://ui.perfetto.dev 或 chrome://tracing 中打开。
+
+未启用跟踪时 span 直接返回共享的空上下文，开销只有一次函数调用。
+
+多进程：
+- 每个进程把事件写到自己的片段文件 <路径>.<进程号>.part，不需要进程间通信
+- fork 出的子进程继承跟踪状态，丢弃从父进程复制来的未写出事件；
+  spawn 出的子进程通过环境变量 PDF_EXTRACTOR_TRACE 在导入时启用跟踪
+- 子进程退出时（multiprocessing 的退出清理）写出剩余事件
+- stop_tracing 在所有子进程结束后把片段合并为一个 JSON 文件
+
+时间戳使用 time.perf_counter_ns（Linux 上为系统范围的单调时钟），
+不同进程的事件可以放在同一条时间线上。
+
+使用方式：
+    start_tracing("trace.json")
+    with span("extract_text", page=1):
+        ...
+    stop_tracing()
+"""
+
+import glob
+import json
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+from .json_serializer import JSONSerializer
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+# spawn 出的子进程通过该环境变量得知跟踪文件路径
+TRACE_ENV_VAR = "PDF_EXTRACTOR_TRACE"
+
+# 事件分类（Perfetto 中可按分类筛选）
+_CATEGORY = "pdf_extractor"
+
+# 缓冲的事件数达到该值时写出到片段文件
+_FLUSH_EVENTS = 512
+
+# 子进程退出清理的优先级（高于默认值，先于其他清理写出）
+_EXIT_PRIORITY = 10
+
+# 未启用跟踪时 span 返回的空上下文
+_NULL_SPAN = nullcontext()
+
+
+def fragment_path(path: str, pid: int) -> str:
+    """某个进程的片段文件路径"""
+    return f"{path}.{pid}.part"
+
+
+class Tracer:
+    """把当前进程的事件缓冲后写到片段文件（写出时再编码，记录事件时只追加到列表）"""
+
+    def __init__(self, path: str):
+        """初始化
+
+        参数:
+            path: 合并后的跟踪文件路径，片段文件写在同一目录
+        """
+        self.path = path
+        self._serializer = JSONSerializer()
+        self._reset()
+
+    def _reset(self) -> None:
+        """清空当前进程的状态（fork 后在子进程中调用）"""
+        self._lock = threading.Lock()
+        self._pid = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._named_threads = set()
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: Optional[Dict[str, Any]] = None) -> None:
+        """记录一个完整事件
+
+        参数:
+            name: 事件名
+            start_ns: 开始时间（perf_counter_ns）
+            end_ns: 结束时间（perf_counter_ns）
+            args: 附加参数（可选），显示在 Perfetto 的详情中
+        """
+        pid = os.getpid()
+        tid = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": _CATEGORY,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+
+        with self._lock:
+            if self._pid != pid:
+                self._start_process(pid)
+            if tid not in self._named_threads:
+                self._named_threads.add(tid)
+                self._append_metadata("thread_name", pid, tid, threading.current_thread().name)
+            self._buffer.append(event)
+            if len(self._buffer) >= _FLUSH_EVENTS:
+                self._write_buffer()
+
+    def flush(self) -> None:
+        """把缓冲的事件写到当前进程的片段文件"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._write_buffer()
+
+    def _start_process(self, pid: int) -> None:
+        """当前进程记录第一个事件：写进程名并注册退出时写出"""
+        self._pid = pid
+        self._buffer = []
+        self._named_threads = set()
+        self._append_metadata("process_name", pid, 0, multiprocessing.current_process().name)
+        # 主进程和 multiprocessing 子进程退出时都会执行
+        multiprocessing.util.Finalize(None, self.flush, exitpriority=_EXIT_PRIORITY)
+
+    def _append_metadata(self, name: str, pid: int, tid: int, value: str) -> None:
+        self._buffer.append({"name": name, "ph": "M", "pid": pid, "tid": tid, "args": {"name": value}})
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+        try:
+            with open(fragment_path(self.path, self._pid), "a", encoding="utf-8") as f:
+                f.write("".join(self._serializer.encode(event) + "\n" for event in self._buffer))
+        except OSError as e:
+            logger.warning(f"跟踪记录写入失败: {str(e)}")
+        self._buffer = []
+
+
+class _Span:
+    """记录一个完整事件的上下文管理器"""
+
+    __slots__ = ("_tracer", "_name", "_args", "_start")
+
+    def __init__(self, tracer: Tracer, name: str, args: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start = 0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        end = time.perf_counter_ns()
+        args = self._args
+        if exc_type is not None:
+            args = dict(args, error=exc_type.__name__)
+        self._tracer.record(self._name, self._start, end, args)
+
+
+# 当前进程的跟踪器，未启用跟踪时为 None
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, **args: Any):
+    """标记一段代码，启用跟踪时记录为完整事件
+
+    参数:
+        name: 事件名
+        **args: 附加参数（如 file、page），需要可以编码为 JSON
+
+    返回:
+        上下文管理器；未启用跟踪时为共享的空上下文
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+
+def is_tracing() -> bool:
+    """当前进程是否启用了跟踪"""
+    return _tracer is not None
+
+
+def start_tracing(path: str) -> None:
+    """启用跟踪，之后创建的子进程也会记录事件
+
+    参数:
+        path: 跟踪文件路径，stop_tracing 时写出
+    """
+    global _tracer
+    path = os.path.abspath(path)
+    for stale in glob.glob(glob.escape(path) + ".*.part"):
+        os.remove(stale)
+    _tracer = Tracer(path)
+    os.environ[TRACE_ENV_VAR] = path
+
+
+def stop_tracing() -> int:
+    """停止跟踪，把各进程的片段合并为跟踪文件
+
+    应在所有子进程结束后调用；未启用跟踪时不做任何事。
+
+    返回:
+        合并的事件数
+
+    异常:
+        IOError: 跟踪文件写入失败
+    """
+    global _tracer
+    tracer = _tracer
+    if tracer is None:
+        return 0
+    tracer.flush()
+    _tracer = None
+    os.environ.pop(TRACE_ENV_VAR, None)
+    return merge_fragments(tracer.path)
+
+
+def merge_fragments(path: str) -> int:
+    """把 <路径>.<进程号>.part 合并为 Chrome trace-event JSON 并删除片段
+
+    进程异常退出时片段的最后一行可能不完整，跳过无法解析的行。
+
+    返回:
+        合并的事件数
+
+    异常:
+        IOError: 跟踪文件写入失败
+    """
+    events = []
+    fragments = sorted(glob.glob(glob.escape(path) + ".*.part"))
+    for fragment in fragments:
+        with open(fragment, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"跳过不完整的跟踪记录: {fragment}")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(JSONSerializer().encode({"traceEvents": events, "displayTimeUnit": "ms"}))
+    except OSError as e:
+        raise IOError(f"跟踪记录写入失败: {str(e)}")
+    for fragment in fragments:
+        os.remove(fragment)
+    return len(events)
+
+
+def _reset_after_fork() -> None:
+    """fork 出的子进程不写出从父进程复制来的事件，也不沿用父进程的锁"""
+    if _tracer is not None:
+        _tracer._reset()
+
+
+# 没有 fork 的平台（Windows）只有 spawn 出的子进程，不需要重置
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+# spawn 出的子进程在导入时启用跟踪
+if os.environ.get(TRACE_ENV_VAR):
+    _tracer = Tracer(os.environ[TRACE_ENV_VAR])
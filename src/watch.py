@@ -0,0 +1,332 @@
+"""监视目录模块
+
+监视一个目录，把新放入（或被修改）的 PDF 交给常驻工作进程提取到输出目录：
+- Linux 上使用 inotify（通过 ctypes 调用 libc，不需要额外依赖），其他平台或
+  inotify 不可用时定期扫描目录
+- 文件大小和修改时间在 settle_time 秒内不再变化后才提交，避免处理仍在写入的文件
+- 任务经由持久化任务队列（参见 job_queue）交给常驻工作进程（参见 BatchRunner），
+  监视进程重启后未完成的任务继续处理
+- 启动时扫描目录，跳过输出文件比输入文件新的 PDF
+
+命令行用法：
+    pdf-extractor watch inbox/ --output-dir out/ -j 2
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import multiprocessing
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .batch import BatchRunner, output_path_for
+from .job_queue import JobQueue
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SETTLE_TIME = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify 事件掩码（linux/inotify.h）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CREATE | _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO
+
+# struct inotify_event: int wd; uint32 mask; uint32 cookie; uint32 len; char name[len]
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_pdf(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.lower().endswith(".pdf") and not name.startswith(".")
+
+
+def _scan(directory: str) -> Dict[str, Tuple[int, int]]:
+    """目录下所有 PDF 的 (大小, 修改时间)"""
+    snapshot = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            path = os.path.join(root, name)
+            if not _is_pdf(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+class PollingWatcher:
+    """定期扫描目录，返回新增或变化的 PDF"""
+
+    def __init__(self, directory: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._snapshot = _scan(directory)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """等待 timeout 秒（不超过扫描间隔）后扫描
+
+        返回:
+            新增或大小 / 修改时间变化的 PDF 路径
+        """
+        time.sleep(min(timeout, self.poll_interval))
+        snapshot = _scan(self.directory)
+        changed = {path for path, signature in snapshot.items() if self._snapshot.get(path) != signature}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def _load_libc():
+    """加载提供 inotify 的 libc，不可用时返回 None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifyWatcher:
+    """使用 inotify 监视目录（包括之后新建的子目录）"""
+
+    def __init__(self, directory: str, libc=None):
+        """开始监视
+
+        异常:
+            OSError: inotify 不可用或无法监视该目录
+        """
+        self.directory = directory
+        self._libc = libc or _load_libc()
+        if self._libc is None:
+            raise OSError("当前平台不支持 inotify")
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 失败: {os.strerror(errno)}")
+        self._dirs: Dict[int, str] = {}
+        self._add_tree(directory)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """等待文件事件，最多 timeout 秒
+
+        返回:
+            有写入、新建或移入事件的 PDF 路径；事件队列溢出时返回目录下所有 PDF
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(sys.getfilesystemencoding(), "surrogateescape")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                logger.warning("inotify 事件队列溢出，重新扫描目录")
+                changed.update(_scan(self.directory))
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, name)
+            if mask & _IN_ISDIR:
+                if not name.startswith("."):
+                    # 新建或移入的子目录：开始监视，并提交其中已有的文件
+                    self._add_tree(path)
+                    changed.update(_scan(path))
+            elif _is_pdf(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_tree(self, directory: str) -> None:
+        for root, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), _WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"无法监视目录 {root}: {os.strerror(errno)}")
+            self._dirs[wd] = root
+
+
+def open_watcher(directory: str, force_polling: bool = False,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """创建目录监视器：优先使用 inotify，不可用时定期扫描"""
+    if not force_polling:
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            logger.info(f"inotify 不可用（{str(e)}），改为定期扫描目录")
+    return PollingWatcher(directory, poll_interval)
+
+
+class Debouncer:
+    """等待文件写入完成：大小和修改时间在 settle_time 秒内不变后才视为就绪"""
+
+    def __init__(self, settle_time: float = DEFAULT_SETTLE_TIME, clock=time.monotonic):
+        self.settle_time = settle_time
+        self._clock = clock
+        # 路径 -> ((大小, 修改时间), 最近一次变化的时间)
+        self._pending: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, paths: Iterable[str]) -> None:
+        """开始（重新）跟踪文件"""
+        now = self._clock()
+        for path in paths:
+            self._pending[path] = (None, now)
+
+    def ready(self) -> List[str]:
+        """返回已写入完成的文件并停止跟踪；已删除的文件直接丢弃"""
+        now = self._clock()
+        ready = []
+        for path, (signature, since) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle_time:
+                del self._pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+
+class FolderWatcher:
+    """监视目录并把 PDF 交给常驻工作进程
+
+    使用方式：
+        runner = BatchRunner("out/.pdf-extractor-jobs.db", output_format="json")
+        FolderWatcher("inbox/", "out/", runner, workers=2).run()
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        output_dir: str,
+        runner: BatchRunner,
+        workers: int = 1,
+        settle_time: float = DEFAULT_SETTLE_TIME,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        force_polling: bool = False
+    ):
+        """初始化
+
+        参数:
+            directory: 监视的目录
+            output_dir: 输出目录，保留监视目录中的子目录结构
+            runner: 批处理（决定任务队列、输出格式和提取选项）
+            workers: 常驻工作进程数
+            settle_time: 文件多少秒内不再变化后才提交
+            poll_interval: 定期扫描的间隔（秒，inotify 不可用时）
+            force_polling: 不使用 inotify，总是定期扫描
+        """
+        # 与 collect_inputs 一致使用解析后的绝对路径，同一文件在队列中只有一个任务
+        self.directory = str(Path(directory).resolve())
+        self.output_dir = os.path.abspath(output_dir)
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+        self.watcher = None
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """请求停止（可从其他线程调用）"""
+        self._stop.set()
+
+    def scan_existing(self) -> int:
+        """启动扫描：提交输出文件不存在或比输入文件旧的 PDF（忽略隐藏文件）
+
+        返回:
+            提交的文件数
+        """
+        jobs = []
+        for input_path in sorted(_scan(self.directory)):
+            output_path = self._output_path(input_path)
+            try:
+                if os.path.getmtime(output_path) >= os.path.getmtime(input_path):
+                    continue
+            except OSError:
+                pass
+            jobs.append((input_path, output_path))
+        with JobQueue(self.runner.queue_path, self.runner.max_attempts) as queue:
+            queue.recover_stale()
+            return queue.resubmit(jobs)
+
+    def run(self) -> None:
+        """启动工作进程并监视目录，直到调用 stop() 或收到 Ctrl-C
+
+        异常:
+            OSError: 无法监视该目录
+        """
+        self.watcher = open_watcher(self.directory, self.force_polling, self.poll_interval)
+        submitted = self.scan_existing()
+        logger.info(f"启动扫描提交 {submitted} 个文件")
+
+        stop_event = multiprocessing.Event()
+        processes = self.runner.start_workers(self.workers, stop_event)
+        debouncer = Debouncer(self.settle_time)
+        tick = max(0.05, min(self.poll_interval, self.settle_time / 2))
+        try:
+            with JobQueue(self.runner.queue_path, self.runner.max_attempts) as queue:
+                while not self._stop.is_set():
+                    debouncer.add(self.watcher.wait(tick))
+                    for path in debouncer.ready():
+                        self._submit(queue, debouncer, path)
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join()
+            self.watcher.close()
+
+    def _output_path(self, input_path: str) -> str:
+        relative = Path(input_path).relative_to(self.directory).with_suffix("")
+        return output_path_for(str(relative), self.output_dir, self.runner.output_format)
+
+    def _submit(self, queue: JobQueue, debouncer: Debouncer, path: str) -> None:
+        if queue.resubmit([(path, self._output_path(path))]):
+            logger.info(f"已提交: {path}")
+        else:
+            # 上一版本仍在处理中，稍后再提交
+            debouncer.add([path])
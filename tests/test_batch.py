@@ -0,0 +1,149 @@
+"""批量提取测试"""
+
+import json
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.batch import BatchRunner, collect_inputs, output_path_for
+from src.cli import main
+from src.job_queue import STATUS_DONE, STATUS_FAILED, JobQueue
+
+
+def make_pdf(path, text):
+    """创建单页 PDF"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    c = canvas.Canvas(str(path), pagesize=letter)
+    c.drawString(100, 750, text)
+    c.showPage()
+    c.save()
+
+
+@pytest.fixture
+def books(tmp_path):
+    """包含子目录和一个损坏文件的输入目录"""
+    root = tmp_path / "books"
+    make_pdf(root / "a.pdf", "Book A")
+    make_pdf(root / "sub" / "b.pdf", "Book B")
+    (root / "broken.pdf").write_bytes(b"not a pdf")
+    (root / "notes.txt").write_text("ignored")
+    return root
+
+
+class TestCollectInputs:
+    """测试输入展开"""
+
+    def test_directory_keeps_structure(self, books):
+        """目录递归查找 PDF，保留子目录结构"""
+        stems = [stem for _, stem in collect_inputs([str(books)])]
+        assert stems == ["a", "broken", "sub/b"]
+
+    def test_file_input(self, books):
+        (path, stem), = collect_inputs([str(books / "sub" / "b.pdf")])
+        assert path == str(books / "sub" / "b.pdf")
+        assert stem == "b"
+
+    def test_output_path(self, tmp_path):
+        assert output_path_for("sub/b", str(tmp_path), "markdown") == str(tmp_path / "sub" / "b.md")
+
+
+class TestBatchRunner:
+    """测试批量提取和续跑"""
+
+    def test_run_and_resume(self, books, tmp_path):
+        """失败的文件在次数上限内重试，重新运行时跳过已完成的文件"""
+        out = tmp_path / "out"
+        queue_path = str(tmp_path / "jobs.db")
+        results = []
+        runner = BatchRunner(
+            queue_path, extract_key_info=False, max_attempts=2,
+            on_result=lambda job, error: results.append((job.input_path, error))
+        )
+
+        assert runner.add([str(books)], str(out)) == 3
+        counts = runner.run(workers=1)
+
+        assert counts[STATUS_DONE] == 2
+        assert counts[STATUS_FAILED] == 1
+        # 损坏的文件尝试 2 次
+        assert [path for path, error in results if error].count(str(books / "broken.pdf")) == 2
+        data = json.loads((out / "sub" / "b.json").read_text(encoding="utf-8"))
+        assert "Book B" in data["pages"][0]["text"]
+        assert not list(out.rglob("*.part"))
+
+        results.clear()
+        assert runner.add([str(books)], str(out)) == 0
+        runner.run(workers=1)
+        assert results == []
+
+    def test_multiple_workers(self, books, tmp_path):
+        """多个工作进程处理同一个队列"""
+        (books / "broken.pdf").unlink()
+        queue_path = str(tmp_path / "jobs.db")
+        runner = BatchRunner(queue_path, output_format="text", extract_key_info=False)
+        runner.add([str(books)], str(tmp_path / "out"))
+
+        counts = runner.run(workers=2)
+
+        assert counts[STATUS_DONE] == 2
+        assert "Book A" in (tmp_path / "out" / "a.txt").read_text(encoding="utf-8")
+        with JobQueue(queue_path) as queue:
+            assert all(job.attempts == 1 for job in queue.jobs())
+
+    @pytest.mark.parametrize("extract_key_info", [True, False])
+    def test_preload_before_fork(self, tmp_path, monkeypatch, extract_key_info):
+        """提取关键信息时在启动工作进程前预加载词表"""
+        import multiprocessing
+        from unittest.mock import Mock
+
+        preload = Mock()
+        monkeypatch.setattr("src.lexicon.preload_lexicon", preload)
+        runner = BatchRunner(str(tmp_path / "jobs.db"), extract_key_info=extract_key_info)
+        runner.run(workers=2)
+        stop_event = multiprocessing.Event()
+        stop_event.set()
+        for process in runner.start_workers(2, stop_event):
+            process.join()
+
+        expected = [((runner.config,),)] * 2 if extract_key_info else []
+        assert preload.call_args_list == expected
+
+    def test_checkpoint_removed_after_success(self, books, tmp_path):
+        """使用检查点时，完成的文件不留下检查点"""
+        (books / "broken.pdf").unlink()
+        runner = BatchRunner(str(tmp_path / "jobs.db"), extract_key_info=False, checkpoint=True)
+        runner.add([str(books)], str(tmp_path / "out"))
+
+        assert runner.run(workers=1)[STATUS_DONE] == 2
+        assert not list((tmp_path / "out").rglob(".*.checkpoint"))
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            BatchRunner(str(tmp_path / "jobs.db"), output_format="xml")
+
+
+class TestBatchCommand:
+    """测试 batch 子命令"""
+
+    def test_batch_and_status(self, books, tmp_path, capsys):
+        """有失败的文件时返回 1，--status 显示失败原因"""
+        out = tmp_path / "out"
+        args = ["batch", str(books), "-d", str(out), "-j", "1", "--max-attempts", "1", "--no-key-info", "-q"]
+        assert main(args) == 1
+        assert (out / "a.json").exists()
+        assert (out / ".pdf-extractor-jobs.db").exists()
+
+        capsys.readouterr()
+        assert main(["batch", "-d", str(out), "--status"]) == 0
+        err = capsys.readouterr().err
+        assert "已完成 2" in err
+        assert "broken.pdf" in err
+
+    def test_status_without_queue(self, tmp_path, capsys):
+        assert main(["batch", "-d", str(tmp_path), "--status"]) == 1
+        assert "任务队列不存在" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
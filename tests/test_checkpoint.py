@@ -0,0 +1,180 @@
+"""逐页检查点测试"""
+
+import os
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.checkpoint import PageCheckpoint
+from src.models import PDFDocument, PageText, StageTimings
+from src.pdf_extraction_service import PDFExtractionService
+from src.text_extractor import TextExtractor
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """创建 6 页 PDF"""
+    path = tmp_path / "long.pdf"
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for i in range(6):
+        c.drawString(100, 750, f"Checkpoint page {i + 1}")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+@pytest.fixture
+def document(pdf_path):
+    return PDFDocument(file_path=pdf_path, page_count=6)
+
+
+def interrupt_at(monkeypatch, page_number):
+    """提取到指定页时模拟进程被终止，返回已提取的页码列表"""
+    extracted = []
+    original = TextExtractor.extract_text
+
+    def extract_text(self, document, index):
+        if index == page_number:
+            raise KeyboardInterrupt
+        extracted.append(index)
+        return original(self, document, index)
+
+    monkeypatch.setattr(TextExtractor, "extract_text", extract_text)
+    return extracted
+
+
+class TestPageCheckpoint:
+    """测试检查点文件读写"""
+
+    def test_resume_completed_pages(self, tmp_path, document):
+        """关闭后重新打开，返回已完成的页面"""
+        path = str(tmp_path / "long.checkpoint")
+        with PageCheckpoint(path, document) as checkpoint:
+            assert checkpoint.load() == []
+            checkpoint.append(PageText(page_number=0, text="第一页"))
+            checkpoint.append(PageText(page_number=1, text=""), "第 2 页提取失败：页面损坏")
+
+        with PageCheckpoint(path, document) as checkpoint:
+            completed = checkpoint.load()
+        assert [(page.page_number, page.text, error) for page, error in completed] == [
+            (0, "第一页", None),
+            (1, "", "第 2 页提取失败：页面损坏"),
+        ]
+
+    def test_partial_last_line_discarded(self, tmp_path, document):
+        """写了一半的最后一行被截掉，之后的页面接着写入"""
+        path = str(tmp_path / "long.checkpoint")
+        with PageCheckpoint(path, document) as checkpoint:
+            checkpoint.load()
+            checkpoint.append(PageText(page_number=0, text="第一页"))
+        with open(path, "ab") as f:
+            f.write(b'{"page_number":1,"te')
+
+        with PageCheckpoint(path, document) as checkpoint:
+            assert len(checkpoint.load()) == 1
+            checkpoint.append(PageText(page_number=1, text="第二页"))
+        with PageCheckpoint(path, document) as checkpoint:
+            assert [page.text for page, _ in checkpoint.load()] == ["第一页", "第二页"]
+
+    def test_modified_source_restarts(self, tmp_path, document, pdf_path):
+        """源文件被修改后丢弃旧检查点"""
+        path = str(tmp_path / "long.checkpoint")
+        with PageCheckpoint(path, document) as checkpoint:
+            checkpoint.load()
+            checkpoint.append(PageText(page_number=0, text="第一页"))
+        stat = os.stat(pdf_path)
+        os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        with PageCheckpoint(path, document) as checkpoint:
+            assert checkpoint.load() == []
+
+    def test_fsync_in_batches(self, tmp_path, document, monkeypatch):
+        """每 fsync_every 页落盘一次"""
+        calls = []
+        monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd))
+        with PageCheckpoint(str(tmp_path / "c"), document, fsync_every=3) as checkpoint:
+            checkpoint.load()
+            assert len(calls) == 1
+            for i in range(7):
+                checkpoint.append(PageText(page_number=i, text="x"))
+            assert len(calls) == 3
+        assert len(calls) == 4
+
+
+class TestServiceCheckpoint:
+    """测试提取中途失败后从检查点恢复"""
+
+    def test_resume_to_file(self, tmp_path, pdf_path, monkeypatch):
+        """恢复后只提取剩余页面，输出与一次完成时相同，完成后删除检查点"""
+        service = PDFExtractionService()
+        checkpoint = str(tmp_path / "long.checkpoint")
+        output = str(tmp_path / "out.json")
+        reference = str(tmp_path / "reference.json")
+        service.extract(pdf_path, "json-compact", extract_key_info=False, output_file=reference)
+
+        with monkeypatch.context() as patch:
+            extracted = interrupt_at(patch, 4)
+            with pytest.raises(KeyboardInterrupt):
+                service.extract(pdf_path, "json-compact", extract_key_info=False,
+                                output_file=output, checkpoint=checkpoint)
+        assert extracted == [0, 1, 2, 3]
+        assert os.path.exists(checkpoint)
+
+        resumed = interrupt_at(monkeypatch, -1)
+        service.extract(pdf_path, "json-compact", extract_key_info=False,
+                        output_file=output, checkpoint=checkpoint)
+
+        assert resumed == [4, 5]
+        assert not os.path.exists(checkpoint)
+
+        def strip_time(path):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            return text[:text.index('"extraction_time"')]
+        assert strip_time(output) == strip_time(reference)
+
+    def test_resume_timings(self, tmp_path, pdf_path, monkeypatch):
+        """恢复的页面计入 restored_pages，不计入提取吞吐量"""
+        service = PDFExtractionService()
+        checkpoint = str(tmp_path / "long.checkpoint")
+
+        with monkeypatch.context() as patch:
+            interrupt_at(patch, 4)
+            with pytest.raises(KeyboardInterrupt):
+                service.extract(pdf_path, "text", extract_key_info=False, checkpoint=checkpoint)
+
+        timings = StageTimings()
+        service.extract(pdf_path, "text", extract_key_info=False, checkpoint=checkpoint, timings=timings)
+
+        assert len(timings.pages) == 6
+        assert timings.pages[:4] == [0.0] * 4
+        assert timings.restored_pages == 4
+        assert timings.extracted_pages == 2
+        assert timings.restored_chars == sum(len(f"Checkpoint page {i}") for i in range(1, 5))
+        assert timings.char_count == sum(len(f"Checkpoint page {i}") for i in range(1, 7))
+        assert timings.pages_per_second == pytest.approx(2 / timings.extract)
+        assert timings.chars_per_second == pytest.approx(
+            (timings.char_count - timings.restored_chars) / timings.extract
+        )
+
+    def test_resume_in_memory(self, tmp_path, pdf_path, monkeypatch):
+        """不写出到文件时同样支持检查点"""
+        service = PDFExtractionService()
+        checkpoint = str(tmp_path / "long.checkpoint")
+
+        with monkeypatch.context() as patch:
+            interrupt_at(patch, 2)
+            with pytest.raises(KeyboardInterrupt):
+                service.extract(pdf_path, "text", extract_key_info=False, checkpoint=checkpoint)
+
+        resumed = interrupt_at(monkeypatch, -1)
+        result = service.extract(pdf_path, "text", extract_key_info=False, checkpoint=checkpoint)
+
+        assert resumed == [2, 3, 4, 5]
+        assert all(f"Checkpoint page {i}" in result for i in range(1, 7))
+        assert not os.path.exists(checkpoint)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
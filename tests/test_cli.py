@@ -1,6 +1,8 @@
 """CLI 模块单元测试"""
 
+import os
 import pytest
+import subprocess
 import sys
 from io import StringIO
 from unittest.mock import Mock, patch, MagicMock
@@ -90,6 +92,19 @@ class TestCreateParser:
         args = parser.parse_args(['test.pdf', '--no-key-info'])
         assert args.no_key_info is True
     
+    def test_key_info_stages_argument(self):
+        """测试选择关键信息分析阶段"""
+        parser = create_parser()
+        
+        args = parser.parse_args(['test.pdf'])
+        assert args.key_info is None
+        
+        args = parser.parse_args(['test.pdf', '--key-info', 'summary,keywords'])
+        assert args.key_info == ['keywords', 'summary']
+        
+        with pytest.raises(SystemExit):
+            parser.parse_args(['test.pdf', '--key-info', 'unknown'])
+    
     def test_progress_argument(self):
         """测试进度显示参数"""
         parser = create_parser()
@@ -215,6 +230,20 @@ class TestPrintResult:
         captured = capsys.readouterr()
         # 静默模式下不应该有输出
         assert captured.out == ""
+    
+    def test_print_streamed_result(self, capsys):
+        """测试结果已逐页写出时只补充结尾换行"""
+        print_result(None)
+        
+        captured = capsys.readouterr()
+        assert captured.out == "\n"
+    
+    def test_print_streamed_ndjson(self, capsys):
+        """测试 ndjson 逐页写出后不再补充换行"""
+        print_result(None, trailing_newline=False)
+        
+        captured = capsys.readouterr()
+        assert captured.out == ""
 
 
 class TestMain:
@@ -238,6 +267,76 @@ class TestMain:
         captured = capsys.readouterr()
         assert "提取的文本内容" in captured.out
     
+    @patch('src.cli.PDFExtractionService')
+    def test_stats(self, mock_service_class, capsys):
+        """测试 --stats 在标准错误显示各阶段耗时和吞吐量"""
+        def extract(**kwargs):
+            timings = kwargs["timings"]
+            timings.pages = [0.5, 0.5]
+            timings.extract = 1.0
+            timings.char_count = 300
+            timings.analysis = {"keywords": 0.2}
+            timings.time_to_first_page = 0.25
+            return "提取的文本内容"
+        
+        mock_service = Mock()
+        mock_service.extract.side_effect = extract
+        mock_service_class.return_value = mock_service
+        
+        assert main(['test.pdf', '--stats', '-q']) == 0
+        
+        captured = capsys.readouterr()
+        assert "各阶段耗时" not in captured.out
+        assert "2 页，2.0 页/秒，300 字符/秒" in captured.err
+        assert "关键信息 keywords: 0.200 秒" in captured.err
+        assert "第一页写出: 0.250 秒" in captured.err
+    
+    @patch('src.cli.PDFExtractionService')
+    def test_stats_restored_pages(self, mock_service_class, capsys):
+        """测试 --stats 的吞吐量不包括从检查点恢复的页面"""
+        def extract(**kwargs):
+            timings = kwargs["timings"]
+            timings.pages = [0.0] * 8 + [0.5, 0.5]
+            timings.extract = 1.0
+            timings.char_count = 3000
+            timings.restored_pages = 8
+            timings.restored_chars = 2700
+            return "提取的文本内容"
+        
+        mock_service = Mock()
+        mock_service.extract.side_effect = extract
+        mock_service_class.return_value = mock_service
+        
+        assert main(['test.pdf', '--stats', '-q']) == 0
+        assert "2 页，2.0 页/秒，300 字符/秒，另有 8 页从检查点恢复" in capsys.readouterr().err
+    
+    @patch('src.cli.PDFExtractionService')
+    def test_stats_slow_pages(self, mock_service_class, capsys):
+        """测试 --stats 显示最慢的页面及其对象数和相关系数"""
+        from src.models import PageComplexity
+        
+        def extract(**kwargs):
+            timings = kwargs["timings"]
+            timings.pages = [0.1, 0.9, 0.2, 0.4]
+            timings.extract = 1.6
+            timings.page_complexity = [
+                PageComplexity(page_number=i, chars=100, rects=rects, content_bytes=rects * 1024)
+                for i, rects in enumerate([10, 900, 200, 400])
+            ]
+            return "提取的文本内容"
+        
+        mock_service = Mock()
+        mock_service.extract.side_effect = extract
+        mock_service_class.return_value = mock_service
+        
+        assert main(['test.pdf', '--stats', '-q']) == 0
+        
+        err = capsys.readouterr().err
+        assert "最慢的 4 页" in err
+        assert "第 2 页: 0.900 秒（字符 100，直线 0，矩形 900，曲线 0，图片 0，内容流 900.0 KiB）" in err
+        assert err.index("第 2 页") < err.index("第 4 页") < err.index("第 3 页") < err.index("第 1 页")
+        assert "相关系数: 矩形 +1.00，内容流大小 +1.00" in err
+    
     @patch('src.cli.PDFExtractionService')
     def test_extraction_with_output_file(self, mock_service_class):
         """测试保存到输出文件"""
@@ -251,6 +350,103 @@ class TestMain:
         # 验证调用参数
         call_args = mock_service.extract.call_args
         assert call_args.kwargs['output_file'] == 'output.txt'
+        assert call_args.kwargs['output_stream'] is None
+    
+    @patch('src.cli.PDFExtractionService')
+    def test_extraction_ndjson_append(self, mock_service_class):
+        """测试 ndjson 追加到输出文件"""
+        mock_service = Mock()
+        mock_service.extract.return_value = None
+        mock_service_class.return_value = mock_service
+        
+        exit_code = main(['test.pdf', '-f', 'ndjson', '-o', 'corpus.ndjson', '--append', '-q'])
+        
+        assert exit_code == 0
+        call_args = mock_service.extract.call_args
+        assert call_args.kwargs['output_format'] == 'ndjson'
+        assert call_args.kwargs['append'] is True
+    
+    @patch('src.cli.PDFExtractionService')
+    def test_extraction_with_compress(self, mock_service_class):
+        """测试压缩输出"""
+        mock_service = Mock()
+        mock_service.extract.return_value = None
+        mock_service_class.return_value = mock_service
+        
+        exit_code = main(['test.pdf', '-o', 'out.txt', '--compress', 'gzip', '-q'])
+        
+        assert exit_code == 0
+        assert mock_service.extract.call_args.kwargs['compression'] == 'gzip'
+        
+        # 不指定时由服务根据后缀识别
+        main(['test.pdf', '-o', 'out.txt.gz', '-q'])
+        assert mock_service.extract.call_args.kwargs['compression'] is None
+    
+    def test_compress_requires_output_file(self):
+        """测试 --compress 需要同时指定 -o"""
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '--compress', 'gzip'])
+    
+    def test_pages_format_requires_uncompressed_output_file(self):
+        """测试 pages 格式需要 -o 且不能压缩"""
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '-f', 'pages'])
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '-f', 'pages', '-o', 'book.pages', '--compress', 'gzip'])
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '-f', 'pages', '-o', 'book.pages.gz'])
+    
+    def test_invalid_config_value(self, monkeypatch, capsys):
+        """测试配置项取值不受支持时在加载配置时报错退出"""
+        monkeypatch.setattr('src.config._config_manager', None)
+        monkeypatch.setenv('PDF_EXTRACTOR_SUMMARY_METHOD', 'bogus')
+        with pytest.raises(SystemExit) as exc_info:
+            main(['test.pdf'])
+        assert exc_info.value.code == 2
+        assert "不支持的摘要算法: bogus" in capsys.readouterr().err
+    
+    @patch('src.sqlite_store.open_sink')
+    @patch('src.cli.PDFExtractionService')
+    def test_extraction_with_sink(self, mock_service_class, mock_open_sink, capsys):
+        """测试写入语料库时不输出到标准输出"""
+        mock_service = Mock()
+        mock_service.extract.return_value = None
+        mock_service_class.return_value = mock_service
+        
+        exit_code = main(['test.pdf', '--sink', 'sqlite:library.db'])
+        
+        assert exit_code == 0
+        mock_open_sink.assert_called_once_with('sqlite:library.db')
+        call_args = mock_service.extract.call_args
+        assert call_args.kwargs['sink'] is mock_open_sink.return_value
+        assert call_args.kwargs['output_stream'] is None
+        mock_open_sink.return_value.close.assert_called_once()
+        assert "library.db" in capsys.readouterr().out
+    
+    def test_invalid_sink(self):
+        """测试不支持的 --sink 格式"""
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '--sink', 'postgres:db'])
+
+    def test_subcommand_modules_not_loaded(self):
+        """测试导入命令行模块时不加载语料库、服务和批处理模块"""
+        code = (
+            "import sys\n"
+            "import src.cli\n"
+            "loaded = [name for name in ('jieba', 'asyncio', 'src.sqlite_store', 'src.server',"
+            " 'src.batch', 'src.watch') if name in sys.modules]\n"
+            "assert not loaded, loaded\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root)
+        assert result.returncode == 0
+
+    def test_append_requires_ndjson_output_file(self):
+        """测试 --append 只能与 ndjson 和 -o 一起使用"""
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '-o', 'out.txt', '--append'])
+        with pytest.raises(SystemExit):
+            main(['test.pdf', '-f', 'ndjson', '--append'])
     
     @patch('src.cli.PDFExtractionService')
     def test_extraction_with_json_format(self, mock_service_class):
@@ -278,6 +474,20 @@ class TestMain:
         call_args = mock_service.extract.call_args
         assert call_args.kwargs['extract_key_info'] is True
     
+    @patch('src.cli.PDFExtractionService')
+    def test_extraction_with_key_info_stages(self, mock_service_class):
+        """测试只提取部分关键信息"""
+        mock_service = Mock()
+        mock_service.extract.return_value = "提取的文本内容"
+        mock_service_class.return_value = mock_service
+        
+        exit_code = main(['test.pdf', '--key-info=keywords,summary'])
+        
+        assert exit_code == 0
+        call_args = mock_service.extract.call_args
+        assert call_args.kwargs['extract_key_info'] is True
+        assert call_args.kwargs['key_info_stages'] == ['keywords', 'summary']
+    
     @patch('src.cli.PDFExtractionService')
     def test_extraction_without_key_info(self, mock_service_class):
         """测试不提取关键信息"""
@@ -370,6 +580,34 @@ class TestMain:
         # 静默模式下应该只有结果输出
         assert "正在处理文件" not in captured.out
     
+    @patch('src.cli.PDFExtractionService')
+    def test_status_messages_on_stderr(self, mock_service_class, capsys):
+        """测试状态消息写到标准错误，标准输出只有结果"""
+        mock_service = Mock()
+        mock_service.extract.return_value = None
+        mock_service_class.return_value = mock_service
+        
+        exit_code = main(['test.pdf', '--extract-key-info'])
+        
+        assert exit_code == 0
+        captured = capsys.readouterr()
+        assert "正在处理文件" in captured.err
+        assert "将提取关键信息" in captured.err
+        assert captured.out == "\n"
+    
+    @patch('src.cli.PDFExtractionService')
+    def test_broken_pipe(self, mock_service_class, capsys):
+        """测试下游关闭管道时静默退出"""
+        mock_service = Mock()
+        mock_service.extract.side_effect = BrokenPipeError()
+        mock_service_class.return_value = mock_service
+        
+        exit_code = main(['test.pdf', '-q'])
+        
+        assert exit_code == 1
+        captured = capsys.readouterr()
+        assert captured.err == ""
+    
     @patch('src.cli.PDFExtractionService')
     def test_verbose_mode(self, mock_service_class, capsys):
         """测试详细模式"""
@@ -395,3 +633,98 @@ class TestMain:
         call_args = mock_service.extract.call_args
         assert call_args.kwargs['file_path'] == '测试文件.pdf'
         assert call_args.kwargs['output_file'] == '输出.txt'
+
+
+class TestSearchCommand:
+    """测试 search 子命令"""
+    
+    @pytest.fixture
+    def database(self, tmp_path):
+        """创建包含一个文档的语料库"""
+        from src.models import ExtractedContent, PageText
+        from src.sqlite_store import SQLiteStore
+        
+        path = str(tmp_path / "library.db")
+        with SQLiteStore(path) as store:
+            store.write(ExtractedContent(
+                file_path="思考致富.pdf",
+                page_count=2,
+                pages=[PageText(0, "第一章 欲望"), PageText(1, "渴望是一切成就的起点。\n坚持到底。")]
+            ))
+        return path
+    
+    def test_search_text(self, database, capsys):
+        """测试文本格式输出"""
+        exit_code = main(['search', database, '渴望'])
+        
+        assert exit_code == 0
+        captured = capsys.readouterr()
+        assert captured.out == "思考致富.pdf 第 2 页: 【渴望】是一切成就的起点。 坚持到底。\n"
+        assert "共 1 条结果" in captured.err
+    
+    def test_search_json(self, database, capsys):
+        """测试 JSON 格式输出"""
+        import json
+        
+        exit_code = main(['search', database, '欲望', '-f', 'json', '-n', '5'])
+        
+        assert exit_code == 0
+        hits = json.loads(capsys.readouterr().out)
+        assert [(hit["file_path"], hit["page_number"]) for hit in hits] == [("思考致富.pdf", 1)]
+    
+    def test_search_missing_database(self, tmp_path, capsys):
+        """测试语料库不存在"""
+        exit_code = main(['search', str(tmp_path / "missing.db"), '渴望'])
+        
+        assert exit_code == 1
+        assert "语料库不存在" in capsys.readouterr().err
+        assert not (tmp_path / "missing.db").exists()
+
+
+
+class TestReformatCommand:
+    """测试 reformat 子命令"""
+    
+    @pytest.fixture
+    def json_path(self, tmp_path):
+        """创建不含关键信息的 JSON 输出"""
+        from src.models import ExtractedContent, PageText
+        from src.output_formatter import OutputFormatter
+        
+        path = str(tmp_path / "book.json")
+        OutputFormatter().write_to_file(ExtractedContent(
+            file_path="思考致富.pdf",
+            page_count=2,
+            pages=[PageText(0, "第一章 渴望"), PageText(1, "渴望是一切成就的起点。渴望坚持。")]
+        ), "json", path)
+        return path
+    
+    def test_reformat_to_markdown(self, json_path, capsys):
+        """测试转换为 Markdown 并重新分析关键信息"""
+        exit_code = main(['reformat', json_path, '-f', 'markdown', '--key-info', 'keywords'])
+        
+        assert exit_code == 0
+        out = capsys.readouterr().out
+        assert out.startswith("# PDF 文本提取结果")
+        assert "## 第 2 页" in out
+        assert "### 关键词" in out
+        assert "渴望" in out.split("### 关键词")[1]
+    
+    def test_reformat_to_file(self, json_path, tmp_path):
+        """测试写出到文件后可以重新加载"""
+        from src.result_loader import load_content
+        
+        output = str(tmp_path / "book.json.gz")
+        exit_code = main(['reformat', json_path, '-f', 'json-compact', '-o', output, '-q'])
+        
+        assert exit_code == 0
+        assert load_content(output) == load_content(json_path)
+    
+    def test_reformat_invalid_input(self, tmp_path, capsys):
+        """测试输入文件不存在或格式错误"""
+        invalid = tmp_path / "invalid.json"
+        invalid.write_text("不是 JSON", encoding="utf-8")
+        
+        assert main(['reformat', str(tmp_path / "missing.json")]) == 1
+        assert main(['reformat', str(invalid)]) == 1
+        assert "✗" in capsys.readouterr().err
@@ -0,0 +1,106 @@
+"""压缩输出模块单元测试"""
+
+import gzip
+import io
+import pytest
+
+from src.compression import (
+    BackgroundCompressor,
+    detect_compression,
+    open_input,
+    open_output,
+)
+
+
+TEXT = "第一页内容\nPage two\n" * 5000
+
+
+class TestDetectCompression:
+    """测试根据后缀识别压缩格式"""
+
+    def test_detect_compression(self):
+        """测试常见后缀"""
+        assert detect_compression("out.ndjson.gz") == "gzip"
+        assert detect_compression("out.json.ZST") == "zstd"
+        assert detect_compression("out.txt") is None
+        assert detect_compression("输出结果") is None
+
+
+class TestOpenOutput:
+    """测试压缩写出和透明读取"""
+
+    @pytest.mark.parametrize("suffix", [".txt", ".gz", ".zst"])
+    def test_round_trip(self, tmp_path, suffix):
+        """测试按后缀压缩并透明读取"""
+        if suffix == ".zst":
+            pytest.importorskip("zstandard")
+        path = str(tmp_path / f"out{suffix}")
+
+        with open_output(path) as f:
+            f.write(TEXT)
+        with open_input(path) as f:
+            assert f.read() == TEXT
+
+    def test_gzip_is_compressed(self, tmp_path):
+        """测试 gzip 输出可以被标准 gzip 模块读取"""
+        path = str(tmp_path / "out.gz")
+        with open_output(path) as f:
+            f.write(TEXT)
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert f.read() == TEXT
+        assert (tmp_path / "out.gz").stat().st_size < len(TEXT.encode("utf-8"))
+
+    def test_explicit_compression_overrides_suffix(self, tmp_path):
+        """测试显式指定压缩格式"""
+        path = str(tmp_path / "out.txt")
+        with open_output(path, compression="gzip") as f:
+            f.write(TEXT)
+        with open(path, "rb") as f:
+            assert f.read(2) == b"\x1f\x8b"
+        with open_input(path) as f:
+            assert f.read() == TEXT
+
+    @pytest.mark.parametrize("suffix", [".gz", ".zst"])
+    def test_append_members(self, tmp_path, suffix):
+        """测试追加写出多个压缩段后连续读取"""
+        if suffix == ".zst":
+            pytest.importorskip("zstandard")
+        path = str(tmp_path / f"corpus.ndjson{suffix}")
+
+        with open_output(path) as f:
+            f.write("第一个文档\n")
+        with open_output(path, append=True) as f:
+            f.write("第二个文档\n")
+        with open_input(path) as f:
+            assert f.read() == "第一个文档\n第二个文档\n"
+
+    def test_invalid_compression(self, tmp_path):
+        """测试不支持的压缩格式不创建文件"""
+        path = tmp_path / "out.bz2"
+        with pytest.raises(ValueError):
+            open_output(str(path), compression="bzip2")
+        assert not path.exists()
+
+
+class TestBackgroundCompressor:
+    """测试后台压缩线程"""
+
+    def test_write_error_raised_on_close(self):
+        """测试后台写出失败时在关闭时报告错误"""
+        class BrokenFile(io.BytesIO):
+            def write(self, data):
+                # 文件头可以写出，压缩数据写出失败
+                if len(data) > 100:
+                    raise OSError("磁盘已满")
+                return super().write(data)
+
+        compressor = BackgroundCompressor(BrokenFile(), "gzip")
+        compressor.write(TEXT.encode("utf-8"))
+        with pytest.raises(IOError):
+            compressor.close()
+        assert compressor.closed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
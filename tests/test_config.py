@@ -24,6 +24,8 @@ class TestExtractionConfig:
         assert config.extract_key_info is True
         assert config.max_keywords == 10
         assert config.summary_max_length == 200
+        assert config.summary_method == "lead"
+        assert config.summary_max_sentences == 2000
         assert config.default_output_format == "text"
         assert config.output_encoding == "utf-8"
         assert config.show_progress_threshold == 5
@@ -46,6 +48,11 @@ class TestExtractionConfig:
         assert config.summary_max_length == 500
         assert config.default_output_format == "json"
         assert config.log_level == "DEBUG"
+    
+    def test_invalid_summary_method(self):
+        """测试不支持的摘要算法"""
+        with pytest.raises(ValueError, match="不支持的摘要算法"):
+            ExtractionConfig(summary_method="bogus")
 
 
 class TestConfigManager:
@@ -105,6 +112,27 @@ class TestConfigManager:
             del os.environ["PDF_EXTRACTOR_MAX_KEYWORDS"]
             del os.environ["PDF_EXTRACTOR_LOG_LEVEL"]
     
+    def test_invalid_summary_method_from_env(self, monkeypatch):
+        """测试环境变量中不支持的摘要算法在加载时报错"""
+        monkeypatch.setenv("PDF_EXTRACTOR_SUMMARY_METHOD", "bogus")
+        with pytest.raises(ValueError, match="bogus"):
+            ConfigManager()
+        
+        monkeypatch.setenv("PDF_EXTRACTOR_SUMMARY_METHOD", "textrank")
+        assert ConfigManager().get_config().summary_method == "textrank"
+    
+    def test_invalid_summary_method_from_file(self, tmp_path):
+        """测试配置文件中不支持的摘要算法在加载时报错"""
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"summary_method": "bogus"}), encoding="utf-8")
+        with pytest.raises(ValueError, match="bogus"):
+            ConfigManager(str(config_file))
+    
+    def test_update_invalid_summary_method(self):
+        """测试更新为不支持的摘要算法"""
+        with pytest.raises(ValueError):
+            ConfigManager().update_config(summary_method="bogus")
+    
     def test_save_config(self):
         """测试保存配置到文件"""
         with TemporaryDirectory() as tmpdir:
@@ -0,0 +1,185 @@
+"""守护进程模式测试"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.daemon import ENV_NO_DAEMON, ENV_SOCKET, run_in_daemon, stop_daemon, daemon_main
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="需要 Unix socket")
+
+ENTRY_SCRIPT = str(Path(__file__).resolve().parent.parent / "pdf_extractor.py")
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建两页 PDF"""
+    pdf_path = tmp_path / "sample.pdf"
+    c = canvas.Canvas(str(pdf_path), pagesize=letter)
+    c.drawString(100, 750, "Daemon page one")
+    c.showPage()
+    c.drawString(100, 750, "Daemon page two")
+    c.showPage()
+    c.save()
+    return pdf_path
+
+
+@contextmanager
+def running_daemon(socket_path, *extra_args):
+    """在子进程中启动守护进程，退出时停止"""
+    process = subprocess.Popen(
+        [sys.executable, ENTRY_SCRIPT, "--daemon", "--socket", socket_path, "-j", "2", *extra_args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 60
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            pytest.fail("守护进程启动失败: " + process.stderr.read().decode("utf-8", "replace"))
+        time.sleep(0.05)
+    try:
+        yield socket_path
+    finally:
+        stop_daemon(socket_path)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stderr.close()
+
+
+@pytest.fixture
+def daemon_socket(tmp_path):
+    """在子进程中启动守护进程，返回 socket 路径"""
+    with running_daemon(str(tmp_path / "daemon.sock")) as socket_path:
+        yield socket_path
+
+
+def run_entry(args, cwd, socket_path=None, no_daemon=False):
+    """通过入口脚本执行一次命令行调用"""
+    env = {k: v for k, v in os.environ.items() if k not in (ENV_SOCKET, ENV_NO_DAEMON)}
+    if socket_path:
+        env[ENV_SOCKET] = socket_path
+    if no_daemon:
+        env[ENV_NO_DAEMON] = "1"
+    return subprocess.run(
+        [sys.executable, ENTRY_SCRIPT] + args,
+        cwd=str(cwd), env=env, capture_output=True, timeout=120,
+    )
+
+
+class TestRunInDaemon:
+    """测试客户端转发条件"""
+
+    def test_returns_none_without_daemon(self, tmp_path, monkeypatch):
+        """守护进程未运行时在当前进程执行"""
+        monkeypatch.delenv(ENV_NO_DAEMON, raising=False)
+        assert run_in_daemon(["test.pdf"], str(tmp_path / "missing.sock")) is None
+
+    def test_returns_none_for_stale_socket(self, tmp_path, monkeypatch):
+        """残留的 socket 文件（无进程监听）不影响执行"""
+        monkeypatch.delenv(ENV_NO_DAEMON, raising=False)
+        socket_path = str(tmp_path / "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        assert run_in_daemon(["test.pdf"], socket_path) is None
+
+    def test_disabled_by_environment(self, tmp_path, monkeypatch):
+        """设置 PDF_EXTRACTOR_NO_DAEMON 时不转发"""
+        monkeypatch.setenv(ENV_NO_DAEMON, "1")
+        assert run_in_daemon(["test.pdf"], str(tmp_path / "missing.sock")) is None
+
+    def test_unsupported_platform(self, monkeypatch, capsys):
+        """没有 os.getuid 的平台（如 Windows）在当前进程执行，--daemon 报错退出"""
+        monkeypatch.delenv(ENV_NO_DAEMON, raising=False)
+        monkeypatch.delenv(ENV_SOCKET, raising=False)
+        monkeypatch.delattr(os, "getuid")
+        assert run_in_daemon(["test.pdf"]) is None
+        assert stop_daemon() is False
+        assert daemon_main([]) == 1
+        assert "不支持" in capsys.readouterr().err
+
+    def test_daemon_command_not_forwarded(self, tmp_path, monkeypatch):
+        """--daemon 自身不转发"""
+        monkeypatch.delenv(ENV_NO_DAEMON, raising=False)
+        assert run_in_daemon(["--daemon", "--stop"], str(tmp_path / "missing.sock")) is None
+
+    def test_stop_without_daemon(self, tmp_path, capsys):
+        """守护进程未运行时 --stop 返回失败"""
+        assert daemon_main(["--stop", "--socket", str(tmp_path / "missing.sock")]) == 1
+        assert "守护进程未运行" in capsys.readouterr().err
+
+
+class TestDaemonIntegration:
+    """测试经守护进程执行的结果与进程内执行一致"""
+
+    def test_stdout_matches_in_process(self, sample_pdf, daemon_socket):
+        """标准输出和退出码与进程内执行相同"""
+        args = [sample_pdf.name, "--no-key-info", "-q"]
+        via_daemon = run_entry(args, sample_pdf.parent, socket_path=daemon_socket)
+        in_process = run_entry(args, sample_pdf.parent, no_daemon=True)
+
+        assert via_daemon.returncode == in_process.returncode == 0
+        assert via_daemon.stdout == in_process.stdout
+        assert b"Daemon page two" in via_daemon.stdout
+
+    def test_relative_output_path_uses_client_cwd(self, sample_pdf, daemon_socket):
+        """相对路径按客户端的工作目录解析"""
+        result = run_entry(
+            [sample_pdf.name, "--no-key-info", "-f", "json", "-o", "out.json"],
+            sample_pdf.parent, socket_path=daemon_socket,
+        )
+        assert result.returncode == 0
+        assert (sample_pdf.parent / "out.json").exists()
+
+    def test_error_exit_code_forwarded(self, tmp_path, daemon_socket):
+        """错误信息写到标准错误，退出码透传"""
+        result = run_entry(["missing.pdf"], tmp_path, socket_path=daemon_socket)
+        assert result.returncode == 1
+        assert result.stdout == b""
+        assert "找不到文件" in result.stderr.decode("utf-8")
+
+    def test_argument_error_exit_code_forwarded(self, tmp_path, daemon_socket):
+        """参数错误的退出码为 2"""
+        result = run_entry(["x.pdf", "-f", "bogus"], tmp_path, socket_path=daemon_socket)
+        assert result.returncode == 2
+
+    def test_stop(self, tmp_path, daemon_socket):
+        """--daemon --stop 停止守护进程并删除 socket"""
+        result = run_entry(["--daemon", "--stop", "--socket", daemon_socket], tmp_path)
+        assert result.returncode == 0
+        deadline = time.monotonic() + 10
+        while os.path.exists(daemon_socket) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not os.path.exists(daemon_socket)
+
+    def test_metrics_file(self, sample_pdf, tmp_path):
+        """--metrics 在每次请求结束时写出各工作进程合并后的运行指标"""
+        metrics_path = tmp_path / "daemon.prom"
+        with running_daemon(str(tmp_path / "metrics.sock"), "--metrics", str(metrics_path)) as socket_path:
+            for _ in range(2):
+                result = run_entry([sample_pdf.name, "--no-key-info", "-q"], sample_pdf.parent,
+                                   socket_path=socket_path)
+                assert result.returncode == 0
+            assert run_entry(["missing.pdf"], tmp_path, socket_path=socket_path).returncode == 1
+
+            text = metrics_path.read_text(encoding="utf-8")
+            assert "pdf_extractor_documents_total 2\n" in text
+            assert "pdf_extractor_pages_total 4\n" in text
+            assert 'pdf_extractor_errors_total{type="FileNotFoundError"} 1\n' in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""持久化任务队列单元测试"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.job_queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_RUNNING,
+    JobQueue,
+    worker_id,
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """包含三个任务的队列"""
+    queue = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+    queue.enqueue([(f"{name}.pdf", f"out/{name}.json") for name in ("a", "b", "c")])
+    yield queue
+    queue.close()
+
+
+def _claim_all(path, results):
+    """子进程：领取并完成任务，直到队列为空"""
+    with JobQueue(path) as queue:
+        while True:
+            job = queue.claim()
+            if job is None:
+                return
+            results.put(job.input_path)
+            queue.complete(job.id)
+
+
+class TestJobQueue:
+    """测试任务状态流转"""
+
+    def test_enqueue_ignores_existing(self, queue):
+        """已在队列中的文件不重复添加"""
+        assert queue.enqueue([("a.pdf", "out/a.json"), ("d.pdf", "out/d.json")]) == 1
+        assert queue.counts()[STATUS_PENDING] == 4
+
+    def test_claim_in_order(self, queue):
+        """按添加顺序领取，领取后为 running"""
+        job = queue.claim("host:1")
+        assert job.input_path == "a.pdf"
+        assert job.status == STATUS_RUNNING
+        assert job.attempts == 1
+        assert queue.claim("host:1").input_path == "b.pdf"
+        assert queue.counts() == {
+            STATUS_PENDING: 1, STATUS_RUNNING: 2, STATUS_DONE: 0, STATUS_FAILED: 0
+        }
+
+    def test_complete_records_timings(self, queue):
+        """完成后记录结束时间和耗时"""
+        queue.complete(queue.claim().id)
+        job = queue.jobs(STATUS_DONE)[0]
+        assert job.finished_at >= job.started_at >= job.enqueued_at
+        assert job.duration == pytest.approx(job.finished_at - job.started_at)
+
+    def test_done_jobs_not_claimed_again(self, queue):
+        """已完成的任务不再领取"""
+        for _ in range(3):
+            queue.complete(queue.claim().id)
+        assert queue.claim() is None
+
+    def test_failed_job_retried_until_limit(self, queue):
+        """失败的任务在待处理任务之后重试，达到次数上限后不再领取"""
+        first = queue.claim()
+        queue.fail(first.id, "页面损坏")
+        assert queue.claim().input_path == "b.pdf"
+        assert queue.claim().input_path == "c.pdf"
+
+        retry = queue.claim()
+        assert retry.id == first.id
+        assert retry.attempts == 2
+        queue.fail(retry.id, "页面损坏")
+
+        assert queue.claim() is None
+        assert queue.exhausted_count() == 1
+        failed = queue.jobs(STATUS_FAILED)[0]
+        assert failed.error == "页面损坏"
+
+    def test_release_does_not_count_attempt(self, queue):
+        """放回的任务不计入尝试次数"""
+        job = queue.claim()
+        queue.release(job.id)
+        again = queue.claim()
+        assert again.id == job.id
+        assert again.attempts == 1
+
+    def test_resubmit_resets_finished_jobs(self, queue):
+        """重新提交的已完成 / 失败任务回到待处理并清零尝试次数，处理中的任务不变"""
+        done = queue.claim()
+        queue.complete(done.id)
+        failed = queue.claim()
+        queue.fail(failed.id, "页面损坏")
+        running = queue.claim()
+
+        submitted = queue.resubmit([
+            ("a.pdf", "out/a.json"), ("b.pdf", "out/b.json"),
+            ("c.pdf", "out/c.json"), ("d.pdf", "out/d.json"),
+        ])
+
+        assert submitted == 3
+        jobs = {job.input_path: job for job in queue.jobs()}
+        assert jobs["a.pdf"].status == STATUS_PENDING
+        assert jobs["b.pdf"].attempts == 0
+        assert jobs["b.pdf"].error is None
+        assert jobs["c.pdf"].status == STATUS_RUNNING
+        assert jobs["d.pdf"].status == STATUS_PENDING
+        assert running.input_path == "c.pdf"
+
+    def test_recover_stale_running_job(self, queue):
+        """工作进程已退出的 running 任务记为一次失败"""
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        dead = queue.claim(worker_id().rsplit(":", 1)[0] + f":{process.pid}")
+        alive = queue.claim()
+
+        assert queue.recover_stale() == 1
+        statuses = {job.id: job for job in queue.jobs()}
+        assert statuses[dead.id].status == STATUS_FAILED
+        assert "异常退出" in statuses[dead.id].error
+        assert statuses[alive.id].status == STATUS_RUNNING
+
+    def test_persistent_across_connections(self, queue, tmp_path):
+        """状态保存在数据库中，重新打开后保持"""
+        queue.complete(queue.claim().id)
+        with JobQueue(str(tmp_path / "jobs.db")) as reopened:
+            assert reopened.counts()[STATUS_DONE] == 1
+
+    def test_concurrent_claims(self, tmp_path):
+        """多个进程同时领取时每个任务只被领取一次"""
+        path = str(tmp_path / "jobs.db")
+        with JobQueue(path) as queue:
+            queue.enqueue([(f"{i}.pdf", f"{i}.json") for i in range(200)])
+
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_claim_all, args=(path, results)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        claimed = [results.get(timeout=60) for _ in range(200)]
+        for process in processes:
+            process.join()
+
+        assert sorted(claimed) == sorted(f"{i}.pdf" for i in range(200))
+        with JobQueue(path) as queue:
+            assert queue.counts()[STATUS_DONE] == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,61 @@
+"""JSON 序列化模块单元测试"""
+
+import json
+import pytest
+
+from src import json_serializer
+from src.json_serializer import JSONSerializer
+
+
+# 覆盖 orjson 与标准库写法不同的各类值
+SAMPLE_VALUES = [
+    "中文文本\n含有\"引号\"、\\反斜杠\t和控制字符\x00\x1f\x7f",
+    "  \U0001f600",
+    "\ud800 孤立代理字符",
+    {"page_number": 1, "text": "第一页", "char_count": 3, "is_empty": False},
+    {"extraction_time": 0.0087599, "stage_timings": {"keywords": 5e-06}},
+    [1e16, 1.5e-07, 0.1, -0.0, 123456789.123],
+    [float("nan"), float("inf")],
+    [2 ** 70, -2 ** 63, 2 ** 64 - 1],
+    {"headings": [], "lists": {}, "summary": None},
+    ("元组", 1),
+]
+
+
+class TestJSONSerializer:
+    """测试两种后端的输出一致"""
+
+    @pytest.mark.parametrize("value", SAMPLE_VALUES)
+    def test_compact_matches_stdlib(self, value):
+        """测试紧凑格式与 json.dumps 一致"""
+        expected = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        assert JSONSerializer().encode(value) == expected
+        assert JSONSerializer(backend="json").encode(value) == expected
+
+    @pytest.mark.parametrize("value", SAMPLE_VALUES)
+    def test_indent_matches_stdlib(self, value):
+        """测试 2 空格缩进与 json.dumps(indent=2) 一致"""
+        expected = json.dumps(value, ensure_ascii=False, indent=2)
+        assert JSONSerializer(indent=2).encode(value) == expected
+
+    def test_unsupported_layout_uses_stdlib(self):
+        """测试 orjson 不支持的布局回退到标准库"""
+        assert JSONSerializer(indent=4).backend == "json"
+        assert JSONSerializer(separators=(', ', ': ')).backend == "json"
+        assert JSONSerializer(separators=(', ', ': ')).encode([1, 2]) == "[1, 2]"
+
+    def test_invalid_backend(self):
+        """测试不支持的后端"""
+        with pytest.raises(ValueError):
+            JSONSerializer(backend="simplejson")
+
+    def test_orjson_backend_selected(self):
+        """测试安装 orjson 时默认使用 orjson"""
+        pytest.importorskip("orjson")
+        assert json_serializer.DEFAULT_BACKEND == "orjson"
+        assert JSONSerializer().backend == "orjson"
+        assert JSONSerializer(indent=2).backend == "orjson"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,7 +1,11 @@
 """KeyInfoAnalyzer 单元测试"""
 
+import os
+import subprocess
+import sys
+
 import pytest
-from src.key_info_analyzer import KeyInfoAnalyzer
+from src.key_info_analyzer import KeyInfoAnalyzer, available_stages, parse_stages
 
 
 class TestKeyInfoAnalyzer:
@@ -126,7 +130,19 @@ class TestKeyInfoAnalyzer:
         assert "第一句" in summary
         # 摘要应该短于原文
         assert len(summary) < len(text)
-    
+
+    def test_generate_summary_keeps_sentence_endings(self):
+        """测试摘要保留句末标点"""
+        text = "第一句话。第二句话！第三句话？第四句话。第五句话。"
+        summary = self.analyzer.generate_summary(text, max_length=15)
+        assert summary == "第一句话。第二句话！第三句话？"
+
+    def test_generate_summary_large_document(self):
+        """测试大文档只取开头部分"""
+        text = "   " + "这是一段很长的文本。" * 100000
+        summary = self.analyzer.generate_summary(text, max_length=30)
+        assert summary == "这是一段很长的文本。" * 3
+
     # ========== extract_lists 测试 ==========
     
     def test_extract_lists_empty_text(self):
@@ -185,5 +201,65 @@ class TestKeyInfoAnalyzer:
         assert lists[1] == "编号项"
 
 
+class TestAnalyzerStages:
+    """分析阶段注册表测试"""
+    
+    def test_available_stages(self):
+        """测试内置阶段"""
+        assert available_stages() == ["headings", "keywords", "summary", "lists"]
+    
+    def test_parse_stages(self):
+        """测试阶段解析按注册顺序去重"""
+        assert parse_stages("summary, keywords,summary") == ["keywords", "summary"]
+        assert parse_stages(["lists"]) == ["lists"]
+        assert parse_stages("all") == available_stages()
+        assert parse_stages(None) == available_stages()
+    
+    def test_parse_stages_invalid(self):
+        """测试不支持的阶段名"""
+        with pytest.raises(ValueError):
+            parse_stages("keywords,unknown")
+        with pytest.raises(ValueError):
+            parse_stages("")
+    
+    def test_analyze_selected_stages_only(self):
+        """测试只执行选定的阶段并记录耗时"""
+        analyzer = KeyInfoAnalyzer()
+        text = "第一章 引言\n这是正文内容。\n- 第一项"
+        key_info = analyzer.analyze(text, stages="headings,lists")
+        
+        assert "第一章 引言" in key_info.headings
+        assert key_info.lists == ["第一项"]
+        assert key_info.keywords == []
+        assert key_info.summary == ""
+        assert list(key_info.stage_timings) == ["headings", "lists"]
+        assert all(elapsed >= 0 for elapsed in key_info.stage_timings.values())
+    
+    def test_analyze_stage_failure_keeps_other_results(self, monkeypatch):
+        """测试单个阶段失败不影响其他阶段"""
+        analyzer = KeyInfoAnalyzer()
+        
+        def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+        monkeypatch.setattr(analyzer, "extract_headings", fail)
+        
+        key_info = analyzer.analyze("- 第一项", stages="headings,lists")
+        assert key_info.headings == []
+        assert key_info.lists == ["第一项"]
+        assert "headings" in key_info.stage_timings
+    
+    def test_unused_stage_imports_not_loaded(self):
+        """测试未选择的阶段不加载 jieba"""
+        code = (
+            "import sys\n"
+            "from src.key_info_analyzer import KeyInfoAnalyzer\n"
+            "KeyInfoAnalyzer().analyze('第一章\\n- 项目', stages='headings,lists')\n"
+            "assert 'jieba' not in sys.modules\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root)
+        assert result.returncode == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
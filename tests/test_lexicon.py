@@ -0,0 +1,98 @@
+"""词表管理模块单元测试"""
+
+import os
+import pytest
+from tempfile import TemporaryDirectory
+
+from src import lexicon as lexicon_module
+from src.lexicon import (
+    DEFAULT_STOPWORDS,
+    Lexicon,
+    get_lexicon,
+    get_lexicon_from_config,
+    read_word_file,
+)
+from src.config import ExtractionConfig
+from src.key_info_analyzer import KeyInfoAnalyzer
+
+
+def write_file(directory: str, name: str, content: str) -> str:
+    """写入临时词表文件"""
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+class TestLexicon:
+    """测试词表加载与缓存"""
+    
+    def test_default_lexicon(self):
+        """测试内置词表"""
+        lexicon = get_lexicon()
+        assert isinstance(lexicon, Lexicon)
+        assert isinstance(lexicon.stopwords, frozenset)
+        assert lexicon.stopwords == DEFAULT_STOPWORDS
+        assert "the" in lexicon.english_stopwords
+    
+    def test_default_lexicon_is_cached(self):
+        """测试相同参数返回同一个对象"""
+        assert get_lexicon() is get_lexicon()
+        assert get_lexicon_from_config(ExtractionConfig()) is get_lexicon()
+    
+    def test_is_punctuation(self):
+        """测试标点判断"""
+        lexicon = get_lexicon()
+        assert lexicon.is_punctuation("，。")
+        assert lexicon.is_punctuation("“”")
+        assert not lexicon.is_punctuation("价值，")
+    
+    def test_read_word_file_skips_comments(self):
+        """测试词表文件忽略注释和空行"""
+        with TemporaryDirectory() as tmpdir:
+            path = write_file(tmpdir, "words.txt", "# 注释\n价值\n\n  投资  \n")
+            assert read_word_file(path) == ["价值", "投资"]
+    
+    def test_read_word_file_missing(self):
+        """测试词表文件不存在"""
+        with pytest.raises(IOError):
+            read_word_file("/nonexistent/words.txt")
+    
+    def test_custom_files_are_merged(self):
+        """测试自定义词表合并到内置词表"""
+        with TemporaryDirectory() as tmpdir:
+            stopwords = write_file(tmpdir, "stop.txt", "投资\n")
+            english = write_file(tmpdir, "en.txt", "Desire\n")
+            punctuation = write_file(tmpdir, "punct.txt", "~·\n")
+            
+            lexicon = get_lexicon(
+                stopwords_file=stopwords,
+                english_stopwords_file=english,
+                punctuation_file=punctuation
+            )
+            
+            assert "投资" in lexicon.stopwords
+            assert "的" in lexicon.stopwords
+            assert "desire" in lexicon.english_stopwords
+            assert lexicon.is_punctuation("~·")
+    
+    def test_user_dict_loaded_once(self, monkeypatch):
+        """测试自定义词典只加载一次"""
+        calls = []
+        monkeypatch.setattr(lexicon_module.jieba, "load_userdict", calls.append)
+        monkeypatch.setattr(lexicon_module, "_loaded_user_dicts", set())
+        
+        with TemporaryDirectory() as tmpdir:
+            path = write_file(tmpdir, "dict.txt", "安全边际 10 n\n")
+            lexicon_module.load_user_dicts([path])
+            lexicon_module.load_user_dicts([path])
+        
+        assert len(calls) == 1
+    
+    def test_analyzer_uses_custom_stopwords(self):
+        """测试分析器使用自定义停用词"""
+        with TemporaryDirectory() as tmpdir:
+            stopwords = write_file(tmpdir, "stop.txt", "人工智能\n")
+            analyzer = KeyInfoAnalyzer(lexicon=get_lexicon(stopwords_file=stopwords))
+            keywords = analyzer.extract_keywords("人工智能改变世界。人工智能推动发展。", top_n=10)
+            assert "人工智能" not in keywords
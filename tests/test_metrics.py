@@ -0,0 +1,273 @@
+"""运行指标测试"""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src import metrics
+from src.cli import main
+from src.exceptions import FileNotFoundError as PDFFileNotFoundError
+from src.metrics import METRICS_DIR_ENV_VAR, MetricsExporter, MetricsRegistry, PeriodicWriter
+from src.models import StageTimings
+from src.pdf_extraction_service import PDFExtractionService
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """创建 2 页 PDF"""
+    path = tmp_path / "metered.pdf"
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for i in range(2):
+        c.drawString(100, 750, f"Metered page {i + 1} about extraction metrics")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+@pytest.fixture
+def shared_dir(tmp_path):
+    """启用多进程共享，测试结束时停止并清空当前进程的指标"""
+    directory = str(tmp_path / "metrics")
+    metrics.REGISTRY.clear()
+    metrics.enable_shared(directory)
+    yield directory
+    metrics.disable_shared()
+    metrics.REGISTRY.clear()
+
+
+def parse_samples(text):
+    """{样本名（含标签）: 值}"""
+    return {
+        name: float(value)
+        for name, value in (line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+    }
+
+
+def _record_in_child(pages):
+    metrics.record_extraction(StageTimings(open=0.01, extract=0.2, pages=[0.1] * pages, total=0.3))
+
+
+class TestRegistry:
+    """测试指标的记录和文本格式"""
+
+    def test_render(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.inc("documents_total")
+        registry.inc("documents_total", 2)
+        registry.inc("errors_total", type='Bad"Name')
+        registry.set_gauge("queue_depth", 3)
+        for value in (0.05, 0.1, 0.5, 7.0):
+            registry.observe("stage_duration_seconds", value, stage="extract")
+
+        lines = registry.render().splitlines()
+        assert lines[:3] == [
+            "# HELP pdf_extractor_documents_total 提取完成的文档数",
+            "# TYPE pdf_extractor_documents_total counter",
+            "pdf_extractor_documents_total 3",
+        ]
+        assert 'pdf_extractor_errors_total{type="Bad\\"Name"} 1' in lines
+        assert "# TYPE pdf_extractor_queue_depth gauge" in lines
+        assert "pdf_extractor_queue_depth 3" in lines
+        assert "# TYPE pdf_extractor_stage_duration_seconds histogram" in lines
+        # 桶的计数是累加的，边界值计入该桶
+        assert lines[-5:] == [
+            'pdf_extractor_stage_duration_seconds_bucket{stage="extract",le="0.1"} 2',
+            'pdf_extractor_stage_duration_seconds_bucket{stage="extract",le="1"} 3',
+            'pdf_extractor_stage_duration_seconds_bucket{stage="extract",le="+Inf"} 4',
+            'pdf_extractor_stage_duration_seconds_sum{stage="extract"} 7.65',
+            'pdf_extractor_stage_duration_seconds_count{stage="extract"} 4',
+        ]
+
+    def test_empty_render(self):
+        assert MetricsRegistry().render() == ""
+
+    def test_unknown_metric(self):
+        with pytest.raises(ValueError):
+            MetricsRegistry().inc("bogus_total")
+
+    def test_merge(self):
+        """计数器和直方图相加"""
+        a = MetricsRegistry()
+        b = MetricsRegistry()
+        a.inc("pages_total", 2)
+        b.inc("pages_total", 3)
+        a.observe("page_duration_seconds", 0.2)
+        b.observe("page_duration_seconds", 0.3)
+
+        merged = MetricsRegistry()
+        merged.merge(a.to_dict())
+        merged.merge(b.to_dict())
+        assert merged.counter_value("pages_total") == 5
+        samples = parse_samples(merged.render())
+        assert samples["pdf_extractor_page_duration_seconds_count"] == 2
+        assert samples["pdf_extractor_page_duration_seconds_sum"] == pytest.approx(0.5)
+
+        with pytest.raises(ValueError):
+            MetricsRegistry(buckets=(1.0,)).merge(a.to_dict())
+
+
+class TestShared:
+    """测试多进程合并"""
+
+    def test_forked_children(self, shared_dir):
+        """fork 出的子进程从零开始计数，导出时合并所有进程"""
+        _record_in_child(1)
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=_record_in_child, args=(3,)) for _ in range(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert os.environ[METRICS_DIR_ENV_VAR] == shared_dir
+        names = os.listdir(shared_dir)
+        assert len(names) == 3
+        assert {name.split("-")[0] for name in names} == {str(os.getpid())} | {str(p.pid) for p in processes}
+        samples = parse_samples(MetricsExporter().render())
+        assert samples["pdf_extractor_documents_total"] == 3
+        assert samples["pdf_extractor_pages_total"] == 7
+        assert samples['pdf_extractor_stage_duration_seconds_count{stage="open"}'] == 3
+
+    def test_pid_reuse(self, shared_dir):
+        """进程号被复用时不覆盖已退出进程的文件，计数不回退"""
+        exited = MetricsRegistry()
+        exited.inc("documents_total", 5)
+        with open(os.path.join(shared_dir, f"{os.getpid()}-1.json"), "w", encoding="utf-8") as f:
+            json.dump(exited.to_dict(), f)
+
+        _record_in_child(1)
+        assert len(os.listdir(shared_dir)) == 2
+        assert metrics.collect().counter_value("documents_total") == 6
+
+    def test_disable(self, shared_dir):
+        metrics.disable_shared()
+        assert METRICS_DIR_ENV_VAR not in os.environ
+        _record_in_child(1)
+        assert os.listdir(shared_dir) == []
+        assert metrics.collect().counter_value("documents_total") == 1
+
+    def test_import_without_fork(self):
+        """没有 os.register_at_fork 的平台（Windows）也能导入提取服务"""
+        code = "import os\ndel os.fork, os.register_at_fork\nimport src.pdf_extraction_service\n"
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+class TestExtractionMetrics:
+    """测试提取流程更新的指标"""
+
+    def test_success_and_error(self, pdf_path, shared_dir, tmp_path):
+        service = PDFExtractionService()
+        service.extract(pdf_path, "text", extract_key_info=False, output_file=str(tmp_path / "out.txt"))
+        with pytest.raises(PDFFileNotFoundError):
+            service.extract(str(tmp_path / "missing.pdf"), "text")
+
+        registry = metrics.collect()
+        assert registry.counter_value("documents_total") == 1
+        assert registry.counter_value("pages_total") == 2
+        assert registry.counter_value("errors_total", type="FileNotFoundError") == 1
+        # 逐页写出到文件时记录第一页写出的耗时
+        samples = parse_samples(registry.render())
+        assert samples["pdf_extractor_first_page_seconds_count"] == 1
+
+    def test_interrupted(self, pdf_path, shared_dir, monkeypatch):
+        """被中断的文档不计入完成的文档、页数和耗时"""
+        service = PDFExtractionService()
+
+        def interrupt(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(service.extractor, "extract_all_text", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            service.extract(pdf_path, "text", extract_key_info=False)
+
+        registry = metrics.collect()
+        assert registry.counter_value("documents_total") == 0
+        assert registry.counter_value("errors_total") == 0
+        assert "document_duration_seconds" not in registry.render()
+
+    def test_restored_pages_and_skipped_stages(self, shared_dir):
+        """从检查点恢复的页面不计入页数和每页耗时，未执行的阶段不记录"""
+        metrics.record_extraction(StageTimings(
+            open=0.01, extract=0.5, pages=[0.0] * 8 + [0.25, 0.25], write=0.02, total=0.6,
+            restored_pages=8
+        ))
+
+        samples = parse_samples(metrics.collect().render())
+        assert samples["pdf_extractor_pages_total"] == 2
+        assert samples["pdf_extractor_page_duration_seconds_count"] == 2
+        assert samples['pdf_extractor_stage_duration_seconds_count{stage="write"}'] == 1
+        assert 'pdf_extractor_stage_duration_seconds_count{stage="analysis"}' not in samples
+        assert 'pdf_extractor_stage_duration_seconds_count{stage="format"}' not in samples
+
+    def test_cache_hit_ratio(self, shared_dir):
+        """缓存查询只在内存中计数，导出时写出"""
+        metrics.record_cache("lexicon", hit=False)
+        for _ in range(3):
+            metrics.record_cache("lexicon", hit=True)
+        assert os.listdir(shared_dir) == []
+
+        samples = parse_samples(MetricsExporter().render())
+        assert samples['pdf_extractor_cache_requests_total{cache="lexicon",result="hit"}'] == 3
+        assert samples['pdf_extractor_cache_hit_ratio{cache="lexicon"}'] == 0.75
+
+
+class TestExporter:
+    """测试导出"""
+
+    def test_gauges_and_throughput(self, shared_dir):
+        now = [100.0]
+        exporter = MetricsExporter(clock=lambda: now[0])
+        _record_in_child(1)
+        _record_in_child(1)
+        now[0] = 104.0
+
+        samples = parse_samples(exporter.render({"queue_depth": 5, "jobs_running": 2}))
+        assert samples["pdf_extractor_queue_depth"] == 5
+        assert samples["pdf_extractor_jobs_running"] == 2
+        assert samples["pdf_extractor_documents_per_second"] == 0.5
+
+    def test_periodic_writer(self, shared_dir, tmp_path):
+        """停止时写出最终结果"""
+        path = tmp_path / "pdf_extractor.prom"
+        writer = PeriodicWriter(MetricsExporter(), str(path), 60, lambda: {"queue_depth": 0})
+        writer.start()
+        _record_in_child(2)
+        writer.stop()
+        samples = parse_samples(path.read_text(encoding="utf-8"))
+        assert samples["pdf_extractor_pages_total"] == 2
+        assert samples["pdf_extractor_queue_depth"] == 0
+
+    def test_write_error(self, tmp_path):
+        with pytest.raises(IOError):
+            MetricsExporter().write(str(tmp_path / "missing" / "out.prom"))
+
+
+class TestCLIMetrics:
+    """测试批处理的 --metrics"""
+
+    def test_batch_metrics(self, pdf_path, tmp_path):
+        path = tmp_path / "batch.prom"
+        assert main(["batch", pdf_path, str(tmp_path / "missing.pdf"), "-d", str(tmp_path / "out"),
+                     "-j", "2", "--no-key-info", "--max-attempts", "1",
+                     "--metrics", str(path), "-q"]) == 1
+        assert METRICS_DIR_ENV_VAR not in os.environ
+
+        samples = parse_samples(path.read_text(encoding="utf-8"))
+        assert samples["pdf_extractor_documents_total"] == 1
+        assert samples["pdf_extractor_pages_total"] == 2
+        assert samples['pdf_extractor_errors_total{type="FileNotFoundError"}'] == 1
+        assert samples["pdf_extractor_queue_depth"] == 0
+        assert samples["pdf_extractor_jobs_running"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,7 +1,7 @@
 """测试核心数据模型"""
 
 import pytest
-from src.models import PDFDocument, PageText, KeyInformation, ExtractedContent
+from src.models import PDFDocument, PageComplexity, PageText, KeyInformation, ExtractedContent, StageTimings
 
 
 class TestPDFDocument:
@@ -47,6 +47,51 @@ class TestPageText:
         assert page.is_empty is True
 
 
+class TestStageTimings:
+    """测试 StageTimings 的慢页面分析"""
+    
+    def test_slowest_pages(self):
+        """按耗时排序，没有复杂度记录的页面为 None"""
+        timings = StageTimings(
+            pages=[0.0, 0.5, 0.1, 0.3],
+            page_complexity=[PageComplexity(page_number=i, chars=10) for i in (1, 2, 3)]
+        )
+        
+        slowest = timings.slowest_pages(top=3)
+        
+        assert [(page, elapsed) for page, elapsed, _ in slowest] == [(1, 0.5), (3, 0.3), (2, 0.1)]
+        assert slowest[0][2].page_number == 1
+        assert timings.slowest_pages(top=10)[-1] == (0, 0.0, None)
+    
+    def test_complexity_correlation(self):
+        """耗时随矩形数增长时相关系数接近 1，各页相同的计数为 None"""
+        timings = StageTimings(
+            pages=[0.1, 0.2, 0.3, 0.4],
+            page_complexity=[
+                PageComplexity(page_number=i, chars=50, rects=100 * i, images=(i + 1) % 2)
+                for i in range(4)
+            ]
+        )
+        
+        correlation = timings.complexity_correlation()
+        
+        assert correlation["rects"] == pytest.approx(1.0)
+        assert correlation["images"] == pytest.approx(-0.447, abs=1e-3)
+        assert correlation["chars"] is None
+        assert StageTimings(pages=[0.1]).complexity_correlation()["rects"] is None
+    
+    def test_throughput_excludes_restored_pages(self):
+        """从检查点恢复的页面和字符不计入吞吐量"""
+        timings = StageTimings(
+            extract=0.5, pages=[0.0] * 8 + [0.25, 0.25], char_count=1000,
+            restored_pages=8, restored_chars=800
+        )
+        
+        assert timings.extracted_pages == 2
+        assert timings.pages_per_second == pytest.approx(4.0)
+        assert timings.chars_per_second == pytest.approx(400.0)
+
+
 class TestKeyInformation:
     """测试 KeyInformation 类"""
     
@@ -130,6 +130,22 @@ class TestOutputFormatter:
         assert data["key_info"]["keywords"] == ["测试", "文档"]
         assert data["key_info"]["summary"] == "这是一个测试文档。"
         assert data["key_info"]["lists"] == ["- 项目1", "- 项目2"]
+        assert data["key_info"]["stage_timings"] == {}
+    
+    def test_format_stage_timings(self, formatter, content_with_key_info):
+        """测试输出各分析阶段耗时"""
+        content_with_key_info.key_info.stage_timings = {"keywords": 0.25, "summary": 0.001}
+        
+        data = json.loads(formatter.format_as_json(content_with_key_info))
+        assert data["key_info"]["stage_timings"] == {"keywords": 0.25, "summary": 0.001}
+        
+        text = formatter.format_as_text(content_with_key_info)
+        assert "分析耗时:" in text
+        assert "keywords: 0.250 秒" in text
+        
+        markdown = formatter.format_as_markdown(content_with_key_info)
+        assert "### 分析耗时" in markdown
+        assert "- summary: 0.001 秒" in markdown
     
     def test_format_as_json_with_errors(self, formatter, content_with_errors):
         """测试 JSON 格式化 - 包含错误"""
@@ -186,6 +202,124 @@ class TestOutputFormatter:
         assert "- 第 2 页提取失败：页面损坏" in result
         assert "*(空页面)*" in result
     
+    @pytest.mark.parametrize("output_format", ["text", "json", "markdown"])
+    def test_write_matches_format(self, formatter, content_with_key_info, output_format):
+        """测试逐页写出与一次性格式化的结果完全一致"""
+        import io
+        
+        stream = io.StringIO()
+        formatter.write(content_with_key_info, output_format, stream)
+        expected = getattr(formatter, f"format_as_{output_format}")(content_with_key_info)
+        assert stream.getvalue() == expected
+    
+    def test_json_writer_matches_json_dumps(self, formatter, content_with_errors):
+        """测试增量 JSON 与 json.dumps 的结果逐字节一致"""
+        content_with_errors.key_info = KeyInformation(
+            headings=["标题"], stage_timings={"headings": 0.5}
+        )
+        content_with_errors.pages[0].text = '含有"引号"\n和换行\t'
+        
+        data = json.loads(formatter.format_as_json(content_with_errors))
+        assert formatter.format_as_json(content_with_errors) == json.dumps(
+            data, ensure_ascii=False, indent=2
+        )
+    
+    def test_json_writer_empty_pages(self, formatter):
+        """测试没有页面时的 JSON 输出"""
+        content = ExtractedContent(file_path="empty.pdf", page_count=0, pages=[])
+        result = formatter.format_as_json(content)
+        assert '"pages": []' in result
+        assert json.loads(result)["pages"] == []
+    
+    def test_write_invalid_format(self, formatter, simple_content):
+        """测试不支持的输出格式"""
+        import io
+        
+        with pytest.raises(ValueError):
+            formatter.write(simple_content, "xml", io.StringIO())
+    
+    def test_write_to_file(self, formatter, simple_content):
+        """测试逐页写出到文件"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.md")
+            message = formatter.write_to_file(simple_content, "markdown", path)
+            
+            assert "文件保存成功" in message
+            with open(path, 'r', encoding='utf-8') as f:
+                assert f.read() == formatter.format_as_markdown(simple_content)
+    
+    def test_write_to_file_invalid_format_creates_nothing(self, formatter, simple_content):
+        """测试格式错误时不创建文件"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.xml")
+            with pytest.raises(ValueError):
+                formatter.write_to_file(simple_content, "xml", path)
+            assert not os.path.exists(path)
+    
+    def test_ndjson_records(self, formatter, content_with_errors):
+        """测试 NDJSON 每行一条记录"""
+        content_with_errors.key_info = KeyInformation(keywords=["关键词"])
+        result = formatter.format_as(content_with_errors, "ndjson")
+        
+        assert result.endswith("\n")
+        records = [json.loads(line) for line in result.splitlines()]
+        types = [record["type"] for record in records]
+        assert types == ["document"] + ["page"] * len(content_with_errors.pages) + [
+            "key_info", "errors", "end"
+        ]
+        assert all(record["file_path"] == content_with_errors.file_path for record in records)
+        assert records[1]["page_number"] == 1
+        assert records[-3] == {
+            "type": "key_info",
+            "file_path": content_with_errors.file_path,
+            "keywords": ["关键词"]
+        }
+    
+    def test_write_to_file_append(self, formatter, simple_content):
+        """测试 NDJSON 追加写出多个文档"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "corpus.ndjson")
+            formatter.write_to_file(simple_content, "ndjson", path)
+            formatter.write_to_file(simple_content, "ndjson", path, append=True)
+            
+            with open(path, 'r', encoding='utf-8') as f:
+                types = [json.loads(line)["type"] for line in f]
+            assert types.count("document") == 2
+            assert types.count("end") == 2
+    
+    def test_page_store_records(self, formatter, content_with_errors):
+        """测试 pages 格式每行一条 JSON 记录，索引偏移指向各页记录"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "book.pages")
+            formatter.write_to_file(content_with_errors, "pages", path)
+            
+            with open(path, 'rb') as f:
+                data = f.read()
+            records = [json.loads(line) for line in data.decode('utf-8').splitlines()]
+            assert records[0]["format"] == "pdf-extractor-pages"
+            index = records[-2]
+            assert json.loads(data[index["footer"]:].split(b"\n")[0])["errors"] == content_with_errors.errors
+            for page, offset in zip(content_with_errors.pages, index["pages"]):
+                record = json.loads(data[offset:].split(b"\n")[0])
+                assert record["page_number"] == page.page_number + 1
+                assert record["text"] == page.text
+            assert records[-1]["index_offset"] == data.index(b'{"pages"')
+    
+    def test_page_store_requires_file(self, formatter, simple_content):
+        """测试 pages 格式不能写出到内存流、压缩文件或追加写出"""
+        import io
+        
+        with pytest.raises(ValueError):
+            formatter.write(simple_content, "pages", io.StringIO())
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ValueError):
+                formatter.write_to_file(simple_content, "pages", os.path.join(tmpdir, "a.pages.gz"))
+            with pytest.raises(ValueError):
+                formatter.write_to_file(
+                    simple_content, "pages", os.path.join(tmpdir, "a.pages"), append=True
+                )
+            assert os.listdir(tmpdir) == []
+    
     def test_save_to_file_success(self, formatter):
         """测试文件保存 - 成功"""
         with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', encoding='utf-8') as f:
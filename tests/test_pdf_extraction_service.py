@@ -1,5 +1,6 @@
 """PDFExtractionService 单元测试"""
 
+import json
 import pytest
 import os
 import tempfile
@@ -171,7 +172,7 @@ class TestPDFExtractionService:
     @patch('src.pdf_extraction_service.OutputFormatter')
     @patch('src.pdf_extraction_service.PathHandler')
     def test_extract_with_output_file(self, mock_path_handler, mock_formatter,
-                                      mock_extractor, mock_reader):
+                                      mock_extractor, mock_reader, tmp_path):
         """测试保存到输出文件"""
         service = PDFExtractionService()
         
@@ -190,35 +191,37 @@ class TestPDFExtractionService:
         service.reader.open.return_value = mock_document
         
         # Mock TextExtractor
-        mock_content = ExtractedContent(
-            file_path="/test/file.pdf",
-            page_count=1,
-            pages=[PageText(0, "Test text", 9, False)],
-            total_text="Test text",
-            errors=[]
-        )
-        service.extractor.extract_all_text.return_value = mock_content
+        page = PageText(0, "Test text", 9, False)
+        service.extractor.iter_pages.return_value = iter([(page, None)])
         
         # Mock OutputFormatter
-        service.formatter.format_as_text.return_value = "Formatted output"
-        service.formatter.save_to_file.return_value = "文件保存成功: /output/result.txt"
+        writer = Mock()
+        service.formatter.get_writer.return_value = writer
         
         # 执行提取并保存
+        output_file = str(tmp_path / "result.txt")
         result = service.extract(
             "/test/file.pdf",
             output_format="text",
             extract_key_info=False,
-            output_file="/output/result.txt"
+            output_file=output_file
         )
         
-        # 验证结果
-        assert result == "Formatted output"
-        
-        # 验证保存文件被调用
-        service.formatter.save_to_file.assert_called_once_with(
-            "Formatted output",
-            "/output/result.txt"
-        )
+        # 结果边提取边逐页写出到文件，不再在内存中生成完整字符串
+        assert result is None
+        assert os.path.exists(output_file)
+        service.formatter.format_as_text.assert_not_called()
+        service.extractor.extract_all_text.assert_not_called()
+        
+        # 验证逐页写出被调用
+        assert service.formatter.get_writer.call_args[0][0] == "text"
+        writer.write_header.assert_called_once_with("/test/file.pdf", 1)
+        writer.write_page.assert_called_once_with(page)
+        # 不提取关键信息、不写入 sink 时写出后不保留页面，字符数逐页累计
+        content = writer.write_footer.call_args[0][0]
+        assert content.pages == []
+        assert content.timings.char_count == 9
+        assert content.key_info is None
     
     @patch('src.pdf_extraction_service.PDFReader')
     @patch('src.pdf_extraction_service.TextExtractor')
@@ -327,3 +330,409 @@ class TestPDFExtractionService:
         assert isinstance(key_info.keywords, list)
         assert isinstance(key_info.summary, str)
         assert isinstance(key_info.lists, list)
+    
+    def test_analyze_key_information_uses_config(self):
+        """测试关键信息分析使用配置项"""
+        from src.config import ExtractionConfig
+        
+        config = ExtractionConfig(max_keywords=2, summary_max_length=10)
+        service = PDFExtractionService(config=config)
+        
+        text = "人工智能改变世界。机器学习推动发展。深度学习突破瓶颈。" * 5
+        key_info = service._analyze_key_information(text)
+        
+        assert len(key_info.keywords) <= 2
+        assert len(key_info.summary) <= 10
+    
+    def test_extract_to_stream(self, tmp_path):
+        """测试逐页写出到文本流"""
+        import io
+        
+        service = PDFExtractionService()
+        content = ExtractedContent(
+            file_path="/test/file.pdf",
+            page_count=1,
+            pages=[PageText(0, "Test text", 9, False)],
+            total_text="Test text",
+            errors=[]
+        )
+        
+        with patch.object(service, 'path_handler') as path_handler, \
+             patch.object(service, 'reader') as reader, \
+             patch.object(service, 'extractor') as extractor:
+            path_handler.normalize_path.return_value = "/test/file.pdf"
+            path_handler.validate_path.return_value = True
+            path_handler.is_pdf_file.return_value = True
+            reader.open.return_value = PDFDocument("/test/file.pdf", 1, {}, Mock())
+            extractor.iter_pages.return_value = iter([(page, None) for page in content.pages])
+            
+            stream = io.StringIO()
+            result = service.extract(
+                "/test/file.pdf",
+                output_format="json",
+                extract_key_info=False,
+                output_stream=stream
+            )
+        
+        assert result is None
+        written = json.loads(stream.getvalue())
+        expected = json.loads(service.formatter.format_as_json(content))
+        assert written.pop("extraction_time") >= 0
+        expected.pop("extraction_time")
+        assert set(written.pop("timings")) == {
+            "open", "extract", "analysis", "format", "write", "time_to_first_page", "pages", "restored_pages", "page_complexity"
+        }
+        assert written == expected
+    
+    def test_extract_to_stream_flushes_each_page(self):
+        """测试写出到输出流时每页立即刷新，并记录首页输出耗时"""
+        import io
+        
+        class RecordingStream(io.StringIO):
+            def __init__(self):
+                super().__init__()
+                self.flushed = []
+            
+            def flush(self):
+                self.flushed.append(self.getvalue())
+        
+        service = PDFExtractionService()
+        stream = RecordingStream()
+        pages = [PageText(0, "第一页内容", 5, False), PageText(1, "第二页内容", 5, False)]
+        
+        def iter_pages(document):
+            for page in pages:
+                # 取下一页之前，上一页已经刷新到输出流
+                assert len(stream.flushed) == page.page_number
+                yield page, None
+        
+        document = PDFDocument("/test/file.pdf", 2, {}, Mock())
+        with patch.object(service.extractor, 'iter_pages', side_effect=iter_pages):
+            content = service._extract_to_stream(
+                document, "text", stream, extract_key_info=False, flush_pages=True
+            )
+        
+        assert "第一页内容" in stream.flushed[0]
+        assert "第二页内容" not in stream.flushed[0]
+        assert 0 < content.time_to_first_page <= content.extraction_time
+        assert content.timings.time_to_first_page == content.time_to_first_page
+    
+    def test_extract_broken_pipe(self):
+        """测试输出管道关闭时停止提取并原样抛出 BrokenPipeError"""
+        import io
+        
+        class ClosedPipe(io.StringIO):
+            def write(self, s):
+                raise BrokenPipeError()
+        
+        service = PDFExtractionService()
+        with patch.object(service, 'path_handler') as path_handler, \
+             patch.object(service, 'reader') as reader, \
+             patch.object(service, 'extractor') as extractor:
+            path_handler.normalize_path.return_value = "/test/file.pdf"
+            path_handler.validate_path.return_value = True
+            path_handler.is_pdf_file.return_value = True
+            reader.open.return_value = PDFDocument("/test/file.pdf", 1, {}, Mock())
+            extractor.iter_pages.return_value = iter([(PageText(0, "内容"), None)])
+            
+            with pytest.raises(BrokenPipeError):
+                service.extract("/test/file.pdf", output_stream=ClosedPipe())
+            reader.close.assert_called_once()
+    
+    def test_reformat(self, tmp_path):
+        """测试从 JSON 输出重新格式化，保留或重新分析关键信息"""
+        service = PDFExtractionService()
+        content = ExtractedContent(
+            file_path="/test/file.pdf",
+            page_count=2,
+            pages=[PageText(0, "第一章 价值投资"), PageText(1, "安全边际")],
+            key_info=KeyInformation(keywords=["原有关键词"]),
+            errors=["第 3 页提取失败：页面损坏"]
+        )
+        input_path = str(tmp_path / "result.json")
+        service.formatter.write_to_file(content, "json", input_path)
+        
+        # 不重新分析时保留原有关键信息，结果与直接格式化一致
+        assert service.reformat(input_path, "markdown") == service.formatter.format_as_markdown(content)
+        # JSON 的 total_text 由逐页写出的文本拼接，不需要保留页面
+        assert service.reformat(input_path, "json") == service.formatter.format_as_json(content)
+        
+        with patch.object(service, '_analyze_key_information',
+                          return_value=KeyInformation(keywords=["新关键词"])) as analyze:
+            output_file = str(tmp_path / "result.txt")
+            assert service.reformat(
+                input_path, "text", extract_key_info=True, output_file=output_file
+            ) is None
+        
+        analyze.assert_called_once()
+        with open(output_file, encoding="utf-8") as f:
+            written = f.read()
+        assert "新关键词" in written
+        assert "原有关键词" not in written
+        assert "第 3 页提取失败" in written
+        # 重新分析时使用全文
+        assert analyze.call_args[0][0] == "第一章 价值投资安全边际"
+    
+    def test_reformat_drops_written_pages(self, tmp_path):
+        """测试不重新分析关键信息时写出后不保留页面"""
+        import io
+        from src.result_loader import open_result
+        
+        service = PDFExtractionService()
+        content = ExtractedContent(
+            file_path="/test/file.pdf", page_count=2, pages=[PageText(0, "第一页"), PageText(1, "第二页")]
+        )
+        input_path = str(tmp_path / "result.json")
+        service.formatter.write_to_file(content, "json", input_path)
+        
+        with open_result(input_path) as source:
+            result = service._reformat_to_stream(source, "text", io.StringIO())
+        assert result.pages == []
+        with open_result(input_path) as source:
+            result = service._reformat_to_stream(source, "text", io.StringIO(), extract_key_info=True)
+        assert result.pages == content.pages
+    
+    def test_extract_compressed_output(self, tmp_path):
+        """测试根据输出文件后缀压缩写出"""
+        import gzip
+        
+        service = PDFExtractionService()
+        output_file = str(tmp_path / "result.txt.gz")
+        page = PageText(0, "第一页内容", 5, False)
+        
+        with patch.object(service, 'path_handler') as path_handler, \
+             patch.object(service, 'reader') as reader, \
+             patch.object(service, 'extractor') as extractor:
+            path_handler.normalize_path.return_value = "/test/file.pdf"
+            path_handler.validate_path.return_value = True
+            path_handler.is_pdf_file.return_value = True
+            reader.open.return_value = PDFDocument("/test/file.pdf", 1, {}, Mock())
+            extractor.iter_pages.return_value = iter([(page, None)])
+            
+            result = service.extract(
+                "/test/file.pdf",
+                output_format="text",
+                extract_key_info=False,
+                output_file=output_file
+            )
+        
+        assert result is None
+        with gzip.open(output_file, "rt", encoding="utf-8") as f:
+            assert "第一页内容" in f.read()
+    
+    def test_extract_to_sink(self, tmp_path):
+        """测试只写入结果存储时不格式化输出"""
+        service = PDFExtractionService()
+        content = ExtractedContent(
+            file_path="/test/file.pdf",
+            page_count=1,
+            pages=[PageText(0, "Test text", 9, False)],
+            total_text="Test text",
+            errors=[]
+        )
+        sink = Mock()
+        
+        with patch.object(service, 'path_handler') as path_handler, \
+             patch.object(service, 'reader') as reader, \
+             patch.object(service, 'extractor') as extractor, \
+             patch.object(service, 'formatter') as formatter:
+            path_handler.normalize_path.return_value = "/test/file.pdf"
+            path_handler.validate_path.return_value = True
+            path_handler.is_pdf_file.return_value = True
+            reader.open.return_value = PDFDocument("/test/file.pdf", 1, {}, Mock())
+            extractor.extract_all_text.return_value = content
+            
+            result = service.extract("/test/file.pdf", extract_key_info=False, sink=sink)
+        
+        assert result is None
+        sink.write.assert_called_once_with(content)
+        formatter.format_as_text.assert_not_called()
+
+    @pytest.mark.parametrize("output_format", ["text", "json"])
+    def test_streaming_memory_is_one_page(self, tmp_path, monkeypatch, output_format):
+        """测试逐页写出到文件时不保留已写出的页面，峰值内存远小于全文"""
+        import tracemalloc
+
+        monkeypatch.setattr("src.output_formatter._TOTAL_TEXT_SPOOL_SIZE", 64 * 1024)
+        service = PDFExtractionService()
+        page_count, page_chars = 40, 100_000
+
+        def iter_pages(document, start_page=0):
+            for number in range(page_count):
+                yield PageText(number, "价" * page_chars), None
+
+        with patch.object(service, 'path_handler') as path_handler, \
+             patch.object(service, 'reader') as reader, \
+             patch.object(service.extractor, 'iter_pages', side_effect=iter_pages):
+            path_handler.normalize_path.return_value = "/test/file.pdf"
+            path_handler.validate_path.return_value = True
+            path_handler.is_pdf_file.return_value = True
+            reader.open.return_value = PDFDocument("/test/file.pdf", page_count, {}, Mock())
+
+            output_file = str(tmp_path / f"big.{output_format}")
+            tracemalloc.start()
+            try:
+                service.extract(
+                    "/test/file.pdf", output_format, extract_key_info=False, output_file=output_file
+                )
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        # 全文约 8 MB（每字 2 字节），峰值应只有几页
+        assert peak < page_count * page_chars * 2 / 4
+        if output_format == "json":
+            with open(output_file, encoding="utf-8") as f:
+                assert len(json.load(f)["total_text"]) == page_count * page_chars
+
+    def test_streaming_sink_keeps_pages(self, tmp_path):
+        """测试逐页写出到文件并写入 sink 时，sink 收到所有页面"""
+        service = PDFExtractionService()
+        pages = [PageText(0, "第一页"), PageText(1, "第二页")]
+        sink = Mock()
+
+        with patch.object(service, 'path_handler') as path_handler, \
+             patch.object(service, 'reader') as reader, \
+             patch.object(service, 'extractor') as extractor:
+            path_handler.normalize_path.return_value = "/test/file.pdf"
+            path_handler.validate_path.return_value = True
+            path_handler.is_pdf_file.return_value = True
+            reader.open.return_value = PDFDocument("/test/file.pdf", 2, {}, Mock())
+            extractor.iter_pages.return_value = iter([(page, None) for page in pages])
+
+            service.extract(
+                "/test/file.pdf", extract_key_info=False, output_file=str(tmp_path / "out.txt"), sink=sink
+            )
+
+        content = sink.write.call_args[0][0]
+        assert content.pages == pages
+        assert content.total_text == "第一页第二页"
+
+    def test_extract_ndjson_append(self, tmp_path):
+        """测试 ndjson 边提取边写出并追加多个文档"""
+        service = PDFExtractionService()
+        output_file = str(tmp_path / "corpus.ndjson")
+        
+        def extract(file_path, texts):
+            pages = [PageText(i, text, len(text), not text) for i, text in enumerate(texts)]
+            written_before = []
+            
+            def iter_pages(document):
+                for page in pages:
+                    # 每页交给写出器前，之前的页面已经刷新到文件
+                    with open(output_file, encoding="utf-8") as f:
+                        written_before.append(f.read().count('"type":"page"'))
+                    yield page, None if page.text else "第 2 页提取失败：损坏"
+            
+            with patch.object(service, 'path_handler') as path_handler, \
+                 patch.object(service, 'reader') as reader, \
+                 patch.object(service.extractor, 'iter_pages', side_effect=iter_pages):
+                path_handler.normalize_path.return_value = file_path
+                path_handler.validate_path.return_value = True
+                path_handler.is_pdf_file.return_value = True
+                reader.open.return_value = PDFDocument(file_path, len(texts), {}, Mock())
+                service.extract(
+                    file_path,
+                    output_format="ndjson",
+                    extract_key_info=False,
+                    output_file=output_file,
+                    append=True
+                )
+            return written_before
+        
+        open(output_file, "w").close()
+        assert extract("/test/a.pdf", ["A1", "A2"]) == [0, 1]
+        assert extract("/test/b.pdf", ["B1", ""]) == [2, 3]
+        
+        with open(output_file, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert [(r["type"], r["file_path"]) for r in records] == [
+            ("document", "/test/a.pdf"),
+            ("page", "/test/a.pdf"),
+            ("page", "/test/a.pdf"),
+            ("end", "/test/a.pdf"),
+            ("document", "/test/b.pdf"),
+            ("page", "/test/b.pdf"),
+            ("page", "/test/b.pdf"),
+            ("errors", "/test/b.pdf"),
+            ("end", "/test/b.pdf"),
+        ]
+        assert records[7]["errors"] == ["第 2 页提取失败：损坏"]
+
+
+class TestStageTimings:
+    """测试各阶段耗时记录"""
+    
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        """创建 3 页 PDF"""
+        from reportlab.pdfgen import canvas
+        
+        path = tmp_path / "timed.pdf"
+        c = canvas.Canvas(str(path))
+        for i in range(3):
+            c.drawString(100, 750, f"Timed page {i + 1} about extraction throughput")
+            c.showPage()
+        c.save()
+        return str(path)
+    
+    def test_in_memory_timings(self, pdf_path):
+        """返回字符串时记录打开、逐页提取、分析和格式化耗时，并写入 JSON 输出"""
+        from src.models import StageTimings
+        
+        timings = StageTimings()
+        result = PDFExtractionService().extract(
+            pdf_path, "json", key_info_stages=["keywords"], timings=timings
+        )
+        
+        assert timings.open > 0
+        assert len(timings.pages) == 3
+        assert timings.extract == sum(timings.pages) > 0
+        assert list(timings.analysis) == ["keywords"]
+        assert timings.format > 0
+        assert timings.write == 0
+        assert timings.total >= timings.open + timings.extract + timings.format
+        assert timings.char_count > 0
+        assert timings.pages_per_second == pytest.approx(3 / timings.extract)
+        
+        data = json.loads(result)["timings"]
+        assert len(data["pages"]) == 3
+        assert list(data["analysis"]) == ["keywords"]
+    
+    def test_page_complexity(self, pdf_path, tmp_path):
+        """每页的对象数记录在耗时中并写入 JSON 输出（页码为 1-based）"""
+        from src.models import StageTimings
+        
+        timings = StageTimings()
+        output_file = str(tmp_path / "timed.json")
+        PDFExtractionService().extract(
+            pdf_path, "json", extract_key_info=False, output_file=output_file, timings=timings
+        )
+        
+        assert [item.page_number for item in timings.page_complexity] == [0, 1, 2]
+        assert all(item.chars > 0 and item.content_bytes > 0 for item in timings.page_complexity)
+        with open(output_file, encoding="utf-8") as f:
+            data = json.load(f)["timings"]["page_complexity"]
+        assert data[0] == {
+            "page_number": 1, "chars": timings.page_complexity[0].chars, "lines": 0, "rects": 0,
+            "curves": 0, "images": 0, "content_bytes": timings.page_complexity[0].content_bytes
+        }
+    
+    def test_streaming_timings(self, pdf_path, tmp_path):
+        """逐页写出时写出器的耗时计入 write"""
+        from src.models import StageTimings
+        
+        timings = StageTimings()
+        output_file = str(tmp_path / "timed.ndjson")
+        PDFExtractionService().extract(
+            pdf_path, "ndjson", extract_key_info=False, output_file=output_file, timings=timings
+        )
+        
+        assert timings.write > 0
+        assert timings.format == 0
+        assert timings.analysis == {}
+        with open(output_file, encoding="utf-8") as f:
+            end = [json.loads(line) for line in f][-1]
+        assert end["type"] == "end"
+        assert len(end["timings"]["pages"]) == 3
+        assert 0 < end["timings"]["time_to_first_page"] == round(timings.time_to_first_page, 6)
@@ -134,6 +134,8 @@ class TestPDFReaderOpen:
             pdf_reader.open(temp_invalid_file)
         
         assert "不是有效的 PDF 文件" in str(exc_info.value)
+        # 保留 pdfplumber 的原始异常
+        assert exc_info.value.__cause__ is not None
     
     def test_open_with_metadata(self, pdf_reader, tmp_path):
         """测试打开带元数据的 PDF 文件"""
@@ -0,0 +1,112 @@
+"""按阶段性能分析测试"""
+
+import pstats
+import tracemalloc
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.cli import main
+from src.pdf_extraction_service import PDFExtractionService
+from src.profiling import StageProfiler, report_prefix
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """创建 3 页 PDF"""
+    path = tmp_path / "profiled.pdf"
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for i in range(3):
+        c.drawString(100, 750, f"Profiled page {i + 1} about extraction performance")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+class TestStageProfiler:
+    """测试 StageProfiler"""
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            StageProfiler("disk")
+
+    def test_cpu_stages_accumulate(self, tmp_path):
+        """同名阶段多次进入时结果累加，嵌套的阶段计入外层"""
+        def work():
+            return sum(range(1000))
+
+        with StageProfiler("cpu") as profiler:
+            for _ in range(3):
+                with profiler.stage("extract"):
+                    work()
+                    with profiler.stage("write"):
+                        work()
+
+        assert profiler.stages == ["extract"]
+        paths = profiler.write_reports(str(tmp_path / "out.json"))
+        assert paths == [str(tmp_path / "out.json.extract.pstats")]
+        stats = pstats.Stats(paths[0]).stats
+        calls = [value[0] for key, value in stats.items() if key[2] == "work"]
+        assert calls == [6]
+
+    def test_memory_report(self, tmp_path):
+        """内存报告列出各阶段分配最多的代码行，关闭后停止 tracemalloc"""
+        kept = []
+        with StageProfiler("memory", top=5) as profiler:
+            assert tracemalloc.is_tracing()
+            with profiler.stage("build"):
+                kept.append(bytearray(512 * 1024))
+            with profiler.stage("idle"):
+                pass
+            report = profiler.format_memory_report()
+            paths = profiler.write_reports(str(tmp_path / "out"))
+        assert not tracemalloc.is_tracing()
+
+        build, idle = report.split("== idle")
+        assert build.startswith("== build: 净分配 5")
+        assert "KiB" in build
+        assert "test_profiling.py" in build
+        assert "bytearray(512 * 1024)" in build
+        assert paths == [str(tmp_path / "out.memory.txt")]
+        assert (tmp_path / "out.memory.txt").read_text(encoding="utf-8") == report
+
+    def test_report_prefix(self):
+        assert report_prefix("books/a.pdf", "out/a.json") == "out/a.json"
+        assert report_prefix("books/a.pdf") == "a.pdf"
+
+
+class TestServiceProfiling:
+    """测试提取流程的各阶段分析"""
+
+    def test_streaming_stages(self, pdf_path, tmp_path):
+        """逐页写出时提取和写出分别计入各自的阶段"""
+        with StageProfiler("cpu") as profiler:
+            PDFExtractionService().extract(
+                pdf_path, "json", key_info_stages=["keywords"],
+                output_file=str(tmp_path / "out.json"), profiler=profiler
+            )
+        assert profiler.stages == ["open", "write", "extract", "analysis.keywords"]
+
+        stats = pstats.Stats(profiler.write_reports(str(tmp_path / "out.json"))[2]).stats
+        calls = [value[0] for key, value in stats.items() if key[2] == "extract_text"]
+        assert 3 in calls
+
+    def test_in_memory_stages(self, pdf_path):
+        with StageProfiler("cpu") as profiler:
+            PDFExtractionService().extract(pdf_path, "text", extract_key_info=False, profiler=profiler)
+        assert profiler.stages == ["open", "extract", "format"]
+
+    def test_cli_profile(self, pdf_path, tmp_path, capsys):
+        """--profile 把分析结果写在输出文件旁边"""
+        output = tmp_path / "out.json"
+        assert main([pdf_path, "-o", str(output), "-f", "json", "--no-key-info",
+                     "--profile", "memory", "-q"]) == 0
+        assert output.exists()
+        report = (tmp_path / "out.json.memory.txt").read_text(encoding="utf-8")
+        assert "== extract:" in report
+        assert "out.json.memory.txt" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
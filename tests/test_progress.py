@@ -0,0 +1,202 @@
+"""进度报告测试"""
+
+import io
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.batch import BatchRunner
+from src.cli import main
+from src.exceptions import FileNotFoundError as PDFFileNotFoundError
+from src.pdf_extraction_service import PDFExtractionService
+from src.progress import DocumentProgress, ProgressEvent, TerminalProgress, format_duration
+
+
+def make_pdf(path, pages):
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for i in range(pages):
+        c.drawString(100, 750, f"Progress page {i + 1}")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """创建 8 页 PDF"""
+    return make_pdf(tmp_path / "progress.pdf", 8)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDocumentProgress:
+    """测试提取服务产生的事件"""
+
+    def test_events(self, pdf_path):
+        events = []
+        PDFExtractionService().extract(pdf_path, "text", extract_key_info=False, progress=events.append)
+
+        assert [event.pages_done for event in events] == list(range(9)) + [8]
+        assert all(event.total_pages == 8 and event.file_path == pdf_path for event in events)
+        assert [event.finished for event in events] == [False] * 9 + [True]
+        assert events[-1].error is None
+        assert events[-1].elapsed >= events[0].elapsed
+
+    def test_streaming_events(self, pdf_path, tmp_path):
+        """逐页写出到文件时使用同一套事件"""
+        events = []
+        PDFExtractionService().extract(
+            pdf_path, "json", extract_key_info=False, output_file=str(tmp_path / "out.json"),
+            progress=events.append
+        )
+        assert [event.pages_done for event in events if not event.finished] == list(range(9))
+        assert events[-1].finished
+
+    def test_error_event(self, tmp_path):
+        """打开文件前失败时结束事件的总页数为 0"""
+        events = []
+        with pytest.raises(PDFFileNotFoundError):
+            PDFExtractionService().extract(str(tmp_path / "missing.pdf"), progress=events.append)
+        assert len(events) == 1
+        assert events[0].finished
+        assert events[0].total_pages == 0
+        assert "missing.pdf" in events[0].error
+
+    def test_interrupted_event(self, pdf_path, tmp_path):
+        """被中断的提取以错误结束，而不是正常完成"""
+        service = PDFExtractionService()
+        pages = service.extractor.iter_pages
+
+        def interrupted(*args, **kwargs):
+            for index, item in enumerate(pages(*args, **kwargs)):
+                if index == 3:
+                    raise KeyboardInterrupt
+                yield item
+
+        service.extractor.iter_pages = interrupted
+        events = []
+        with pytest.raises(KeyboardInterrupt):
+            service.extract(
+                pdf_path, "text", extract_key_info=False, output_file=str(tmp_path / "out.txt"),
+                progress=events.append
+            )
+        assert events[-1].finished
+        assert events[-1].pages_done == 3
+        assert events[-1].error == "KeyboardInterrupt"
+    
+    def test_show_progress_threshold(self, tmp_path, capsys):
+        """未提供回调时，页数超过阈值才在标准错误显示进度"""
+        service = PDFExtractionService()
+        service.extract(make_pdf(tmp_path / "short.pdf", 3), extract_key_info=False, show_progress=True)
+        assert "处理进度" not in capsys.readouterr().err
+
+        service.extract(make_pdf(tmp_path / "long.pdf", 6), extract_key_info=False, show_progress=True)
+        err = capsys.readouterr().err
+        assert "6/6 页 (100.0%)" in err
+        assert err.endswith("\n")
+
+    def test_track(self):
+        events = []
+        tracker = DocumentProgress(events.append, "a.pdf", clock=FakeClock())
+        tracker.start(2)
+        assert list(tracker.track(["p1", "p2"])) == ["p1", "p2"]
+        tracker.finish(ValueError("bad"))
+        assert events[-1] == ProgressEvent("a.pdf", 2, 2, 0.0, finished=True, error="bad")
+
+
+class TestTerminalProgress:
+    """测试命令行进度显示"""
+
+    def test_rate_limited(self):
+        """每秒最多重绘 refresh_rate 次，结束时总是显示最终结果"""
+        clock = FakeClock()
+        stream = io.StringIO()
+        progress = TerminalProgress(stream, refresh_rate=4, clock=clock)
+        tracker = DocumentProgress(progress, "a.pdf", clock=clock)
+        tracker.start(1000)
+        for _ in tracker.track(range(1000)):
+            clock.now += 0.002
+        tracker.finish()
+
+        output = stream.getvalue()
+        # 1000 个事件：开始 1 次 + 2 秒内最多每 0.25 秒 1 次 + 结束 1 次
+        assert 8 <= output.count("\r") <= 10
+        assert output.endswith("\n")
+        last = output.rstrip("\n").rsplit("\r", 1)[1]
+        assert last.startswith("处理进度: 1000/1000 页 (100.0%)，500.0 页/秒")
+
+    def test_eta(self):
+        clock = FakeClock()
+        stream = io.StringIO()
+        progress = TerminalProgress(stream, refresh_rate=0, clock=clock)
+        progress(ProgressEvent("a.pdf", 0, 100, 0.0))
+        clock.now = 10.0
+        progress(ProgressEvent("a.pdf", 20, 100, 10.0))
+        assert stream.getvalue().endswith("处理进度: 20/100 页 (20.0%)，2.0 页/秒，剩余约 40 秒")
+
+    def test_batch(self):
+        """汇总多个文件，每个文件结束时在进度行上方显示结果"""
+        clock = FakeClock()
+        stream = io.StringIO()
+        progress = TerminalProgress(stream, total_documents=4, show_documents=True, clock=clock)
+        progress(ProgressEvent("a.pdf", 0, 10, 0.0))
+        progress(ProgressEvent("b.pdf", 0, 10, 0.0))
+        clock.now = 5.0
+        progress(ProgressEvent("a.pdf", 10, 10, 5.0))
+        progress(ProgressEvent("a.pdf", 10, 10, 5.0, finished=True))
+        progress(ProgressEvent("b.pdf", 3, 10, 5.0, finished=True, error="坏文件"))
+        progress.close()
+
+        lines = [line.rstrip() for line in stream.getvalue().replace("\r", "\n").split("\n") if line.strip()]
+        assert "✓ a.pdf（5.0 秒）" in lines
+        assert "✗ b.pdf: 坏文件" in lines
+        assert lines[-1] == "处理进度: 2/4 个文件，0 个进行中，已提取 13 页，2.6 页/秒，剩余约 5 秒"
+        assert stream.getvalue().endswith("\n")
+
+    def test_format_duration(self):
+        assert format_duration(42.4) == "42 秒"
+        assert format_duration(185) == "3 分 05 秒"
+        assert format_duration(3720) == "1 小时 02 分"
+
+
+class TestBatchProgress:
+    """测试批量提取时工作进程的进度汇总"""
+
+    def test_workers_report_progress(self, tmp_path):
+        inputs = tmp_path / "in"
+        inputs.mkdir()
+        make_pdf(inputs / "a.pdf", 3)
+        make_pdf(inputs / "b.pdf", 4)
+        events = []
+        runner = BatchRunner(
+            str(tmp_path / "queue.db"), output_format="text", extract_key_info=False,
+            on_progress=events.append
+        )
+        runner.add([str(inputs)], str(tmp_path / "out"))
+        runner.run(workers=2)
+
+        finished = {event.file_path: event for event in events if event.finished}
+        assert set(finished) == {str(inputs / "a.pdf"), str(inputs / "b.pdf")}
+        assert finished[str(inputs / "b.pdf")].pages_done == 4
+        # 每个文件的事件按页序到达
+        for path in finished:
+            pages = [event.pages_done for event in events if event.file_path == path and not event.finished]
+            assert pages == sorted(pages)
+
+    def test_cli_batch_progress(self, pdf_path, tmp_path, capsys):
+        assert main(["batch", pdf_path, "-d", str(tmp_path / "out"), "-j", "2",
+                     "--no-key-info", "--progress"]) == 0
+        err = capsys.readouterr().err
+        assert f"✓ {pdf_path}" in err
+        assert "1/1 个文件，0 个进行中，已提取 8 页" in err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,309 @@
+"""提取结果加载模块单元测试"""
+
+import io
+import json
+import os
+import tempfile
+import pytest
+
+from src.models import ExtractedContent, PageComplexity, PageText, KeyInformation, StageTimings
+from src.output_formatter import OutputFormatter
+import src.result_loader as result_loader
+from src.result_loader import (
+    JSONPageReader,
+    PageStoreReader,
+    content_from_dict,
+    iter_ndjson_contents,
+    load_content,
+    load_ndjson,
+    loads_content,
+    open_result,
+)
+
+
+class TestResultLoader:
+    """测试从 JSON 输出重建 ExtractedContent"""
+    
+    @pytest.fixture
+    def formatter(self):
+        """创建 OutputFormatter 实例"""
+        return OutputFormatter()
+    
+    @pytest.fixture
+    def content(self):
+        """创建包含关键信息和错误的提取内容"""
+        pages = [
+            PageText(page_number=0, text="第一页\n内容"),
+            PageText(page_number=1, text=""),
+            PageText(page_number=2, text="第三页"),
+        ]
+        return ExtractedContent(
+            file_path="测试.pdf",
+            page_count=3,
+            pages=pages,
+            key_info=KeyInformation(
+                headings=["第一章"],
+                keywords=["内容"],
+                stage_timings={"headings": 0.01}
+            ),
+            extraction_time=1.5,
+            errors=["第 2 页提取失败：页面损坏"],
+            timings=StageTimings(
+                open=0.02,
+                extract=0.3,
+                pages=[0.0, 0.15, 0.05],
+                restored_pages=1,
+                analysis={"headings": 0.01},
+                write=0.004,
+                page_complexity=[PageComplexity(page_number=1, chars=120, rects=3, content_bytes=2048)]
+            )
+        )
+    
+    def test_round_trip_full_layout(self, formatter, content):
+        """测试完整布局往返"""
+        loaded = loads_content(formatter.format_as_json(content))
+        assert loaded == content
+    
+    def test_round_trip_compact_layout(self, formatter, content):
+        """测试紧凑布局往返"""
+        loaded = loads_content(formatter.format_as_compact_json(content))
+        assert loaded == content
+    
+    def test_compact_layout_drops_total_text(self, formatter, content):
+        """测试紧凑布局不包含 total_text 和空的关键信息部分"""
+        data = json.loads(formatter.format_as_compact_json(content))
+        
+        assert data["schema_version"] == 2
+        assert "total_text" not in data
+        assert set(data["pages"][0]) == {"page_number", "text"}
+        assert set(data["key_info"]) == {"headings", "keywords", "stage_timings"}
+    
+    def test_compact_layout_is_smaller(self, formatter, content):
+        """测试紧凑布局体积更小"""
+        full = formatter.format_as_json(content)
+        compact = formatter.format_as_compact_json(content)
+        assert len(compact) < len(full)
+    
+    def test_compact_layout_without_key_info(self, formatter):
+        """测试没有关键信息和页面时的紧凑布局"""
+        content = ExtractedContent(file_path="empty.pdf", page_count=0, pages=[])
+        data = json.loads(formatter.format_as_compact_json(content))
+        assert data["pages"] == []
+        assert "key_info" not in data
+        assert "errors" not in data
+    
+    def test_load_content_from_file_and_stream(self, formatter, content):
+        """测试从文件路径和文本流加载"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "result.json")
+            formatter.write_to_file(content, "json-compact", path)
+            assert load_content(path) == content
+            with open(path, 'r', encoding='utf-8') as f:
+                assert load_content(f) == content
+    
+    def test_round_trip_ndjson(self, formatter, content):
+        """测试 NDJSON 追加多个文档后逐个重建"""
+        other = ExtractedContent(
+            file_path="other.pdf",
+            page_count=1,
+            pages=[PageText(page_number=0, text="另一个文档")],
+            total_text="另一个文档"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "corpus.ndjson")
+            formatter.write_to_file(content, "ndjson", path)
+            formatter.write_to_file(other, "ndjson", path, append=True)
+            assert load_ndjson(path) == [content, other]
+    
+    @pytest.mark.parametrize("suffix", [".gz", ".zst"])
+    def test_load_compressed(self, formatter, content, suffix):
+        """测试透明读取压缩输出"""
+        if suffix == ".zst":
+            pytest.importorskip("zstandard")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = os.path.join(tmpdir, "result.json" + suffix)
+            ndjson_path = os.path.join(tmpdir, "corpus.ndjson" + suffix)
+            formatter.write_to_file(content, "json", json_path)
+            formatter.write_to_file(content, "ndjson", ndjson_path)
+            formatter.write_to_file(content, "ndjson", ndjson_path, append=True)
+            
+            assert load_content(json_path) == content
+            assert load_ndjson(ndjson_path) == [content, content]
+    
+    def test_ndjson_truncated_document(self, formatter, content):
+        """测试缺少 end 记录的文档"""
+        lines = formatter.format_as(content, "ndjson").splitlines()
+        with pytest.raises(ValueError):
+            list(iter_ndjson_contents(lines[:-1]))
+        with pytest.raises(ValueError):
+            list(iter_ndjson_contents(lines[1:]))
+    
+    def test_load_content_missing_file(self):
+        """测试文件不存在"""
+        with pytest.raises(IOError):
+            load_content("/nonexistent/result.json")
+    
+    def test_unsupported_version(self):
+        """测试不支持的布局版本"""
+        with pytest.raises(ValueError):
+            content_from_dict({"schema_version": 99, "file_path": "a.pdf", "pages": []})
+    
+    def test_missing_fields(self):
+        """测试缺少必需字段"""
+        with pytest.raises(ValueError):
+            content_from_dict({"pages": []})
+
+
+class TestPageStoreReader:
+    """测试页面存储的随机访问读取"""
+    
+    @pytest.fixture
+    def content(self):
+        """创建 200 页的提取内容（含空页和多行文本）"""
+        pages = [
+            PageText(page_number=i, text="" if i % 50 == 7 else f"第 {i + 1} 页\n价值投资与安全边际")
+            for i in range(200)
+        ]
+        return ExtractedContent(
+            file_path="思考致富.pdf",
+            page_count=200,
+            pages=pages,
+            key_info=KeyInformation(keywords=["价值投资"], summary="摘要"),
+            extraction_time=2.5,
+            errors=["第 8 页提取失败：页面损坏"]
+        )
+    
+    @pytest.fixture
+    def store_path(self, tmp_path, content):
+        """写出页面存储文件"""
+        path = str(tmp_path / "book.pages")
+        OutputFormatter().write_to_file(content, "pages", path)
+        return path
+    
+    def test_get_page(self, store_path, content):
+        """测试按序号读取任意一页"""
+        with PageStoreReader(store_path) as store:
+            assert len(store) == 200
+            assert store.file_path == "思考致富.pdf"
+            for index in (179, 0, 199, 7, 57):
+                assert store.get_page(index) == content.pages[index]
+    
+    def test_load_content(self, store_path, content):
+        """测试重建完整内容"""
+        with PageStoreReader(store_path) as store:
+            assert store.load_content() == content
+            assert list(store.iter_pages()) == content.pages
+    
+    def test_page_out_of_range(self, store_path):
+        """测试页面序号超出范围"""
+        with PageStoreReader(store_path) as store:
+            with pytest.raises(IndexError):
+                store.get_page(200)
+            with pytest.raises(IndexError):
+                store.get_page(-1)
+    
+    def test_empty_document(self, tmp_path):
+        """测试没有页面的文档"""
+        path = str(tmp_path / "empty.pages")
+        content = ExtractedContent(file_path="空.pdf", page_count=0, pages=[])
+        OutputFormatter().write_to_file(content, "pages", path)
+        with PageStoreReader(path) as store:
+            assert len(store) == 0
+            assert store.load_content() == content
+    
+    def test_invalid_file(self, tmp_path, store_path):
+        """测试非页面存储文件和被截断的文件"""
+        json_path = tmp_path / "result.json"
+        json_path.write_text('{"file_path": "a.pdf", "pages": []}', encoding="utf-8")
+        empty_path = tmp_path / "empty"
+        empty_path.write_bytes(b"")
+        truncated_path = tmp_path / "truncated.pages"
+        with open(store_path, "rb") as f:
+            truncated_path.write_bytes(f.read()[:-10])
+        
+        for path in (json_path, empty_path, truncated_path):
+            with pytest.raises(ValueError):
+                PageStoreReader(str(path))
+        with pytest.raises(IOError):
+            PageStoreReader(str(tmp_path / "missing.pages"))
+
+
+
+class TestJSONPageReader:
+    """测试逐页增量读取 JSON 输出"""
+    
+    @pytest.fixture
+    def content(self):
+        """创建包含转义字符、反斜杠和空页的提取内容"""
+        pages = [
+            PageText(page_number=0, text='第一页 "引号" 与 \\ 反斜杠\n换行\t制表'),
+            PageText(page_number=1, text=""),
+            PageText(page_number=2, text="C:\\Users\\书\\" * 20),
+            PageText(page_number=3, text="😀 emoji 与 \u2028 分隔符"),
+        ]
+        return ExtractedContent(
+            file_path="C:\\书籍\\测试.pdf",
+            page_count=4,
+            pages=pages,
+            key_info=KeyInformation(headings=["第一章"], keywords=["价值"]),
+            extraction_time=1.25,
+            errors=["第 2 页提取失败：页面损坏"]
+        )
+    
+    def read(self, text):
+        """逐页读取 JSON 文本并重建内容"""
+        with JSONPageReader(io.StringIO(text)) as reader:
+            pages = list(reader.iter_pages())
+            return reader.content_from_pages(pages)
+    
+    @pytest.mark.parametrize("chunk_size", [3, 7, 64 * 1024])
+    @pytest.mark.parametrize("output_format", ["json", "json-compact"])
+    def test_matches_load_content(self, monkeypatch, content, chunk_size, output_format):
+        """测试任意分块大小下的结果与整体加载一致"""
+        monkeypatch.setattr(result_loader, "_PARSER_CHUNK_SIZE", chunk_size)
+        text = OutputFormatter().format_as(content, output_format)
+        assert self.read(text) == loads_content(text) == content
+    
+    def test_field_order(self, content):
+        """测试 pages 之后的字段以任意顺序出现"""
+        data = json.loads(OutputFormatter().format_as_json(content))
+        reordered = {
+            "page_count": data["page_count"],
+            "file_path": data["file_path"],
+            "pages": data["pages"],
+            "errors": data["errors"],
+            "key_info": data["key_info"],
+            "total_text": data["total_text"],
+            "extraction_time": data["extraction_time"],
+        }
+        assert self.read(json.dumps(reordered, ensure_ascii=False)) == content
+    
+    def test_invalid_json(self, content):
+        """测试格式错误、缺少字段和不支持的版本"""
+        text = OutputFormatter().format_as_json(content)
+        invalid = [
+            text[:len(text) // 2],
+            '{"file_path": "a.pdf"}',
+            '{"pages": [], "file_path": "a.pdf"}',
+            '{"schema_version": 99, "file_path": "a.pdf", "pages": []}',
+            '{"file_path": "a.pdf", "pages": [{"text": "缺少页码"}]}',
+        ]
+        for value in invalid:
+            with pytest.raises(ValueError):
+                self.read(value)
+    
+    def test_open_result(self, tmp_path, content):
+        """测试按文件内容识别 JSON、压缩 JSON 和页面存储"""
+        formatter = OutputFormatter()
+        paths = []
+        for output_format, name in (("json", "a.json"), ("json-compact", "b.json.gz"), ("pages", "c.pages")):
+            path = str(tmp_path / name)
+            formatter.write_to_file(content, output_format, path)
+            paths.append(path)
+        
+        for path in paths:
+            with open_result(path) as reader:
+                pages = list(reader.iter_pages())
+                assert reader.content_from_pages(pages) == content
+        with pytest.raises(IOError):
+            open_result(str(tmp_path / "missing.json"))
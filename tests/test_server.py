@@ -0,0 +1,225 @@
+"""HTTP 提取服务测试"""
+
+import asyncio
+import http.client
+import io
+import json
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.config import ExtractionConfig
+from src.pdf_extraction_service import PDFExtractionService
+from src.server import ExtractionServer, is_loopback
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建两页 PDF"""
+    pdf_path = tmp_path / "sample.pdf"
+    c = canvas.Canvas(str(pdf_path), pagesize=letter)
+    c.drawString(100, 750, "Server page one")
+    c.showPage()
+    c.drawString(100, 750, "Server page two")
+    c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.fixture(scope="module")
+def server():
+    """在后台线程的事件循环中运行服务（自动分配端口）"""
+    server = ExtractionServer(
+        config=ExtractionConfig(extract_key_info=False),
+        port=0,
+        workers=1,
+        queue_size=1
+    )
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+    server.close()
+    loop.close()
+
+
+def request(server, method, path, body=None, headers=None):
+    """发送请求，返回 (状态码, 响应头, 响应体)"""
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=60)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+class TestExtract:
+    """测试 /extract 接口"""
+
+    def test_path_matches_in_process_output(self, server, sample_pdf):
+        """通过 path 参数提取的结果与进程内逐页写出的结果一致（提取耗时除外）"""
+        status, headers, body = request(server, "POST", f"/extract?path={sample_pdf}&format=json")
+        assert status == 200
+        assert headers["Transfer-Encoding"] == "chunked"
+        assert headers["Content-Type"] == "application/json; charset=utf-8"
+
+        expected = io.StringIO()
+        PDFExtractionService(ExtractionConfig()).extract(
+            str(sample_pdf), "json", extract_key_info=False, output_stream=expected
+        )
+        result = json.loads(body.decode("utf-8"))
+        reference = json.loads(expected.getvalue())
+        for key in ("extraction_time", "timings"):
+            result.pop(key)
+            reference.pop(key)
+        assert result == reference
+
+    def test_upload(self, server, sample_pdf):
+        """上传 PDF 内容，name 参数作为文件名"""
+        status, headers, body = request(
+            server, "POST", "/extract?format=text&name=book.pdf",
+            body=sample_pdf.read_bytes()
+        )
+        assert status == 200
+        assert headers["Content-Type"] == "text/plain; charset=utf-8"
+        text = body.decode("utf-8")
+        assert "book.pdf" in text
+        assert "Server page two" in text
+
+    def test_upload_with_put(self, server, sample_pdf):
+        """接受 PUT 上传（如 curl -T）"""
+        status, _, body = request(server, "PUT", "/extract?format=ndjson", body=sample_pdf.read_bytes())
+        assert status == 200
+        records = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        assert [r["page_number"] for r in records if r.get("type") == "page"] == [1, 2]
+
+    def test_key_info_stages(self, server, sample_pdf):
+        """stages 参数开启指定阶段的关键信息分析"""
+        status, _, body = request(server, "POST", f"/extract?path={sample_pdf}&format=json&stages=keywords")
+        assert status == 200
+        assert "key_info" in json.loads(body.decode("utf-8"))
+
+    def test_missing_file(self, server, tmp_path):
+        """文件不存在返回 404"""
+        status, _, body = request(server, "POST", f"/extract?path={tmp_path / 'missing.pdf'}")
+        assert status == 404
+        assert "找不到文件" in json.loads(body.decode("utf-8"))["error"]
+
+    def test_invalid_pdf_upload(self, server):
+        """上传内容不是 PDF 返回 400"""
+        status, _, _ = request(server, "POST", "/extract", body=b"not a pdf")
+        assert status == 400
+
+    @pytest.mark.parametrize("query", ["format=pages", "format=xml", "stages=unknown"])
+    def test_invalid_parameters(self, server, sample_pdf, query):
+        """不支持的格式（包括只能写出到文件的 pages）和分析阶段返回 400"""
+        status, _, _ = request(server, "POST", f"/extract?path={sample_pdf}&{query}")
+        assert status == 400
+
+    def test_empty_body(self, server):
+        """既没有请求体也没有 path 参数返回 400"""
+        status, _, _ = request(server, "POST", "/extract", body=b"")
+        assert status == 400
+
+    def test_upload_too_large(self, server, sample_pdf):
+        """上传文件超过大小上限返回 413"""
+        server.max_upload_size = 10
+        try:
+            status, _, _ = request(server, "POST", "/extract", body=sample_pdf.read_bytes())
+        finally:
+            server.max_upload_size = 200 * 1024 * 1024
+        assert status == 413
+
+    def test_saturated_returns_429(self, server, sample_pdf):
+        """正在处理和排队的请求已满时返回 429，且不影响之后的请求"""
+        server._pending = server.capacity
+        try:
+            status, headers, _ = request(server, "POST", "/extract", body=sample_pdf.read_bytes())
+        finally:
+            server._pending = 0
+        assert status == 429
+        assert headers["Retry-After"] == "1"
+
+        status, _, _ = request(server, "POST", f"/extract?path={sample_pdf}")
+        assert status == 200
+
+    def test_worker_crash_rebuilds_pool(self, server, sample_pdf):
+        """工作进程异常退出后重建进程池，之后的请求正常处理"""
+        broken = server._pool
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result(timeout=30)
+
+        status, _, _ = request(server, "POST", f"/extract?path={sample_pdf}")
+        assert status == 200
+        assert server._pool is not broken
+
+    def test_path_rejected_on_public_host(self, server, sample_pdf):
+        """监听非本机地址时不接受 path 参数，上传仍然可用"""
+        server.host = "0.0.0.0"
+        try:
+            status, _, body = request(server, "POST", f"/extract?path={sample_pdf}")
+            assert status == 403
+            assert "path" in json.loads(body)["error"]
+            status, _, _ = request(server, "POST", "/extract", body=sample_pdf.read_bytes())
+            assert status == 200
+        finally:
+            server.host = "127.0.0.1"
+
+    def test_is_loopback(self):
+        assert is_loopback("127.0.0.1")
+        assert is_loopback("::1")
+        assert is_loopback("localhost")
+        assert not is_loopback("0.0.0.0")
+        assert not is_loopback("")
+        assert not is_loopback("example.com")
+
+
+class TestRoutes:
+    """测试其他接口"""
+
+    def test_health(self, server):
+        """健康检查返回队列状态"""
+        status, _, body = request(server, "GET", "/health")
+        assert status == 200
+        assert json.loads(body) == {
+            "status": "ok", "workers": 1, "running": 0, "queued": 0, "capacity": 2
+        }
+
+    def test_metrics(self, server, sample_pdf, tmp_path):
+        """运行指标合并工作进程的计数，并包含排队深度"""
+        assert request(server, "POST", f"/extract?path={sample_pdf}")[0] == 200
+        assert request(server, "POST", f"/extract?path={tmp_path / 'missing.pdf'}")[0] == 404
+
+        status, headers, body = request(server, "GET", "/metrics")
+        assert status == 200
+        assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        samples = dict(
+            line.rsplit(" ", 1) for line in body.decode("utf-8").splitlines() if not line.startswith("#")
+        )
+        assert float(samples["pdf_extractor_documents_total"]) >= 1
+        assert float(samples["pdf_extractor_pages_total"]) >= 2
+        assert float(samples['pdf_extractor_errors_total{type="FileNotFoundError"}']) >= 1
+        assert samples["pdf_extractor_queue_depth"] == "0"
+        assert samples["pdf_extractor_jobs_running"] == "0"
+        assert 'pdf_extractor_stage_duration_seconds_bucket{stage="extract",le="+Inf"}' in samples
+
+    def test_unknown_path(self, server):
+        status, _, _ = request(server, "GET", "/unknown")
+        assert status == 404
+
+    def test_wrong_method(self, server):
+        status, headers, _ = request(server, "GET", "/extract")
+        assert status == 405
+        assert headers["Allow"] == "POST, PUT"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,145 @@
+"""SQLite 语料库存储模块单元测试"""
+
+import sqlite3
+import pytest
+
+from src.models import ExtractedContent, KeyInformation, PageText
+from src.sqlite_store import SQLiteStore, build_match_query, open_sink, parse_sink
+
+
+def make_content(file_path, texts, key_info=None):
+    """构造提取内容"""
+    return ExtractedContent(
+        file_path=file_path,
+        page_count=len(texts),
+        pages=[PageText(page_number=i, text=text) for i, text in enumerate(texts)],
+        key_info=key_info,
+        errors=["第 3 页提取失败：页面损坏"] if len(texts) > 2 else []
+    )
+
+
+class TestBuildMatchQuery:
+    """测试检索词转换"""
+
+    def test_cjk_terms_segmented(self):
+        """测试中文检索词分词后作为短语"""
+        assert build_match_query("价值投资") == '"价值 投资"'
+
+    def test_multiple_terms(self):
+        """测试多个检索词为 AND 关系"""
+        assert build_match_query("安全边际  Graham") == '"安全 边际" "Graham"'
+
+    def test_quotes_escaped(self):
+        """测试引号被转义"""
+        assert build_match_query('say"hi') == '"say""hi"'
+
+    def test_empty_query(self):
+        """测试空检索词"""
+        assert build_match_query("   ") == ""
+
+
+class TestSQLiteStore:
+    """测试写入和全文检索"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """创建包含两个文档的语料库"""
+        store = SQLiteStore(str(tmp_path / "library.db"))
+        store.write_many([
+            make_content(
+                "思考致富.pdf",
+                ["第一章 欲望\n渴望是一切成就的起点。", "", "安全边际是价值投资的核心。"],
+                key_info=KeyInformation(keywords=["欲望", "渴望"], stage_timings={"keywords": 0.1})
+            ),
+            make_content("intelligent_investor.pdf", ["The margin of safety is the central concept."]),
+        ])
+        yield store
+        store.close()
+
+    def test_wal_mode(self, store):
+        """测试使用 WAL 日志模式"""
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_search_cjk(self, store):
+        """测试中文词语检索"""
+        hits = store.search("价值投资")
+        assert len(hits) == 1
+        assert hits[0].file_path == "思考致富.pdf"
+        assert hits[0].page_number == 3
+        assert hits[0].snippet == "安全边际是【价值投资】的核心。"
+
+    def test_search_two_character_word(self, store):
+        """测试两个字的中文词语"""
+        hits = store.search("渴望")
+        assert [(hit.file_path, hit.page_number) for hit in hits] == [("思考致富.pdf", 1)]
+
+    def test_search_latin(self, store):
+        """测试英文检索不区分大小写"""
+        hits = store.search("Margin safety")
+        assert len(hits) == 1
+        assert hits[0].file_path == "intelligent_investor.pdf"
+        assert "【margin】" in hits[0].snippet
+
+    def test_search_cjk_on_latin_page(self, store):
+        """测试以英文为主的页面中的中文词语同样可以检索"""
+        text = "Benjamin Graham called it the margin of safety, " * 5 + "即安全边际。"
+        store.write(make_content("mixed.pdf", [text]))
+        hits = store.search("安全边际")
+        assert ("mixed.pdf", 1) in [(hit.file_path, hit.page_number) for hit in hits]
+
+    def test_search_no_hits(self, store):
+        """测试没有结果"""
+        assert store.search("不存在的词语") == []
+        assert store.search("") == []
+
+    def test_rewrite_replaces_document(self, store):
+        """测试重复写入同一文件时替换旧记录"""
+        store.write(make_content("思考致富.pdf", ["新的内容"]))
+
+        assert store.document_count() == 2
+        assert store.search("渴望") == []
+        assert len(store.search("新的内容")) == 1
+        page_count = store._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        fts_count = store._conn.execute("SELECT COUNT(*) FROM pages_fts").fetchone()[0]
+        assert page_count == fts_count == 2
+
+    def test_key_info_and_errors_stored(self, store):
+        """测试关键信息和错误信息被保存"""
+        row = store._conn.execute(
+            "SELECT key_info.keywords, documents.errors FROM key_info "
+            "JOIN documents ON documents.id = key_info.document_id"
+        ).fetchone()
+        assert row == ('["欲望", "渴望"]', '["第 3 页提取失败：页面损坏"]')
+
+    def test_failed_batch_rolls_back(self, store):
+        """测试批量写入失败时整批回滚"""
+        broken = make_content("broken.pdf", ["内容"])
+        broken.page_count = None  # 违反 NOT NULL 约束
+
+        with pytest.raises(sqlite3.IntegrityError):
+            store.write_many([make_content("ok.pdf", ["内容"]), broken])
+        assert store.document_count() == 2
+
+
+class TestOpenSink:
+    """测试 --sink 参数解析"""
+
+    def test_parse_sink(self):
+        """测试支持的格式"""
+        assert parse_sink("sqlite:library.db") == "library.db"
+        assert parse_sink("sqlite:C:\\语料库\\library.db") == "C:\\语料库\\library.db"
+
+    @pytest.mark.parametrize("spec", ["library.db", "postgres:db", "sqlite:"])
+    def test_parse_sink_invalid(self, spec):
+        """测试不支持的格式"""
+        with pytest.raises(ValueError):
+            parse_sink(spec)
+
+    def test_open_sink(self, tmp_path):
+        """测试打开 SQLite 语料库"""
+        with open_sink(f"sqlite:{tmp_path / 'library.db'}") as store:
+            assert store.document_count() == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -163,6 +163,48 @@ class TestExtractText:
         pdf_reader.close(document)
 
 
+class TestPageComplexity:
+    """测试 page_complexity 方法"""
+    
+    def test_counts_page_objects(self, text_extractor, pdf_reader, tmp_path):
+        """统计字符、图形对象和内容流大小"""
+        pdf_path = tmp_path / "shapes.pdf"
+        c = canvas.Canvas(str(pdf_path), pagesize=letter)
+        c.drawString(100, 750, "Shapes")
+        for i in range(4):
+            c.rect(100 + i * 20, 600, 10, 10)
+        c.line(100, 500, 300, 500)
+        c.showPage()
+        c.save()
+        
+        document = pdf_reader.open(str(pdf_path))
+        text_extractor.extract_text(document, 0)
+        complexity = text_extractor.page_complexity(document, 0)
+        pdf_reader.close(document)
+        
+        assert complexity.page_number == 0
+        assert complexity.chars == 6
+        assert complexity.rects == 4
+        assert complexity.lines == 1
+        assert complexity.images == 0
+        assert complexity.content_bytes > 0
+    
+    def test_iter_pages_attaches_complexity(self, text_extractor, pdf_reader, temp_multipage_pdf):
+        """逐页提取的页面附带复杂度"""
+        document = pdf_reader.open(temp_multipage_pdf)
+        pages = [page for page, _ in text_extractor.iter_pages(document)]
+        pdf_reader.close(document)
+        
+        assert [page.complexity.page_number for page in pages] == [0, 1, 2]
+        assert all(page.complexity.chars > 0 for page in pages)
+    
+    def test_unavailable_document(self, text_extractor):
+        """文档未打开时返回 None"""
+        from src.models import PDFDocument
+        
+        assert text_extractor.page_complexity(PDFDocument("a.pdf", 1), 0) is None
+
+
 class TestExtractAllText:
     """测试 extract_all_text 方法"""
     
@@ -0,0 +1,72 @@
+"""TextRankSummarizer 单元测试"""
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from src.textrank import TextRankSummarizer
+from src.key_info_analyzer import KeyInfoAnalyzer
+
+
+class TestTextRankSummarizer:
+    """TextRankSummarizer 类的单元测试"""
+    
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.summarizer = TextRankSummarizer(min_sentence_length=2)
+    
+    def test_rank_scores_sum_to_one(self):
+        """测试得分归一化"""
+        sentences = ["价值投资关注企业内在价值", "企业内在价值决定长期回报", "今天天气很好"]
+        scores = self.summarizer.rank(sentences)
+        assert len(scores) == 3
+        assert abs(scores.sum() - 1.0) < 1e-6
+    
+    def test_rank_prefers_central_sentence(self):
+        """测试与其他句子最相似的句子得分最高"""
+        sentences = [
+            "价值投资关注企业内在价值",
+            "企业内在价值决定长期回报",
+            "长期回报来自价值投资",
+            "今天天气很好",
+        ]
+        scores = self.summarizer.rank(sentences)
+        assert scores.argmax() != 3
+        assert scores[3] == scores.min()
+    
+    def test_summarize_skips_leading_boilerplate(self):
+        """测试摘要不局限于开头的版权页"""
+        text = (
+            "版权所有，翻印必究。"
+            + "价值投资者关注企业的内在价值。" * 3
+            + "市场短期波动不改变企业的内在价值。"
+            + "投资者应当关注企业的内在价值与安全边际。"
+        )
+        summary = self.summarizer.summarize(text, max_length=40)
+        assert "版权所有" not in summary
+        assert "内在价值" in summary
+        assert len(summary) <= 40
+    
+    def test_summarize_respects_max_sentences(self):
+        """测试候选句数量上限"""
+        summarizer = TextRankSummarizer(max_sentences=10, min_sentence_length=2)
+        sentences = summarizer._split_sentences("第几句话内容。" * 100)
+        assert len(sentences) == 10
+    
+    def test_summarize_no_candidates(self):
+        """测试没有候选句"""
+        assert TextRankSummarizer().summarize("短。短。", max_length=10) == ""
+    
+    def test_analyzer_textrank_method(self):
+        """测试 KeyInfoAnalyzer 选择 textrank 算法"""
+        analyzer = KeyInfoAnalyzer()
+        text = "版权所有，翻印必究，未经许可不得转载。" + "企业的内在价值决定了长期的投资回报。" * 20
+        summary = analyzer.generate_summary(text, max_length=30, method='textrank')
+        assert "内在价值" in summary
+        assert len(summary) <= 30
+    
+    def test_analyzer_invalid_method(self):
+        """测试不支持的摘要算法"""
+        with pytest.raises(ValueError):
+            KeyInfoAnalyzer().generate_summary("文本" * 200, method='unknown')
@@ -0,0 +1,103 @@
+"""分词与文字体系检测单元测试"""
+
+import pytest
+
+from src import tokenizer
+from src.tokenizer import (
+    SCRIPT_CJK,
+    SCRIPT_LATIN,
+    SCRIPT_MIXED,
+    SCRIPT_NONE,
+    detect_script,
+    script_histogram,
+    split_script_runs,
+    tokenize,
+    tokenize_latin,
+    tokenize_pages,
+)
+from src.key_info_analyzer import KeyInfoAnalyzer
+
+
+class TestScriptDetection:
+    """测试文字体系检测"""
+    
+    def test_histogram_counts(self):
+        """测试字符直方图"""
+        histogram = script_histogram("abc 思考致富 é!")
+        assert histogram == {SCRIPT_CJK: 4, SCRIPT_LATIN: 4}
+    
+    def test_histogram_without_numpy(self, monkeypatch):
+        """测试未安装 NumPy 时的回退实现"""
+        expected = script_histogram("Think and Grow Rich 思考致富")
+        monkeypatch.setattr(tokenizer, "np", None)
+        assert script_histogram("Think and Grow Rich 思考致富") == expected
+    
+    def test_histogram_empty(self):
+        """测试空文本"""
+        assert script_histogram("") == {SCRIPT_CJK: 0, SCRIPT_LATIN: 0}
+    
+    def test_detect_script(self):
+        """测试文字体系判断"""
+        assert detect_script("Think and Grow Rich, by Napoleon Hill.") == SCRIPT_LATIN
+        assert detect_script("思考致富是一本经典著作。") == SCRIPT_CJK
+        assert detect_script("思考致富 Think and Grow Rich") == SCRIPT_MIXED
+        assert detect_script("12345 ...") == SCRIPT_NONE
+    
+    def test_split_script_runs(self):
+        """测试混排文本按片段切分"""
+        runs = split_script_runs("Napoleon Hill 的思考致富 Think and Grow Rich")
+        assert runs == [
+            (SCRIPT_LATIN, "Napoleon Hill "),
+            (SCRIPT_CJK, "的思考致富"),
+            (SCRIPT_LATIN, " Think and Grow Rich"),
+        ]
+
+
+class TestTokenize:
+    """测试分词"""
+    
+    def test_tokenize_latin_filters_stopwords(self):
+        """测试拉丁文字分词过滤停用词并转为小写"""
+        tokens = list(tokenize_latin("The Desire is the Starting Point of all achievement"))
+        assert tokens == ["desire", "starting", "point", "achievement"]
+    
+    def test_tokenize_latin_keeps_compound_words(self):
+        """测试保留撇号和连字符连接的单词"""
+        tokens = list(tokenize_latin("A well-known author's book"))
+        assert "well-known" in tokens
+        assert "author's" in tokens
+    
+    def test_tokenize_latin_page_skips_jieba(self, monkeypatch):
+        """测试英文页面不调用 jieba"""
+        def fail(*args, **kwargs):
+            raise AssertionError("英文页面不应调用 jieba")
+        monkeypatch.setattr(tokenizer.jieba, "cut", fail)
+        assert list(tokenize("Persistence and Faith")) == ["persistence", "faith"]
+    
+    def test_tokenize_mixed_page(self):
+        """测试混排页面分别处理汉字与拉丁片段"""
+        tokens = list(tokenize("思考致富 Think and Grow Rich"))
+        assert "think" in tokens
+        assert "grow" in tokens
+        assert "and" not in tokens
+        assert any("思考" in token or "致富" in token for token in tokens)
+    
+    def test_tokenize_pages_routes_each_page(self):
+        """测试逐页路由"""
+        tokens = list(tokenize_pages(["Burning Desire", "人工智能"]))
+        assert tokens[:2] == ["burning", "desire"]
+        assert "人工智能" in tokens
+
+
+class TestEnglishKeywords:
+    """测试英文关键词提取"""
+    
+    def test_extract_keywords_english_pages(self):
+        """测试英文文本关键词"""
+        analyzer = KeyInfoAnalyzer()
+        pages = [
+            "Desire is the starting point of all achievement. Desire backed by faith.",
+            "Faith is the head chemist of the mind. Desire and faith together.",
+        ]
+        keywords = analyzer.extract_keywords("".join(pages), top_n=2, pages=pages)
+        assert keywords == ["desire", "faith"]
@@ -0,0 +1,174 @@
+"""跟踪记录测试"""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src import tracing
+from src.cli import main
+from src.pdf_extraction_service import PDFExtractionService
+from src.tracing import TRACE_ENV_VAR, is_tracing, span, start_tracing, stop_tracing
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    """创建 3 页 PDF"""
+    path = tmp_path / "traced.pdf"
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for i in range(3):
+        c.drawString(100, 750, f"Traced page {i + 1} about extraction timelines")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+@pytest.fixture
+def trace_path(tmp_path):
+    """跟踪文件路径，测试结束时停止跟踪"""
+    yield str(tmp_path / "trace.json")
+    stop_tracing()
+
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["displayTimeUnit"] == "ms"
+    return data["traceEvents"]
+
+
+def complete_events(events):
+    return [event for event in events if event["ph"] == "X"]
+
+
+def _traced_child():
+    with span("child", value=1):
+        pass
+
+
+class TestSpan:
+    """测试事件记录"""
+
+    def test_disabled_span_is_shared_noop(self):
+        """未启用跟踪时 span 返回同一个空上下文"""
+        assert not is_tracing()
+        assert span("a", page=1) is span("b")
+        with span("a"):
+            pass
+
+    def test_complete_events(self, trace_path):
+        """事件带进程号、线程号、时间和参数，嵌套的事件在外层之内"""
+        start_tracing(trace_path)
+        with span("outer", file="a.pdf"):
+            with span("inner"):
+                pass
+        with pytest.raises(KeyError):
+            with span("failing"):
+                raise KeyError("x")
+        assert stop_tracing() == 5
+        assert not is_tracing()
+        assert TRACE_ENV_VAR not in os.environ
+
+        events = load_events(trace_path)
+        metadata = {event["name"]: event for event in events if event["ph"] == "M"}
+        assert metadata["process_name"]["args"]["name"] == "MainProcess"
+        assert metadata["thread_name"]["args"]["name"] == "MainThread"
+
+        inner, outer, failing = complete_events(events)
+        assert outer["name"] == "outer"
+        assert outer["args"] == {"file": "a.pdf"}
+        assert outer["pid"] == os.getpid()
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert failing["args"] == {"error": "KeyError"}
+        assert not [name for name in os.listdir(os.path.dirname(trace_path)) if name.endswith(".part")]
+
+    def test_stop_without_start(self):
+        assert stop_tracing() == 0
+
+
+class TestMultiprocess:
+    """测试多进程事件合并"""
+
+    def test_forked_children(self, trace_path):
+        """fork 出的子进程写出自己的事件，不重复父进程未写出的事件"""
+        start_tracing(trace_path)
+        with span("parent"):
+            pass
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=_traced_child) for _ in range(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        stop_tracing()
+
+        events = complete_events(load_events(trace_path))
+        assert sorted(event["name"] for event in events) == ["child", "child", "parent"]
+        assert {event["pid"] for event in events if event["name"] == "child"} == {
+            process.pid for process in processes
+        }
+
+    def test_spawned_process_enabled_by_environment(self, trace_path):
+        """spawn 出的进程通过环境变量在导入时启用跟踪"""
+        start_tracing(trace_path)
+        code = "from src.tracing import span\nwith span('spawned'):\n    pass\n"
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        stop_tracing()
+
+        names = [event["name"] for event in complete_events(load_events(trace_path))]
+        assert names == ["spawned"]
+
+    def test_import_without_fork(self):
+        """没有 os.register_at_fork 的平台（Windows）也能导入"""
+        code = "import os\ndel os.fork, os.register_at_fork\nimport src.tracing\n"
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+class TestExtractionTracing:
+    """测试提取流程的事件"""
+
+    def test_extraction_spans(self, pdf_path, trace_path, tmp_path):
+        start_tracing(trace_path)
+        PDFExtractionService().extract(
+            pdf_path, "json", key_info_stages=["keywords"], output_file=str(tmp_path / "out.json")
+        )
+        stop_tracing()
+
+        events = complete_events(load_events(trace_path))
+        names = [event["name"] for event in events]
+        assert names.count("PDFReader.open") == 1
+        assert names.count("analysis.keywords") == 1
+        assert "write" in names
+        pages = [event["args"]["page"] for event in events if event["name"] == "extract_text"]
+        assert pages == [1, 2, 3]
+
+    def test_cli_trace(self, pdf_path, trace_path, capsys):
+        assert main([pdf_path, "-f", "text", "--no-key-info", "--trace", trace_path, "-q"]) == 0
+        assert not is_tracing()
+        names = {event["name"] for event in load_events(trace_path)}
+        assert {"PDFReader.open", "extract_text", "write"} <= names
+        assert "trace.json" in capsys.readouterr().err
+
+    def test_batch_trace(self, pdf_path, trace_path, tmp_path):
+        """批量提取时各工作进程的事件合并到同一个文件"""
+        assert main(["batch", pdf_path, "-d", str(tmp_path / "out"), "-j", "2",
+                     "--no-key-info", "--trace", trace_path, "-q"]) == 0
+        events = complete_events(load_events(trace_path))
+        jobs = [event for event in events if event["name"] == "job"]
+        assert len(jobs) == 1
+        assert jobs[0]["args"] == {"file": pdf_path, "attempt": 1}
+        assert jobs[0]["pid"] != os.getpid()
+        assert tracing._tracer is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
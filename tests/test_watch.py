@@ -0,0 +1,193 @@
+"""监视目录测试"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from src.batch import BatchRunner
+from src.job_queue import STATUS_DONE, JobQueue
+from src.watch import (
+    Debouncer,
+    FolderWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+    open_watcher,
+)
+
+
+def make_pdf(path, text):
+    """创建单页 PDF"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    c = canvas.Canvas(str(path), pagesize=letter)
+    c.drawString(100, 750, text)
+    c.showPage()
+    c.save()
+
+
+def inotify_available(directory):
+    try:
+        InotifyWatcher(str(directory)).close()
+    except OSError:
+        return False
+    return True
+
+
+def wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDebouncer:
+    """测试等待文件写入完成"""
+
+    def test_ready_after_settle_time(self, tmp_path):
+        """文件在 settle_time 内不变才就绪，写入后重新计时"""
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        clock = FakeClock()
+        debouncer = Debouncer(settle_time=2.0, clock=clock)
+
+        debouncer.add([str(path)])
+        assert debouncer.ready() == []
+        clock.now = 1.5
+        assert debouncer.ready() == []
+
+        # 仍在写入
+        with open(path, "ab") as f:
+            f.write(b"\n% more")
+        clock.now = 3.0
+        assert debouncer.ready() == []
+        clock.now = 4.0
+        assert debouncer.ready() == []
+        clock.now = 5.0
+        assert debouncer.ready() == [str(path)]
+        assert len(debouncer) == 0
+
+    def test_deleted_file_dropped(self, tmp_path):
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"%PDF-1.4")
+        debouncer = Debouncer(settle_time=0, clock=FakeClock())
+        debouncer.add([str(path)])
+        path.unlink()
+        assert debouncer.ready() == []
+        assert len(debouncer) == 0
+
+
+class TestWatchers:
+    """测试目录监视器"""
+
+    def test_polling_reports_new_and_changed_pdfs(self, tmp_path):
+        (tmp_path / "old.pdf").write_bytes(b"old")
+        watcher = PollingWatcher(str(tmp_path), poll_interval=0.01)
+
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "new.pdf").write_bytes(b"new")
+        (tmp_path / "notes.txt").write_text("ignored")
+        (tmp_path / ".partial.pdf").write_bytes(b"hidden")
+        assert watcher.wait(0.01) == {str(tmp_path / "sub" / "new.pdf")}
+        assert watcher.wait(0.01) == set()
+
+        (tmp_path / "old.pdf").write_bytes(b"changed")
+        assert watcher.wait(0.01) == {str(tmp_path / "old.pdf")}
+
+    def test_inotify_reports_files_in_new_directories(self, tmp_path):
+        if not inotify_available(tmp_path):
+            pytest.skip("inotify 不可用")
+        watcher = InotifyWatcher(str(tmp_path))
+        try:
+            (tmp_path / "a.pdf").write_bytes(b"a")
+            assert str(tmp_path / "a.pdf") in watcher.wait(1.0)
+
+            # 移入的目录中已有的文件也会提交
+            staging = tmp_path.parent / f"{tmp_path.name}-staging"
+            (staging / "sub").mkdir(parents=True)
+            (staging / "sub" / "b.pdf").write_bytes(b"b")
+            os.rename(staging / "sub", tmp_path / "sub")
+            assert str(tmp_path / "sub" / "b.pdf") in watcher.wait(1.0)
+
+            (tmp_path / "sub" / "c.pdf").write_bytes(b"c")
+            assert str(tmp_path / "sub" / "c.pdf") in watcher.wait(1.0)
+        finally:
+            watcher.close()
+
+    def test_open_watcher_falls_back_to_polling(self, tmp_path):
+        assert isinstance(open_watcher(str(tmp_path), force_polling=True), PollingWatcher)
+
+
+class TestFolderWatcher:
+    """测试监视目录并提取"""
+
+    def test_startup_scan_skips_up_to_date_outputs(self, tmp_path):
+        """启动时跳过输出文件比输入文件新的 PDF"""
+        inbox = tmp_path / "inbox"
+        out = tmp_path / "out"
+        make_pdf(inbox / "done.pdf", "Done")
+        make_pdf(inbox / "stale.pdf", "Stale")
+        make_pdf(inbox / "sub" / "new.pdf", "New")
+        out.mkdir()
+        (out / "done.json").write_text("{}")
+        (out / "stale.json").write_text("{}")
+        old = os.stat(inbox / "stale.pdf").st_mtime - 60
+        os.utime(out / "stale.json", (old, old))
+
+        runner = BatchRunner(str(out / "jobs.db"), extract_key_info=False)
+        watcher = FolderWatcher(str(inbox), str(out), runner)
+
+        assert watcher.scan_existing() == 2
+        with JobQueue(str(out / "jobs.db")) as queue:
+            assert sorted(os.path.relpath(job.output_path, out) for job in queue.jobs()) == [
+                "stale.json", os.path.join("sub", "new.json")
+            ]
+
+    @pytest.mark.parametrize("force_polling", [True, False])
+    def test_extracts_dropped_files(self, tmp_path, force_polling):
+        """放入的 PDF 被提取到输出目录，修改后重新提取"""
+        inbox = tmp_path / "inbox"
+        out = tmp_path / "out"
+        inbox.mkdir()
+        if not force_polling and not inotify_available(inbox):
+            pytest.skip("inotify 不可用")
+        make_pdf(tmp_path / "source.pdf", "Dropped file")
+
+        runner = BatchRunner(str(tmp_path / "jobs.db"), extract_key_info=False)
+        watcher = FolderWatcher(str(inbox), str(out), runner, settle_time=0.2,
+                                poll_interval=0.05, force_polling=force_polling)
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        try:
+            output = out / "a.json"
+            shutil.copy(tmp_path / "source.pdf", inbox / "a.pdf")
+            assert wait_for(output.exists)
+            data = json.loads(output.read_text(encoding="utf-8"))
+            assert "Dropped file" in data["pages"][0]["text"]
+
+            make_pdf(inbox / "a.pdf", "Replaced file")
+            assert wait_for(lambda: "Replaced file" in output.read_text(encoding="utf-8"))
+        finally:
+            watcher.stop()
+            thread.join(timeout=30)
+        assert not thread.is_alive()
+        with JobQueue(str(tmp_path / "jobs.db")) as queue:
+            assert queue.counts()[STATUS_DONE] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])